@@ -0,0 +1,571 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+HTTP API универсального анализатора для UI (экраны источников, рекомендаций и качества данных).
+
+Долгоживущий asyncio-сервис вокруг DataAnalyzer и LLMClient: модель загружается в Ollama
+при старте, очередь запросов к LLM и соединение с Ollama общие для всех задач. Статистика
+каждой задачи считается в отдельном процессе, который завершается по таймауту или отмене.
+Задача - анализ одного файла входной папки; UI ставит ее в очередь и забирает результат,
+когда он готов. Веб-фреймворк не нужен: HTTP/1.1 поверх asyncio.start_server, ответы в JSON.
+
+Эндпоинты:
+    GET    /health                      состояние сервиса, задачи по статусам, очередь LLM
+    GET    /files                       файлы входной папки
+    POST   /jobs                        {"path": "tickets.csv", "options": {"sampled": true}, "timeout": 600}
+    GET    /jobs                        задачи, новые первыми
+    GET    /jobs/<id>                   статус задачи
+    GET    /jobs/<id>/result?wait=30    результат; wait - ждать готовности до N секунд (не больше 60)
+    DELETE /jobs/<id>                   отмена задачи, которая ждет в очереди или считает статистику
+
+Примеры:
+    python3 api_server.py -i input -o output --port 8765 --keep-alive 30m
+    curl -X POST localhost:8765/jobs -d '{"path": "tickets.csv"}'
+    curl "localhost:8765/jobs/<id>/result?wait=30"
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import re
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import universal_data_analyzer as uda
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_BODY_BYTES = 1024 * 1024
+MAX_HEADER_BYTES = 16 * 1024
+HEADER_TIMEOUT = 10  # Секунд на заголовки запроса
+KEEP_ALIVE_TIMEOUT = 15  # Секунд простоя соединения keep-alive
+MAX_RESULT_WAIT = 60  # Предел ?wait= для долгого опроса
+FINISHED_JOBS_KEPT = 500  # Завершенные задачи сверх этого числа забываются, старые первыми
+PROCESS_POLL_INTERVAL = 0.05  # Секунд между проверками готовности процесса анализа
+PROCESS_JOIN_TIMEOUT = 5  # Секунд на завершение процесса анализа после результата или terminate()
+
+# Параметры AnalysisConfig, которые можно задать для отдельной задачи, и их типы
+JOB_OPTIONS = {
+    "sampled": bool,
+    "chunk_size": int,
+    "arrow": bool,
+    "sample_rows": int,
+    "duplicates": str,
+    "key_columns": list,
+    "mask_pii": bool,
+    "infer_types": bool,
+    "correlations": bool,
+    "reuse_analyses": bool
+}
+# Допустимые значения строковых параметров
+JOB_OPTION_CHOICES = {
+    "duplicates": uda.DUPLICATE_METHODS
+}
+
+STATUS_TEXT = {200: "OK", 202: "Accepted", 204: "No Content", 400: "Bad Request", 404: "Not Found",
+               405: "Method Not Allowed", 409: "Conflict", 413: "Payload Too Large",
+               431: "Request Header Fields Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+def finite(value: Any) -> Any:
+    """NaN и бесконечности - в null: JSON.parse в браузере их не принимает"""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: finite(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [finite(item) for item in value]
+    return value
+
+
+def process_context():
+    """Контекст процессов анализа: forkserver, где он есть, иначе spawn.
+
+    fork из процесса с потоками (пулы, asyncio) небезопасен. Сервер forkserver заранее
+    импортирует анализатор и pandas, поэтому процесс задачи стартует за миллисекунды.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(["universal_data_analyzer", "pandas", "numpy"])
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+def analyze_in_process(config: uda.AnalysisConfig, file_info: uda.FileInfo, conn):
+    """Тело процесса анализа: ("ok", результат DataAnalyzer) или ("error", текст ошибки) в conn"""
+    try:
+        message = ("ok", uda.DataAnalyzer(config).analyze_file(file_info))
+    except Exception as e:
+        message = ("error", str(e))
+    try:
+        conn.send(message)
+    except Exception as e:  # Результат не сериализуется
+        conn.send(("error", f"Результат анализа не передан: {e}"))
+    conn.close()
+
+
+class ApiError(Exception):
+    """Ошибка запроса с HTTP-статусом ответа"""
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass
+class Job:
+    """Задача анализа файла: статусы queued -> analyzing -> llm -> done (или failed, timeout, cancelled)"""
+    id: str
+    path: str  # Относительно входной папки
+    full_path: str
+    options: Dict[str, Any]
+    timeout: Optional[float]
+    size_bytes: int
+    status: str = "queued"
+    created: str = field(default_factory=lambda: datetime.now().isoformat(timespec="seconds"))
+    started: Optional[str] = None
+    finished: Optional[str] = None
+    error: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+    done: asyncio.Event = field(default_factory=asyncio.Event)
+    task: Optional[asyncio.Task] = field(default=None, repr=False)  # Выполнение задачи, пока она не в очереди
+
+    FINAL = ("done", "failed", "timeout", "cancelled")
+
+    def finish(self, status: str, error: Optional[str] = None):
+        self.status = status
+        self.error = error
+        self.finished = datetime.now().isoformat(timespec="seconds")
+        self.done.set()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Статус без результата"""
+        info = {"job_id": self.id, "path": self.path, "status": self.status, "options": self.options,
+                "timeout": self.timeout, "created": self.created, "started": self.started,
+                "finished": self.finished}
+        if self.error:
+            info["error"] = self.error
+        if self.result:
+            info["report"] = self.result.get("report")
+            info["timings"] = {key: self.result["analysis_data"].get("timings", {}).get(key)
+                               for key in ("analysis_seconds", "total_seconds")}
+        return info
+
+
+class AnalyzerService:
+    """Очередь задач и общие ресурсы анализатора.
+
+    Статистика считается в отдельных процессах, не больше analysis_workers одновременно, ответы LLM -
+    в пуле потоков через общую очередь LLMClient (не больше llm_concurrency запросов к Ollama).
+    Меньшие файлы идут раньше. По таймауту и отмене процесс статистики завершается и освобождает
+    место следующей задаче; для этапа LLM таймаут ограничивает ожидание в очереди и запросы.
+    """
+    def __init__(self, config: uda.AnalysisConfig, analysis_workers: int = 1, max_jobs: int = 100,
+                 job_timeout: Optional[float] = None):
+        self.config = config
+        self.analysis_workers = max(1, analysis_workers)
+        self.max_jobs = max_jobs
+        self.job_timeout = job_timeout
+        self.logger = uda.Logger(config.verbose)
+        self.file_handler = uda.FileHandler(self.logger)
+        self.llm_client = uda.create_llm_client(config, self.logger)
+        self.result_saver = uda.ResultSaver(config.output_dir, self.logger) if config.save_results else None
+        self.analysis_index = uda.AnalysisIndex(config.output_dir, self.logger) \
+            if config.save_results and config.reuse_analyses else None
+        self.context = process_context()
+        self.llm_pool = ThreadPoolExecutor(max_workers=2 * max(1, config.llm_concurrency), thread_name_prefix="llm")
+        self.jobs: Dict[str, Job] = {}
+        self.queue: Optional[asyncio.PriorityQueue] = None
+        self.order = itertools.count()
+        self.workers: List[asyncio.Task] = []
+        self.started = time.monotonic()
+
+    async def start(self, warm_up: bool = True):
+        self.queue = asyncio.PriorityQueue()
+        self.workers = [asyncio.create_task(self._worker()) for _ in range(self.analysis_workers)]
+        if warm_up:
+            # Загрузка модели не задерживает прием задач
+            asyncio.get_running_loop().run_in_executor(self.llm_pool, self.llm_client.warm_up)
+
+    async def stop(self):
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.llm_pool.shutdown(wait=False, cancel_futures=True)
+
+    def resolve(self, path: str) -> str:
+        """Путь файла внутри входной папки; другие файлы сервиса недоступны"""
+        root = os.path.realpath(self.config.input_dir)
+        full = os.path.realpath(os.path.join(root, path))
+        if os.path.commonpath([root, full]) != root:
+            raise ApiError(400, f"Путь вне входной папки: {path}")
+        if not os.path.isfile(full):
+            raise ApiError(404, f"Файл не найден: {path}")
+        if not self.file_handler.matches(full):
+            raise ApiError(400, f"Неподдерживаемый формат: {path}")
+        return full
+
+    def submit(self, payload: Dict[str, Any]) -> Job:
+        if not isinstance(payload.get("path"), str):
+            raise ApiError(400, "Нужен path - путь файла относительно входной папки")
+        options = payload.get("options") or {}
+        if not isinstance(options, dict):
+            raise ApiError(400, "options должен быть объектом")
+        for name, value in options.items():
+            expected = JOB_OPTIONS.get(name)
+            if expected is None:
+                raise ApiError(400, f"Неизвестный параметр {name}; доступны: {', '.join(JOB_OPTIONS)}")
+            if not isinstance(value, expected) or (expected is int and isinstance(value, bool)):
+                raise ApiError(400, f"Параметр {name} должен быть {expected.__name__}")
+            choices = JOB_OPTION_CHOICES.get(name)
+            if choices and value not in choices:
+                raise ApiError(400, f"Параметр {name}: одно из {', '.join(choices)}")
+            if expected is list and not all(isinstance(item, str) and item for item in value):
+                raise ApiError(400, f"Параметр {name} - список имен столбцов")
+        timeout = payload.get("timeout", self.job_timeout)
+        if timeout is not None and (not isinstance(timeout, (int, float)) or timeout <= 0):
+            raise ApiError(400, "timeout - положительное число секунд")
+        active = sum(1 for job in self.jobs.values() if job.status not in Job.FINAL)
+        if active >= self.max_jobs:
+            raise ApiError(503, f"Очередь заполнена: {active} задач")
+
+        path = self.resolve(payload["path"])
+        job = Job(id=uuid.uuid4().hex[:12], path=os.path.relpath(path, os.path.realpath(self.config.input_dir)),
+                  full_path=path, options=options, timeout=timeout, size_bytes=os.path.getsize(path))
+        self.jobs[job.id] = job
+        self.queue.put_nowait((job.size_bytes, next(self.order), job.id))
+        self.logger.info(f"Задача {job.id}: {job.path}")
+        self._forget_finished()
+        return job
+
+    def cancel(self, job: Job):
+        if job.status not in ("queued", "analyzing"):
+            raise ApiError(409, f"Задача уже {job.status}, отменить можно только ожидающую или считающую статистику")
+        job.finish("cancelled")
+        if job.task is not None:
+            job.task.cancel()  # Процесс статистики завершается
+
+    def _forget_finished(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job.status in Job.FINAL]
+        for job_id in finished[:max(0, len(finished) - FINISHED_JOBS_KEPT)]:
+            del self.jobs[job_id]
+
+    async def _worker(self):
+        while True:
+            _, _, job_id = await self.queue.get()
+            job = self.jobs.get(job_id)
+            if job is None or job.status != "queued":
+                continue
+            job.started = datetime.now().isoformat(timespec="seconds")
+            job.task = asyncio.create_task(self._run(job))
+            try:
+                await asyncio.wait_for(job.task, job.timeout)
+            except asyncio.TimeoutError:
+                job.finish("timeout", f"Не уложилась в {job.timeout:g}с")
+                self.logger.warning(f"Задача {job.id}: таймаут {job.timeout:g}с")
+            except asyncio.CancelledError:
+                # Отмена задачи через DELETE; остановку сервиса пропускаем дальше
+                if job.status != "cancelled":
+                    raise
+                self.logger.info(f"Задача {job.id} отменена")
+            except Exception as e:
+                job.finish("failed", str(e))
+                self.logger.error(f"Задача {job.id}: {e}")
+            finally:
+                job.task = None
+
+    async def _run(self, job: Job):
+        loop = asyncio.get_running_loop()
+        deadline = time.monotonic() + job.timeout if job.timeout else None
+        config = replace(self.config, **{key: job.options[key] for key in job.options})
+        file_info = self.file_handler.file_info(job.full_path)
+        job.status = "analyzing"
+        analysis_data = await self._analyze(config, file_info)
+        job.status = "llm"
+        job.result = await loop.run_in_executor(self.llm_pool, self._answer, job, file_info, analysis_data,
+                                                config, deadline)
+        job.finish("done")
+        self.logger.success(f"Задача {job.id} готова за {analysis_data['timings']['total_seconds']:.1f}с")
+
+    async def _analyze(self, config: uda.AnalysisConfig, file_info: uda.FileInfo) -> Dict[str, Any]:
+        """Статистика файла в отдельном процессе; при отмене (таймаут, DELETE, остановка) процесс завершается"""
+        loop = asyncio.get_running_loop()
+        receiver, sender = self.context.Pipe(duplex=False)
+        process = self.context.Process(target=analyze_in_process, args=(config, file_info, sender),
+                                       name="analysis", daemon=True)
+        process.start()
+        sender.close()  # Иначе конец канала не виден, если процесс упадет
+        received = False
+        try:
+            while not receiver.poll():
+                await asyncio.sleep(PROCESS_POLL_INTERVAL)
+            try:
+                # Большой результат читается, пока процесс его пишет: не в цикле событий
+                status, payload = await loop.run_in_executor(None, receiver.recv)
+            except EOFError:
+                raise RuntimeError("Процесс анализа завершился без результата")
+            received = True
+        finally:
+            receiver.close()
+            if not received:
+                process.terminate()
+            await loop.run_in_executor(None, process.join, PROCESS_JOIN_TIMEOUT)
+            if process.is_alive():
+                process.kill()
+        if status != "ok":
+            raise RuntimeError(payload)
+        return payload
+
+    def _answer(self, job: Job, file_info: uda.FileInfo, analysis_data: Dict[str, Any], config: uda.AnalysisConfig,
+                deadline: Optional[float]) -> Dict[str, Any]:
+        analysis_index = self.analysis_index if config.reuse_analyses else None
+        llm_response = uda.answer_file(file_info, analysis_data, self.logger, self.llm_client, config,
+                                       analysis_index, deadline)
+        report = uda.save_result(file_info, analysis_data, llm_response, self.result_saver, analysis_index)
+        return {"file": job.path, "analysis_data": analysis_data,
+                "llm_response": llm_response, "report": report}
+
+    def health(self) -> Dict[str, Any]:
+        statuses: Dict[str, int] = {}
+        for job in self.jobs.values():
+            statuses[job.status] = statuses.get(job.status, 0) + 1
+        return {"status": "ok", "uptime_seconds": round(time.monotonic() - self.started, 1),
+                "model": self.config.model_name, "fast_model": self.config.llm_fast_model,
+                "analysis_workers": self.analysis_workers, "jobs": statuses, "llm_queue": self.llm_client.queue.report()}
+
+    def files(self) -> List[Dict[str, Any]]:
+        return [{"path": os.path.relpath(f.path, self.config.input_dir), "format": f.format,
+                 "compression": f.compression, "size_bytes": f.size_bytes, "modified": f.modified.isoformat()}
+                for f in self.file_handler.find_files(self.config.input_dir)]
+
+
+class ApiServer:
+    """HTTP/1.1 с keep-alive поверх asyncio: маршрутизация и JSON-ответы"""
+    ROUTES = [
+        ("GET", re.compile(r"^/health$"), "health"),
+        ("GET", re.compile(r"^/files$"), "files"),
+        ("POST", re.compile(r"^/jobs$"), "submit"),
+        ("GET", re.compile(r"^/jobs$"), "list_jobs"),
+        ("GET", re.compile(r"^/jobs/(\w+)$"), "get_job"),
+        ("DELETE", re.compile(r"^/jobs/(\w+)$"), "cancel_job"),
+        ("GET", re.compile(r"^/jobs/(\w+)/result$"), "get_result")
+    ]
+
+    def __init__(self, service: AnalyzerService, cors_origin: Optional[str] = None):
+        self.service = service
+        self.cors_origin = cors_origin
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except ApiError as e:
+                    await self._respond(writer, e.status, {"error": str(e)}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                method, target, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+                status, payload = await self._dispatch(method, target, body)
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+        """Запрос или None, если клиент закрыл соединение или молчит дольше KEEP_ALIVE_TIMEOUT"""
+        try:
+            line = await asyncio.wait_for(reader.readline(), KEEP_ALIVE_TIMEOUT)
+        except asyncio.TimeoutError:
+            return None
+        except ValueError:  # Строка длиннее лимита буфера
+            raise ApiError(431, "Слишком длинная строка запроса")
+        if not line.strip():
+            return None
+        try:
+            method, target, _ = line.decode("latin-1").split(" ", 2)
+        except ValueError:
+            raise ApiError(400, "Некорректная строка запроса")
+        try:
+            headers = await asyncio.wait_for(self._read_headers(reader), HEADER_TIMEOUT)
+        except asyncio.TimeoutError:
+            raise ApiError(400, "Заголовки не получены вовремя")
+        try:
+            length = int(headers.get("content-length") or 0)
+        except ValueError:
+            raise ApiError(400, "Некорректный Content-Length")
+        if length > MAX_BODY_BYTES:
+            raise ApiError(413, f"Тело запроса больше {MAX_BODY_BYTES} байт")
+        body = await asyncio.wait_for(reader.readexactly(length), HEADER_TIMEOUT) if length else b""
+        return method.upper(), target, headers, body
+    
+    @staticmethod
+    async def _read_headers(reader: asyncio.StreamReader) -> Dict[str, str]:
+        headers = {}
+        size = 0
+        while True:
+            try:
+                line = await reader.readline()
+            except ValueError:
+                raise ApiError(431, "Слишком большие заголовки")
+            size += len(line)
+            if size > MAX_HEADER_BYTES:
+                raise ApiError(431, "Слишком большие заголовки")
+            if not line.strip():
+                return headers
+            name, sep, value = line.decode("latin-1").partition(":")
+            if sep:
+                headers[name.strip().lower()] = value.strip()
+
+    async def _dispatch(self, method: str, target: str, body: bytes) -> Tuple[int, Any]:
+        url = urlsplit(target)
+        if method == "OPTIONS":
+            return 204, None
+        allowed = []
+        for route_method, pattern, handler in self.ROUTES:
+            match = pattern.match(url.path)
+            if not match:
+                continue
+            if route_method != method:
+                allowed.append(route_method)
+                continue
+            try:
+                return await getattr(self, handler)(*match.groups(), query=parse_qs(url.query), body=body)
+            except ApiError as e:
+                return e.status, {"error": str(e)}
+            except Exception as e:
+                self.service.logger.error(f"{method} {url.path}: {e}")
+                return 500, {"error": str(e)}
+        if allowed:
+            return 405, {"error": f"Метод {method} не поддерживается, доступны: {', '.join(allowed)}"}
+        return 404, {"error": f"Нет такого адреса: {url.path}"}
+
+    async def _respond(self, writer: asyncio.StreamWriter, status: int, payload: Any, keep_alive: bool):
+        data = uda.safe_json_dumps(finite(payload), ensure_ascii=False).encode("utf-8") \
+            if payload is not None else b""
+        headers = [f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}",
+                   f"Content-Length: {len(data)}",
+                   f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        if data:
+            headers.append("Content-Type: application/json; charset=utf-8")
+        if self.cors_origin:
+            headers += [f"Access-Control-Allow-Origin: {self.cors_origin}",
+                        "Access-Control-Allow-Methods: GET, POST, DELETE, OPTIONS",
+                        "Access-Control-Allow-Headers: Content-Type"]
+        writer.write(("\r\n".join(headers) + "\r\n\r\n").encode("latin-1") + data)
+        await writer.drain()
+
+    def _job(self, job_id: str) -> Job:
+        job = self.service.jobs.get(job_id)
+        if job is None:
+            raise ApiError(404, f"Задача {job_id} не найдена")
+        return job
+
+    async def health(self, query, body):
+        return 200, self.service.health()
+
+    async def files(self, query, body):
+        return 200, {"input_dir": self.service.config.input_dir, "files": self.service.files()}
+
+    async def submit(self, query, body):
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError as e:
+            raise ApiError(400, f"Тело запроса - не JSON: {e}")
+        if not isinstance(payload, dict):
+            raise ApiError(400, "Тело запроса должно быть объектом JSON")
+        job = self.service.submit(payload)
+        return 202, {**job.to_dict(), "status_url": f"/jobs/{job.id}", "result_url": f"/jobs/{job.id}/result"}
+
+    async def list_jobs(self, query, body):
+        return 200, {"jobs": [job.to_dict() for job in reversed(list(self.service.jobs.values()))]}
+
+    async def get_job(self, job_id, query, body):
+        return 200, self._job(job_id).to_dict()
+
+    async def cancel_job(self, job_id, query, body):
+        job = self._job(job_id)
+        self.service.cancel(job)
+        return 200, job.to_dict()
+
+    async def get_result(self, job_id, query, body):
+        """Результат готовой задачи; для незавершенной - 202 со статусом (после ожидания ?wait=N)"""
+        job = self._job(job_id)
+        try:
+            wait = min(float(query.get("wait", ["0"])[0]), MAX_RESULT_WAIT)
+        except ValueError:
+            raise ApiError(400, "wait - число секунд")
+        if wait > 0 and not job.done.is_set():
+            try:
+                await asyncio.wait_for(job.done.wait(), wait)
+            except asyncio.TimeoutError:
+                pass
+        if job.status == "done":
+            return 200, {**job.to_dict(), **job.result}
+        if job.status in Job.FINAL:
+            return 409, job.to_dict()
+        return 202, job.to_dict()
+
+
+def create_argument_parser() -> argparse.ArgumentParser:
+    """Параметры анализатора (как у universal_data_analyzer.py) и параметры сервиса"""
+    parser = uda.create_argument_parser()
+    parser.description = "HTTP API анализатора данных с локальной LLM"
+    parser.epilog = __doc__[__doc__.index("Эндпоинты:"):]
+    group = parser.add_argument_group("HTTP API")
+    group.add_argument("--host", default=DEFAULT_HOST, help=f"Адрес (по умолчанию: {DEFAULT_HOST})")
+    group.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Порт (по умолчанию: {DEFAULT_PORT})")
+    group.add_argument("--analysis-workers", type=int, default=1,
+                       help="Файлов, статистика которых считается одновременно (по умолчанию: 1)")
+    group.add_argument("--max-jobs", type=int, default=100,
+                       help="Незавершенных задач, сверх которых новые отклоняются с 503 (по умолчанию: 100)")
+    group.add_argument("--job-timeout", type=float,
+                       help="Таймаут задачи по умолчанию, секунд (задача может задать свой timeout)")
+    group.add_argument("--cors-origin", default="*",
+                       help="Access-Control-Allow-Origin для UI на другом порту, пустая строка - без CORS (по умолчанию: *)")
+    group.add_argument("--no-warm-up", action="store_true", help="Не загружать модель в Ollama при старте")
+    return parser
+
+
+async def serve(args: argparse.Namespace):
+    config = uda.config_from_args(args)
+    service = AnalyzerService(config, args.analysis_workers, args.max_jobs, args.job_timeout)
+    await service.start(warm_up=not args.no_warm_up)
+    api = ApiServer(service, args.cors_origin or None)
+    server = await asyncio.start_server(api.handle_connection, args.host, args.port, limit=MAX_HEADER_BYTES)
+    service.logger.success(f"HTTP API: http://{args.host}:{args.port} (входная папка {config.input_dir})")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.stop()
+
+
+def main():
+    args = create_argument_parser().parse_args()
+    uda.check_required_packages()
+    if not os.path.isdir(args.input_dir):
+        print(f"Директория {args.input_dir} не найдена")
+        sys.exit(1)
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        print("Сервис остановлен")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Генератор синтетической выгрузки билетов для бенчмарков universal_data_analyzer.py.
+
+Схема повторяет выгрузку билетов из 27 столбцов: даты в ISO с часовым поясом,
+справочники событий и площадок, кириллица, пропуски в персональных данных.
+Данные воспроизводимы: одинаковые seed и число строк дают одинаковый файл.
+Строки генерируются порциями, поэтому объем файла ограничен только диском.
+"""
+
+import argparse
+import json
+import os
+import re
+from pathlib import Path
+from typing import Iterator, Optional
+from xml.sax.saxutils import escape
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = [
+    "created", "order_status", "ticket_status", "ticket_price", "visitor_category", "event_id",
+    "is_active", "valid_to", "count_visitor", "is_entrance", "is_entrance_mdate", "event_name",
+    "event_kind_name", "spot_id", "spot_name", "museum_name", "start_datetime", "ticket_id",
+    "update_timestamp", "client_name", "name", "surname", "client_phone", "museum_inn",
+    "birthday_date", "order_number", "ticket_number"
+]
+
+FORMATS = {"csv": ".csv", "tsv": ".tsv", "json": ".json", "xml": ".xml", "parquet": ".parquet", "excel": ".xlsx"}
+EXCEL_MAX_ROWS = 1_048_575  # Лист Excel без строки заголовка
+CHUNK_ROWS = 500_000
+
+EVENTS, SPOTS, MUSEUMS = 10_000, 371, 139
+
+KINDS = ["выставка", "экскурсия", "концерт", "спектакль", "лекция", "мастер-класс",
+         "интерактивное занятие, мастер-класс, урок", "квест", "кинопоказ", "фестиваль"]
+KINDS += [f"{kind}, онлайн" for kind in KINDS] + [f"программа {i}" for i in range(1, 14)]  # 33 вида
+
+CATEGORIES = [
+    "Полный", "Дети в возрасте от 7 до 17 лет включительно", "Пенсионеры", "Многодетные семьи",
+    "Студенты, обучающиеся по очной форме обучения в государственных образовательных учреждениях "
+    "и негосударственных образовательных организациях, имеющих государственную аккредитацию, "
+    "по программам среднего и высшего профессионального образования",
+    "Инвалиды I и II групп", "Ветераны боевых действий", "Члены Союза художников России"
+] + [f"Льготная категория № {i}" for i in range(1, 76)]  # 83 категории
+
+FIRST_NAMES = ["НИКОЛАЙ", "ВАЛЕНТИНА", "ЭЛЕОНОРА", "МАКСИМ", "НИНА", "ДАНИЛ", "АННА", "ИВАН", "ОЛЬГА",
+               "СЕРГЕЙ", "ЕЛЕНА", "АЛЕКСЕЙ", "МАРИЯ", "ДМИТРИЙ", "ТАТЬЯНА", "АНДРЕЙ", "ЮЛИЯ", "ПАВЕЛ",
+               "ИРИНА", "МИХАИЛ", "СВЕТЛАНА", "ВИКТОР", "ЕКАТЕРИНА", "СЕМЁН"]
+SURNAME_ROOTS = ["ИВАН", "ПЕТР", "СИДОР", "КУЗНЕЦ", "СМИРН", "ПОПОВ", "ВАСИЛЬ", "ЛАЗАРИД", "ЭНИ", "ЮХНОВЕЦ",
+                 "ГРИНЕВИЧ", "СОКОЛ", "МОРОЗ", "ВОЛК", "ЛЕБЕД", "КОЗЛ", "НОВИК", "ФЕДОР", "ОРЛ", "ЗАЙЦ"]
+SURNAME_ENDINGS = ["ОВ", "ЕВ", "ИН", "ОВА", "ЕВА", "ИНА", "ИС", "А", "СКИЙ", "СКАЯ", "ЕНКО", "ЮК"]
+STREETS = ["Большой Тишинский пер.", "Грузинская Б. ул.", "Борисоглебский пер.", "ул. Пречистенка",
+           "Тверская ул.", "Волхонка ул.", "Новый Арбат ул.", "Пятницкая ул."]
+
+
+def parse_rows(value: str) -> int:
+    """Число строк с суффиксом: 10k, 1.5m, 50m"""
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)([km]?)", value.strip().lower())
+    if not match:
+        raise argparse.ArgumentTypeError(f"Неверное число строк: {value}")
+    return int(float(match.group(1)) * {"": 1, "k": 1_000, "m": 1_000_000}[match.group(2)])
+
+
+def uuid_text(high: int, low: int) -> str:
+    """UUID-подобная строка из двух 63-битных чисел"""
+    h = f"{high:016x}{low:016x}"
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+def dataset_path(directory: str, rows: int, fmt: str, seed: int = 42) -> Path:
+    """Имя файла набора: одинаковые параметры - один и тот же файл"""
+    return Path(directory) / f"tickets_{rows}_s{seed}{FORMATS[fmt]}"
+
+
+class TicketGenerator:
+    """Порции синтетической выгрузки билетов"""
+
+    def __init__(self, seed: int = 42):
+        self.seed = seed
+        rng = np.random.default_rng(seed)
+        # Справочники: событие -> вид, площадка, название; площадка -> адрес, учреждение
+        self.event_kind = rng.integers(0, len(KINDS), EVENTS)
+        self.event_spot = rng.integers(0, SPOTS, EVENTS)
+        self.event_names = np.array([
+            f"{KINDS[k].split(',')[0].capitalize()} «{rng.choice(SURNAME_ROOTS).capitalize()}ская коллекция {i}»"
+            if i % 3 else f'Квест-урок "Мир в чемодане {i}"'
+            for i, k in enumerate(self.event_kind)], dtype=object)
+        self.spot_ids = rng.choice(np.arange(100, 300_000), SPOTS, replace=False).astype("float64")
+        self.spot_names = np.array([f"{STREETS[i % len(STREETS)]} {i + 1}, строение {i % 5 + 1}"
+                                    for i in range(SPOTS)], dtype=object)
+        self.spot_museum = rng.integers(0, MUSEUMS, SPOTS)
+        self.museum_names = np.array([
+            f"Государственное бюджетное учреждение культуры города Москвы «Музей № {i + 1}»" for i in range(MUSEUMS)
+        ], dtype=object)
+        self.surnames = np.array([root + ending for root in SURNAME_ROOTS for ending in SURNAME_ENDINGS], dtype=object)
+        # Цены: ~100 значений, бесплатные билеты - самые частые
+        self.prices = np.concatenate([[0.0], np.round(np.arange(50, 5001, 50) * 1.0, 2), [149.99, 349.5]])
+        price_weights = np.full(len(self.prices), 0.6 / (len(self.prices) - 1))
+        price_weights[0] = 0.4
+        self.price_weights = price_weights
+        # Популярность событий по закону Ципфа
+        weights = 1.0 / np.arange(1, EVENTS + 1) ** 0.8
+        self.event_weights = weights / weights.sum()
+
+    def chunks(self, rows: int, chunk_rows: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+        """Порции по chunk_rows строк; каждая зависит только от seed и своего номера"""
+        for index, start in enumerate(range(0, rows, chunk_rows)):
+            yield self.chunk(start, min(chunk_rows, rows - start), index)
+
+    def chunk(self, start: int, n: int, index: int) -> pd.DataFrame:
+        rng = np.random.default_rng([self.seed, index])
+
+        def nulls(values, rate):
+            values = pd.Series(values, dtype=object)
+            values[rng.random(n) < rate] = None
+            return values
+
+        def iso(moments):
+            return np.char.add(np.datetime_as_string(moments, unit="ms"), "+03:00")
+
+        created = np.datetime64("2021-01-01T00:00:00") + rng.integers(0, 365 * 86400 * 1000, n).astype("timedelta64[ms]")
+        event = rng.choice(EVENTS, n, p=self.event_weights)
+        spot = self.event_spot[event]
+        visit_day = (created + rng.integers(0, 14, n).astype("timedelta64[D]")).astype("datetime64[D]")
+        start_hour = visit_day + rng.integers(9, 21, n).astype("timedelta64[h]")
+        # ~0.06% повторных ticket_id, как в исходной выгрузке
+        ticket_id = np.arange(start, start + n) + 100_000
+        repeats = rng.random(n) < 0.0006
+        ticket_id[repeats] = rng.choice(ticket_id, repeats.sum())
+        has_name = rng.random(n) >= 0.402
+        first = np.array(FIRST_NAMES, dtype=object)[rng.integers(0, len(FIRST_NAMES), n)]
+        last = self.surnames[rng.integers(0, len(self.surnames), n)]
+        birthday = np.datetime64("1940-01-01") + rng.integers(0, 80 * 365, n).astype("timedelta64[D]")
+        uuid_parts = rng.integers(0, 2 ** 63, (n, 2), dtype=np.int64)
+
+        return pd.DataFrame({
+            "created": iso(created),
+            "order_status": rng.choice(["PAID", "CANCELLED", "REFUND"], n, p=[0.9, 0.07, 0.03]),
+            "ticket_status": rng.choice(["PAID", "CANCELLED", "REFUNDED", "RESERVED"], n, p=[0.88, 0.07, 0.03, 0.02]),
+            "ticket_price": rng.choice(self.prices, n, p=self.price_weights),
+            "visitor_category": np.array(CATEGORIES, dtype=object)[rng.integers(0, len(CATEGORIES), n)],
+            "event_id": event.astype("float64") + 1,
+            "is_active": rng.random(n) < 0.97,
+            "valid_to": visit_day.astype(str),
+            "count_visitor": np.ones(n, dtype=np.int64),
+            "is_entrance": np.where(rng.random(n) < 0.8, "True", "False"),
+            "is_entrance_mdate": iso(start_hour.astype("datetime64[ms]") + rng.integers(0, 3600_000, n).astype("timedelta64[ms]")),
+            "event_name": self.event_names[event],
+            "event_kind_name": np.array(KINDS, dtype=object)[self.event_kind[event]],
+            "spot_id": self.spot_ids[spot],
+            "spot_name": self.spot_names[spot],
+            "museum_name": self.museum_names[self.spot_museum[spot]],
+            "start_datetime": nulls(np.datetime_as_string(start_hour, unit="s"), 0.042).str.replace("T", " "),
+            "ticket_id": ticket_id,
+            "update_timestamp": iso(created + rng.integers(100, 600_000, n).astype("timedelta64[ms]")),
+            "client_name": last + " " + first,
+            "name": pd.Series(first).where(has_name, None),
+            "surname": pd.Series(last).where(has_name, None),
+            "client_phone": nulls(np.char.add("79", rng.integers(10 ** 8, 10 ** 9, n).astype(str)), 0.327),
+            "museum_inn": rng.integers(10 ** 7, 10 ** 10, n).astype("float64"),
+            "birthday_date": nulls(birthday.astype(str), 0.935),
+            "order_number": [f"{a:05d}-{b:06d}" for a, b in zip(rng.integers(0, 10 ** 5, n), rng.integers(0, 10 ** 6, n))],
+            "ticket_number": [uuid_text(a, b) for a, b in uuid_parts]
+        }, columns=COLUMNS)
+
+
+def write_dataset(path: Path, fmt: str, rows: int, seed: int = 42, chunk_rows: int = CHUNK_ROWS) -> Path:
+    """Записать набор в формате fmt порциями (Excel - не больше одного листа)"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    generator = TicketGenerator(seed)
+    tmp = path.with_name(path.name + ".part")
+    if fmt == "excel":
+        if rows > EXCEL_MAX_ROWS:
+            raise ValueError(f"Excel вмещает не больше {EXCEL_MAX_ROWS:,} строк на лист")
+        try:
+            import openpyxl  # noqa: F401
+        except ImportError:
+            raise RuntimeError("Для Excel нужен openpyxl: pip install openpyxl")
+        # openpyxl пишет книгу целиком
+        pd.concat(generator.chunks(rows, chunk_rows)).to_excel(tmp, index=False, engine="openpyxl")
+    elif fmt == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        writer = None
+        for chunk in generator.chunks(rows, chunk_rows):
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            writer = writer or pq.ParquetWriter(tmp, table.schema)
+            writer.write_table(table)
+        if writer:
+            writer.close()
+    else:
+        with open(tmp, "w", encoding="utf-8", newline="") as f:
+            if fmt == "json":
+                f.write("[\n")
+            elif fmt == "xml":
+                f.write('<?xml version="1.0" encoding="UTF-8"?>\n<tickets>\n')
+            for i, chunk in enumerate(generator.chunks(rows, chunk_rows)):
+                if fmt in ("csv", "tsv"):
+                    # Выгрузка как у источника: ";" и десятичная запятая
+                    chunk.to_csv(f, sep=";" if fmt == "csv" else "\t", decimal=",", index=False, header=i == 0)
+                elif fmt == "json":
+                    records = chunk.to_json(orient="records", force_ascii=False, lines=True).strip().replace("\n", ",\n")
+                    f.write((",\n" if i else "") + records)
+                else:
+                    write_xml_rows(f, chunk)
+            f.write("\n]\n" if fmt == "json" else "</tickets>\n" if fmt == "xml" else "")
+    os.replace(tmp, path)
+    return path
+
+
+def write_xml_rows(f, chunk: pd.DataFrame):
+    """Строки как <ticket><столбец>значение</столбец>...</ticket>; пропуски не пишутся"""
+    columns = list(chunk.columns)
+    for row in chunk.itertuples(index=False, name=None):
+        fields = "".join(f"<{c}>{escape(str(v))}</{c}>" for c, v in zip(columns, row) if v is not None and v == v)
+        f.write(f"<ticket>{fields}</ticket>\n")
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Синтетическая выгрузка билетов (27 столбцов) для бенчмарков")
+    parser.add_argument("-n", "--rows", type=parse_rows, default=parse_rows("100k"),
+                        help="Число строк: 10k, 1m, 50m (по умолчанию: 100k)")
+    parser.add_argument("-f", "--format", choices=list(FORMATS), nargs="+", default=["csv"],
+                        help="Форматы файлов (по умолчанию: csv)")
+    parser.add_argument("-o", "--output-dir", default=str(Path(__file__).parent / "data"),
+                        help="Папка для файлов (по умолчанию: benchmarks/data)")
+    parser.add_argument("--seed", type=int, default=42, help="Seed генератора (по умолчанию: 42)")
+    args = parser.parse_args(argv)
+
+    for fmt in args.format:
+        path = write_dataset(dataset_path(args.output_dir, args.rows, fmt, args.seed), fmt, args.rows, args.seed)
+        print(json.dumps({"path": str(path), "rows": args.rows, "format": fmt,
+                          "size_mb": round(path.stat().st_size / 1024 / 1024, 2)}, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Бенчмарки universal_data_analyzer.py на синтетической выгрузке билетов.
+
+Для каждого сочетания формата, режима и объема файл генерируется (один раз, в benchmarks/data)
+и анализируется в отдельном процессе: пиковая память одного прогона не влияет на другой.
+LLM заменена фиксированным ответом, замеряются этапы анализатора и сборка промпта
+(раздел timings отчета). Результаты пишутся в JSON и сравниваются с сохраненной базовой линией.
+
+Примеры:
+    python benchmarks/run_benchmarks.py                              # 10k и 100k строк, CSV и Parquet
+    python benchmarks/run_benchmarks.py -n 1m 10m -f csv -m chunked arrow --repeat 3
+    python benchmarks/run_benchmarks.py --update-baseline            # сохранить базовую линию
+
+Отдельно замеряется запуск: импорт модуля и --help в свежем процессе.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+
+from generate_tickets import FORMATS, EXCEL_MAX_ROWS, dataset_path, parse_rows  # noqa: E402
+
+# Режимы анализатора: параметры AnalysisConfig
+MODES = {
+    "memory": {},
+    "chunked": {"chunk_size": 500_000},
+    "arrow": {"arrow": True},
+    "sampled": {"sampled": True}
+}
+STREAMING_FORMATS = {"csv", "tsv", "parquet"}  # Остальные режимы - только для них
+
+STUB_RESPONSE = "## Анализ\n\n- Ответ LLM заменен заглушкой бенчмарка."
+
+# Пакеты, которые анализатор импортирует лениво: при старте их быть не должно
+HEAVY_MODULES = ["pandas", "numpy", "pyarrow", "lxml", "ollama", "openpyxl", "rich"]
+IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import universal_data_analyzer
+seconds = time.perf_counter() - start
+print(json.dumps({"seconds": seconds, "loaded": [m for m in %r if m in sys.modules]}))
+""" % HEAVY_MODULES
+
+
+def run_case(path: str, mode: str) -> Dict[str, Any]:
+    """Один прогон в текущем процессе: анализ файла и сборка промпта с заглушкой LLM"""
+    import universal_data_analyzer as uda
+
+    class StubLLMClient(uda.LLMClient):
+        """Без запросов к Ollama: этапы prompt и llm замеряются, ответ фиксированный"""
+
+        def _call_ollama(self, prompt, model=None, deadline=None, queue_info=None):
+            return STUB_RESPONSE
+
+    config = uda.AnalysisConfig(
+        input_dir=str(Path(path).parent), output_dir=None, model_name="benchmark-stub",
+        sample_rows=10, max_chars=uda.DEFAULT_PROMPT_CHARS, expected_cols=None,
+        file_pattern=Path(path).name, verbose=False, save_results=False, **MODES[mode]
+    )
+    analyzer = uda.DataAnalyzer(config)
+    file_info = next(f for f in analyzer.file_handler.find_files(config.input_dir, config.file_pattern)
+                     if Path(f.path).name == Path(path).name)
+    analysis_data = analyzer.analyze_file(file_info)
+    job = uda.LLMJob(file_info.path, timer=uda.StageTimer(analysis_data["timings"]))
+    StubLLMClient(config.model_name, analyzer.logger, prompt_tokens=config.prompt_budget(),
+                  retries=0).analyze_data(Path(path).name, analysis_data, job)
+
+    timings = analysis_data["timings"]
+    overview = analysis_data.get("overview", {})
+    rows = overview.get("table_like", overview).get("rows") or 0
+    # Повторяющиеся этапы (попытки чтения, листы, запросы) суммируются
+    stages: Dict[str, Dict[str, float]] = {}
+    for stage in timings["stages"]:
+        if stage["stage"] == "discovery":
+            continue
+        total = stages.setdefault(stage["stage"], {"wall_seconds": 0.0, "cpu_seconds": 0.0})
+        total["wall_seconds"] = round(total["wall_seconds"] + stage["wall_seconds"], 4)
+        total["cpu_seconds"] = round(total["cpu_seconds"] + stage["cpu_seconds"], 4)
+        if stage.get("rows"):
+            total["rows"] = max(total.get("rows", 0), stage["rows"])
+    for total in stages.values():
+        if total.get("rows") and total["wall_seconds"] > 0:
+            total["rows_per_s"] = round(total.pop("rows") / total["wall_seconds"])
+        total.pop("rows", None)
+    wall = round(sum(s["wall_seconds"] for s in stages.values()), 3)
+    return {
+        "rows": rows,
+        "wall_seconds": wall,
+        "cpu_seconds": round(sum(s["cpu_seconds"] for s in stages.values()), 3),
+        "peak_rss_mb": timings.get("peak_rss_mb"),
+        "stages": stages
+    }
+
+
+def prepare_dataset(data_dir: str, rows: int, fmt: str, seed: int) -> Path:
+    """Файл набора; генерируется отдельным процессом.
+    
+    Linux переносит пик памяти (ru_maxrss) через fork/exec: генерация в этом процессе
+    завысила бы пиковую память всех следующих прогонов.
+    """
+    path = dataset_path(data_dir, rows, fmt, seed)
+    if not path.exists():
+        print(f"Генерация {path.name}...", file=sys.stderr)
+        process = subprocess.run([sys.executable, str(BENCH_DIR / "generate_tickets.py"), "-n", str(rows),
+                                  "-f", fmt, "-o", data_dir, "--seed", str(seed)], capture_output=True, text=True)
+        if process.returncode != 0:
+            raise RuntimeError((process.stderr.strip().splitlines() or ["генерация не удалась"])[-1])
+    return path
+
+
+def run_isolated(path: Path, mode: str) -> Dict[str, Any]:
+    """run_case в отдельном процессе; вывод анализатора отбрасывается"""
+    with tempfile.TemporaryDirectory() as tmp:
+        result_file = Path(tmp) / "result.json"
+        process = subprocess.run(
+            [sys.executable, __file__, "--run-case", str(path), mode, "--result-file", str(result_file)],
+            capture_output=True, text=True, cwd=str(BENCH_DIR.parent)
+        )
+        if process.returncode != 0 or not result_file.exists():
+            return {"error": (process.stderr or process.stdout).strip().splitlines()[-1:] or ["unknown"]}
+        return json.loads(result_file.read_text(encoding="utf-8"))
+
+
+def measure_startup(repeat: int) -> Dict[str, Any]:
+    """Время импорта модуля и запуска --help в свежем процессе (лучшее из repeat).
+
+    Ленивые импорты держат оба числа малыми: регрессия здесь значит, что тяжелый
+    пакет снова грузится при старте.
+    """
+    cwd = str(BENCH_DIR.parent)
+    imports, helps, loaded = [], [], []
+    for _ in range(repeat):
+        probe = subprocess.run([sys.executable, "-c", IMPORT_PROBE], capture_output=True, text=True,
+                               cwd=cwd, check=True)
+        result = json.loads(probe.stdout.strip().splitlines()[-1])
+        imports.append(result["seconds"])
+        loaded = result["loaded"]
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "universal_data_analyzer.py", "--help"], capture_output=True,
+                       cwd=cwd, check=True)
+        helps.append(time.perf_counter() - start)
+    return {"import_seconds": round(min(imports), 4), "help_seconds": round(min(helps), 4),
+            "heavy_modules_at_import": loaded}
+
+
+def environment() -> Dict[str, Any]:
+    """Окружение прогона: без него числа разных машин несравнимы"""
+    import numpy
+    import pandas
+    info = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "pandas": pandas.__version__,
+        "numpy": numpy.__version__
+    }
+    try:
+        import pyarrow
+        info["pyarrow"] = pyarrow.__version__
+    except ImportError:
+        info["pyarrow"] = None
+    try:
+        info["git_commit"] = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                            text=True, cwd=str(BENCH_DIR), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        info["git_commit"] = None
+    return info
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float,
+            min_seconds: float, min_memory_mb: float) -> List[Dict[str, Any]]:
+    """Регрессии относительно базовой линии: рост больше tolerance и больше абсолютного порога.
+
+    Порог в секундах отсекает шум коротких этапов, порог в MB - колебания аллокатора.
+    """
+    base_cases = {case["case"]: case for case in baseline.get("cases", [])}
+    regressions = []
+    for case in results["cases"]:
+        old = base_cases.get(case["case"])
+        if not old or "error" in case or "error" in old:
+            continue
+        checks = [("total", case["wall_seconds"], old["wall_seconds"], min_seconds, "s")]
+        checks += [(name, stage["wall_seconds"], old["stages"][name]["wall_seconds"], min_seconds, "s")
+                   for name, stage in case["stages"].items() if name in old.get("stages", {})]
+        if case.get("peak_rss_mb") and old.get("peak_rss_mb"):
+            checks.append(("peak_rss_mb", case["peak_rss_mb"], old["peak_rss_mb"], min_memory_mb, "MB"))
+        for metric, new_value, old_value, threshold, unit in checks:
+            if new_value > old_value * (1 + tolerance) and new_value - old_value >= threshold:
+                regressions.append({
+                    "case": case["case"], "metric": metric, "baseline": old_value, "current": new_value,
+                    "change": round(new_value / old_value - 1, 3) if old_value else None, "unit": unit
+                })
+    startup, old_startup = results.get("startup"), baseline.get("startup")
+    if startup and old_startup:
+        for metric in ("import_seconds", "help_seconds"):
+            new_value, old_value = startup[metric], old_startup[metric]
+            if new_value > old_value * (1 + tolerance) and new_value - old_value >= min_seconds:
+                regressions.append({
+                    "case": "startup", "metric": metric, "baseline": old_value, "current": new_value,
+                    "change": round(new_value / old_value - 1, 3) if old_value else None, "unit": "s"
+                })
+    return regressions
+
+
+def print_table(cases: List[Dict[str, Any]]):
+    print(f"\n{'случай':<32} {'строк':>11} {'MB':>8} {'время, с':>9} {'строк/с':>11} {'пик, MB':>8}  самые долгие этапы")
+    for case in cases:
+        if "error" in case:
+            print(f"{case['case']:<32} ошибка: {case['error']}")
+            continue
+        slowest = sorted(case["stages"].items(), key=lambda item: -item[1]["wall_seconds"])[:3]
+        print(f"{case['case']:<32} {case['dataset_rows']:>11,} {case['file_mb']:>8} {case['wall_seconds']:>9.2f} "
+              f"{case['rows_per_s'] or 0:>11,} {case['peak_rss_mb'] or 0:>8}  "
+              + ", ".join(f"{name} {stage['wall_seconds']:.2f}" for name, stage in slowest))
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Бенчмарки universal_data_analyzer.py (LLM заменена заглушкой)")
+    parser.add_argument("-n", "--rows", type=parse_rows, nargs="+", default=[parse_rows("10k"), parse_rows("100k")],
+                        help="Объемы наборов: 10k 100k 1m 10m 50m (по умолчанию: 10k 100k)")
+    parser.add_argument("-f", "--formats", choices=list(FORMATS), nargs="+", default=["csv", "parquet"],
+                        help="Форматы (по умолчанию: csv parquet)")
+    parser.add_argument("-m", "--modes", choices=list(MODES), nargs="+", default=["memory", "chunked", "arrow"],
+                        help="Режимы анализатора (по умолчанию: memory chunked arrow)")
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="Прогонов на случай, в результат идет самый быстрый (по умолчанию: 1)")
+    parser.add_argument("--no-startup", action="store_true", help="Не замерять время импорта и запуска --help")
+    parser.add_argument("--seed", type=int, default=42, help="Seed генератора данных (по умолчанию: 42)")
+    parser.add_argument("--data-dir", default=str(BENCH_DIR / "data"),
+                        help="Папка сгенерированных наборов (по умолчанию: benchmarks/data)")
+    parser.add_argument("-o", "--output", help="Файл результатов (по умолчанию: benchmarks/results/bench_<время>.json)")
+    parser.add_argument("--baseline", default=str(BENCH_DIR / "baseline.json"),
+                        help="Базовая линия для сравнения (по умолчанию: benchmarks/baseline.json)")
+    parser.add_argument("--update-baseline", action="store_true", help="Записать результаты как базовую линию")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Допустимый рост времени и памяти относительно базовой линии (по умолчанию: 0.25)")
+    parser.add_argument("--min-seconds", type=float, default=0.05,
+                        help="Меньший рост времени не считается регрессией (по умолчанию: 0.05)")
+    parser.add_argument("--min-memory-mb", type=float, default=32,
+                        help="Меньший рост пиковой памяти не считается регрессией (по умолчанию: 32)")
+    parser.add_argument("--run-case", nargs=2, metavar=("PATH", "MODE"), help=argparse.SUPPRESS)
+    parser.add_argument("--result-file", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run_case:
+        result = run_case(*args.run_case)
+        Path(args.result_file).write_text(json.dumps(result, ensure_ascii=False), encoding="utf-8")
+        return 0
+
+    cases = []
+    for rows in args.rows:
+        for fmt in args.formats:
+            if fmt == "excel" and rows > EXCEL_MAX_ROWS:
+                print(f"Пропуск excel/{rows:,}: больше {EXCEL_MAX_ROWS:,} строк на лист", file=sys.stderr)
+                continue
+            try:
+                path = prepare_dataset(args.data_dir, rows, fmt, args.seed)
+            except RuntimeError as e:
+                print(f"Пропуск {fmt}: {e}", file=sys.stderr)
+                continue
+            for mode in args.modes:
+                if mode != "memory" and fmt not in STREAMING_FORMATS:
+                    continue
+                name = f"{fmt}/{mode}/{rows}"
+                print(f"Прогон {name}...", file=sys.stderr)
+                runs = [run_isolated(path, mode) for _ in range(max(1, args.repeat))]
+                ok = [run for run in runs if "error" not in run]
+                best = min(ok, key=lambda run: run["wall_seconds"]) if ok else runs[0]
+                if ok:
+                    # Скорость - по объему набора: для XML и выборки анализатор дает не точное число строк
+                    best["rows_per_s"] = round(rows / best["wall_seconds"]) if best["wall_seconds"] else None
+                cases.append({"case": name, "format": fmt, "mode": mode, "dataset_rows": rows,
+                              "file_mb": round(path.stat().st_size / 1024 / 1024, 2), "repeats": len(runs), **best})
+
+    results = {"timestamp": datetime.now().isoformat(timespec="seconds"), "environment": environment(),
+               "seed": args.seed, "cases": cases}
+    if not args.no_startup:
+        print("Замер запуска...", file=sys.stderr)
+        results["startup"] = measure_startup(max(3, args.repeat))
+    print_table(cases)
+    if results.get("startup"):
+        startup = results["startup"]
+        print(f"\nЗапуск: импорт {startup['import_seconds']:.3f} с, --help {startup['help_seconds']:.3f} с; "
+              f"тяжелые пакеты при импорте: {', '.join(startup['heavy_modules_at_import']) or 'нет'}")
+
+    baseline_path = Path(args.baseline)
+    regressions = []
+    if baseline_path.exists() and not args.update_baseline:
+        baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+        regressions = compare(results, baseline, args.tolerance, args.min_seconds, args.min_memory_mb)
+        results["baseline"] = {"path": str(baseline_path), "timestamp": baseline.get("timestamp"),
+                               "environment": baseline.get("environment")}
+        if baseline.get("environment", {}).get("platform") != results["environment"]["platform"]:
+            print("⚠ Базовая линия снята на другой машине, сравнение приблизительное", file=sys.stderr)
+        print(f"\nСравнение с {baseline_path} (допуск {args.tolerance:.0%}):")
+        for item in regressions:
+            print(f"  ✗ {item['case']} {item['metric']}: {item['baseline']} -> {item['current']} {item['unit']} "
+                  f"({item['change']:+.0%})")
+        if not regressions:
+            print("  ✓ Регрессий нет")
+    elif not args.update_baseline:
+        print(f"\nБазовая линия {baseline_path} не найдена; сохранить текущую: --update-baseline")
+    results["regressions"] = regressions
+
+    output = Path(args.output) if args.output else \
+        BENCH_DIR / "results" / f"bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"\nРезультаты: {output}")
+    if args.update_baseline:
+        baseline_path.write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"Базовая линия обновлена: {baseline_path}")
+    # Ненулевой код - для CI
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,46 @@
+"""Общие фикстуры тестов universal_data_analyzer.py"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+LDT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(LDT_DIR))
+sys.path.insert(0, str(LDT_DIR / "benchmarks"))
+
+import universal_data_analyzer as uda  # noqa: E402
+from generate_tickets import write_dataset  # noqa: E402
+
+
+@pytest.fixture
+def make_config(tmp_path):
+    """Фабрика AnalysisConfig с настройками по умолчанию и переопределениями"""
+    def make(**overrides) -> uda.AnalysisConfig:
+        values = dict(input_dir=str(tmp_path), output_dir=None, model_name="test-model", sample_rows=5,
+                      max_chars=uda.DEFAULT_PROMPT_CHARS, expected_cols=None, file_pattern=None,
+                      save_results=False, verbose=False)
+        values.update(overrides)
+        return uda.AnalysisConfig(**values)
+    return make
+
+
+@pytest.fixture
+def analyze(make_config):
+    """Анализ файла без LLM: возвращает результат DataAnalyzer.analyze_file"""
+    def run(path, **overrides):
+        analyzer = uda.DataAnalyzer(make_config(**overrides))
+        return analyzer.analyze_file(analyzer.file_handler.file_info(str(path)))
+    return run
+
+
+@pytest.fixture(scope="session")
+def tickets_csv(tmp_path_factory) -> Path:
+    """Синтетическая выгрузка билетов (CSV, ";" и десятичная запятая)"""
+    return write_dataset(tmp_path_factory.mktemp("tickets") / "tickets.csv", "csv", 20_000, seed=7)
+
+
+@pytest.fixture(scope="session")
+def tickets_parquet(tmp_path_factory) -> Path:
+    return write_dataset(tmp_path_factory.mktemp("tickets") / "tickets.parquet", "parquet", 20_000, seed=7,
+                         chunk_rows=4_000)
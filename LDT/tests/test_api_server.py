@@ -0,0 +1,150 @@
+"""HTTP API: проверка параметров задач, таймаут и отмена расчета статистики"""
+
+import asyncio
+import json
+import signal
+import time
+
+import pandas as pd
+import pytest
+
+import api_server
+
+
+@pytest.fixture
+def input_dir(tmp_path, tickets_csv):
+    folder = tmp_path / "input"
+    folder.mkdir()
+    pd.DataFrame({"id": range(50), "value": [i * 0.5 for i in range(50)]}).to_csv(folder / "small.csv", index=False)
+    (folder / "tickets.csv").write_bytes(tickets_csv.read_bytes())
+    return folder
+
+
+@pytest.fixture
+def service(input_dir, make_config):
+    service = api_server.AnalyzerService(make_config(input_dir=str(input_dir)), analysis_workers=1)
+    service.llm_client._call_ollama = lambda prompt, model=None, deadline=None, queue_info=None: "ответ"
+    return service
+
+
+@pytest.fixture
+def processes(service, monkeypatch):
+    """Процессы анализа, запущенные сервисом"""
+    started = []
+    process_class = service.context.Process
+
+    def record(*args, **kwargs):
+        process = process_class(*args, **kwargs)
+        started.append(process)
+        return process
+    monkeypatch.setattr(service.context, "Process", record)
+    return started
+
+
+def run(service, scenario):
+    """Сценарий с запущенным сервисом: scenario(service) - корутина"""
+    async def main():
+        await service.start(warm_up=False)
+        try:
+            return await scenario(service)
+        finally:
+            await service.stop()
+    return asyncio.run(main())
+
+
+async def wait_status(job, statuses, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while job.status not in statuses:
+        assert time.monotonic() < deadline, f"статус {job.status}"
+        await asyncio.sleep(0.02)
+
+
+@pytest.mark.parametrize("options, message", [
+    ({"duplicates": "fuzzy"}, "duplicates"),
+    ({"duplicates": 1}, "duplicates"),
+    ({"key_columns": "ticket_id"}, "key_columns"),
+    ({"key_columns": ["ticket_id", 5]}, "key_columns"),
+    ({"key_columns": [""]}, "key_columns"),
+    ({"chunk_size": True}, "chunk_size"),
+    ({"unknown": 1}, "unknown"),
+])
+def test_invalid_options_rejected(service, options, message):
+    with pytest.raises(api_server.ApiError) as error:
+        service.submit({"path": "small.csv", "options": options})
+    assert error.value.status == 400
+    assert message in str(error.value)
+
+
+def test_invalid_options_return_400_over_http(service):
+    server = api_server.ApiServer(service)
+    body = json.dumps({"path": "small.csv", "options": {"duplicates": "fuzzy"}}).encode()
+    status, payload = asyncio.run(server._dispatch("POST", "/jobs", body))
+    assert status == 400 and "auto" in payload["error"]
+
+
+def test_path_outside_input_dir_rejected(service):
+    with pytest.raises(api_server.ApiError) as error:
+        service.submit({"path": "../secret.csv"})
+    assert error.value.status in (400, 404)
+
+
+def test_job_analyzed_in_separate_process(service):
+    async def scenario(service):
+        job = service.submit({"path": "small.csv", "options": {"duplicates": "exact", "key_columns": ["id"]}})
+        await asyncio.wait_for(job.done.wait(), 60)
+        return job
+    job = run(service, scenario)
+    assert job.status == "done", job.error
+    assert job.result["llm_response"] == "ответ"
+    assert job.result["analysis_data"]["overview"]["rows"] == 50
+    assert "id" in job.result["analysis_data"]["statistics"]["duplicates"]["key_columns"]
+
+
+def test_timeout_terminates_analysis_and_frees_worker(service, processes):
+    async def scenario(service):
+        slow = service.submit({"path": "tickets.csv", "timeout": 0.3})
+        await wait_status(slow, {"analyzing"})
+        following = service.submit({"path": "small.csv", "timeout": 60})
+        await asyncio.wait_for(following.done.wait(), 60)
+        return slow, following
+    slow, following = run(service, scenario)
+    assert slow.status == "timeout"
+    # Расчет прерван, а не дорабатывает в фоне; единственный обработчик свободен
+    assert processes[0].exitcode == -signal.SIGTERM
+    assert following.status == "done"
+    assert processes[1].exitcode == 0
+
+
+def test_cancel_running_analysis(service, processes):
+    async def scenario(service):
+        job = service.submit({"path": "tickets.csv"})
+        await wait_status(job, {"analyzing"})
+        service.cancel(job)
+        following = service.submit({"path": "small.csv"})
+        await asyncio.wait_for(following.done.wait(), 60)
+        return job, following
+    job, following = run(service, scenario)
+    assert job.status == "cancelled"
+    assert processes[0].exitcode == -signal.SIGTERM
+    assert following.status == "done"
+
+
+def test_cancel_after_analysis_rejected(service):
+    async def scenario(service):
+        job = service.submit({"path": "small.csv"})
+        await asyncio.wait_for(job.done.wait(), 60)
+        with pytest.raises(api_server.ApiError) as error:
+            service.cancel(job)
+        return error.value.status
+    assert run(service, scenario) == 409
+
+
+def test_failed_analysis_reports_error(service, input_dir):
+    (input_dir / "broken.parquet").write_bytes(b"not a parquet file")
+
+    async def scenario(service):
+        job = service.submit({"path": "broken.parquet"})
+        await asyncio.wait_for(job.done.wait(), 60)
+        return job
+    job = run(service, scenario)
+    assert job.status == "failed" and job.error
@@ -0,0 +1,62 @@
+"""Режим Arrow: приведение типов ядрами pyarrow.compute и согласие с pandas"""
+
+import pandas as pd
+import pytest
+
+import universal_data_analyzer as uda
+
+pa = pytest.importorskip("pyarrow")
+
+
+@pytest.fixture
+def inferencer():
+    return uda.TypeInferencer(uda.Logger(False))
+
+
+def test_arrow_casts_match_pandas(inferencer):
+    frame = pd.DataFrame({
+        "price": ["149,99", " 0 ", None, "1,5"] * 50,
+        "amount": ["1 234,5", "12 000", "7", None] * 50,
+        "paid": ["да", "нет", "True", None] * 50,
+        "day": ["04.03.2021", "31.12.2020", None, "01.01.2021"] * 50,
+        "moment": ["2021-03-04T10:00:00.000+03:00", None, "2021-03-05T11:30:00.000+03:00", None] * 50,
+        "code": ["01234", "12345", "00007", "55555"] * 50,
+    })
+    table = inferencer.fit_transform_arrow(pa.Table.from_pandas(frame, preserve_index=False))
+    arrow_report = inferencer.report()
+    expected = uda.TypeInferencer(uda.Logger(False)).fit_transform(frame.copy())
+    assert set(arrow_report) == {"price", "amount", "paid", "day", "moment"}
+    assert pa.types.is_string(table.column("code").type) or pa.types.is_large_string(table.column("code").type)
+    for name in arrow_report:
+        converted, reference = table.column(name).to_pandas(), expected[name]
+        if pd.api.types.is_datetime64_any_dtype(reference):
+            converted, reference = converted.dt.as_unit("ns"), reference.dt.as_unit("ns")
+        if name in ("price", "amount"):
+            assert converted.tolist() == pytest.approx(reference.tolist(), nan_ok=True)
+        else:
+            assert plain(converted) == plain(reference)
+
+
+def plain(series):
+    return [None if pd.isna(v) else v for v in series.tolist()]
+
+
+def test_arrow_rolls_back_lossy_columns_and_counts_failures(inferencer):
+    values = [str(i) for i in range(3_000)]
+    values[-5:] = ["н/д"] * 5
+    mostly_bad = [str(i) if i % 2 else "текст" for i in range(3_000)]
+    table = pa.table({"n": values, "bad": mostly_bad})
+    inferencer.SAMPLE_SIZE = 500
+    table = inferencer.fit_transform_arrow(table)
+    assert table.column("n").type == pa.int64()
+    assert inferencer.report()["n"]["failed_values"] == 5
+    assert table.column("bad").type == pa.string()
+
+
+def test_arrow_mode_reports_inferred_types(tickets_csv, analyze):
+    result = analyze(tickets_csv, arrow=True)
+    assert result["statistics"]["type_inference"]["ticket_price"]["kind"] == "decimal_comma"
+    columns = {c["name"]: c for c in result["overview"]["columns"]}
+    assert columns["ticket_price"]["dtype"] == "double"
+    exact = analyze(tickets_csv)["statistics"]["numeric_summary"]["ticket_price"]
+    assert result["statistics"]["numeric_summary"]["ticket_price"]["mean"] == pytest.approx(exact["mean"])
@@ -0,0 +1,85 @@
+"""Бенчмарки: воспроизводимость генератора и поиск регрессий"""
+
+import argparse
+
+import pandas as pd
+import pytest
+
+import generate_tickets as gen
+import run_benchmarks as bench
+
+
+@pytest.mark.parametrize("value, rows", [("10k", 10_000), ("1.5m", 1_500_000), ("250", 250), (" 50M ", 50_000_000)])
+def test_parse_rows(value, rows):
+    assert gen.parse_rows(value) == rows
+
+
+def test_parse_rows_rejects_garbage():
+    with pytest.raises(argparse.ArgumentTypeError):
+        gen.parse_rows("10 тысяч")
+
+
+def test_chunks_depend_only_on_seed_and_index():
+    first = list(gen.TicketGenerator(7).chunks(2_500, 1_000))
+    second = list(gen.TicketGenerator(7).chunks(2_500, 1_000))
+    assert [len(chunk) for chunk in first] == [1_000, 1_000, 500]
+    for a, b in zip(first, second):
+        pd.testing.assert_frame_equal(a, b)
+    # Порция не зависит от предыдущих
+    pd.testing.assert_frame_equal(gen.TicketGenerator(7).chunk(1_000, 1_000, 1), first[1])
+    assert not gen.TicketGenerator(8).chunk(0, 1_000, 0).equals(first[0])
+
+
+def test_chunk_schema():
+    chunk = gen.TicketGenerator(1).chunk(0, 2_000, 0)
+    assert list(chunk.columns) == gen.COLUMNS and len(gen.COLUMNS) == 27
+    assert chunk["client_phone"].isna().mean() == pytest.approx(0.327, abs=0.05)
+    assert chunk["event_name"].str.contains("[А-Яа-я]").all()
+
+
+def test_csv_file_is_reproducible(tmp_path):
+    a = gen.write_dataset(tmp_path / "a" / "t.csv", "csv", 3_000, seed=3, chunk_rows=1_000)
+    b = gen.write_dataset(tmp_path / "b" / "t.csv", "csv", 3_000, seed=3, chunk_rows=1_000)
+    assert a.read_bytes() == b.read_bytes()
+    header, first = a.read_text(encoding="utf-8").splitlines()[:2]
+    assert header.split(";") == gen.COLUMNS
+    assert header.count(";") == 26
+    # Десятичная запятая, как у источника
+    assert "," in first.split(";")[gen.COLUMNS.index("spot_id")]
+    assert not list(tmp_path.rglob("*.part"))
+
+
+def test_dataset_path_encodes_parameters():
+    assert gen.dataset_path("data", 10_000, "parquet", 5).name == "tickets_10000_s5.parquet"
+
+
+def case(name, wall, stages, peak=100.0):
+    return {"case": name, "wall_seconds": wall, "peak_rss_mb": peak,
+            "stages": {stage: {"wall_seconds": seconds} for stage, seconds in stages.items()}}
+
+
+def test_compare_flags_only_significant_regressions():
+    baseline = {"cases": [case("csv_10k_memory", 2.0, {"read": 1.0, "pii": 0.01}, peak=200)],
+                "startup": {"import_seconds": 0.05, "help_seconds": 0.1}}
+    results = {"cases": [case("csv_10k_memory", 3.0, {"read": 2.0, "pii": 0.03}, peak=205)],
+               "startup": {"import_seconds": 0.9, "help_seconds": 0.1}}
+    regressions = bench.compare(results, baseline, tolerance=0.2, min_seconds=0.1, min_memory_mb=50)
+    flagged = {(r["case"], r["metric"]) for r in regressions}
+    # pii вырос втрое, но на 0.02 с - шум; память выросла на 5 MB - колебания аллокатора
+    assert flagged == {("csv_10k_memory", "total"), ("csv_10k_memory", "read"), ("startup", "import_seconds")}
+    total = next(r for r in regressions if r["metric"] == "total")
+    assert total["change"] == 0.5 and total["unit"] == "s"
+
+
+def test_compare_skips_new_and_failed_cases():
+    baseline = {"cases": [case("a", 1.0, {}), {"case": "b", "error": ["boom"]}]}
+    results = {"cases": [case("b", 5.0, {}), case("c", 5.0, {}), {"case": "a", "error": ["boom"]}]}
+    assert bench.compare(results, baseline, 0.2, 0.1, 50) == []
+
+
+def test_run_case_stubs_llm(tmp_path):
+    path = gen.write_dataset(tmp_path / "t.csv", "csv", 2_000, seed=1)
+    result = bench.run_case(str(path), "memory")
+    assert result["rows"] == 2_000
+    assert {"read", "prompt", "llm"} <= set(result["stages"])
+    assert result["wall_seconds"] > 0
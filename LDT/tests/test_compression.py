@@ -0,0 +1,63 @@
+"""Сжатые входные файлы: определение сжатия и потоковая распаковка"""
+
+import bz2
+import gzip
+import shutil
+
+import pytest
+
+import universal_data_analyzer as uda
+
+
+@pytest.fixture(scope="module")
+def compressed(tickets_csv, tmp_path_factory):
+    """Копии выгрузки билетов в gzip и bz2"""
+    folder = tmp_path_factory.mktemp("compressed")
+    paths = {}
+    for compression, opener, ext in (("gzip", gzip.open, ".gz"), ("bz2", bz2.open, ".bz2")):
+        path = folder / f"tickets.csv{ext}"
+        with open(tickets_csv, "rb") as source, opener(path, "wb") as target:
+            shutil.copyfileobj(source, target)
+        paths[compression] = path
+    return paths
+
+
+def test_compression_detected_by_magic_bytes(compressed, tickets_csv, tmp_path):
+    assert uda.detect_compression(str(compressed["gzip"])) == "gzip"
+    assert uda.detect_compression(str(compressed["bz2"])) == "bz2"
+    assert uda.detect_compression(str(tickets_csv)) is None
+    # Сигнатура важнее расширения
+    renamed = tmp_path / "tickets.csv"
+    shutil.copy(compressed["gzip"], renamed)
+    assert uda.detect_compression(str(renamed)) == "gzip"
+
+
+def test_format_ignores_compression_extension():
+    handler = uda.FileHandler(uda.Logger(verbose=False))
+    assert uda.FileHandler._data_suffix("data.csv.gz") == ".csv"
+    assert uda.FileHandler._data_suffix("data.PARQUET.zst") == ".parquet"
+    assert handler.detect_format("data.csv.gz") == "csv"
+    assert handler.detect_format("data.tsv.bz2") == "tsv"
+    assert handler.detect_format("data.gz") == "unknown"
+
+
+@pytest.mark.parametrize("compression", ["gzip", "bz2"])
+def test_compressed_analysis_matches_plain(compression, compressed, tickets_csv, analyze):
+    plain = analyze(tickets_csv)
+    result = analyze(compressed[compression])
+    assert result["overview"]["rows"] == plain["overview"]["rows"]
+    assert result["overview"]["cols"] == plain["overview"]["cols"]
+    assert result["statistics"]["numeric_summary"] == plain["statistics"]["numeric_summary"]
+
+    report = result["statistics"]["input"]
+    assert report["compression"] == compression
+    assert report["passes"] >= 1
+    assert report["uncompressed_mb"] > report["compressed_mb"]
+    assert "input" not in plain["statistics"]
+
+
+def test_sampled_compressed_falls_back_to_streaming(compressed, analyze):
+    result = analyze(compressed["gzip"], sampled=True, chunk_size=5_000)
+    assert "sampling" not in result["statistics"]
+    assert result["overview"]["rows"] == 20_000
+    assert result["statistics"]["input"]["compression"] == "gzip"
@@ -0,0 +1,57 @@
+"""Корреляции: потоковые совместные моменты и V Крамера"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import universal_data_analyzer as uda
+
+
+def sample_frame(n=6_000, seed=2):
+    rng = np.random.default_rng(seed)
+    x = rng.normal(size=n)
+    category = rng.choice(["a", "b", "c"], n)
+    return pd.DataFrame({
+        "x": x,
+        "y": 2 * x + rng.normal(scale=0.5, size=n),
+        "z": np.where(rng.random(n) < 0.1, np.nan, rng.normal(size=n)),
+        "category": category,
+        "mirror": pd.Series(category).map({"a": "A", "b": "B", "c": "C"}),
+    })
+
+
+def test_streaming_moments_match_pandas_across_chunks_and_merge():
+    df = sample_frame()
+    left, right = uda.CorrelationAccumulator(df), uda.CorrelationAccumulator(df)
+    for start in range(0, 3_000, 700):
+        left.update(df.iloc[start:min(start + 700, 3_000)])
+    right.update(df.iloc[3_000:])
+    left.merge(right)
+    expected = df[["x", "y", "z"]].corr()
+    i, j, k = (left.numeric.index(c) for c in ("x", "y", "z"))
+    corr = left.comoment / np.sqrt(np.outer(np.diag(left.m2), np.diag(left.m2)))
+    assert left.n[i, j] == 6_000 and left.n[i, k] == df["z"].notna().sum()
+    assert corr[i, j] == pytest.approx(expected.loc["x", "y"], abs=1e-9)
+    result = left.result()
+    assert result["pearson"]["matrix"][i][k] == pytest.approx(expected.loc["x", "z"], abs=1e-4)
+    assert result["top_pairs"][0]["columns"] == ["category", "mirror"]
+
+
+def test_cramers_v_detects_association():
+    table = np.array([[50, 0, 0], [0, 40, 0], [0, 0, 60]])
+    assert uda.cramers_v(table) == pytest.approx(1.0, abs=0.02)
+    independent = np.full((3, 3), 100)
+    assert uda.cramers_v(independent) == pytest.approx(0.0, abs=1e-9)
+    assert uda.cramers_v(np.array([[5, 5]])) is None
+
+
+def test_numeric_column_read_as_strings_in_later_chunk():
+    df = sample_frame(1_000)
+    acc = uda.CorrelationAccumulator(df)
+    acc.update(df.iloc[:500])
+    drifted = df.iloc[500:].copy()
+    drifted["y"] = drifted["y"].astype(str).astype(object)
+    drifted.iloc[0, drifted.columns.get_loc("y")] = "продолжение"
+    acc.update(drifted)
+    i, j = acc.numeric.index("x"), acc.numeric.index("y")
+    assert acc.n[i, j] == 999
@@ -0,0 +1,74 @@
+"""Дубликаты строк и ключей: отпечатки, пропуски, сброс на диск"""
+
+import numpy as np
+import pandas as pd
+
+import universal_data_analyzer as uda
+
+
+def test_column_hashes_ignore_chunk_dtype():
+    ints = uda.column_hashes(pd.Series([1, 2, None], dtype="Int64"))
+    floats = uda.column_hashes(pd.Series([1.0, 2.0, np.nan]))
+    strings = uda.column_hashes(pd.Series(["1", "2.0", None], dtype=object))
+    assert (ints == floats).all() and (floats == strings).all()
+    text = uda.column_hashes(pd.Series(["a", None], dtype="str"))
+    objects = uda.column_hashes(pd.Series(["a", np.nan], dtype=object))
+    assert (text == objects).all()
+    assert text[1] == ints[2] == uda.NULL_HASH
+
+
+def test_row_fingerprints_match_across_dtypes():
+    left = pd.DataFrame({"id": [1, 2], "name": ["a", "b"]})
+    right = pd.DataFrame({"id": ["1", "2"], "name": pd.Series(["a", "b"], dtype=object)})
+    assert (uda.row_fingerprints(left) == uda.row_fingerprints(right)).all()
+
+
+def test_exact_detector_across_chunks_with_spill():
+    detector = uda.DuplicateDetector("exact", memory_mb=0.00001)
+    detector.update(pd.DataFrame({"id": [1, 2, 3], "v": ["a", "b", "c"]}))
+    detector.update(pd.DataFrame({"id": ["1", "4"], "v": ["a", "d"]}))
+    result = detector.result()
+    assert result["spilled_to_disk"]
+    assert result["rows"] == 5
+    assert result["duplicate_rows"] == 1
+    assert result["examples"] == [{"id": "1", "v": "a"}]
+
+
+def test_key_mode_excludes_null_keys():
+    detector = uda.DuplicateDetector("exact", key=["ticket_id"])
+    detector.update(pd.DataFrame({"ticket_id": [1, None, None, 2, 2], "v": range(5)}))
+    result = detector.result()
+    assert result["null_rows"] == 2
+    assert result["rows"] == 3
+    assert result["duplicate_rows"] == 1
+    assert result["examples"] == ["2.0"]
+
+
+def test_bloom_counts_are_upper_bound():
+    detector = uda.DuplicateDetector("bloom", memory_mb=1)
+    detector.update(pd.DataFrame({"v": np.arange(10_000) % 9_000}))
+    result = detector.result()
+    assert result["duplicate_rows"] >= 1_000
+    assert result["false_positive_rate"] < 0.01
+
+
+def test_auto_method_is_off_for_sampled_runs(make_config):
+    assert uda.DataAnalyzer(make_config())._duplicate_method() == "exact"
+    assert uda.DataAnalyzer(make_config(sampled=True))._duplicate_method() == "off"
+    assert uda.DataAnalyzer(make_config(sampled=True, duplicates="bloom"))._duplicate_method() == "bloom"
+
+
+def test_scanner_reports_key_columns(tickets_csv, analyze):
+    duplicates = analyze(tickets_csv, chunk_size=5_000)["statistics"]["duplicates"]
+    assert duplicates["duplicate_rows"] == 0
+    ticket_id = duplicates["key_columns"]["ticket_id"]
+    # Генератор повторяет ~0.06% ticket_id
+    assert 0 < ticket_id["duplicate_rows"] < 50
+    assert ticket_id["null_rows"] == 0
+
+
+def test_column_hashes_accept_arrow_dates():
+    import pyarrow as pa
+    arrow = pd.Series(pd.arrays.ArrowExtensionArray(pa.array([pd.Timestamp("2021-01-01").date(), None], pa.date32())))
+    native = pd.Series(pd.to_datetime(["2021-01-01", None]))
+    assert (uda.column_hashes(arrow) == uda.column_hashes(native)).all()
@@ -0,0 +1,88 @@
+"""Параметры генерации Ollama, блоки рассуждений и метрики запросов"""
+
+import pytest
+
+import universal_data_analyzer as uda
+
+
+def test_to_options_sizes_context_from_prompt_budget():
+    options = uda.GenerationOptions().to_options(prompt_tokens=4_000)
+    assert options["num_predict"] == 4096
+    # 4000 * 1.5 + 4096 = 10096 -> кратно 1024
+    assert options["num_ctx"] == 10_240
+    assert "temperature" not in options
+
+
+def test_to_options_explicit_values():
+    options = uda.GenerationOptions(num_predict=None, num_ctx=32_768, temperature=0.0).to_options(4_000)
+    assert options == {"temperature": 0.0, "num_ctx": 32_768}
+
+
+def test_to_options_context_does_not_depend_on_prompt_text():
+    generation = uda.GenerationOptions(num_predict=1_024)
+    assert generation.to_options(2_000) == generation.to_options(2_000)
+    assert generation.to_options(2_000)["num_ctx"] % 1024 == 0
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("ответ", "ответ"),
+    ("<think>рассуждение</think>\n\nответ", "ответ"),
+    ("<think>a</think>один <think>b</think>два", "один два"),
+    ("начало <think>обрезано лимитом", "начало "),
+])
+def test_strip_reasoning(text, expected):
+    assert uda.strip_reasoning(text) == expected
+
+
+class FakeClient:
+    """Клиент Ollama, который отвергает think и запоминает аргументы запросов"""
+    def __init__(self, reject_think=False):
+        self.reject_think = reject_think
+        self.requests = []
+
+    def chat(self, **kwargs):
+        self.requests.append(kwargs)
+        if self.reject_think and "think" in kwargs:
+            raise uda.ollama.ResponseError('"test-model" does not support thinking')
+        return {"message": {"content": "<think>x</think>ответ"}, "prompt_eval_count": 100,
+                "prompt_eval_duration": 2e9, "eval_count": 50, "eval_duration": 1e9, "done_reason": "stop"}
+
+
+@pytest.fixture
+def client():
+    pytest.importorskip("ollama")
+    generation = uda.GenerationOptions(think=True, num_predict=512, keep_alive="30m")
+    return uda.LLMClient("test-model", uda.Logger(verbose=False), prompt_tokens=1_000, generation=generation)
+
+
+def test_chat_passes_generation_options(client):
+    fake = FakeClient()
+    client._client = lambda timeout=None: fake
+    client._chat("промпт", "test-model")
+    request = fake.requests[0]
+    assert request["think"] is True
+    assert request["keep_alive"] == "30m"
+    assert request["options"] == client.generation.to_options(client.prompt_tokens)
+
+
+def test_chat_retries_without_think_for_plain_models(client):
+    fake = FakeClient(reject_think=True)
+    client._client = lambda timeout=None: fake
+    client._chat("промпт", "test-model")
+    assert len(fake.requests) == 2 and "think" not in fake.requests[1]
+
+
+def test_call_strips_reasoning_and_records_metrics(client):
+    fake = FakeClient()
+    client._client = lambda timeout=None: fake
+    job = uda.LLMJob("data.csv")
+    token = uda.LLM_JOB.set(job)
+    try:
+        assert client._call_ollama("промпт", queue_info={"attempt": 1}) == "ответ"
+    finally:
+        uda.LLM_JOB.reset(token)
+    call = job.calls[0]
+    assert call["prompt_tokens"] == 100 and call["output_tokens"] == 50
+    assert call["output_tokens_per_s"] == 50.0
+    assert call["prompt_seconds"] == 2.0
+    assert call["attempt"] == 1
@@ -0,0 +1,62 @@
+"""Гистограммы: адаптивная равноширинная за один проход и равночастотная"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import universal_data_analyzer as uda
+
+
+def test_streaming_histogram_widens_without_losing_counts():
+    hist = uda.StreamingHistogram(bins=10)
+    hist.update(np.linspace(0, 10, 101))
+    width = hist.width
+    hist.update(np.array([-35.0, 95.0]))
+    edges, counts = hist.result()
+    assert counts.sum() == 103
+    assert hist.width >= 8 * width
+    assert edges[0] <= -35 and edges[-1] > 95
+    assert len(edges) == len(counts) + 1
+
+
+def test_streaming_histogram_merge_keeps_total():
+    left, right = uda.StreamingHistogram(bins=20), uda.StreamingHistogram(bins=20)
+    left.update(np.arange(0, 100, dtype="float64"))
+    right.update(np.arange(500, 600, dtype="float64"))
+    left.merge(right)
+    edges, counts = left.result()
+    assert counts.sum() == 200
+    assert edges[0] <= 0 and edges[-1] >= 599
+
+
+def test_constant_column_gets_single_bin():
+    hist = uda.StreamingHistogram(bins=4)
+    hist.update(np.full(10, 7.0))
+    edges, counts = hist.result()
+    assert counts.tolist() == [10]
+    assert edges[0] <= 7 < edges[1]
+
+
+def test_histogram_summary_formats_datetimes():
+    ns = pd.to_datetime(["2024-01-01", "2024-01-02"]).as_unit("ns").asi8
+    summary = uda.histogram_summary(ns.astype("float64"), np.array([3]), list(ns), 1.5, temporal=True)
+    assert summary["type"] == "datetime"
+    assert summary["equi_width"]["edges"] == ["2024-01-01T00:00:00", "2024-01-02T00:00:00"]
+    assert summary["equi_depth"]["count_per_bin"] == 1.5
+
+
+def test_exact_and_streaming_histograms_agree(tmp_path, analyze):
+    rng = np.random.default_rng(5)
+    frame = pd.DataFrame({"amount": rng.gamma(2, 50, 12_000),
+                          "day": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 365, 12_000), "D")})
+    path = tmp_path / "hist.csv"
+    frame.to_csv(path, sep=";", index=False)
+    exact = analyze(path, histogram_bins=10)["statistics"]["histograms"]
+    streaming = analyze(path, histogram_bins=10, chunk_size=3_000)["statistics"]["histograms"]
+    assert sum(exact["amount"]["equi_width"]["counts"]) == 12_000
+    assert sum(streaming["amount"]["equi_width"]["counts"]) == 12_000
+    assert streaming["amount"]["approximate"]
+    assert exact["day"]["type"] == streaming["day"]["type"] == "datetime"
+    exact_depth = exact["amount"]["equi_depth"]["edges"]
+    streaming_depth = streaming["amount"]["equi_depth"]["edges"]
+    assert streaming_depth[5] == pytest.approx(exact_depth[5], rel=0.05)
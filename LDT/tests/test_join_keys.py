@@ -0,0 +1,58 @@
+"""MinHash-сигнатуры столбцов и поиск ключей соединения между наборами"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import universal_data_analyzer as uda
+
+
+def signature(values, chunks=1):
+    minhash = uda.MinHashSignatures()
+    for part in np.array_split(np.asarray(values), chunks):
+        minhash.update(pd.DataFrame({"col": part}))
+    return minhash
+
+
+def test_signature_is_chunk_independent_and_roundtrips():
+    one, many = signature(np.arange(5_000)), signature(np.arange(5_000), chunks=7)
+    assert (one.signatures["col"] == many.signatures["col"]).all()
+    encoded = one.result()["columns"]["col"]
+    assert (uda.MinHashSignatures.decode(encoded) == one.signatures["col"]).all()
+
+
+@pytest.mark.parametrize("overlap", [0.2, 0.5, 0.8])
+def test_signature_agreement_estimates_jaccard(overlap):
+    size = 20_000
+    shift = int(size * (1 - overlap) / (1 + overlap))
+    left = signature(np.arange(size)).signatures["col"]
+    right = signature(np.arange(shift, size + shift)).signatures["col"]
+    truth = (size - shift) / (size + shift)
+    assert float(np.mean(left == right)) == pytest.approx(truth, abs=0.2)
+
+
+def test_signatures_match_across_dtypes():
+    ints = signature(np.arange(1_000)).signatures["col"]
+    strings = signature(np.arange(1_000).astype(str).astype(object)).signatures["col"]
+    assert (ints == strings).all()
+
+
+def analysis(name, values, unique_count, rows):
+    minhash = uda.MinHashSignatures()
+    minhash.update(pd.DataFrame({name: values}))
+    return {"overview": {"columns": [{"name": name, "unique_count": unique_count, "non_null_count": rows}]},
+            "statistics": {"minhash": minhash.result()}}
+
+
+def test_join_key_index_finds_key_and_skips_small_sets():
+    rng = np.random.default_rng(0)
+    events = np.arange(1_000)
+    tickets = rng.choice(events[:600], 5_000)
+    index = uda.JoinKeyIndex()
+    index.add("events.csv", analysis("event_id", events, 1_000, 1_000))
+    index.add("tickets.csv", analysis("event_id", tickets, len(np.unique(tickets)), 5_000))
+    index.add("other.csv", analysis("flag", np.arange(5), 5, 5))
+    candidates = index.candidates()
+    assert len(candidates) == 1
+    assert candidates[0]["relation"] == "join_key"
+    assert candidates[0]["containment"] >= 0.8
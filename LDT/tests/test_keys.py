@@ -0,0 +1,83 @@
+"""Потенциальные ключи и функциональные зависимости"""
+
+import numpy as np
+import pandas as pd
+
+import universal_data_analyzer as uda
+
+
+def frame(n=2_000):
+    rng = np.random.default_rng(11)
+    event = rng.integers(0, 50, n)
+    return pd.DataFrame({
+        "ticket_id": np.arange(n),
+        "event_id": event,
+        "event_name": [f"событие {e}" for e in event],
+        "price": rng.random(n) * 1000,
+        "created": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 10 ** 9, n), "s"),
+    })
+
+
+def dependency(result, lhs, rhs):
+    return next((d for d in result["functional_dependencies"]
+                 if d["determinant"] == lhs and d["dependent"] == rhs), None)
+
+
+def test_discovers_key_and_dependency_and_verifies_them():
+    df = frame()
+    keys = uda.KeyDiscovery()
+    keys.discover(df)
+    keys.start_verification()
+    keys.update(df.iloc[:1_000].copy())
+    keys.update(df.iloc[1_000:].copy())
+    result = keys.result()
+    assert result["candidate_keys"][0]["columns"] == ["ticket_id"]
+    assert result["candidate_keys"][0]["verified"]
+    dep = dependency(result, "event_id", "event_name")
+    assert dep["strength"] == 1.0 and dep["verified"] and dep["violations"] == 0
+
+
+def test_continuous_columns_are_keys_only_on_request():
+    df = frame().drop(columns="ticket_id")
+    keys = uda.KeyDiscovery()
+    keys.discover(df)
+    assert all("price" not in k and "created" not in k for k in keys.keys)
+    requested = uda.KeyDiscovery(include=["price"])
+    requested.discover(df)
+    assert ("price",) in requested.keys
+
+
+def test_dependency_strength_ignores_rows_with_empty_determinant():
+    df = frame()
+    # Пустой event_id у строк с разными названиями не ослабляет event_id -> event_name
+    df["event_id"] = df["event_id"].astype("float64")
+    df.loc[::5, "event_id"] = np.nan
+    keys = uda.KeyDiscovery()
+    keys.discover(df)
+    keys.start_verification()
+    keys.update(df.copy())
+    dep = dependency(keys.result(), "event_id", "event_name")
+    assert dep["strength"] == 1.0
+    assert dep["determinant_null_rate"] == 0.2
+    assert dep["verified"]
+
+
+def test_mostly_empty_columns_are_not_determinants():
+    df = frame()
+    df["promo"] = np.where(np.arange(len(df)) % 10 == 0, "акция", None)
+    keys = uda.KeyDiscovery()
+    keys.discover(df)
+    assert all(d["determinant"] != "promo" for d in keys.dependencies)
+
+
+def test_keys_with_nulls_are_reported_unverified():
+    df = frame()
+    keys = uda.KeyDiscovery()
+    keys.discover(df)
+    keys.start_verification()
+    tail = df.iloc[:3].copy()
+    tail["ticket_id"] = np.nan
+    keys.update(df.copy())
+    keys.update(tail)
+    key = keys.result()["candidate_keys"][0]
+    assert key["null_rows"] == 3 and key["duplicate_rows"] == 0 and not key["verified"]
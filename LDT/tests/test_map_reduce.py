@@ -0,0 +1,81 @@
+"""Широкие таблицы: группы столбцов и map-reduce запросов к модели"""
+
+import threading
+
+import pytest
+
+import universal_data_analyzer as uda
+
+
+@pytest.fixture
+def client():
+    return uda.LLMClient("test-model", uda.Logger(verbose=False), prompt_tokens=4_000, group_columns=10,
+                         concurrency=3, retries=0)
+
+
+def fake_model(client, answer=lambda prompt: "ok", fail=lambda prompt: False):
+    """Подмена вызова Ollama: запоминает промпты, ответ и ошибки задаются функциями"""
+    prompts = []
+    lock = threading.Lock()
+
+    def call(prompt, model=None, deadline=None, queue_info=None):
+        with lock:
+            prompts.append(prompt)
+        if fail(prompt):
+            raise RuntimeError("model failed")
+        return answer(prompt)
+    client._call_ollama = call
+    return prompts
+
+
+@pytest.mark.parametrize("count, sizes", [(10, [10]), (11, [6, 5]), (27, [9, 9, 9]), (31, [8, 8, 8, 7])])
+def test_column_groups_are_balanced_and_ordered(client, count, sizes):
+    names = [f"c{i}" for i in range(count)]
+    groups = client._column_groups(names)
+    assert [len(group) for group in groups] == sizes
+    assert sum(groups, []) == names
+
+
+def test_column_subset_keeps_only_group_columns(client, tickets_csv, analyze):
+    analysis = analyze(tickets_csv)
+    names = [c["name"] for c in analysis["overview"]["columns"]][:5]
+    subset = client._column_subset(analysis, names)
+    assert [c["name"] for c in subset["overview"]["columns"]] == names
+    assert set(subset["statistics"]["numeric_summary"]) <= set(names)
+    for record in subset["sample"]:
+        assert set(record) <= set(names)
+    # Разделы всей таблицы остаются для reduce
+    assert "duplicates" not in subset["statistics"]
+
+
+def test_wide_table_is_analyzed_by_groups_then_reduced(client, tickets_csv, analyze):
+    analysis = analyze(tickets_csv)
+    prompts = fake_model(client, answer=lambda prompt: "итог" if "объедини выводы" in prompt else "вывод группы")
+    assert client.analyze_data("tickets.csv", analysis) == "итог"
+
+    groups = [p for p in prompts if "Группа столбцов" in p]
+    reduce = [p for p in prompts if "объедини выводы" in p]
+    assert len(groups) == 3 and len(reduce) == 1
+    assert reduce[0].count("вывод группы") == 3
+    assert all(uda.estimate_tokens(p) <= client.prompt_tokens for p in prompts)
+
+
+def test_failed_group_is_reported_in_reduce(client, tickets_csv, analyze):
+    analysis = analyze(tickets_csv)
+    prompts = fake_model(client, fail=lambda prompt: "Группа столбцов 2 " in prompt)
+    assert client.analyze_data("tickets.csv", analysis) == "ok"
+    assert "анализ не получен" in prompts[-1]
+
+
+def test_all_groups_failed_raises(client, tickets_csv, analyze):
+    analysis = analyze(tickets_csv)
+    fake_model(client, fail=lambda prompt: True)
+    with pytest.raises(RuntimeError):
+        client.analyze_data("tickets.csv", analysis)
+
+
+def test_narrow_table_uses_single_request(tickets_csv, analyze):
+    client = uda.LLMClient("test-model", uda.Logger(verbose=False), group_columns=60)
+    prompts = fake_model(client)
+    client.analyze_data("tickets.csv", analyze(tickets_csv))
+    assert len(prompts) == 1
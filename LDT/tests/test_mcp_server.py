@@ -0,0 +1,126 @@
+"""MCP-сервер анализатора: общий расчет для одновременных вызовов и его прогресс"""
+
+import asyncio
+import importlib
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("mcp.server")
+
+SERVER_DIR = Path(__file__).resolve().parents[2] / "mcp" / "mcp_server"
+
+
+@pytest.fixture(scope="module")
+def server(tmp_path_factory):
+    """Модуль сервера с папками данных и вывода во временном каталоге"""
+    root = tmp_path_factory.mktemp("mcp")
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setenv("ANALYZER_INPUT_DIR", str(root / "files"))
+        patch.setenv("ANALYZER_OUTPUT_DIR", str(root / "output"))
+        patch.syspath_prepend(str(SERVER_DIR))
+        module = importlib.import_module("data_analyzer_server")
+        yield module
+    sys.modules.pop("data_analyzer_server", None)
+
+
+@pytest.fixture
+def tools(server, tmp_path, tickets_csv, monkeypatch):
+    monkeypatch.setattr(server, "PROGRESS_INTERVAL", 0.05)
+    base_dir = tmp_path / "files"
+    base_dir.mkdir()
+    shutil.copy(tickets_csv, base_dir / "tickets.csv")
+    tools = server.AnalyzerTools(str(base_dir), str(tmp_path / "output"))
+    tools.llm_client._call_ollama = lambda prompt, model=None, deadline=None, queue_info=None: "рекомендации"
+    return tools
+
+
+class FakeProgress:
+    """Progress без сессии MCP: запоминает сообщения"""
+    def __init__(self):
+        self.messages = []
+
+    async def __call__(self, message, total=None):
+        self.messages.append(message)
+
+
+def count_calls(monkeypatch, tools, name):
+    calls = []
+    original = getattr(tools, name)
+
+    async def wrapper(*args):
+        calls.append(args)
+        return await original(*args)
+    monkeypatch.setattr(tools, name, wrapper)
+    return calls
+
+
+def test_missing_file_reported_as_not_found(tools):
+    path = tools.resolve("tickets.csv")
+    Path(path).unlink()
+    with pytest.raises(ValueError, match="не найден"):
+        asyncio.run(tools._profile(path, "auto", False, FakeProgress()))
+
+
+def test_tool_mode_rejects_unknown_values(server):
+    assert server.tool_mode({}) == "auto"
+    assert server.tool_mode({"mode": "sampled"}) == "sampled"
+    with pytest.raises(ValueError, match="fast"):
+        server.tool_mode({"mode": "fast"})
+
+
+def test_concurrent_calls_share_analysis_and_progress(tools, monkeypatch):
+    analyses = count_calls(monkeypatch, tools, "_analyze")
+    first, second = FakeProgress(), FakeProgress()
+
+    async def scenario():
+        a = asyncio.create_task(tools.profile_file("tickets.csv", "full", False, first))
+        await asyncio.sleep(0.1)
+        b = asyncio.create_task(tools.profile_file("tickets.csv", "full", False, second))
+        results = await asyncio.gather(a, b)
+        return results, dict(tools.running), dict(tools.listeners)
+
+    (text_a, text_b), running, listeners = asyncio.run(scenario())
+    assert len(analyses) == 1
+    assert text_a == text_b
+    # Второй вызов присоединился к расчету и тоже получает уведомления об этапах
+    assert any("готов" in message for message in second.messages)
+    assert running == {} and listeners == {}
+
+
+def test_cancelled_caller_does_not_stop_shared_analysis(tools):
+    first, second = FakeProgress(), FakeProgress()
+
+    async def scenario():
+        a = asyncio.create_task(tools.profile_file("tickets.csv", "full", False, first))
+        await asyncio.sleep(0.1)
+        b = asyncio.create_task(tools.profile_file("tickets.csv", "full", False, second))
+        await asyncio.sleep(0.1)
+        a.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await a
+        return await b
+
+    assert "tickets.csv" in asyncio.run(scenario())
+    assert any("готов" in message for message in second.messages)
+
+
+def test_cached_profile_returned_without_analysis(tools, monkeypatch):
+    asyncio.run(tools.profile_file("tickets.csv", "full", False, FakeProgress()))
+    analyses = count_calls(monkeypatch, tools, "_analyze")
+    text = asyncio.run(tools.profile_file("tickets.csv", "sampled", False, FakeProgress()))
+    assert analyses == [] and "профиль из кэша" in text
+
+
+def test_concurrent_recommendations_ask_model_once(tools, monkeypatch):
+    answers = count_calls(monkeypatch, tools, "_answer")
+
+    async def scenario():
+        return await asyncio.gather(*(tools.get_recommendations("tickets.csv", "full", False, FakeProgress())
+                                      for _ in range(3)))
+
+    assert asyncio.run(scenario()) == ["рекомендации"] * 3
+    assert len(answers) == 1
+    assert tools.running == {}
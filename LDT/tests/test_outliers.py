@@ -0,0 +1,46 @@
+"""Выбросы: границы IQR и робастный z-score, точный и потоковый расчет"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import universal_data_analyzer as uda
+
+
+def test_robust_fences_iqr_and_mad():
+    fences = uda.robust_fences(q1=10, median=15, q3=20, mad=2, mean_ad=3)
+    assert fences["iqr"] == 10
+    assert (fences["lower_fence"], fences["upper_fence"]) == (-5, 35)
+    assert fences["robust_scale"] == pytest.approx(2 / 0.6745)
+    assert fences["robust_z_upper"] == pytest.approx(15 + 3.5 * 2 / 0.6745)
+
+
+def test_robust_fences_fall_back_to_mean_deviation():
+    assert uda.robust_fences(5, 5, 5, 0, 0.4)["robust_scale"] == pytest.approx(0.4 * 1.2533)
+    constant = uda.robust_fences(5, 5, 5, 0, 0)
+    assert constant["robust_z_lower"] is None and constant["robust_z_upper"] is None
+
+
+def test_outlier_summary_orders_by_distance_from_median():
+    fences = uda.robust_fences(10, 15, 20, 2, 3)
+    summary = uda.outlier_summary(fences, count=100, iqr_rate=0.03, z_rate=0.05,
+                                  candidates=np.array([-50.0, 40.0, 100.0, 16.0]), min_value=-50, max_value=100)
+    assert summary["iqr_outliers"] == 3
+    assert summary["mad_outliers"] == 5
+    assert summary["top_outliers"] == [100.0, -50.0, 40.0]
+    assert summary["max_abs_robust_z"] == pytest.approx(85 / (2 / 0.6745), abs=1e-3)
+    assert "approximate" not in summary
+
+
+def test_exact_and_streaming_outliers_agree(tmp_path, analyze):
+    rng = np.random.default_rng(0)
+    values = np.concatenate([rng.normal(100, 10, 20_000), [1_000, 2_000, -500]])
+    path = tmp_path / "values.csv"
+    pd.DataFrame({"amount": values}).to_csv(path, sep=";", index=False)
+    exact = analyze(path)["statistics"]["outliers"]["amount"]
+    streaming = analyze(path, chunk_size=4_000)["statistics"]["outliers"]["amount"]
+    assert exact["top_outliers"][:3] == [2_000.0, 1_000.0, -500.0]
+    assert streaming["top_outliers"][:3] == pytest.approx(exact["top_outliers"][:3])
+    assert streaming["approximate"]
+    assert streaming["median"] == pytest.approx(exact["median"], rel=0.01)
+    assert streaming["iqr_outliers"] == pytest.approx(exact["iqr_outliers"], abs=40)
@@ -0,0 +1,35 @@
+"""Статистика по столбцам в пуле потоков: порядок и результат не зависят от числа потоков"""
+
+import threading
+import time
+
+import universal_data_analyzer as uda
+
+
+def test_map_columns_keeps_column_order(make_config):
+    analyzer = uda.DataAnalyzer(make_config(workers=4))
+    threads = set()
+
+    def slow(i):
+        threads.add(threading.get_ident())
+        time.sleep(0.01 * (5 - i))
+        return i * i
+
+    assert analyzer._map_columns(slow, list(range(5))) == [0, 1, 4, 9, 16]
+    assert len(threads) > 1
+
+
+def test_single_worker_runs_inline(make_config):
+    analyzer = uda.DataAnalyzer(make_config(workers=1))
+    threads = []
+    analyzer._map_columns(lambda i: threads.append(threading.get_ident()), [1, 2, 3])
+    assert set(threads) == {threading.get_ident()}
+
+
+def test_report_is_identical_for_any_worker_count(tickets_csv, analyze):
+    def statistics(workers):
+        result = analyze(tickets_csv, workers=workers)
+        stats = result["statistics"]
+        return result["overview"]["columns"], {k: stats[k] for k in ("numeric_summary", "outliers", "histograms")}
+
+    assert statistics(1) == statistics(4)
@@ -0,0 +1,64 @@
+"""Персональные данные: контрольные суммы, отбор столбцов и маскирование"""
+
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import universal_data_analyzer as uda
+
+
+def test_checksums():
+    assert uda.inn_valid(pd.Series(["7707083893", "7707083890", "500100732259"])).tolist() == [True, False, True]
+    assert uda.snils_valid(pd.Series(["11223344595", "11223344596"])).tolist() == [True, False]
+    assert uda.luhn_valid(pd.Series(["4111111111111111", "4111111111111112"])).tolist() == [True, False]
+
+
+def test_scanner_flags_by_shape_checksum_and_hint():
+    frame = pd.DataFrame({
+        "contact": ["ivan@example.ru", "olga@mail.ru", None],
+        "code": ["7707083893", "7707083890", "7707083893"],
+        "passport_no": ["4510 123456", "4511 654321", None],
+        "city": ["Москва", "Тверь", "Казань"],
+    })
+    scanner = uda.PIIScanner()
+    scanner.update(frame)
+    columns = scanner.result()["columns"]
+    assert columns["contact"]["email"]["rate"] == 1.0
+    assert columns["code"]["inn"]["checksum_rate"] == pytest.approx(2 / 3, abs=1e-4)
+    assert columns["passport_no"]["passport"]["name_hint"]
+    assert "city" not in columns
+
+
+def test_integer_float_columns_are_scanned_only_with_hint():
+    phones = pd.Series([79161234567.0, np.nan, 79261234567.0])
+    scanner = uda.PIIScanner()
+    scanner.update(pd.DataFrame({"client_phone": phones, "amount": phones, "rate": [0.5, 1.5, np.nan]}))
+    columns = scanner.result()["columns"]
+    assert columns["client_phone"]["phone"]["hits"] == 2
+    assert "amount" not in columns and "rate" not in columns
+
+
+def test_mask_pii_value():
+    assert uda.mask_pii_value("ivan@example.ru", ["email"]) == "i***@example.ru"
+    assert uda.mask_pii_value("1985-04-12", ["birth_date"]) == "1985-**-**"
+    assert uda.mask_pii_value(79161234567.0, ["phone"]) == "*********67"
+    assert uda.mask_pii_value("79161234567.0", ["phone"]) == "*********67"
+    assert uda.mask_pii_value(None, ["phone"]) is None
+
+
+PHONE = re.compile(r"79\d{9}")
+
+
+@pytest.mark.parametrize("mode", [{}, {"chunk_size": 5_000}, {"sampled": True, "sample_block_mb": 0.25},
+                                  {"arrow": True}])
+def test_client_phone_flagged_and_masked_in_every_read_path(tickets_csv, analyze, mode):
+    result = analyze(tickets_csv, mask_pii=True, **mode)
+    assert "phone" in result["statistics"]["pii"]["columns"]["client_phone"]
+    assert result["statistics"]["pii"]["masked"]
+    column = next(c for c in result["overview"]["columns"] if c["name"] == "client_phone")
+    shown = [str(v) for v in column["example_values"]] + [v["value"] for v in column["top_values"]]
+    shown += [str(row.get("client_phone")) for row in result["sample"]]
+    assert not any(PHONE.search(v) for v in shown)
+    assert any("*" in v for v in shown)
@@ -0,0 +1,65 @@
+"""Бюджет промпта: оценка токенов и сокращение разделов по важности"""
+
+import pytest
+
+import universal_data_analyzer as uda
+
+
+def test_estimate_tokens_rounds_up():
+    assert uda.estimate_tokens("") == 0
+    assert uda.estimate_tokens("a") == 1
+    assert uda.estimate_tokens("x" * uda.CHARS_PER_TOKEN * 10) == 10
+    assert uda.estimate_tokens("x" * (uda.CHARS_PER_TOKEN * 10 + 1)) == 11
+
+
+def test_prompt_section_text_and_empty_variant():
+    section = uda.PromptSection("ЗАГОЛОВОК", [["a", "b"], []], weights=[1])
+    assert section.text() == "ЗАГОЛОВОК:\na\nb"
+    section.level = 1
+    assert section.text() == ""
+
+
+def test_fit_sections_drops_least_important_details_first():
+    long_lines = ["x" * 90] * 10
+    important = uda.PromptSection("ВАЖНО", [long_lines, long_lines[:2]], weights=[9])
+    minor = uda.PromptSection("МЕЛОЧИ", [long_lines, long_lines[:2], []], weights=[1, 2])
+    within = uda.fit_sections([important, minor], budget=400)
+    assert within <= 400
+    assert important.level == 0
+    assert minor.level >= 1
+
+
+def test_fit_sections_keeps_everything_when_budget_allows():
+    section = uda.PromptSection("РАЗДЕЛ", [["a"] * 5, []], weights=[1])
+    used = uda.fit_sections([section], budget=1_000)
+    assert section.level == 0
+    assert used == uda.estimate_tokens(section.text())
+
+
+def test_fit_sections_truncates_lines_when_short_variants_do_not_fit():
+    lines = [f"столбец_{i}: " + "y" * 60 for i in range(200)]
+    section = uda.PromptSection("СТОЛБЦЫ", [lines], weights=[])
+    used = uda.fit_sections([section], budget=500)
+    assert used <= 500
+    kept = section.variants[0]
+    assert kept[-1].startswith("... еще ")
+    assert 0 < len(kept) < len(lines)
+
+
+@pytest.mark.parametrize("prompt_tokens", [1_500, 3_000, 8_000])
+def test_build_prompt_stays_within_budget(prompt_tokens, tickets_csv, analyze):
+    analysis = analyze(tickets_csv)
+    client = uda.LLMClient("test-model", uda.Logger(verbose=False), prompt_tokens=prompt_tokens)
+    prompt = client._build_prompt("tickets.csv", analysis)
+    assert uda.estimate_tokens(prompt) <= prompt_tokens
+    assert prompt.startswith("Ты - эксперт по анализу данных")
+    assert prompt.endswith(client.TASKS)
+    assert "tickets.csv" in prompt
+
+
+def test_small_budget_shortens_sections(tickets_csv, analyze):
+    analysis = analyze(tickets_csv)
+    logger = uda.Logger(verbose=False)
+    full = uda.LLMClient("test-model", logger, prompt_tokens=50_000)._build_prompt("tickets.csv", analysis)
+    short = uda.LLMClient("test-model", logger, prompt_tokens=1_500)._build_prompt("tickets.csv", analysis)
+    assert len(short) < len(full)
@@ -0,0 +1,112 @@
+"""Очередь запросов к Ollama: слоты, приоритеты, дедлайны и повторы"""
+
+import threading
+import time
+
+import pytest
+
+import universal_data_analyzer as uda
+
+
+def test_slots_limit_concurrent_requests():
+    queue = uda.RequestQueue(2)
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def request():
+        with queue.slot():
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.05)
+            with lock:
+                active[0] -= 1
+
+    threads = [threading.Thread(target=request) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert peak[0] == 2
+    report = queue.report()
+    assert report["requests"] == 6 and report["slots"] == 2
+    assert report["max_wait_seconds"] > 0
+
+
+def test_lower_priority_value_is_served_first():
+    queue = uda.RequestQueue(1)
+    order = []
+
+    def request(priority):
+        with queue.slot(priority):
+            order.append(priority)
+
+    with queue.slot():
+        threads = []
+        for priority in (30, 10, 20):
+            thread = threading.Thread(target=request, args=(priority,))
+            thread.start()
+            threads.append(thread)
+            # Ждем, пока запрос встанет в очередь, чтобы порядок постановки был известен
+            while len(queue._waiting) < len(threads):
+                time.sleep(0.005)
+    for thread in threads:
+        thread.join()
+    assert order == [10, 20, 30]
+
+
+def test_deadline_expires_in_queue():
+    queue = uda.RequestQueue(1)
+    with queue.slot():
+        with pytest.raises(TimeoutError):
+            with queue.slot(deadline=time.monotonic() + 0.05):
+                pass
+        assert queue._waiting == []
+    # Слот освобожден, очередь работает дальше
+    with queue.slot(deadline=time.monotonic() + 1) as (waited, depth):
+        assert depth == 0
+
+
+def test_retries_with_backoff_then_success():
+    client = uda.LLMClient("test-model", uda.Logger(verbose=False), retries=2, backoff=0.01)
+    attempts = []
+
+    def call(prompt, model=None, deadline=None, queue_info=None):
+        attempts.append(queue_info["attempt"])
+        if len(attempts) < 3:
+            raise RuntimeError("connection reset")
+        return "ответ"
+    client._call_ollama = call
+    assert client._timed_call("промпт", "test-model") == "ответ"
+    assert attempts == [1, 2, 3]
+    assert client.queue.report()["retries"] == 2
+
+
+def test_retries_exhausted_raise_last_error():
+    client = uda.LLMClient("test-model", uda.Logger(verbose=False), retries=1, backoff=0.01)
+
+    def call(prompt, model=None, deadline=None, queue_info=None):
+        raise RuntimeError("down")
+    client._call_ollama = call
+    with pytest.raises(RuntimeError, match="down"):
+        client._timed_call("промпт", "test-model")
+
+
+def test_expired_job_deadline_is_not_retried():
+    client = uda.LLMClient("test-model", uda.Logger(verbose=False), retries=3, backoff=0.01)
+    calls = []
+
+    def call(prompt, model=None, deadline=None, queue_info=None):
+        calls.append(deadline)
+        time.sleep(0.06)
+        raise TimeoutError("slow")
+    client._call_ollama = call
+    job = uda.LLMJob("data.csv", deadline=time.monotonic() + 0.05)
+    token = uda.LLM_JOB.set(job)
+    try:
+        with pytest.raises(TimeoutError):
+            client._timed_call("промпт", "test-model")
+    finally:
+        uda.LLM_JOB.reset(token)
+    assert len(calls) == 1
+    assert calls[0] == pytest.approx(job.deadline)
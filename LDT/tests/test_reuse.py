@@ -0,0 +1,88 @@
+"""Повторное использование анализов: отпечатки, сходство и индекс"""
+
+import pytest
+
+import universal_data_analyzer as uda
+from generate_tickets import write_dataset
+
+
+@pytest.fixture(scope="module")
+def next_day_csv(tmp_path_factory):
+    """Следующая выгрузка той же таблицы: другие строки, та же схема"""
+    return write_dataset(tmp_path_factory.mktemp("next_day") / "tickets.csv", "csv", 22_000, seed=8)
+
+
+@pytest.fixture
+def index(tmp_path):
+    return uda.AnalysisIndex(str(tmp_path), uda.Logger(verbose=False))
+
+
+def test_fingerprint_of_table(tickets_csv, analyze):
+    fingerprint = uda.AnalysisIndex.fingerprint(analyze(tickets_csv))
+    assert fingerprint["rows"] == 20_000
+    assert len(fingerprint["schema_hash"]) == 16
+    assert len(fingerprint["columns"]) == 27
+    assert uda.AnalysisIndex.fingerprint({"overview": {"data_type": "xml"}}) is None
+
+
+def test_next_export_is_similar_and_changes_reported(tickets_csv, next_day_csv, analyze):
+    old = uda.AnalysisIndex.fingerprint(analyze(tickets_csv))
+    new = uda.AnalysisIndex.fingerprint(analyze(next_day_csv))
+    assert uda.AnalysisIndex.similarity(old, old) == pytest.approx(1.0)
+    assert uda.AnalysisIndex.similarity(old, new) >= 0.9
+    changes = uda.AnalysisIndex("unused", uda.Logger(verbose=False)).changes(old, new)
+    assert changes[0].startswith("- строк: 20,000 -> 22,000")
+
+
+def test_different_schema_is_not_similar(tickets_csv, analyze):
+    old = uda.AnalysisIndex.fingerprint(analyze(tickets_csv))
+    renamed = {**old, "schema_hash": "0" * 16}
+    assert uda.AnalysisIndex.similarity(old, renamed) == 0.0
+
+
+def test_shifted_statistics_lower_similarity():
+    base = {"schema_hash": "a", "rows": 100,
+            "columns": {"x": {"null_percentage": 0.0, "unique_ratio": 0.1, "top": ["1", "2"], "mean": 10.0, "std": 1.0}}}
+    shifted = {"schema_hash": "a", "rows": 100,
+               "columns": {"x": {"null_percentage": 5.0, "unique_ratio": 0.1, "top": ["3"], "mean": 13.0, "std": 1.0}}}
+    assert uda.AnalysisIndex.similarity(base, shifted) < 0.5
+
+
+def test_index_find_returns_latest_match_above_threshold(index):
+    fingerprint = {"schema_hash": "a", "rows": 10, "columns": {"x": {"null_percentage": 0.0, "unique_ratio": 0.5,
+                                                                        "top": []}}}
+    assert index.find(fingerprint, 0.95) is None
+    index.add("first.csv", fingerprint, "первый ответ", None)
+    index.add("second.csv", fingerprint, "второй ответ", "report.md")
+    entry, score = index.find(fingerprint, 0.95)
+    assert entry["llm_response"] == "второй ответ" and entry["report"] == "report.md"
+    assert score == pytest.approx(1.0)
+    other = {**fingerprint, "schema_hash": "b"}
+    assert index.find(other, 0.95) is None
+
+
+def test_index_skips_corrupted_lines(index):
+    fingerprint = {"schema_hash": "a", "rows": 1, "columns": {}}
+    index.add("data.csv", fingerprint, "ответ", None)
+    with open(index.path, "a", encoding="utf-8") as f:
+        f.write("{оборванная строка\n")
+    assert len(index._entries()) == 1
+
+
+def test_answer_file_reuses_similar_analysis(tickets_csv, next_day_csv, analyze, make_config, index):
+    config = make_config(reuse_threshold=0.9)
+    logger = uda.Logger(verbose=False)
+    handler = uda.FileHandler(logger)
+    client = uda.LLMClient("test-model", logger)
+    calls = []
+    client._call_ollama = lambda prompt, model=None, deadline=None, queue_info=None: calls.append(model) or "ответ"
+
+    first = analyze(tickets_csv)
+    answer = uda.answer_file(handler.file_info(str(tickets_csv)), first, logger, client, config, index)
+    uda.save_result(handler.file_info(str(tickets_csv)), first, answer, None, index)
+    second = analyze(next_day_csv)
+    reused = uda.answer_file(handler.file_info(str(next_day_csv)), second, logger, client, config, index)
+    assert len(calls) == 1
+    assert reused.startswith("ответ")
+    assert "Изменения относительно прошлого анализа" in reused
+    assert second["reused_analysis"]["similarity"] >= 0.9
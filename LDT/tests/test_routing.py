@@ -0,0 +1,105 @@
+"""Каскад моделей: выбор модели, проверка ответа и эскалация"""
+
+import pandas as pd
+import pytest
+
+import universal_data_analyzer as uda
+
+GOOD_ANSWER = "\n".join([
+    "# Обзор данных",
+    "- Таблица заказов: идентификатор, сумма и дата оформления заказа клиентом.",
+    "- Пропусков немного, дубликаты по идентификатору не найдены.",
+    "## Качество данных",
+    "- Суммы содержат единичные выбросы, которые стоит проверить вручную.",
+    "- Даты лежат в ожидаемом диапазоне без значений из будущего.",
+    "## Рекомендации",
+    "1. Привести суммы к числовому типу и проверить крупнейшие значения.",
+    "2. Добавить проверку уникальности идентификатора при загрузке.",
+    "3. Хранить даты в едином часовом поясе для корректных отчетов.",
+])
+
+
+@pytest.fixture
+def small_analysis(tmp_path, analyze):
+    path = tmp_path / "orders.csv"
+    pd.DataFrame({"id": range(100), "amount": [i * 1.5 for i in range(100)],
+                  "city": ["Москва", "Казань"] * 50}).to_csv(path, index=False)
+    return analyze(path)
+
+
+def make_client(escalate="auto", deadline=None):
+    return uda.LLMClient("big-model", uda.Logger(verbose=False), fast_model="fast-model", escalate=escalate,
+                         deadline=deadline, retries=0)
+
+
+def fake_models(client, answers):
+    """Подмена вызова Ollama: ответ (или исключение) по имени модели, список вызванных моделей"""
+    called = []
+
+    def call(prompt, model=None, deadline=None, queue_info=None):
+        called.append(model)
+        answer = answers[model]
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+    client._call_ollama = call
+    return called
+
+
+def test_good_answer_has_no_structure_problems():
+    assert make_client()._structure_problems(GOOD_ANSWER) == []
+
+
+def test_structure_problems_detected():
+    client = make_client()
+    problems = client._structure_problems("Short English answer without sections.", truncated=True)
+    assert "обрезан лимитом длины" in problems
+    assert "слишком короткий" in problems
+    assert "нет заголовков и списков" in problems
+    assert "не на русском" in problems
+    assert any(p.startswith("нет разделов") for p in problems)
+
+
+def test_escalation_reason_by_mode_and_shape(small_analysis):
+    assert make_client("always")._escalation_reason(small_analysis) == "по запросу"
+    assert make_client("never")._escalation_reason({"overview": {"data_type": "xml"}}) is None
+    client = make_client()
+    assert client._escalation_reason(small_analysis) is None
+    assert client._escalation_reason({"overview": {"data_type": "xml"}}).startswith("вложенная структура")
+    wide = {"overview": {"columns": [{"name": f"c{i}"} for i in range(client.COMPLEX_COLUMNS + 1)]}}
+    assert client._escalation_reason(wide).startswith("широкая таблица")
+
+
+def test_good_fast_answer_is_not_escalated(small_analysis):
+    client = make_client()
+    called = fake_models(client, {"fast-model": GOOD_ANSWER, "big-model": "большая"})
+    assert client.analyze_data("orders.csv", small_analysis) == GOOD_ANSWER
+    assert called == ["fast-model"]
+
+
+def test_bad_fast_answer_is_escalated(small_analysis):
+    client = make_client()
+    called = fake_models(client, {"fast-model": "ok", "big-model": GOOD_ANSWER})
+    assert client.analyze_data("orders.csv", small_analysis) == GOOD_ANSWER
+    assert called == ["fast-model", "big-model"]
+
+
+def test_escalation_disabled_keeps_fast_answer(small_analysis):
+    client = make_client("never")
+    called = fake_models(client, {"fast-model": "ok", "big-model": GOOD_ANSWER})
+    assert client.analyze_data("orders.csv", small_analysis) == "ok"
+    assert called == ["fast-model"]
+
+
+def test_big_model_timeout_falls_back_to_fast_answer(small_analysis):
+    client = make_client(deadline=5)
+    called = fake_models(client, {"fast-model": "ok", "big-model": TimeoutError("slow")})
+    assert client.analyze_data("orders.csv", small_analysis) == "ok"
+    assert called == ["fast-model", "big-model"]
+
+
+def test_always_escalate_timeout_asks_fast_model(small_analysis):
+    client = make_client("always", deadline=5)
+    called = fake_models(client, {"fast-model": "ok", "big-model": TimeoutError("slow")})
+    assert client.analyze_data("orders.csv", small_analysis) == "ok"
+    assert called == ["big-model", "fast-model"]
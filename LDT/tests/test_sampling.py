@@ -0,0 +1,122 @@
+"""Выборочный режим: оценки по случайным блокам и ранняя остановка"""
+
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import universal_data_analyzer as uda
+
+
+def test_ratio_estimate_exact_when_blocks_are_proportional():
+    ratio, half_width = uda.ratio_estimate([10, 20, 30], [100, 200, 300], z=1.96)
+    assert ratio == pytest.approx(0.1)
+    assert half_width == pytest.approx(0.0)
+
+
+def test_ratio_estimate_needs_two_blocks_and_shrinks_with_fpc():
+    assert math.isinf(uda.ratio_estimate([5], [10], z=1.96)[1])
+    assert math.isnan(uda.ratio_estimate([0, 0], [0, 0], z=1.96)[0])
+    nums, dens = [3, 9, 4, 8], [10, 10, 10, 10]
+    _, full = uda.ratio_estimate(nums, dens, z=1.96)
+    _, half = uda.ratio_estimate(nums, dens, z=1.96, fpc=0.5)
+    _, none = uda.ratio_estimate(nums, dens, z=1.96, fpc=0.0)
+    assert full > half > none == 0.0
+
+
+def test_quantile_sketch_merges_within_rank_error():
+    rng = np.random.default_rng(1)
+    values = rng.exponential(10, 200_000)
+    left, right = uda.QuantileSketch(k=256, seed=1), uda.QuantileSketch(k=256, seed=2)
+    for part in np.array_split(values[:100_000], 10):
+        left.update(part)
+    right.update(values[100_000:])
+    left.merge(right)
+    assert left.count == len(values)
+    for q, estimate in zip([0.1, 0.5, 0.99], left.quantiles([0.1, 0.5, 0.99])):
+        assert abs((values <= estimate).mean() - q) < 0.01
+    assert left.rank(float(np.median(values))) == pytest.approx(0.5, abs=0.01)
+    assert math.isnan(uda.QuantileSketch().quantiles([0.5])[0])
+
+
+def test_distinct_sketch_exact_below_k_and_close_above():
+    small = uda.DistinctSketch()
+    small.update(pd.Series(np.arange(500) % 300))
+    assert small.estimate() == 300
+    large, other = uda.DistinctSketch(), uda.DistinctSketch()
+    large.update(pd.Series(np.arange(60_000)))
+    other.update(pd.Series(np.arange(40_000, 100_000)))
+    large.merge(other)
+    assert large.estimate() == pytest.approx(100_000, rel=0.1)
+
+
+def test_distinct_sketch_never_exceeds_values_seen():
+    sketch, other = uda.DistinctSketch(), uda.DistinctSketch()
+    for part in np.array_split(np.arange(2_000), 4):
+        sketch.update(pd.Series(part))
+    other.update(pd.Series(np.arange(2_000, 3_000)))
+    sketch.merge(other)
+    assert sketch.seen == 3_000
+    assert sketch.estimate() <= 3_000
+    acc = uda.ColumnAccumulator("x", numeric=True)
+    acc.update(pd.Series(np.r_[np.arange(5_000), [np.nan] * 100]))
+    assert acc.distinct.estimate() <= acc.rows - acc.nulls
+
+
+def test_identifier_by_name_and_by_uniqueness(make_config):
+    profiler = uda.SampledProfiler(make_config(), uda.Logger(False))
+    def accumulator(values):
+        acc = uda.ColumnAccumulator("x", numeric=True)
+        acc.update(pd.Series(values))
+        return acc
+
+    sequential = accumulator(np.arange(1000))
+    repeated = accumulator(np.arange(1000) % 7)
+    fractional = accumulator(np.arange(1000) + 0.5)
+    assert profiler._identifier("order_id", repeated)
+    assert profiler._identifier("counter", sequential)
+    assert not profiler._identifier("counter", repeated)
+    assert not profiler._identifier("amount", fractional)
+
+
+def test_sampled_run_stops_early_and_covers_true_row_count(tickets_csv, analyze):
+    result = analyze(tickets_csv, sampled=True, sample_block_mb=0.25)
+    sampling = result["statistics"]["sampling"]
+    assert sampling["stop_reason"] in ("converged", "max_fraction")
+    assert sampling["blocks_read"] <= math.ceil(uda.SampledProfiler.MAX_FRACTION * sampling["blocks_total"])
+    rows = sampling["estimated_rows"]
+    assert rows["ci_low"] <= 20_000 <= rows["ci_high"]
+    # Последовательный ticket_id не участвует в критерии остановки по среднему
+    assert sampling["columns"]["ticket_id"]["identifier"]
+    assert sampling["skipped_lines"] == 0
+
+
+def test_blocks_cover_every_line_exactly_once(tmp_path, make_config):
+    path = tmp_path / "rows.csv"
+    pd.DataFrame({"n": np.arange(5000), "text": ["значение"] * 5000}).to_csv(path, sep=";", index=False)
+    profiler = uda.SampledProfiler(make_config(sample_block_mb=0.01, sample_tolerance=0.0),
+                                   uda.Logger(False))
+    profiler.MAX_FRACTION = 1.0
+    profile, _, info = profiler.profile_csv(str(path), ";", "utf-8")
+    assert info["stop_reason"] == "exhausted"
+    assert info["blocks_total"] > 1
+    assert profile.rows == 5000
+    assert profile.columns["n"].n == 5000
+
+
+def test_multiline_values_in_pilot_fall_back_to_streaming(tmp_path, analyze):
+    path = tmp_path / "notes.csv"
+    notes = [f"строка {i}\nпродолжение" if i % 3 == 0 else f"заметка {i}" for i in range(3000)]
+    pd.DataFrame({"id": range(3000), "note": notes}).to_csv(path, sep=";", index=False)
+    result = analyze(path, sampled=True, sample_block_mb=0.01)
+    assert "sampling" not in result["statistics"]
+    assert result["overview"]["rows"] == 3000
+
+
+def test_multiline_values_after_pilot_are_counted_as_skipped(tmp_path, analyze):
+    path = tmp_path / "late.csv"
+    notes = [f"строка {i}\nпродолжение;1" if i > 2000 and i % 3 == 0 else f"заметка {i}" for i in range(20_000)]
+    pd.DataFrame({"id": range(20_000), "note": notes}).to_csv(path, sep=";", index=False)
+    result = analyze(path, sampled=True, sample_block_mb=0.01, correlations=False)
+    assert result["statistics"]["sampling"]["skipped_lines"] > 0
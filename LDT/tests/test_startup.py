@@ -0,0 +1,74 @@
+"""Ленивые импорты: --help и обнаружение файлов без тяжелых пакетов"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import universal_data_analyzer as uda
+from run_benchmarks import HEAVY_MODULES, IMPORT_PROBE
+
+LDT_DIR = Path(uda.__file__).resolve().parent
+LOADED = "print(json.dumps([m for m in %r if m in sys.modules]))" % HEAVY_MODULES
+
+
+def run_probe(code: str) -> str:
+    """Код в свежем процессе из папки анализатора; последняя строка вывода"""
+    process = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=str(LDT_DIR),
+                             check=True)
+    return process.stdout.strip().splitlines()[-1]
+
+
+def test_import_loads_no_heavy_packages():
+    assert json.loads(run_probe(IMPORT_PROBE))["loaded"] == []
+
+
+def test_help_loads_no_heavy_packages():
+    code = ("import json, runpy, sys\n"
+            "sys.argv = ['universal_data_analyzer.py', '--help']\n"
+            "try:\n"
+            "    runpy.run_path('universal_data_analyzer.py', run_name='__main__')\n"
+            "except SystemExit:\n"
+            "    pass\n" + LOADED)
+    assert json.loads(run_probe(code)) == []
+
+
+def test_file_discovery_loads_no_data_packages(tmp_path):
+    (tmp_path / "a.csv").write_text("x\n1\n", encoding="utf-8")
+    (tmp_path / "b.parquet").write_bytes(b"PAR1")
+    code = ("import json, sys\n"
+            "import universal_data_analyzer as uda\n"
+            f"files = uda.FileHandler(uda.Logger()).find_files({str(tmp_path)!r})\n"
+            "assert len(files) == 2, files\n" + LOADED)
+    loaded = set(json.loads(run_probe(code)))
+    # rich нужен самому логгеру
+    assert loaded <= {"rich"}
+
+
+def test_lazy_module_imports_on_first_attribute():
+    module = uda.LazyModule("json")
+    assert "не загружен" in repr(module)
+    assert module.dumps([1]) == "[1]"
+    assert "загружен" in repr(module) and "не" not in repr(module)
+
+
+def test_lazy_module_missing_package_fails_on_use():
+    module = uda.LazyModule("package_that_does_not_exist")
+    with pytest.raises(ImportError):
+        module.anything
+
+
+def test_optional_packages_return_default_when_missing():
+    packages = uda.OptionalPackages()
+    assert packages.get("package_that_does_not_exist") is None
+    assert packages.get("package_that_does_not_exist", "fallback") == "fallback"
+    assert packages["json"] is json
+
+
+def test_check_required_packages_exits_with_install_hint(monkeypatch, capsys):
+    monkeypatch.setattr(uda, "REQUIRED_PACKAGES", {"package_that_does_not_exist": "pip install it"})
+    with pytest.raises(SystemExit):
+        uda.check_required_packages()
+    assert "pip install it" in capsys.readouterr().out
@@ -0,0 +1,72 @@
+"""Замеры этапов: время, CPU, строк/с и пиковая память"""
+
+import time
+
+import pytest
+
+import universal_data_analyzer as uda
+
+
+def test_span_records_wall_cpu_and_fields():
+    timer = uda.StageTimer()
+    with timer.span("read", rows=1_000, skipped=None) as stage:
+        time.sleep(0.02)
+        stage["bytes"] = 10
+    recorded = timer.timings["stages"][0]
+    assert recorded["stage"] == "read" and recorded["bytes"] == 10
+    assert "skipped" not in recorded
+    assert recorded["wall_seconds"] >= 0.02
+    assert recorded["cpu_seconds"] >= 0
+    assert recorded["rows_per_s"] == pytest.approx(1_000 / recorded["wall_seconds"], rel=0.01)
+    if uda.peak_rss_mb() is not None:
+        assert recorded["peak_rss_mb"] > 0
+        assert timer.timings["peak_rss_mb"] == recorded["peak_rss_mb"]
+
+
+def test_accumulated_spans_are_summed():
+    timer = uda.StageTimer()
+    for _ in range(3):
+        with timer.span("chunk", accumulate=True, rows=100):
+            time.sleep(0.005)
+    with timer.span("chunk"):
+        pass
+    stages = timer.timings["stages"]
+    assert len(stages) == 2
+    assert stages[0]["calls"] == 3 and stages[0]["rows"] == 300
+    assert stages[0]["wall_seconds"] >= 0.015
+    assert "calls" not in stages[1]
+
+
+def test_failed_span_records_error_and_reraises():
+    timer = uda.StageTimer()
+    with pytest.raises(ValueError):
+        with timer.span("parse"):
+            raise ValueError("broken row")
+    assert timer.timings["stages"][0]["error"] == "broken row"
+    assert "wall_seconds" in timer.timings["stages"][0]
+
+
+def test_analysis_result_contains_stage_timings(tickets_csv, analyze):
+    timings = analyze(tickets_csv)["timings"]
+    stages = {s["stage"]: s for s in timings["stages"]}
+    assert {"read", "type_inference", "statistics.numeric_summary", "statistics.duplicates"} <= set(stages)
+    assert stages["statistics.numeric_summary"]["rows"] == 20_000
+    assert timings["analysis_seconds"] > 0
+
+
+def test_chunked_stages_are_accumulated_per_chunk(tickets_csv, analyze):
+    stages = {s["stage"]: s for s in analyze(tickets_csv, chunk_size=5_000)["timings"]["stages"]}
+    assert stages["statistics.profile"]["calls"] == 4
+    assert stages["statistics.profile"]["rows"] == 20_000
+
+
+def test_answer_file_adds_llm_and_total_time(tickets_csv, analyze, make_config):
+    logger = uda.Logger(verbose=False)
+    client = uda.LLMClient("test-model", logger, retries=0)
+    client._call_ollama = lambda prompt, model=None, deadline=None, queue_info=None: "ответ"
+    analysis = analyze(tickets_csv)
+    file_info = uda.FileHandler(logger).file_info(str(tickets_csv))
+    uda.answer_file(file_info, analysis, logger, client, make_config())
+    stages = [s["stage"] for s in analysis["timings"]["stages"]]
+    assert "prompt" in stages and "llm" in stages
+    assert analysis["timings"]["total_seconds"] >= analysis["timings"]["analysis_seconds"]
@@ -0,0 +1,54 @@
+"""Частые значения: скетч Space-Saving и уникальные значения в обзоре"""
+
+import numpy as np
+import pandas as pd
+
+import universal_data_analyzer as uda
+
+
+def test_space_saving_bounds_hold_after_merges():
+    rng = np.random.default_rng(3)
+    values = pd.Series(rng.zipf(1.5, 50_000) % 5_000)
+    sketch, other = uda.TopKSketch(capacity=32), uda.TopKSketch(capacity=32)
+    for start in range(0, 25_000, 2_500):
+        sketch.update(values.iloc[start:start + 2_500])
+    other.update(values[25_000:])
+    sketch.merge(other)
+    truth = values.value_counts()
+    assert sketch.total == len(values)
+    top = sketch.top(10)
+    assert [int(v["value"]) for v in top[:3]] == truth.index[:3].tolist()
+    for entry in top:
+        true_count = truth[int(entry["value"])]
+        assert entry["count"] - entry["error"] <= true_count <= entry["count"]
+    assert sketch.floor <= len(values) / 32
+
+
+def test_space_saving_exact_below_capacity_and_formats_values():
+    sketch = uda.TopKSketch()
+    sketch.update(pd.Series([1, 1, 2]))
+    sketch.update(pd.Series([1.0, 2.5]))
+    sketch.update(pd.Series(pd.to_datetime(["2024-01-02", "2024-01-02"])))
+    top = sketch.top(rows=7)
+    assert top[0] == {"value": "1", "count": 3, "error": 0, "percentage": 42.86}
+    assert {"2024-01-02T00:00:00", "2.5", "2"} <= {v["value"] for v in top}
+
+
+def test_column_info_counts_unique_exactly(make_config):
+    analyzer = uda.DataAnalyzer(make_config(chunk_size=1_000))
+    small = analyzer._column_info(pd.Series(np.arange(5_000) % 700, name="code"))
+    assert small.unique_count == 700
+    large = analyzer._column_info(pd.Series(np.r_[np.arange(50_000).astype(str), [None] * 10], name="text"))
+    assert large.unique_count == large.non_null_count == 50_000
+    assert "unique_count_approx" not in large.to_dict()
+    top = small.top_values[0]
+    assert top["count"] - top["error"] <= 8 <= top["count"]
+
+
+def test_streamed_unique_count_capped_and_marked_approximate(tmp_path, analyze):
+    path = tmp_path / "ids.csv"
+    pd.DataFrame({"id": np.arange(5_000), "code": np.arange(5_000) % 7}).to_csv(path, index=False)
+    columns = {c["name"]: c for c in analyze(path, chunk_size=1_000)["overview"]["columns"]}
+    assert columns["id"]["unique_count"] <= columns["id"]["non_null_count"] == 5_000
+    assert columns["id"]["unique_count_approx"] is True
+    assert columns["code"]["unique_count"] == 7 and "unique_count_approx" not in columns["code"]
@@ -0,0 +1,58 @@
+"""Определение типов строковых столбцов: числа, булевы, даты"""
+
+import pandas as pd
+import pytest
+
+import universal_data_analyzer as uda
+
+
+@pytest.fixture
+def inferencer():
+    return uda.TypeInferencer(uda.Logger(False))
+
+
+@pytest.mark.parametrize("values, kind", [
+    (["1", "-2", "30"], "integer"),
+    (["1.5", "2e3", ".5"], "float"),
+    (["149,99", "0", "50,5"], "decimal_comma"),
+    (["1 234,5", "12 000", "7"], "thousands_space"),
+    (["1.234,5", "12.000", "7"], "thousands_dot"),
+    (["1,234.5", "12,000", "7"], "thousands_comma"),
+    (["да", "нет", "True"], "boolean"),
+    (["2021-03-04T10:00:00.000+03:00", "2021-03-05T11:30:00.000+03:00"], "datetime"),
+    (["04.03.2021", "31.12.2020"], "datetime"),
+])
+def test_infer_kinds(inferencer, values, kind):
+    specs = inferencer.infer(pd.DataFrame({"col": pd.Series(values * 50, dtype=object)}))
+    assert specs["col"].kind == kind
+
+
+def test_codes_with_leading_zeros_and_text_stay_strings(inferencer):
+    frame = pd.DataFrame({"zip": ["01234", "12345"] * 50, "name": ["Анна", "Олег"] * 50})
+    assert inferencer.infer(frame) == {}
+
+
+def test_fit_transform_converts_and_reports(inferencer):
+    frame = pd.DataFrame({"price": ["149,99", "0", None, " 50 "], "paid": ["True", "False", "True", None],
+                          "day": ["2024-01-02", "2024-01-03", "2024-01-04", None]})
+    result = inferencer.fit_transform(frame)
+    assert result["price"].tolist()[:2] == [149.99, 0.0] and result["price"].isna()[2]
+    assert str(result["paid"].dtype) == "boolean"
+    assert pd.api.types.is_datetime64_any_dtype(result["day"])
+    assert inferencer.report()["price"] == {"kind": "decimal_comma", "target": "float64", "match_rate": 1.0}
+
+
+def test_lossy_conversion_is_rolled_back(inferencer):
+    frame = pd.DataFrame({"n": [str(i) for i in range(100)]})
+    specs = inferencer.infer(frame)
+    frame.loc[:10, "n"] = "н/д"
+    converted, applied = inferencer.convert(frame, specs)
+    assert applied == {}
+    assert converted["n"].iloc[0] == "н/д"
+
+
+def test_transform_counts_failed_values_in_later_chunks(inferencer):
+    inferencer.fit_transform(pd.DataFrame({"n": ["1", "2", "3"]}))
+    chunk = inferencer.transform(pd.DataFrame({"n": ["4", "x"]}))
+    assert chunk["n"].iloc[0] == 4 and pd.isna(chunk["n"].iloc[1])
+    assert inferencer.report()["n"]["failed_values"] == 1
@@ -0,0 +1,155 @@
+"""Режим наблюдения: ожидание конца записи, опрос, inotify и обработка новых файлов"""
+
+import os
+import signal
+import sys
+import time
+
+import pytest
+
+import universal_data_analyzer as uda
+
+
+def write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.02)
+    return True
+
+
+def test_debouncer_waits_for_stable_signature(tmp_path):
+    path = tmp_path / "a.csv"
+    write(path, "x\n1\n")
+    debouncer = uda.Debouncer(0.2)
+    debouncer.touch(str(path))
+    assert debouncer.ready() == []
+    time.sleep(0.1)
+    write(path, "x\n1\n2\n")  # Файл еще дописывается: отсчет начинается заново
+    assert debouncer.ready() == []
+    time.sleep(0.1)
+    assert debouncer.ready() == []
+    ready = []
+    assert wait_for(lambda: ready.extend(debouncer.ready()) or ready)
+    assert ready == [(str(path), uda.file_signature(str(path)))]
+    assert debouncer.pending == {}
+
+
+def test_debouncer_returns_signature_and_drops_deleted(tmp_path):
+    kept, deleted = tmp_path / "kept.csv", tmp_path / "deleted.csv"
+    write(kept, "x\n1\n")
+    write(deleted, "x\n1\n")
+    debouncer = uda.Debouncer(0.0)
+    debouncer.touch(str(kept))
+    debouncer.touch(str(deleted))
+    os.remove(deleted)
+    assert debouncer.ready() == [(str(kept), uda.file_signature(str(kept)))]
+    assert debouncer.pending == {}
+    debouncer.touch(str(deleted))
+    assert debouncer.pending == {}
+
+
+def test_polling_watcher_reports_new_and_changed_files(tmp_path):
+    old = tmp_path / "old.csv"
+    write(old, "x\n1\n")
+    watcher = uda.PollingWatcher(str(tmp_path), interval=0.05)
+    assert watcher.changes(0.01) == []
+    new = tmp_path / "sub" / "new.csv"
+    write(new, "x\n1\n")
+    write(old, "x\n1\n2\n")
+    changed = watcher.changes(1.0)
+    assert sorted(changed) == sorted([str(old), str(new)])
+    assert watcher.changes(1.0) == []
+
+
+@pytest.fixture
+def inotify(tmp_path):
+    if not sys.platform.startswith("linux"):
+        pytest.skip("inotify есть только в Linux")
+    try:
+        watcher = uda.InotifyWatcher(str(tmp_path))
+    except OSError as e:
+        pytest.skip(f"inotify недоступен: {e}")
+    yield watcher
+    watcher.close()
+
+
+def collect(watcher, expected, timeout=3.0):
+    paths = set()
+    deadline = time.monotonic() + timeout
+    while not expected <= paths and time.monotonic() < deadline:
+        paths.update(watcher.changes(0.1))
+    return paths
+
+
+def test_inotify_reports_written_and_moved_files(inotify, tmp_path):
+    written = tmp_path / "written.csv"
+    write(written, "x\n1\n")
+    staged = tmp_path.parent / f"{tmp_path.name}_staged.csv"
+    write(staged, "x\n1\n")
+    moved = tmp_path / "moved.csv"
+    os.replace(staged, moved)
+    assert {str(written), str(moved)} <= collect(inotify, {str(written), str(moved)})
+
+
+def test_inotify_follows_new_directories(inotify, tmp_path):
+    nested = tmp_path / "day" / "part.csv"
+    write(nested, "x\n1\n")
+    assert str(nested) in collect(inotify, {str(nested)})
+    later = tmp_path / "day" / "later.csv"
+    write(later, "x\n2\n")
+    assert str(later) in collect(inotify, {str(later)})
+
+
+class ScriptedWatcher(uda.PollingWatcher):
+    """Опрос с действиями теста между проверками; после последнего действия - SIGTERM"""
+    def __init__(self, root, steps):
+        super().__init__(root, interval=0.05)
+        self.steps = steps
+
+    def changes(self, timeout):
+        if self.steps and self.steps[0]():
+            self.steps.pop(0)
+            if not self.steps:
+                signal.raise_signal(signal.SIGTERM)
+        return super().changes(min(timeout, 0.05))
+
+
+def test_run_watch_analyzes_new_and_changed_files_once(tmp_path, make_config, monkeypatch):
+    input_dir = tmp_path / "input"
+    input_dir.mkdir()
+    config = make_config(input_dir=str(input_dir), watch=True, watch_debounce=0.1, watch_polling=True)
+    analyzer = uda.DataAnalyzer(config)
+    client = uda.LLMClient("test-model", analyzer.logger, retries=0)
+    prompts = []
+    client._call_ollama = lambda prompt, model=None, deadline=None, queue_info=None: prompts.append(prompt) or "ок"
+    data = input_dir / "data.csv"
+    started = time.monotonic()
+
+    def create():
+        write(data, "id,value\n1,10\n2,20\n")
+        return True
+
+    def change():
+        if len(prompts) < 1:
+            return False
+        write(data, "id,value\n1,10\n2,20\n3,30\n")
+        return True
+
+    def settle():
+        # Повторное событие без изменения файла не анализируется повторно
+        return len(prompts) >= 2 and time.monotonic() - started > 0.5
+
+    steps = [create, change, settle]
+    monkeypatch.setattr(uda, "create_watcher", lambda config, logger: ScriptedWatcher(str(input_dir), steps))
+    uda.run_watch(analyzer, client, None, config)
+    assert steps == []
+    assert len(prompts) == 2
+    assert "3 строк" in prompts[-1]
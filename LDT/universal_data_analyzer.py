@@ -8,6 +8,8 @@
 Версия с улучшенным автоопределением разделителя для CSV.
 """
 
+from __future__ import annotations
+
 import os
 import json
 import sys
@@ -15,14 +17,44 @@ import argparse
 import logging
 import textwrap
 import time
+import io
+import gzip
+import bz2
+import queue
+import threading
+import math
+import heapq
+import itertools
+import contextvars
+import hashlib
+import re
+import shutil
+import tempfile
+import importlib
+import importlib.util
+import errno
+import select
+import signal
+import struct
+import subprocess
+import csv
+from statistics import NormalDist
+from concurrent.futures import ThreadPoolExecutor, ALL_COMPLETED, FIRST_COMPLETED, wait
+from contextlib import contextmanager
 from pathlib import Path
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 from typing import Any, Dict, List, Tuple, Optional, Union
 from datetime import datetime
 import warnings
+try:
+    import resource  # Нет в Windows: пиковая память тогда не замеряется
+except ImportError:
+    resource = None
 warnings.filterwarnings('ignore')
 
-# Внешние зависимости
+# Внешние зависимости. Тяжелые пакеты (pandas, lxml, ollama, pyarrow) импортируются
+# при первом обращении: --help, обнаружение файлов и повторный анализ из индекса
+# не платят за их загрузку
 REQUIRED_PACKAGES = {
     'pandas': 'pip install pandas',
     'lxml': 'pip install lxml', 
@@ -32,16 +64,14 @@ REQUIRED_PACKAGES = {
 OPTIONAL_PACKAGES = {
     'openpyxl': 'pip install openpyxl',
     'pyarrow': 'pip install pyarrow',
-    'rich': 'pip install rich'
+    'rich': 'pip install rich',
+    'zstandard': 'pip install zstandard'
 }
 
-def check_and_import_required():
-    missing = []
-    for package, install_cmd in REQUIRED_PACKAGES.items():
-        try:
-            globals()[package] = __import__(package)
-        except ImportError:
-            missing.append(f"{package}: {install_cmd}")
+def check_required_packages():
+    """Наличие обязательных пакетов без их импорта"""
+    missing = [f"{package}: {install_cmd}" for package, install_cmd in REQUIRED_PACKAGES.items()
+               if importlib.util.find_spec(package) is None]
     
     if missing:
         print("Отсутствуют обязательные пакеты:")
@@ -49,44 +79,61 @@ def check_and_import_required():
             print(f"  {pkg}")
         sys.exit(1)
 
-def check_and_import_optional():
-    available = {}
-    for package in OPTIONAL_PACKAGES.keys():
-        try:
-            available[package] = __import__(package)
-        except ImportError:
-            available[package] = None
-    return available
-
-check_and_import_required()
-optional_packages = check_and_import_optional()
+class LazyModule:
+    """Модуль, который импортируется при первом обращении к атрибуту"""
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+    
+    def __getattr__(self, attr: str):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+    
+    def __repr__(self):
+        state = "загружен" if self._module is not None else "не загружен"
+        return f"<LazyModule {self._name}: {state}>"
 
-import pandas as pd
-import subprocess
-import csv
-from lxml import etree
+class OptionalPackages:
+    """Опциональные пакеты: импорт при первой проверке, None если пакет не установлен"""
+    def __init__(self):
+        self._modules: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, package: str, default: Any = None) -> Any:
+        with self._lock:
+            if package not in self._modules:
+                try:
+                    self._modules[package] = importlib.import_module(package)
+                except ImportError:
+                    self._modules[package] = None
+        module = self._modules[package]
+        return module if module is not None else default
+    
+    def __getitem__(self, package: str) -> Any:
+        return self.get(package)
 
-# Опциональные импорты
-try:
-    import ollama
-    OLLAMA_CLIENT_OK = True
-except ImportError:
-    OLLAMA_CLIENT_OK = False
+optional_packages = OptionalPackages()
 
-try:
-    from rich.console import Console
-    from rich.progress import Progress, SpinnerColumn, TextColumn
-    from rich.table import Table
-    from rich.panel import Panel
-    RICH_OK = True
-except ImportError:
-    RICH_OK = False
+pd = LazyModule("pandas")
+np = LazyModule("numpy")
+etree = LazyModule("lxml.etree")
+ollama = LazyModule("ollama")
 
 # Константы
 DEFAULT_INPUT_DIR = "input"
 DEFAULT_OUTPUT_DIR = "output"
 SUPPORTED_EXTS = {".csv", ".tsv", ".json", ".xml", ".xlsx", ".xls", ".parquet"}
+# Сжатие определяется по сигнатуре файла, расширение нужно только для поиска файлов
+COMPRESSION_EXTS = {".gz": "gzip", ".bz2": "bz2", ".zst": "zstd"}
+COMPRESSION_MAGIC = {b"\x1f\x8b": "gzip", b"BZh": "bz2", b"\x28\xb5\x2f\xfd": "zstd"}
 DEFAULT_MODEL = "qwen3:30b"
+ROBUST_Z_THRESHOLD = 3.5
+TOP_OUTLIERS = 5
+TOP_VALUES = 10
+DUPLICATE_METHODS = ["auto", "exact", "bloom", "off"]
+DEFAULT_PROMPT_CHARS = 12000
+CHARS_PER_TOKEN = 3  # Оценка для смеси кириллицы, латиницы и чисел в токенизаторах Qwen/Llama
 
 class DateTimeJSONEncoder(json.JSONEncoder):
     """Кастомный JSON encoder для datetime объектов"""
@@ -108,16 +155,20 @@ class FileInfo:
     format: str
     size_bytes: int
     modified: datetime
+    compression: Optional[str] = None  # gzip, bz2, zstd
     
     def to_dict(self):
         """Конвертация в словарь с сериализуемыми типами"""
-        return {
+        result = {
             "path": self.path,
             "format": self.format,
             "size_bytes": self.size_bytes,
             "modified": self.modified.isoformat(),
             "size_mb": round(self.size_bytes / 1024 / 1024, 2)
         }
+        if self.compression:
+            result["compression"] = self.compression
+        return result
         
 @dataclass  
 class AnalysisConfig:
@@ -126,12 +177,69 @@ class AnalysisConfig:
     output_dir: Optional[str]
     model_name: str
     sample_rows: int
-    max_chars: int
+    max_chars: int  # Лимит промпта в символах (переводится в токены, если не задан prompt_tokens)
     expected_cols: Optional[int]
     file_pattern: Optional[str]
     save_results: bool
     verbose: bool
     force_separator: Optional[str] = None  # Принудительный разделитель
+    # Выборочный режим: случайные блоки файла с доверительными интервалами
+    sampled: bool = False
+    sample_tolerance: float = 0.02  # Допустимая полуширина интервала (относительная)
+    sample_confidence: float = 0.95
+    sample_block_mb: float = 4.0
+    sample_max_blocks: int = 500
+    sample_seed: int = 42
+    # Потоковый режим: полный проход по чанкам с ограниченной памятью
+    chunk_size: Optional[int] = None
+    # Дубликаты: exact (отпечатки со сбросом на диск), bloom (приближенно), off;
+    # auto - exact, а в выборочном режиме off (точный подсчет требует хешировать каждую строку)
+    duplicates: str = "auto"
+    duplicates_memory_mb: float = 256
+    key_columns: Optional[List[str]] = None
+    histogram_bins: int = 20  # 0 - без гистограмм
+    infer_types: bool = True  # Приведение строковых столбцов к числам, датам и булевым
+    discover_keys: bool = True  # Потенциальные ключи и функциональные зависимости
+    pii_scan: bool = True  # Поиск персональных данных (телефоны, email, ИНН, СНИЛС, карты, даты рождения)
+    mask_pii: bool = False  # Маскировать найденные ПДн в примерах перед отправкой в LLM
+    # Пакетный режим: все найденные файлы и поиск ключей соединения между ними
+    all_files: bool = False
+    minhash: bool = False  # MinHash-сигнатуры столбцов (включается пакетным режимом)
+    correlations: bool = True  # Пирсон для числовых столбцов и V Крамера для категориальных
+    workers: Optional[int] = None  # Потоки для статистики по столбцам (по умолчанию - число ядер)
+    arrow: bool = False  # Профилирование на таблицах Arrow без преобразования в pandas (CSV/TSV/Parquet)
+    prompt_tokens: Optional[int] = None  # Бюджет промпта в токенах
+    # Широкие таблицы: анализ групп столбцов параллельными запросами и общий отчет (0 - один запрос)
+    llm_group_columns: int = 60
+    # Очередь запросов к Ollama: одновременных запросов, таймаут одного запроса (None - без ограничения),
+    # повторы при ошибке с паузой llm_backoff, 2*llm_backoff, ...
+    llm_concurrency: int = 2
+    llm_timeout: Optional[float] = None
+    llm_retries: int = 2
+    llm_backoff: float = 2.0
+    # Генерация: рассуждения (<think>), лимит ответа, контекст (None - по бюджету промпта), температура
+    llm_think: bool = False
+    llm_num_predict: Optional[int] = 4096
+    llm_num_ctx: Optional[int] = None
+    llm_temperature: Optional[float] = None
+    llm_keep_alive: Optional[str] = None
+    # Каскад моделей: быстрая модель по умолчанию, эскалация на model_name (never, auto, always)
+    llm_fast_model: Optional[str] = None
+    llm_escalate: str = "auto"
+    llm_deadline: Optional[float] = None  # Секунды на ответ большой модели, затем - ответ быстрой
+    # Повторное использование ответа LLM для файлов с той же схемой и близкой статистикой
+    reuse_analyses: bool = True
+    reuse_threshold: float = 0.95
+    # Наблюдение за input_dir: анализ новых и измененных файлов, когда их размер не меняется
+    # watch_debounce секунд; опрос раз в watch_poll секунд, если inotify недоступен или выключен
+    watch: bool = False
+    watch_debounce: float = 2.0
+    watch_poll: float = 5.0
+    watch_polling: bool = False
+    
+    def prompt_budget(self) -> int:
+        """Бюджет промпта в токенах"""
+        return self.prompt_tokens or math.ceil(self.max_chars / CHARS_PER_TOKEN)
 
 @dataclass
 class ColumnInfo:
@@ -143,10 +251,12 @@ class ColumnInfo:
     null_percentage: float
     unique_count: int
     example_values: List[Any]
+    top_values: Optional[List[Dict[str, Any]]] = None  # Частые значения (Space-Saving)
+    unique_count_approx: bool = False  # unique_count - оценка скетча, а не точный подсчет
     
     def to_dict(self):
         """Конвертация в словарь"""
-        return {
+        result = {
             "name": self.name,
             "dtype": self.dtype,
             "non_null_count": self.non_null_count,
@@ -155,7 +265,31 @@ class ColumnInfo:
             "unique_count": self.unique_count,
             "example_values": [str(v) for v in self.example_values]  # Приводим к строкам
         }
+        if self.unique_count_approx:
+            result["unique_count_approx"] = True
+        if self.top_values is not None:
+            result["top_values"] = self.top_values
+        return result
         
+@dataclass
+class ColumnTypeSpec:
+    """Результат определения типа строкового столбца"""
+    kind: str
+    target: str
+    match_rate: float
+    format: Optional[str] = None
+    utc: bool = False
+    failed: int = 0
+    
+    def to_dict(self):
+        """Конвертация в словарь"""
+        result = {"kind": self.kind, "target": self.target, "match_rate": round(self.match_rate, 4)}
+        if self.format:
+            result["format"] = self.format
+        if self.failed:
+            result["failed_values"] = self.failed
+        return result
+
 @dataclass
 class DataOverview:
     """Обзор данных"""
@@ -188,7 +322,8 @@ class Logger:
     """Простой логгер с поддержкой rich"""
     def __init__(self, verbose: bool = False):
         self.verbose = verbose
-        self.console = Console() if RICH_OK else None
+        rich_console = optional_packages.get('rich.console')
+        self.console = rich_console.Console() if rich_console else None
         
         # Настройка стандартного логгера
         logging.basicConfig(
@@ -234,6 +369,203 @@ class Logger:
                 print(f"Debug: {message}")
         self.logger.debug(message)
 
+def detect_compression(path: str) -> Optional[str]:
+    """Сжатие по сигнатуре (magic bytes) в начале файла"""
+    with open(path, "rb") as f:
+        head = f.read(4)
+    for magic, compression in COMPRESSION_MAGIC.items():
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+@dataclass
+class ThroughputMeter:
+    """Счетчики распаковки по всем проходам чтения файла"""
+    compressed_bytes: int = 0
+    uncompressed_bytes: int = 0
+    seconds: float = 0.0
+    passes: int = 0
+    
+    def report(self, compression: str) -> Dict[str, Any]:
+        mb = 1024 * 1024
+        seconds = max(self.seconds, 1e-9)
+        return {
+            "compression": compression,
+            "passes": self.passes,
+            "compressed_mb": round(self.compressed_bytes / mb, 2),
+            "uncompressed_mb": round(self.uncompressed_bytes / mb, 2),
+            "ratio": round(self.uncompressed_bytes / self.compressed_bytes, 2) if self.compressed_bytes else None,
+            "decompress_seconds": round(self.seconds, 3),
+            "compressed_mb_per_s": round(self.compressed_bytes / mb / seconds, 1),
+            "uncompressed_mb_per_s": round(self.uncompressed_bytes / mb / seconds, 1)
+        }
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Пиковая резидентная память процесса с запуска, MB (None - не поддерживается ОС)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux отдает КБ, macOS - байты
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+class StageTimer:
+    """Замеры этапов в раздел timings: время, CPU, строк/с и пиковая память.
+    
+    Пик памяти - максимум процесса с запуска; peak_rss_growth_mb показывает, какой этап его поднял.
+    CPU - по всему процессу, включая потоки статистики (и параллельные запросы пакетного режима).
+    """
+    
+    def __init__(self, timings: Optional[Dict[str, Any]] = None):
+        # Словарь кладется в результат анализа как есть и дополняется этапами LLM и сохранения
+        self.timings = timings if timings is not None else {"stages": [], "peak_rss_mb": None}
+    
+    @contextmanager
+    def span(self, name: str, accumulate: bool = False, **fields):
+        """Замер блока; в отдаваемый словарь этапа можно дописать rows и другие поля.
+        
+        accumulate=True суммирует повторные замеры с тем же именем (чанки, порции) в один этап.
+        """
+        stage = {"stage": name, **{k: v for k, v in fields.items() if v is not None}}
+        peak_before = peak_rss_mb()
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield stage
+        except Exception as e:
+            stage["error"] = str(e)[:100]
+            raise
+        finally:
+            stage["wall_seconds"] = round(time.perf_counter() - wall, 4)
+            stage["cpu_seconds"] = round(time.process_time() - cpu, 4)
+            peak = peak_rss_mb()
+            if peak is not None:
+                stage["peak_rss_mb"] = peak
+                stage["peak_rss_growth_mb"] = round(peak - peak_before, 1)
+                self.timings["peak_rss_mb"] = max(self.timings.get("peak_rss_mb") or 0, peak)
+            self._record(stage, accumulate)
+    
+    def _record(self, stage: Dict[str, Any], accumulate: bool):
+        stages = self.timings["stages"]
+        previous = next((s for s in stages if s["stage"] == stage["stage"]), None) if accumulate else None
+        if previous is None:
+            if accumulate:
+                stage["calls"] = 1
+            stages.append(stage)
+            previous = stage
+        else:
+            previous["calls"] += 1
+            for key in ("wall_seconds", "cpu_seconds", "rows", "peak_rss_growth_mb"):
+                if key in stage:
+                    previous[key] = round(previous.get(key, 0) + stage[key], 4)
+            if "peak_rss_mb" in stage:
+                previous["peak_rss_mb"] = stage["peak_rss_mb"]  # Пик процесса только растет
+        if previous.get("rows") and previous["wall_seconds"] > 0:
+            previous["rows_per_s"] = round(previous["rows"] / previous["wall_seconds"])
+
+
+class DecompressingReader(io.RawIOBase):
+    """Потоковая распаковка gzip/bz2/zstd в фоновом потоке с упреждающим чтением.
+    
+    Кодеки отпускают GIL, поэтому распаковка идет параллельно с разбором
+    данных в основном потоке.
+    """
+    
+    BLOCK_BYTES = 1024 * 1024
+    READAHEAD_BLOCKS = 8
+    
+    def __init__(self, path: str, compression: str, meter: Optional[ThroughputMeter] = None):
+        super().__init__()
+        self.raw = open(path, "rb")
+        self.stream = self._decompressor(compression)
+        self.meter = meter if meter is not None else ThroughputMeter()
+        self.meter.passes += 1
+        self.blocks: "queue.Queue[bytes]" = queue.Queue(self.READAHEAD_BLOCKS)
+        self.stopped = threading.Event()
+        self.error: Optional[BaseException] = None
+        self.pending = memoryview(b"")
+        self.finished = False
+        self.thread = threading.Thread(target=self._produce, daemon=True)
+        self.thread.start()
+    
+    def _decompressor(self, compression: str):
+        if compression == "gzip":
+            return gzip.GzipFile(fileobj=self.raw)
+        if compression == "bz2":
+            return bz2.BZ2File(self.raw)
+        zstandard = optional_packages.get('zstandard')
+        if zstandard:
+            return zstandard.ZstdDecompressor().stream_reader(self.raw, read_across_frames=True)
+        if optional_packages.get('pyarrow'):
+            import pyarrow as pa
+            return pa.CompressedInputStream(pa.PythonFile(self.raw, mode="r"), "zstd")
+        raise RuntimeError("Для файлов zstd нужен zstandard или pyarrow: pip install zstandard")
+    
+    def _produce(self):
+        position = 0
+        try:
+            while not self.stopped.is_set():
+                start = time.perf_counter()
+                block = self.stream.read(self.BLOCK_BYTES)
+                self.meter.seconds += time.perf_counter() - start
+                self.meter.uncompressed_bytes += len(block)
+                self.meter.compressed_bytes += self.raw.tell() - position
+                position = self.raw.tell()
+                self._put(bytes(block))
+                if not block:
+                    return
+        except Exception as e:
+            self.error = e
+            self._put(b"")
+    
+    def _put(self, block: bytes):
+        while not self.stopped.is_set():
+            try:
+                self.blocks.put(block, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+    
+    def readable(self) -> bool:
+        return True
+    
+    def readinto(self, buffer) -> int:
+        if not self.pending and not self.finished:
+            block = self.blocks.get()
+            if self.error:
+                raise self.error
+            self.finished = not block
+            self.pending = memoryview(block)
+        n = min(len(buffer), len(self.pending))
+        buffer[:n] = self.pending[:n]
+        self.pending = self.pending[n:]
+        return n
+    
+    def close(self):
+        if not self.closed:
+            self.stopped.set()
+            self.thread.join()
+            self.stream.close()
+            self.raw.close()
+        super().close()
+
+
+def open_input(path: str, compression: Optional[str] = None, meter: Optional[ThroughputMeter] = None):
+    """Бинарный поток файла; сжатые файлы распаковываются на лету"""
+    if not compression:
+        return open(path, "rb")
+    return io.BufferedReader(DecompressingReader(path, compression, meter), buffer_size=DecompressingReader.BLOCK_BYTES)
+
+
+def open_text(path: str, compression: Optional[str] = None, encoding: str = "utf-8", errors: str = "strict",
+              meter: Optional[ThroughputMeter] = None):
+    """Текстовый поток файла с распаковкой на лету"""
+    if not compression:
+        return open(path, "r", encoding=encoding, errors=errors)
+    return io.TextIOWrapper(open_input(path, compression, meter), encoding=encoding, errors=errors)
+
+
 class FileHandler:
     """Обработчик файлов"""
     
@@ -245,25 +577,38 @@ class FileHandler:
         if not os.path.isdir(input_dir):
             raise FileNotFoundError(f"Директория {input_dir} не найдена")
         
-        files = []
-        for path in Path(input_dir).rglob("*"):
-            if path.is_file() and path.suffix.lower() in SUPPORTED_EXTS:
-                if pattern and pattern not in path.name:
-                    continue
-                
-                stat = path.stat()
-                files.append(FileInfo(
-                    path=str(path),
-                    format=self.detect_format(str(path)),
-                    size_bytes=stat.st_size,
-                    modified=datetime.fromtimestamp(stat.st_mtime)
-                ))
+        files = [self.file_info(str(path)) for path in Path(input_dir).rglob("*")
+                 if path.is_file() and self.matches(str(path), pattern)]
         
         return sorted(files, key=lambda f: f.modified, reverse=True)
     
+    def matches(self, path: str, pattern: Optional[str] = None) -> bool:
+        """Поддерживаемый формат и подстрока pattern в имени файла"""
+        if self._data_suffix(path) not in SUPPORTED_EXTS:
+            return False
+        return not pattern or pattern in os.path.basename(path)
+    
+    def file_info(self, path: str) -> FileInfo:
+        stat = os.stat(path)
+        return FileInfo(
+            path=path,
+            format=self.detect_format(path),
+            size_bytes=stat.st_size,
+            modified=datetime.fromtimestamp(stat.st_mtime),
+            compression=detect_compression(path)
+        )
+    
+    @staticmethod
+    def _data_suffix(path: str) -> str:
+        """Расширение данных без расширения сжатия (data.csv.gz -> .csv)"""
+        path = Path(path)
+        if path.suffix.lower() in COMPRESSION_EXTS:
+            path = path.with_suffix("")
+        return path.suffix.lower()
+    
     def detect_format(self, path: str) -> str:
         """Определить формат файла"""
-        ext = Path(path).suffix.lower()
+        ext = self._data_suffix(path)
         format_map = {
             ".csv": "csv",
             ".tsv": "tsv", 
@@ -280,8 +625,22 @@ class CSVReader:
     
     def __init__(self, logger: Logger):
         self.logger = logger
+        self.meter: Optional[ThroughputMeter] = None  # счетчики распаковки текущего файла
+        self.timer = StageTimer()  # замеры этапов текущего файла
+    
+    def read_csv(self, path: str, compression: Optional[str] = None, **kwargs) -> pd.DataFrame:
+        """pd.read_csv с распаковкой сжатого файла на лету; каждая попытка - отдельный этап read"""
+        with self.timer.span("read", sep=kwargs.get("sep"), encoding=kwargs.get("encoding")) as stage:
+            if not compression:
+                df = pd.read_csv(path, **kwargs)
+            else:
+                with open_input(path, compression, self.meter) as source:
+                    df = pd.read_csv(source, **kwargs)
+            stage["rows"] = len(df)
+        return df
     
-    def detect_separator(self, path: str, sample_lines: int = 10, encoding: str = 'utf-8') -> Tuple[str, Dict[str, Any]]:
+    def detect_separator(self, path: str, sample_lines: int = 10, encoding: str = 'utf-8',
+                         compression: Optional[str] = None) -> Tuple[str, Dict[str, Any]]:
         """Автоматическое определение разделителя CSV"""
         separators = [';', ',', '\t', '|']  # Приоритет точке с запятой
         separator_scores = {}
@@ -293,7 +652,7 @@ class CSVReader:
         
         for enc in encodings_to_try:
             try:
-                with open(path, 'r', encoding=enc, errors='replace') as f:
+                with open_text(path, compression, enc, 'replace', self.meter) as f:
                     sample_content = []
                     for i, line in enumerate(f):
                         if i >= sample_lines:
@@ -382,7 +741,7 @@ class CSVReader:
         }
         return names.get(sep, f"'{sep}'")
     
-    def diagnose_csv_structure(self, path: str, lines_to_check: int = 5):
+    def diagnose_csv_structure(self, path: str, lines_to_check: int = 5, compression: Optional[str] = None):
         """Диагностика структуры CSV файла"""
         self.logger.info("=== ДИАГНОСТИКА CSV ===")
         
@@ -393,7 +752,7 @@ class CSVReader:
         
         for encoding in encodings:
             try:
-                with open(path, 'r', encoding=encoding, errors='replace') as f:
+                with open_text(path, compression, encoding, 'replace', self.meter) as f:
                     lines = [f.readline().strip() for _ in range(lines_to_check)]
                 used_encoding = encoding
                 break
@@ -419,7 +778,8 @@ class CSVReader:
     
     def robust_read_csv(self, path: str, expected_cols: Optional[int] = None, 
                        prefer_seps: Optional[Tuple[str, ...]] = None,
-                       force_separator: Optional[str] = None) -> Tuple[pd.DataFrame, List[Tuple[Dict, str]], Dict[str, Any]]:
+                       force_separator: Optional[str] = None,
+                       compression: Optional[str] = None) -> Tuple[pd.DataFrame, List[Tuple[Dict, str]], Dict[str, Any]]:
         """Устойчивое чтение CSV с перебором конфигураций"""
         attempts = []
         separator_info = {}
@@ -431,7 +791,8 @@ class CSVReader:
             self.logger.info(f"Используется принудительный разделитель: '{self._get_separator_name(force_separator)}'")
         elif prefer_seps is None:
             # Автоопределение разделителя
-            detected_sep, separator_info = self.detect_separator(path)
+            with self.timer.span("sniff"):
+                detected_sep, separator_info = self.detect_separator(path, compression=compression)
             prefer_seps = (detected_sep, ";", ",", "\t", "|")
             self.logger.debug(f"Автоопределение дало разделитель: '{detected_sep}'")
         
@@ -457,7 +818,7 @@ class CSVReader:
         for i, cfg in enumerate(unique_configs[:25]):
             try:
                 self.logger.debug(f"Попытка {i+1}: {cfg}")
-                df = pd.read_csv(path, **cfg)
+                df = self.read_csv(path, compression, **cfg)
                 
                 attempt_info = (cfg, f"OK: {df.shape[0]} строк, {df.shape[1]} столбцов")
                 attempts.append(attempt_info)
@@ -526,132 +887,2469 @@ class CSVReader:
                 {"engine": "python", "sep": sep, "quotechar": '"', "escapechar": "\\", "on_bad_lines": "skip"},
                 {"engine": "python", "sep": sep, "encoding": "utf-8-sig"},
                 {"engine": "python", "sep": sep, "encoding": "cp1251"},
-                {"engine": "python", "sep": sep, "decimal": ",", "on_bad_lines": "skip"},
-                {"engine": "python", "sep": sep, "thousands": " ", "on_bad_lines": "skip"},
             ])
+            # Десятичная запятая и разделители разрядов обрабатываются TypeInferencer
         
         return configs
 
-class DataAnalyzer:
-    """Основной класс анализа данных"""
-    
-    def __init__(self, config: AnalysisConfig):
-        self.config = config
-        self.logger = Logger(config.verbose)
-        self.file_handler = FileHandler(self.logger)
-        self.csv_reader = CSVReader(self.logger)
-    
-    def analyze_file(self, file_info: FileInfo) -> Dict[str, Any]:
-        """Анализ одного файла"""
-        self.logger.info(f"Анализ файла: {file_info.path} ({file_info.format})")
-        
-        try:
-            if file_info.format in ["csv", "tsv"]:
-                return self._analyze_csv(file_info)
-            elif file_info.format == "json":
-                return self._analyze_json(file_info)
-            elif file_info.format == "xml":
-                return self._analyze_xml(file_info)
-            elif file_info.format == "excel":
-                return self._analyze_excel(file_info)
-            elif file_info.format == "parquet":
-                return self._analyze_parquet(file_info)
-            else:
-                raise ValueError(f"Неподдерживаемый формат: {file_info.format}")
-                
-        except Exception as e:
-            self.logger.error(f"Ошибка анализа файла {file_info.path}: {e}")
-            raise
-    
-    def _analyze_csv(self, file_info: FileInfo) -> Dict[str, Any]:
-        """Анализ CSV файла"""
-        
-        # Добавляем диагностику в verbose режиме
-        if self.config.verbose:
-            self.csv_reader.diagnose_csv_structure(file_info.path)
-        
-        df = None
-        attempts = []
-        separator_info = {}
-        
-        # Сначала пробуем стандартный способ (быстро)
+class TypeInferencer:
+    """Векторное определение типов строковых столбцов по выборке.
+
+    Числа (в т.ч. с десятичной запятой и разделителями разрядов), булевы
+    значения и даты распознаются по выборке; затем столбец приводится
+    целиком одной векторной операцией с закешированным форматом.
+    """
+
+    SAMPLE_SIZE = 2000
+    MIN_MATCH = 0.98
+    MAX_CONVERSION_LOSS = 0.01
+    # (вид, шаблон, удаляемые символы разрядов, десятичный разделитель)
+    NUMERIC_KINDS = [
+        ("integer", r"[+-]?\d+", "", "."),
+        ("float", r"[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?", "", "."),
+        ("decimal_comma", r"[+-]?\d+(?:,\d+)?", "", ","),
+        ("thousands_space", "[+-]?\\d{1,3}(?:[ \u00a0\u202f]\\d{3})*(?:[,.]\\d+)?", " \u00a0\u202f", ","),
+        ("thousands_dot", r"[+-]?\d{1,3}(?:\.\d{3})*(?:,\d+)?", ".", ","),
+        ("thousands_comma", r"[+-]?\d{1,3}(?:,\d{3})*(?:\.\d+)?", ",", "."),
+    ]
+    BOOL_VALUES = {
+        "true": True, "false": False, "yes": True, "no": False, "t": True, "f": False,
+        "y": True, "n": False, "да": True, "нет": False, "истина": True, "ложь": False
+    }
+    DATE_PATTERN = r"\d{1,4}[-./]\d{1,2}[-./]\d{1,4}.*"
+    DATE_FORMATS = [
+        "ISO8601", "%d.%m.%Y", "%d.%m.%Y %H:%M:%S", "%d.%m.%Y %H:%M", "%d/%m/%Y", "%m/%d/%Y",
+        "%Y/%m/%d", "%d-%m-%Y", "%d.%m.%y"
+    ]
+
+    def __init__(self, logger: Logger):
+        self.logger = logger
+        self.specs: Dict[str, ColumnTypeSpec] = {}
+
+    def fit_transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Определить типы по выборке и привести столбцы с проверкой потерь"""
+        df, self.specs = self.convert(df, self.infer(df))
+        return df
+
+    def transform(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """Привести очередной чанк по уже найденным форматам"""
+        return self.convert(chunk, self.specs, verify=False)[0] if self.specs else chunk
+
+    def fit_transform_arrow(self, table):
+        """То же для таблицы Arrow: типы по случайной выборке строк, приведение ядрами pyarrow.compute"""
+        import pyarrow as pa
+        self.specs = {}
+        strings = [name for name, column in zip(table.column_names, table.columns)
+                   if pa.types.is_string(column.type) or pa.types.is_large_string(column.type)]
+        if not strings or table.num_rows == 0:
+            return table
+        size = min(table.num_rows, self.SAMPLE_SIZE)
+        rows = np.sort(np.random.default_rng(0).choice(table.num_rows, size, replace=False))
+        specs = self.infer(table.select(strings).take(pa.array(rows)).to_pandas())
+        for name, spec in specs.items():
+            pos = table.column_names.index(name)
+            column = table.column(pos)
+            converted = self._convert_arrow(column, spec)
+            failed = converted.null_count - column.null_count
+            non_null = len(column) - column.null_count
+            if non_null and failed / non_null > self.MAX_CONVERSION_LOSS:
+                self.logger.debug(f"Столбец {name}: приведение к {spec.target} отменено ({failed} ошибок)")
+                continue
+            spec.failed += max(failed, 0)
+            table = table.set_column(pos, name, converted)
+            self.specs[name] = spec
+        if self.specs:
+            self.logger.debug(f"Приведены типы столбцов: {', '.join(f'{k}->{v.target}' for k, v in self.specs.items())}")
+        return table
+
+    def _convert_arrow(self, column, spec: ColumnTypeSpec):
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        values = pc.utf8_trim_whitespace(column)
         try:
-            df = pd.read_csv(file_info.path)
-            attempts = [({"method": "standard_pandas"}, f"OK: {df.shape[0]} строк, {df.shape[1]} столбцов")]
-            
-            # Проверяем результат - если только 1 столбец, скорее всего проблема с разделителем
-            if df.shape[1] == 1:
-                first_value = str(df.iloc[0, 0]) if len(df) > 0 else ""
-                if ';' in first_value or '\t' in first_value:
-                    self.logger.warning("Стандартное чтение дало 1 столбец, но в данных есть другие разделители. Пробуем устойчивое чтение.")
-                    df = None  # Сбросим результат для перехода к устойчивому чтению
-                
-        except Exception as e:
-            attempts = [({"method": "standard_pandas"}, f"FAILED: {str(e)[:100]}")]
-            self.logger.debug(f"Стандартное чтение не сработало: {e}")
-        
-        # Если стандартное чтение не сработало ИЛИ дало подозрительный результат
-        if df is None or df.shape[1] <= 1:
-            self.logger.info("Переходим к устойчивому чтению с автоопределением разделителя...")
-            
-            # Определяем предпочтительные разделители
-            prefer_seps = None
-            if file_info.format == "tsv":
-                prefer_seps = ("\t", ";", ",", "|")
-            
-            # Устойчивое чтение
-            df, robust_attempts, separator_info = self.csv_reader.robust_read_csv(
-                file_info.path, 
-                expected_cols=self.config.expected_cols,
-                prefer_seps=prefer_seps,
-                force_separator=self.config.force_separator
-            )
-            attempts.extend(robust_attempts)
-        
-        # Создаем обзор
-        overview = self._create_dataframe_overview(df, file_info)
-        overview.separator_info = separator_info
-        overview.read_attempts = attempts
-        
-        # Безопасное получение sample для больших датафреймов
-        sample_df = df.head(self.config.sample_rows)
-        sample = []
+            if spec.kind == "boolean":
+                lowered = pc.utf8_lower(values)
+                truthy = pa.array([k for k, v in self.BOOL_VALUES.items() if v])
+                falsy = pa.array([k for k, v in self.BOOL_VALUES.items() if not v])
+                return pc.if_else(pc.is_in(lowered, truthy), True,
+                                  pc.if_else(pc.is_in(lowered, falsy), False, pa.scalar(None, pa.bool_())))
+            if spec.kind == "datetime":
+                if spec.format == "ISO8601":
+                    return pc.cast(values, pa.timestamp("ns", tz="UTC" if spec.utc else None))
+                parsed = pc.strptime(values, format=spec.format, unit="ns", error_is_null=True)
+                return pc.assume_timezone(parsed, "UTC") if spec.utc else parsed
+            _, _, thousands, decimal = next(k for k in self.NUMERIC_KINDS if k[0] == spec.kind)
+            if thousands:
+                values = pc.replace_substring_regex(values, f"[{thousands}]", "")
+            if decimal == ",":
+                values = pc.replace_substring(values, ",", ".")
+            # Неразбираемые значения - пропуски, как errors="coerce" в pandas
+            valid = pc.match_substring_regex(values, r"^[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?$")
+            values = pc.if_else(valid, values, pa.scalar(None, values.type))
+            return pc.cast(values, pa.int64() if spec.target == "int64" else pa.float64())
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            # Значения, которые Arrow не разбирает (ISO с пояснениями, смесь поясов): столбец через pandas
+            converted = self._convert_column(column.to_pandas(), spec)
+            return pa.chunked_array([pa.array(converted, from_pandas=True)])
+
+    def report(self) -> Dict[str, Any]:
+        return {name: spec.to_dict() for name, spec in self.specs.items()}
+
+    def infer(self, df: pd.DataFrame) -> Dict[str, ColumnTypeSpec]:
+        """Определить типы строковых столбцов по выборке"""
+        specs = {}
+        for i, col in enumerate(df.columns):
+            series = df.iloc[:, i]
+            if not (pd.api.types.is_object_dtype(series.dtype) or pd.api.types.is_string_dtype(series.dtype)):
+                continue
+            values = series.dropna()
+            if len(values) > self.SAMPLE_SIZE:
+                values = values.sample(self.SAMPLE_SIZE, random_state=0)
+            values = values.astype(str).str.strip()
+            values = values[values != ""]
+            if len(values) == 0:
+                continue
+            spec = self._infer_column(values)
+            if spec:
+                specs[str(col)] = spec
+        return specs
+
+    def _infer_column(self, values: pd.Series) -> Optional[ColumnTypeSpec]:
+        for kind, pattern, _, _ in self.NUMERIC_KINDS:
+            rate = float(values.str.fullmatch(pattern).mean())
+            if rate >= self.MIN_MATCH:
+                # Ведущие нули - признак кода, а не числа
+                if kind == "integer" and values.str.match(r"[+-]?0\d").any():
+                    return None
+                return ColumnTypeSpec(kind, "int64" if kind == "integer" else "float64", rate)
         
-        for _, row in sample_df.iterrows():
-            row_dict = {}
-            for col, val in row.items():
-                # Конвертируем все значения в строки для безопасной сериализации
-                if pd.isna(val):
-                    row_dict[str(col)] = None
-                elif isinstance(val, (pd.Timestamp, datetime)):
-                    row_dict[str(col)] = val.isoformat() if hasattr(val, 'isoformat') else str(val)
-                else:
-                    row_dict[str(col)] = str(val)
-            sample.append(row_dict)
+        lowered = values.str.lower()
+        rate = float(lowered.isin(self.BOOL_VALUES.keys()).mean())
+        if rate >= self.MIN_MATCH:
+            return ColumnTypeSpec("boolean", "boolean", rate)
         
+        if values.str.fullmatch(self.DATE_PATTERN).mean() >= self.MIN_MATCH:
+            utc = bool(values.str.contains(r"(?:[+-]\d{2}:?\d{2}|Z)$").any())
+            best = None
+            for fmt in self.DATE_FORMATS:
+                parsed = pd.to_datetime(values, format=fmt, errors="coerce", utc=utc)
+                rate = float(parsed.notna().mean())
+                if rate >= self.MIN_MATCH and (best is None or rate > best.match_rate):
+                    best = ColumnTypeSpec("datetime", "datetime64", rate, format=fmt, utc=utc)
+            return best
+        return None
+
+    def convert(self, df: pd.DataFrame, specs: Dict[str, ColumnTypeSpec],
+                verify: bool = True) -> Tuple[pd.DataFrame, Dict[str, ColumnTypeSpec]]:
+        """Привести столбцы целиком; при verify столбцы с потерями больше порога не меняются"""
+        applied = {}
+        columns = [str(c) for c in df.columns]
+        for name, spec in specs.items():
+            if name not in columns:
+                continue
+            pos = columns.index(name)
+            series = df.iloc[:, pos]
+            if not (pd.api.types.is_object_dtype(series.dtype) or pd.api.types.is_string_dtype(series.dtype)):
+                applied[name] = spec
+                continue
+            converted = self._convert_column(series, spec)
+            failed = int(converted.isna().sum() - series.isna().sum())
+            non_null = int(series.notna().sum())
+            if verify and non_null and failed / non_null > self.MAX_CONVERSION_LOSS:
+                self.logger.debug(f"Столбец {name}: приведение к {spec.target} отменено ({failed} ошибок)")
+                continue
+            spec.failed += max(failed, 0)
+            df.isetitem(pos, converted)
+            applied[name] = spec
+        if applied and verify:
+            self.logger.debug(f"Приведены типы столбцов: {', '.join(f'{k}->{v.target}' for k, v in applied.items())}")
+        return df, applied
+
+    def _convert_column(self, series: pd.Series, spec: ColumnTypeSpec) -> pd.Series:
+        values = series.astype(str).str.strip()
+        values = values.where(series.notna() & (values != ""))
+        if spec.kind == "boolean":
+            return values.str.lower().map(self.BOOL_VALUES).astype("boolean")
+        if spec.kind == "datetime":
+            return pd.to_datetime(values, format=spec.format, errors="coerce", utc=spec.utc)
+        _, _, thousands, decimal = next(k for k in self.NUMERIC_KINDS if k[0] == spec.kind)
+        if thousands:
+            values = values.str.replace(f"[{thousands}]", "", regex=True)
+        if decimal == ",":
+            values = values.str.replace(",", ".", regex=False)
+        numeric = pd.to_numeric(values, errors="coerce")
+        if spec.target == "int64" and numeric.notna().all():
+            return numeric.astype("int64")
+        return numeric
+
+
+class QuantileSketch:
+    """Потоковый квантильный скетч (KLL-подобные компакторы), сливаемый между чанками"""
+
+    def __init__(self, k: int = 1024, seed: int = 0):
+        self.k = k
+        self.count = 0
+        self.levels: List[np.ndarray] = [np.empty(0, dtype="float64")]
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values: np.ndarray):
+        """Добавить массив значений без NaN"""
+        if len(values) == 0:
+            return
+        self.levels[0] = np.concatenate([self.levels[0], values.astype("float64", copy=False)])
+        self.count += len(values)
+        self._compress()
+
+    def merge(self, other: "QuantileSketch"):
+        """Слить другой скетч в текущий"""
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0, dtype="float64"))
+        for h, level in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], level])
+        self.count += other.count
+        self._compress()
+
+    def _compress(self):
+        # Каждый переполненный уровень сортируется и прореживается вдвое:
+        # оставшиеся элементы получают вдвое больший вес на следующем уровне
+        h = 0
+        while h < len(self.levels):
+            level = self.levels[h]
+            if len(level) > self.k:
+                level = np.sort(level)
+                keep_odd = len(level) % 2
+                rest, level = level[len(level) - keep_odd:], level[:len(level) - keep_odd]
+                promoted = level[int(self._rng.integers(2))::2]
+                self.levels[h] = rest
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0, dtype="float64"))
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+            h += 1
+
+    def _items(self) -> Tuple[np.ndarray, np.ndarray]:
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2.0 ** h) for h, level in enumerate(self.levels)])
+        return values, weights
+
+    def _weighted(self) -> Tuple[np.ndarray, np.ndarray]:
+        values, weights = self._items()
+        order = np.argsort(values, kind="stable")
+        return values[order], np.cumsum(weights[order])
+
+    def quantiles(self, qs: List[float]) -> List[float]:
+        """Приближенные квантили"""
+        if self.count == 0:
+            return [float("nan")] * len(qs)
+        values, cum_weights = self._weighted()
+        targets = np.asarray(qs, dtype="float64") * cum_weights[-1]
+        idx = np.minimum(np.searchsorted(cum_weights, targets, side="left"), len(values) - 1)
+        return [float(v) for v in values[idx]]
+
+    def rank(self, value: float, strict: bool = False) -> float:
+        """Приближенная доля значений не больше value (строго меньше при strict)"""
+        if self.count == 0:
+            return float("nan")
+        values, cum_weights = self._weighted()
+        pos = np.searchsorted(values, value, side="left" if strict else "right")
+        return float(cum_weights[pos - 1] / cum_weights[-1]) if pos else 0.0
+
+    def deviations(self, center: float) -> Tuple[float, float]:
+        """Приближенные медиана и среднее абсолютного отклонения от center"""
+        if self.count == 0:
+            return float("nan"), float("nan")
+        values, weights = self._items()
+        deviations = np.abs(values - center)
+        order = np.argsort(deviations, kind="stable")
+        cum_weights = np.cumsum(weights[order])
+        median_pos = min(int(np.searchsorted(cum_weights, cum_weights[-1] / 2)), len(order) - 1)
+        return float(deviations[order][median_pos]), float(np.average(deviations, weights=weights))
+
+
+class DistinctSketch:
+    """Оценка числа уникальных значений методом KMV по 64-битным хешам"""
+
+    def __init__(self, k: int = 1024):
+        self.k = k
+        self.hashes = np.empty(0, dtype="uint64")
+        self.seen = 0  # Всего значений: уникальных не может быть больше
+
+    def update(self, values: pd.Series):
+        if len(values):
+            self.seen += len(values)
+            self.update_hashes(pd.util.hash_pandas_object(values, index=False).to_numpy())
+
+    @property
+    def exact(self) -> bool:
+        """Уникальных меньше k: оценка совпадает с точным числом"""
+        return len(self.hashes) < self.k
+
+    def update_hashes(self, hashes: np.ndarray):
+        if len(self.hashes) >= self.k:
+            hashes = hashes[hashes < self.hashes[-1]]
+        # k наименьших различных хешей - среди m наименьших, если среди них уже k различных:
+        # частичная сортировка вместо полной
+        m = 4 * self.k
+        while m < len(hashes):
+            smallest = np.unique(np.partition(hashes, m)[:m])
+            if len(smallest) >= self.k:
+                hashes = smallest
+                break
+            m *= 4
+        self.hashes = np.union1d(self.hashes, hashes)[:self.k]
+
+    def merge(self, other: "DistinctSketch"):
+        self.seen += other.seen
+        self.update_hashes(other.hashes)
+
+    def estimate(self) -> int:
+        """Оценка кардинальности (точная, пока уникальных меньше k; не больше числа значений)"""
+        if len(self.hashes) < self.k:
+            return int(len(self.hashes))
+        kth = float(self.hashes[-1]) / 2.0 ** 64
+        return min(int(round((self.k - 1) / kth)), self.seen)
+
+
+def ratio_estimate(nums: List[float], dens: List[float], z: float,
+                   fpc: float = 1.0) -> Tuple[float, float]:
+    """Отношение сумм по блокам и полуширина интервала (кластерная выборка)"""
+    nums_arr = np.asarray(nums, dtype="float64")
+    dens_arr = np.asarray(dens, dtype="float64")
+    total = dens_arr.sum()
+    if total <= 0:
+        return float("nan"), float("inf")
+    ratio = float(nums_arr.sum() / total)
+    m = len(nums_arr)
+    if m < 2:
+        return ratio, float("inf")
+    mean_den = total / m
+    variance = ((nums_arr - ratio * dens_arr) ** 2).sum() / (m - 1) / m / mean_den ** 2
+    return ratio, float(z * math.sqrt(max(fpc, 0.0) * variance))
+
+
+def robust_fences(q1: float, median: float, q3: float, mad: float, mean_ad: float) -> Dict[str, Optional[float]]:
+    """Границы выбросов: IQR (Тьюки, 1.5) и робастный z-score (Иглевич-Хоаглин, 3.5)"""
+    iqr = q3 - q1
+    # При MAD = 0 масштаб оценивается по среднему абсолютному отклонению
+    scale = mad / 0.6745 if mad > 0 else mean_ad * 1.2533
+    fences = {
+        "q1": q1, "median": median, "q3": q3, "iqr": iqr,
+        "lower_fence": q1 - 1.5 * iqr, "upper_fence": q3 + 1.5 * iqr,
+        "mad": mad, "robust_scale": scale,
+        "robust_z_lower": None, "robust_z_upper": None
+    }
+    if scale > 0:
+        fences["robust_z_lower"] = median - ROBUST_Z_THRESHOLD * scale
+        fences["robust_z_upper"] = median + ROBUST_Z_THRESHOLD * scale
+    return fences
+
+
+def outlier_summary(fences: Dict[str, Optional[float]], count: float, iqr_rate: float,
+                    z_rate: Optional[float], candidates: np.ndarray, min_value: float, max_value: float,
+                    approximate: bool = False) -> Dict[str, Any]:
+    """Сводка выбросов столбца для раздела statistics.outliers"""
+    lower, upper = fences["lower_fence"], fences["upper_fence"]
+    outside = (candidates < lower) | (candidates > upper)
+    if fences["robust_z_lower"] is not None:
+        outside |= (candidates < fences["robust_z_lower"]) | (candidates > fences["robust_z_upper"])
+    top = candidates[outside]
+    top = top[np.argsort(-np.abs(top - fences["median"]), kind="stable")][:TOP_OUTLIERS]
+    summary = {key: (None if value is None else round(float(value), 6)) for key, value in fences.items()}
+    summary.update({
+        "iqr_outliers": int(round(iqr_rate * count)),
+        "iqr_outlier_percentage": round(iqr_rate * 100, 4),
+        "mad_outliers": None if z_rate is None else int(round(z_rate * count)),
+        "mad_outlier_percentage": None if z_rate is None else round(z_rate * 100, 4),
+        "max_abs_robust_z": None,
+        "top_outliers": [float(v) for v in top]
+    })
+    if fences["robust_scale"]:
+        worst = max(abs(max_value - fences["median"]), abs(min_value - fences["median"]))
+        summary["max_abs_robust_z"] = round(worst / fences["robust_scale"], 3)
+    if approximate:
+        summary["approximate"] = True
+    return summary
+
+
+def confidence_z(confidence: float) -> float:
+    """Квантиль нормального распределения для двустороннего интервала"""
+    return NormalDist().inv_cdf((1 + confidence) / 2)
+
+
+class StreamingHistogram:
+    """Адаптивная равноширинная гистограмма за один проход.
+
+    Число корзин фиксировано; если новые значения выходят за диапазон,
+    ширина корзин удваивается (соседние корзины попарно складываются).
+    """
+
+    def __init__(self, bins: int = 40):
+        self.bins = bins + bins % 2
+        self.low: Optional[float] = None
+        self.width = 0.0
+        self.counts = np.zeros(self.bins, dtype="int64")
+
+    def update(self, values: np.ndarray):
+        if len(values) == 0:
+            return
+        low, high = float(values.min()), float(values.max())
+        if self.low is None:
+            self.low = low
+            self.width = (high - low) / self.bins if high > low else max(abs(low) * 1e-9, 1e-9)
+            # Правая граница должна покрывать максимум
+            self.width *= 1 + 1e-9
+        self._cover(low, high)
+        idx = np.clip(((values - self.low) / self.width).astype("int64"), 0, self.bins - 1)
+        self.counts += np.bincount(idx, minlength=self.bins)
+
+    def _cover(self, low: float, high: float):
+        half = self.bins // 2
+        while low < self.low or high >= self.low + self.bins * self.width:
+            paired = self.counts.reshape(half, 2).sum(axis=1)
+            counts = np.zeros(self.bins, dtype="int64")
+            if low < self.low:
+                # Расширение вниз: старый диапазон становится верхней половиной
+                counts[half:] = paired
+                self.low -= self.bins * self.width
+            else:
+                counts[:half] = paired
+            self.counts = counts
+            self.width *= 2
+
+    def merge(self, other: "StreamingHistogram"):
+        """Слияние с перераспределением по центрам корзин (точность - одна корзина)"""
+        if other.low is None:
+            return
+        centers = other.low + (np.arange(other.bins) + 0.5) * other.width
+        occupied = other.counts > 0
+        if self.low is None:
+            self.low, self.width = other.low, other.width
+        self._cover(float(centers[occupied].min()), float(centers[occupied].max()))
+        idx = np.clip(((centers[occupied] - self.low) / self.width).astype("int64"), 0, self.bins - 1)
+        np.add.at(self.counts, idx, other.counts[occupied])
+
+    def result(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Границы и счетчики без пустых корзин по краям"""
+        nonzero = np.flatnonzero(self.counts)
+        if self.low is None or len(nonzero) == 0:
+            return np.empty(0), np.empty(0, dtype="int64")
+        first, last = nonzero[0], nonzero[-1] + 1
+        edges = self.low + np.arange(first, last + 1) * self.width
+        return edges, self.counts[first:last]
+
+
+def datetime_to_ns(values: pd.Series) -> np.ndarray:
+    """Даты как наносекунды UTC (float64) без пропусков"""
+    dt = pd.to_datetime(values, errors="coerce")
+    if getattr(dt.dt, "tz", None) is not None:
+        dt = dt.dt.tz_convert("UTC").dt.tz_localize(None)
+    return dt.dropna().astype("datetime64[ns]").astype("int64").to_numpy(dtype="float64")
+
+
+def histogram_summary(edges: np.ndarray, counts: np.ndarray, depth_edges: List[float],
+                      count_per_bin: float, temporal: bool, approximate: bool = False) -> Dict[str, Any]:
+    """Гистограммы столбца для раздела statistics.histograms"""
+    def fmt(values):
+        if temporal:
+            return [pd.Timestamp(int(v)).isoformat() for v in values]
+        return [round(float(v), 6) for v in values]
+
+    summary = {
+        "type": "datetime" if temporal else "numeric",
+        "equi_width": {"edges": fmt(edges), "counts": [int(c) for c in counts]},
+        "equi_depth": {"edges": fmt(depth_edges), "count_per_bin": round(count_per_bin, 2)}
+    }
+    if approximate:
+        summary["approximate"] = True
+    return summary
+
+
+class ColumnAccumulator:
+    """Потоковая статистика одного столбца, сливаемая между чанками"""
+
+    def __init__(self, name: str, numeric: bool, seed: int = 0, temporal: bool = False, histogram_bins: int = 0):
+        self.name = name
+        self.numeric = numeric
+        self.temporal = temporal
+        self.rows = 0
+        self.nulls = 0
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self.integral = numeric  # Все значения целые
+        self.quantiles = QuantileSketch(seed=seed) if numeric or temporal else None
+        self.histogram = StreamingHistogram(2 * histogram_bins) if histogram_bins and (numeric or temporal) else None
+        self.distinct = DistinctSketch()
+        self.top_values = TopKSketch()
+        self.examples: List[Any] = []
+        # Крайние значения для примеров выбросов
+        self.smallest = np.empty(0, dtype="float64")
+        self.largest = np.empty(0, dtype="float64")
+        # По блокам: (строк, пропусков, числовых значений, сумма)
+        self.blocks: List[Tuple[int, int, int, float]] = []
+
+    def update(self, series: pd.Series):
+        rows = len(series)
+        values = series.dropna()
+        nulls = rows - len(values)
+        n, block_sum = 0, 0.0
+        if self.numeric:
+            arr = pd.to_numeric(values, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+            arr = arr[np.isfinite(arr)]
+            n = len(arr)
+            if n:
+                block_sum = float(arr.sum())
+                block_mean = block_sum / n
+                self._merge_moments(n, block_mean, float(((arr - block_mean) ** 2).sum()))
+                self.min = float(arr.min()) if self.min is None else min(self.min, float(arr.min()))
+                self.max = float(arr.max()) if self.max is None else max(self.max, float(arr.max()))
+                self.integral = self.integral and bool(np.all(arr == np.floor(arr)))
+                self.quantiles.update(arr)
+                self._update_extremes(arr)
+                if self.histogram:
+                    self.histogram.update(arr)
+        elif self.temporal:
+            arr = datetime_to_ns(values)
+            n = len(arr)
+            if n:
+                self.n += n
+                self.min = float(arr.min()) if self.min is None else min(self.min, float(arr.min()))
+                self.max = float(arr.max()) if self.max is None else max(self.max, float(arr.max()))
+                self.quantiles.update(arr)
+                if self.histogram:
+                    self.histogram.update(arr)
+        self.distinct.update(values)
+        self.top_values.update(values)
+        if len(self.examples) < 5:
+            self.examples.extend(values.head(5 - len(self.examples)).tolist())
+        self.rows += rows
+        self.nulls += nulls
+        self.blocks.append((rows, nulls, n, block_sum))
+
+    def _update_extremes(self, arr: np.ndarray, k: int = 2 * TOP_OUTLIERS):
+        smallest = np.concatenate([self.smallest, arr])
+        largest = np.concatenate([self.largest, arr])
+        if len(smallest) > k:
+            smallest = np.partition(smallest, k - 1)[:k]
+            largest = np.partition(largest, len(largest) - k)[-k:]
+        self.smallest, self.largest = smallest, largest
+
+    def _merge_moments(self, n: int, mean: float, m2: float):
+        # Параллельное объединение моментов (Chan et al.)
+        total = self.n + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta ** 2 * self.n * n / total
+        self.n = total
+
+    def merge(self, other: "ColumnAccumulator"):
+        if other.n and self.numeric:
+            self._merge_moments(other.n, other.mean, other.m2)
+            self.integral = self.integral and other.integral
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        elif other.n:
+            self.n += other.n
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        if self.quantiles is not None and other.quantiles is not None:
+            self.quantiles.merge(other.quantiles)
+            self._update_extremes(np.concatenate([other.smallest, other.largest]))
+        if self.histogram is not None and other.histogram is not None:
+            self.histogram.merge(other.histogram)
+        self.distinct.merge(other.distinct)
+        self.top_values.merge(other.top_values)
+        self.examples = (self.examples + other.examples)[:5]
+        self.rows += other.rows
+        self.nulls += other.nulls
+        self.blocks.extend(other.blocks)
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else float("nan")
+
+    def outliers(self, scale: float = 1.0) -> Optional[Dict[str, Any]]:
+        """Выбросы по квантильному скетчу (доли приближенные, примеры - точные крайние значения)"""
+        if not self.numeric or not self.n:
+            return None
+        q1, median, q3 = self.quantiles.quantiles([0.25, 0.5, 0.75])
+        mad, mean_ad = self.quantiles.deviations(median)
+        fences = robust_fences(q1, median, q3, mad, mean_ad)
+        iqr_rate = self.quantiles.rank(fences["lower_fence"], strict=True) + 1 - self.quantiles.rank(fences["upper_fence"])
+        z_rate = None
+        if fences["robust_z_lower"] is not None:
+            z_rate = self.quantiles.rank(fences["robust_z_lower"], strict=True) + 1 - self.quantiles.rank(fences["robust_z_upper"])
+        extremes = np.unique(np.concatenate([self.smallest, self.largest]))
+        return outlier_summary(fences, self.n * scale, iqr_rate, z_rate, extremes, self.min, self.max, approximate=True)
+
+    def histograms(self, bins: int, scale: float = 1.0) -> Optional[Dict[str, Any]]:
+        """Равноширинная гистограмма из потокового прохода и равночастотная из квантильного скетча"""
+        if self.histogram is None or not self.n:
+            return None
+        edges, counts = self.histogram.result()
+        depth_edges = self.quantiles.quantiles(list(np.linspace(0, 1, bins + 1)))
+        depth_edges[0], depth_edges[-1] = self.min, self.max
+        return histogram_summary(edges, np.round(counts * scale), depth_edges, self.n * scale / bins,
+                                 self.temporal, approximate=True)
+
+    def describe(self) -> Dict[str, float]:
+        """Числовая сводка в формате pandas describe()"""
+        q25, q50, q75 = self.quantiles.quantiles([0.25, 0.5, 0.75])
         return {
-            "overview": overview.to_dict(),
-            "sample": sample,
-            "statistics": self._get_dataframe_statistics(df)
+            "count": float(self.n), "mean": self.mean, "std": self.std,
+            "min": self.min, "25%": q25, "50%": q50, "75%": q75, "max": self.max
         }
-    
-    def _analyze_json(self, file_info: FileInfo) -> Dict[str, Any]:
-        """Анализ JSON файла"""
-        with open(file_info.path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        
-        def summarize_structure(obj, depth=0, max_depth=3):
-            if depth > max_depth:
-                return "...depth limit..."
-            if isinstance(obj, dict):
-                return {k: summarize_structure(v, depth+1, max_depth) 
-                       for k, v in list(obj.items())[:20]}
-            elif isinstance(obj, list):
-                return [summarize_structure(v, depth+1, max_depth) 
-                       for v in obj[:10]]
-            return type(obj).__name__
-        
-        # Попытка табличного представления
+
+
+def cramers_v(table: np.ndarray) -> Optional[float]:
+    """V Крамера с поправкой на смещение (Bergsma) по таблице сопряженности"""
+    table = table[table.sum(axis=1) > 0][:, table.sum(axis=0) > 0]
+    n = table.sum()
+    r, k = table.shape
+    if n < 2 or r < 2 or k < 2:
+        return None
+    expected = np.outer(table.sum(axis=1), table.sum(axis=0)) / n
+    phi2 = float(((table - expected) ** 2 / expected).sum() / n)
+    phi2 = max(0.0, phi2 - (k - 1) * (r - 1) / (n - 1))
+    r_corr, k_corr = r - (r - 1) ** 2 / (n - 1), k - (k - 1) ** 2 / (n - 1)
+    denominator = min(k_corr - 1, r_corr - 1)
+    return math.sqrt(phi2 / denominator) if denominator > 0 else None
+
+
+class CorrelationAccumulator:
+    """Корреляции Пирсона по потоковым совместным моментам и V Крамера для категориальных столбцов.
+
+    Для каждой пары числовых столбцов по строкам, где оба заполнены, хранятся
+    число строк, средние, суммы квадратов отклонений и совместный момент;
+    чанки и файлы сливаются формулой Чана. Для категориальных столбцов с
+    небольшим числом значений копятся таблицы сопряженности.
+    """
+
+    MAX_NUMERIC = 100
+    MAX_CATEGORICAL = 30
+    MAX_LEVELS = 50  # Столбец с большим числом значений перестает считаться категориальным
+    MATRIX_MAX_COLUMNS = 20  # Для более широких таблиц в отчете только сильнейшие пары
+    TOP_PAIRS = 15
+    MIN_PAIR_ROWS = 30
+
+    def __init__(self, schema: pd.DataFrame):
+        numeric, categorical = [], []
+        for i, col in enumerate(schema.columns):
+            series = schema.iloc[:, i]
+            dtype = series.dtype
+            if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype):
+                numeric.append(str(col))
+            elif not pd.api.types.is_datetime64_any_dtype(dtype) and 1 < series.nunique() <= self.MAX_LEVELS:
+                categorical.append(str(col))
+        self.numeric: List[str] = []
+        self.n = self.mean = self.m2 = self.comoment = np.zeros((0, 0))
+        self._expand(numeric[:self.MAX_NUMERIC])
+        self.levels: Dict[str, Dict[Any, int]] = {name: {} for name in categorical[:self.MAX_CATEGORICAL]}
+        self.tables: Dict[Tuple[str, str], np.ndarray] = {}
+
+    def _expand(self, columns: List[str]):
+        """Добавить числовые столбцы с пустыми моментами"""
+        new = [c for c in columns if c not in self.numeric]
+        if not new:
+            return
+        size = len(self.numeric) + len(new)
+
+        def grow(matrix):
+            grown = np.zeros((size, size))
+            grown[:matrix.shape[0], :matrix.shape[1]] = matrix
+            return grown
+
+        self.n, self.mean, self.m2, self.comoment = map(grow, (self.n, self.mean, self.m2, self.comoment))
+        self.numeric += new
+
+    def _merge_moments(self, n, mean, m2, comoment):
+        """Слияние попарных моментов (формула Чана); mean[i, j] - среднее i-го столбца при заполненном j-м"""
+        total = self.n + n
+        weight = np.divide(self.n * n, total, out=np.zeros_like(total), where=total > 0)
+        delta = mean - self.mean
+        self.comoment = self.comoment + comoment + delta * delta.T * weight
+        self.m2 = self.m2 + m2 + delta ** 2 * weight
+        self.mean = self.mean + delta * np.divide(n, total, out=np.zeros_like(total), where=total > 0)
+        self.n = total
+
+    def update(self, chunk: pd.DataFrame):
+        if self.numeric:
+            self._update_numeric(chunk)
+        # Коды значений (-1 - пропуск) в общей для всех чанков нумерации
+        codes = {}
+        for name in list(self.levels):
+            series = chunk[name] if name in chunk else pd.Series([None] * len(chunk), dtype="object")
+            chunk_codes, uniques = pd.factorize(series)
+            levels = self.levels[name]
+            for value in uniques:
+                levels.setdefault(value, len(levels))
+            if len(levels) > self.MAX_LEVELS:
+                self._drop_categorical(name)
+                continue
+            codes[name] = np.array([levels[value] for value in uniques] + [-1], dtype="int64")[chunk_codes]
+        names = list(codes)
+        for a_pos, a in enumerate(names):
+            for b in names[a_pos + 1:]:
+                valid = (codes[a] >= 0) & (codes[b] >= 0)
+                counts = np.bincount(codes[a][valid] * self.MAX_LEVELS + codes[b][valid],
+                                     minlength=self.MAX_LEVELS * self.MAX_LEVELS)
+                table = self.tables.setdefault((a, b), np.zeros((self.MAX_LEVELS, self.MAX_LEVELS)))
+                table += counts.reshape(self.MAX_LEVELS, self.MAX_LEVELS)
+
+    def _update_numeric(self, chunk: pd.DataFrame):
+        """Векторно по чанку: моменты по парам через матричные произведения"""
+        def column(name):
+            if name not in chunk:
+                return np.full(len(chunk), np.nan)
+            series = chunk[name]
+            if not pd.api.types.is_numeric_dtype(series.dtype):
+                # Числовой столбец прочитан в этом чанке строками (мусор в значениях): нечисловое - пропуск
+                series = pd.to_numeric(series, errors="coerce")
+            return series.to_numpy(dtype="float64", na_value=np.nan)
+
+        values = np.column_stack([column(name) for name in self.numeric])
+        present = np.isfinite(values)
+        mask = present.astype("float64")
+        with np.errstate(invalid="ignore"):
+            shift = np.nanmean(np.where(present, values, np.nan), axis=0)
+        shift = np.nan_to_num(shift)
+        # Сдвиг на среднее чанка снижает потерю точности в суммах
+        centered = np.where(present, values - shift, 0.0)
+        n = mask.T @ mask
+        sums = centered.T @ mask
+        squares = (centered ** 2).T @ mask
+        products = centered.T @ centered
+        mean_centered = np.divide(sums, n, out=np.zeros_like(n), where=n > 0)
+        m2 = squares - sums * mean_centered
+        comoment = products - sums * mean_centered.T
+        self._merge_moments(n, mean_centered + shift[:, None], m2, comoment)
+
+    def _drop_categorical(self, name: str):
+        self.levels.pop(name, None)
+        self.tables = {pair: t for pair, t in self.tables.items() if name not in pair}
+
+    def merge(self, other: "CorrelationAccumulator"):
+        """Слияние с профилем другого чанка или файла (столбцы сопоставляются по именам)"""
+        self._expand(other.numeric)
+        order = [self.numeric.index(c) for c in other.numeric]
+        size = len(self.numeric)
+
+        def place(matrix):
+            placed = np.zeros((size, size))
+            placed[np.ix_(order, order)] = matrix
+            return placed
+
+        self._merge_moments(*map(place, (other.n, other.mean, other.m2, other.comoment)))
+        # Категориальные: коды другого профиля переводятся в коды этого
+        remap = {}
+        for name, levels in other.levels.items():
+            if name not in self.levels:
+                if len(self.levels) >= self.MAX_CATEGORICAL:
+                    continue
+                self.levels[name] = {}
+            own = self.levels[name]
+            for value in levels:
+                own.setdefault(value, len(own))
+            if len(own) > self.MAX_LEVELS:
+                self._drop_categorical(name)
+                continue
+            remap[name] = np.array([own[value] for value in levels], dtype="int64")
+        for (a, b), table in other.tables.items():
+            if a not in remap or b not in remap:
+                continue
+            key = (a, b) if (a, b) in self.tables or (b, a) not in self.tables else (b, a)
+            rows, cols = len(remap[a]), len(remap[b])
+            target = self.tables.setdefault(key, np.zeros((self.MAX_LEVELS, self.MAX_LEVELS)))
+            source = table[:rows, :cols] if key == (a, b) else table[:rows, :cols].T
+            index = np.ix_(remap[a], remap[b]) if key == (a, b) else np.ix_(remap[b], remap[a])
+            target[index] += source
+
+    def result(self) -> Dict[str, Any]:
+        """Матрицы для узких таблиц и сильнейшие пары"""
+        result: Dict[str, Any] = {}
+        pairs = []
+        if self.numeric:
+            with np.errstate(invalid="ignore", divide="ignore"):
+                pearson = self.comoment / np.sqrt(self.m2 * self.m2.T)
+            pearson = np.where(self.n >= self.MIN_PAIR_ROWS, np.clip(pearson, -1, 1), np.nan)
+            if len(self.numeric) <= self.MATRIX_MAX_COLUMNS:
+                result["pearson"] = {
+                    "columns": self.numeric,
+                    "matrix": [[None if np.isnan(v) else round(float(v), 4) for v in row] for row in pearson]
+                }
+            for i in range(len(self.numeric)):
+                for j in range(i + 1, len(self.numeric)):
+                    if np.isfinite(pearson[i, j]):
+                        pairs.append({"columns": [self.numeric[i], self.numeric[j]], "method": "pearson",
+                                      "value": round(float(pearson[i, j]), 4), "rows": int(self.n[i, j])})
+        values = {}
+        for (a, b), table in self.tables.items():
+            rows = int(table.sum())
+            v = cramers_v(table) if rows >= self.MIN_PAIR_ROWS else None
+            if v is not None:
+                values[(a, b)] = v
+                pairs.append({"columns": [a, b], "method": "cramers_v", "value": round(v, 4), "rows": rows})
+        categorical = list(self.levels)
+        if values and len(categorical) <= self.MATRIX_MAX_COLUMNS:
+            def cell(a, b):
+                if a == b:
+                    return 1.0
+                v = values.get((a, b), values.get((b, a)))
+                return None if v is None else round(v, 4)
+
+            result["cramers_v"] = {
+                "columns": categorical,
+                "matrix": [[cell(a, b) for b in categorical] for a in categorical]
+            }
+        pairs.sort(key=lambda p: -abs(p["value"]))
+        result["top_pairs"] = pairs[:self.TOP_PAIRS]
+        result["numeric_columns"] = len(self.numeric)
+        result["categorical_columns"] = len(categorical)
+        return result
+
+
+class StreamingProfile:
+    """Сливаемый профиль таблицы, собираемый по чанкам или случайным блокам"""
+
+    def __init__(self, schema: pd.DataFrame, seed: int = 0, histogram_bins: int = 0, correlations: bool = False):
+        self.dtypes = {str(col): str(dtype) for col, dtype in schema.dtypes.items()}
+        self.columns: Dict[str, ColumnAccumulator] = {}
+        for i, col in enumerate(schema.columns):
+            dtype = schema.iloc[:, i].dtype
+            numeric = pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+            temporal = pd.api.types.is_datetime64_any_dtype(dtype)
+            self.columns[str(col)] = ColumnAccumulator(str(col), numeric, seed=seed + i, temporal=temporal,
+                                                       histogram_bins=histogram_bins)
+        self.rows = 0
+        self.memory_bytes = 0
+        self.rows_with_missing = 0
+        # По блокам: (строк, байт входного файла)
+        self.blocks: List[Tuple[int, int]] = []
+        self.correlations = CorrelationAccumulator(schema.rename(columns=str)) if correlations else None
+
+    def update(self, chunk: pd.DataFrame, nbytes: int = 0):
+        chunk.columns = [str(c) for c in chunk.columns]
+        for name, acc in self.columns.items():
+            acc.update(chunk[name] if name in chunk else pd.Series([None] * len(chunk), dtype="object"))
+        if self.correlations:
+            self.correlations.update(chunk)
+        self.rows += len(chunk)
+        self.memory_bytes += int(chunk.memory_usage(deep=True).sum())
+        self.rows_with_missing += int(chunk.isnull().any(axis=1).sum())
+        self.blocks.append((len(chunk), nbytes))
+
+    def merge(self, other: "StreamingProfile"):
+        for name, acc in other.columns.items():
+            if name in self.columns:
+                self.columns[name].merge(acc)
+            else:
+                self.columns[name] = acc
+                self.dtypes[name] = other.dtypes.get(name, "object")
+        self.rows += other.rows
+        self.memory_bytes += other.memory_bytes
+        self.rows_with_missing += other.rows_with_missing
+        self.blocks.extend(other.blocks)
+        if self.correlations and other.correlations:
+            self.correlations.merge(other.correlations)
+
+
+class TopKSketch:
+    """Частые значения по схеме Space-Saving, сливаемые между чанками и файлами.
+
+    Для каждого отслеживаемого значения хранится верхняя оценка частоты и
+    ее максимальная ошибка; floor - верхняя граница частоты любого
+    неотслеживаемого значения (не больше n / capacity). Состояние - словари
+    не больше чем на capacity значений, упорядоченные по убыванию частоты:
+    слияние - цикл по 2 * capacity ключам без индексов pandas.
+    """
+
+    def __init__(self, capacity: int = 128):
+        self.capacity = capacity
+        self.counts: Dict[Any, float] = {}
+        self.errors: Dict[Any, float] = {}
+        self.floor = 0.0
+        self.total = 0
+
+    def update(self, values: pd.Series):
+        """Добавить значения без пропусков (подсчет внутри чанка векторный)"""
+        if len(values) == 0:
+            return
+        counts = normalize_numeric(values).value_counts(sort=False)
+        freq = counts.to_numpy(dtype="float64")
+        floor = 0.0
+        if len(freq) > self.capacity:
+            # capacity самых частых и следующая за ними частота - без полной сортировки
+            part = np.argpartition(-freq, self.capacity)
+            floor = float(freq[part[self.capacity]])
+            top = np.sort(part[:self.capacity])
+            counts, freq = counts.iloc[top], freq[top]
+        keys = counts.index.tolist()
+        self._merge(dict(zip(keys, freq.tolist())), dict.fromkeys(keys, 0.0), floor, len(values))
+
+    def merge(self, other: "TopKSketch"):
+        self._merge(other.counts, other.errors, other.floor, other.total)
+
+    def _merge(self, counts: Dict[Any, float], errors: Dict[Any, float], floor: float, total: int):
+        merged_counts, merged_errors = {}, {}
+        for key in itertools.chain(self.counts, counts):
+            if key not in merged_counts:
+                merged_counts[key] = self.counts.get(key, self.floor) + counts.get(key, floor)
+                merged_errors[key] = self.errors.get(key, self.floor) + errors.get(key, floor)
+        # sorted устойчива и при reverse: при равных частотах раньше остаются уже отслеживаемые значения
+        ranked = sorted(merged_counts, key=merged_counts.__getitem__, reverse=True)
+        dropped = merged_counts[ranked[self.capacity]] if len(ranked) > self.capacity else 0.0
+        kept = ranked[:self.capacity]
+        self.counts = {key: merged_counts[key] for key in kept}
+        self.errors = {key: merged_errors[key] for key in kept}
+        self.floor = max(self.floor + floor, dropped)
+        self.total += total
+
+    def top(self, n: int = TOP_VALUES, scale: float = 1.0, rows: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Топ-n значений: частота (оценка сверху), ошибка и доля от rows"""
+        rows = rows or self.total
+        result = []
+        for value, count in itertools.islice(self.counts.items(), n):
+            error = self.errors[value]
+            if isinstance(value, float) and value.is_integer():
+                value = int(value)
+            result.append({
+                "value": value.isoformat() if isinstance(value, (pd.Timestamp, datetime)) else str(value),
+                "count": int(round(count * scale)),
+                "error": int(round(error * scale)),
+                "percentage": round(count / rows * 100, 2) if rows else 0.0
+            })
+        return result
+
+
+def normalize_numeric(series: pd.Series) -> pd.Series:
+    """Числа как float64, чтобы int и float из разных чанков совпадали; булевы без изменений"""
+    if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+        return pd.Series(series.to_numpy(dtype="float64", na_value=np.nan), index=series.index, name=series.name)
+    return series
+
+
+NULL_HASH = 0x9E3779B97F4A7C15  # Хеш пропуска (uint64): None, NaN, NaT и pd.NA совпадают
+HASH_PROBE_ROWS = 256
+
+
+def column_hashes(series: pd.Series) -> np.ndarray:
+    """64-битные хеши значений столбца, не зависящие от dtype чанка.
+
+    Числа и булевы хешируются как float64, даты - как наносекунды UTC. Строковые
+    столбцы, в пробе которых есть числа (id, прочитанные как object из-за мусора
+    в чанке), хешируются по разобранным числам, прочие значения - как строки.
+    """
+    nulls = series.isna().to_numpy(dtype=bool)
+    dtype = series.dtype
+    if pd.api.types.is_numeric_dtype(dtype) or pd.api.types.is_bool_dtype(dtype):
+        hashes = pd.util.hash_array(series.to_numpy(dtype="float64", na_value=np.nan))
+    elif pd.api.types.is_datetime64_any_dtype(dtype):
+        # Наивные даты - как UTC; to_datetime понимает и типы Arrow (date32, timestamp)
+        dt = pd.to_datetime(series, utc=True).dt.tz_localize(None).astype("datetime64[ns]")
+        hashes = pd.util.hash_array(dt.to_numpy(dtype="int64", na_value=0))
+    else:
+        values = series.to_numpy(dtype=object, na_value=None)
+        probe = series.iloc[:HASH_PROBE_ROWS].dropna()
+        numbers = None
+        if len(probe) and pd.to_numeric(pd.Series(probe.to_numpy(dtype=object)), errors="coerce").notna().any():
+            numbers = pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+        text = np.array([str(v) for v in values], dtype=object) if len(values) else values
+        hashes = pd.util.hash_array(text)
+        if numbers is not None:
+            parsed = ~np.isnan(numbers)
+            hashes[parsed] = pd.util.hash_array(numbers[parsed])
+    hashes[nulls] = NULL_HASH
+    return hashes
+
+
+def combine_hashes(left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    return (left * np.uint64(1000003)) ^ right
+
+
+def row_fingerprints(df: pd.DataFrame) -> np.ndarray:
+    """64-битные отпечатки строк"""
+    fingerprints = np.zeros(len(df), dtype="uint64")
+    for i in range(df.shape[1]):
+        fingerprints = combine_hashes(fingerprints, column_hashes(df.iloc[:, i]))
+    return fingerprints
+
+
+class BloomFilter:
+    """Фильтр Блума по 64-битным отпечаткам (двойное хеширование)"""
+
+    def __init__(self, size_bits: int, num_hashes: int = 4):
+        self.size = max(int(size_bits), 64)
+        self.num_hashes = num_hashes
+        self.bits = np.zeros((self.size + 7) // 8, dtype="uint8")
+        self.count = 0
+
+    def _positions(self, fingerprints: np.ndarray) -> List[np.ndarray]:
+        h1 = fingerprints & np.uint64(0xFFFFFFFF)
+        h2 = (fingerprints >> np.uint64(32)) | np.uint64(1)
+        return [(h1 + np.uint64(i) * h2) % np.uint64(self.size) for i in range(self.num_hashes)]
+
+    def contains(self, fingerprints: np.ndarray) -> np.ndarray:
+        result = np.ones(len(fingerprints), dtype=bool)
+        for pos in self._positions(fingerprints):
+            result &= ((self.bits[pos >> np.uint64(3)] >> (pos & np.uint64(7)).astype("uint8")) & 1).astype(bool)
+        return result
+
+    def add(self, fingerprints: np.ndarray):
+        for pos in self._positions(fingerprints):
+            np.bitwise_or.at(self.bits, pos >> np.uint64(3), np.left_shift(1, pos & np.uint64(7)).astype("uint8"))
+        self.count += len(fingerprints)
+
+    def false_positive_rate(self) -> float:
+        return float((1 - math.exp(-self.num_hashes * self.count / self.size)) ** self.num_hashes)
+
+
+class DuplicateDetector:
+    """Потоковый поиск дубликатов по отпечаткам с ограничением памяти.
+
+    exact: отпечатки копятся в памяти и при превышении лимита сбрасываются
+    на диск по 64 хеш-партициям, подсчет идет по одной партиции за раз.
+    bloom: приближенный подсчет фильтром Блума (оценка сверху).
+    Строки с пропуском в null_columns (по умолчанию - во всех столбцах ключа)
+    не сравниваются, а считаются отдельно в null_rows: пустой ключ не дубликат.
+    """
+
+    PARTITIONS = 64
+    MAX_EXAMPLES = 5
+    MAX_CANDIDATES = 1000
+
+    def __init__(self, method: str = "exact", memory_mb: float = 256, key: Optional[List[str]] = None,
+                 null_columns: Optional[List[str]] = None):
+        self.method = method
+        self.key = key
+        self.null_columns = (key or []) if null_columns is None else null_columns
+        self.null_rows = 0
+        self.memory_bytes = int(memory_mb * 1024 * 1024)
+        bloom_bytes = self.memory_bytes if method == "bloom" else min(self.memory_bytes // 4, 16 * 1024 * 1024)
+        self.bloom = BloomFilter(bloom_bytes * 8)
+        self.rows = 0
+        self.bloom_hits = 0
+        self.buffer: List[np.ndarray] = []
+        self.buffered_bytes = 0
+        self.spill_dir: Optional[str] = None
+        # Кандидаты в примеры: отпечаток -> строка (подтверждаются при подсчете)
+        self.candidates: Dict[int, Any] = {}
+
+    def update(self, chunk: pd.DataFrame):
+        frame = chunk[self.key] if self.key else chunk
+        if self.null_columns:
+            missing = chunk[self.null_columns].isna().any(axis=1).to_numpy()
+            if missing.any():
+                self.null_rows += int(missing.sum())
+                frame = frame[~missing]
+        fingerprints = row_fingerprints(frame)
+        seen = self.bloom.contains(fingerprints) | pd.Series(fingerprints).duplicated().to_numpy()
+        self.bloom.add(fingerprints)
+        self.bloom_hits += int(seen.sum())
+        room = self.MAX_CANDIDATES - len(self.candidates)
+        if room > 0 and seen.any():
+            for pos in np.flatnonzero(seen)[:room]:
+                self.candidates.setdefault(int(fingerprints[pos]), self._example(frame.iloc[pos]))
+        if self.method == "exact":
+            self.buffer.append(fingerprints)
+            self.buffered_bytes += fingerprints.nbytes
+            if self.buffered_bytes > self.memory_bytes:
+                self._spill()
+        self.rows += len(fingerprints)
+
+    def _example(self, row: pd.Series) -> Any:
+        values = {str(k): (None if pd.isna(v) else str(v)) for k, v in row.items()}
+        if self.key and len(self.key) == 1:
+            return values[str(self.key[0])]
+        return values
+
+    def _spill(self):
+        if not self.buffer:
+            return
+        if self.spill_dir is None:
+            self.spill_dir = tempfile.mkdtemp(prefix="uda_duplicates_")
+        fingerprints = np.concatenate(self.buffer)
+        partitions = (fingerprints >> np.uint64(58)).astype("int64")
+        order = np.argsort(partitions, kind="stable")
+        fingerprints, partitions = fingerprints[order], partitions[order]
+        bounds = np.searchsorted(partitions, np.arange(self.PARTITIONS + 1))
+        for p in range(self.PARTITIONS):
+            if bounds[p] < bounds[p + 1]:
+                with open(os.path.join(self.spill_dir, f"part_{p:02d}.bin"), "ab") as f:
+                    fingerprints[bounds[p]:bounds[p + 1]].tofile(f)
+        self.buffer, self.buffered_bytes = [], 0
+
+    def _partitions(self):
+        if self.spill_dir is None:
+            if self.buffer:
+                yield np.concatenate(self.buffer)
+            return
+        self._spill()
+        for name in sorted(os.listdir(self.spill_dir)):
+            yield np.fromfile(os.path.join(self.spill_dir, name), dtype="uint64")
+
+    def result(self) -> Dict[str, Any]:
+        """Итоговые счетчики дубликатов и примеры"""
+        result: Dict[str, Any] = {"method": self.method, "rows": self.rows}
+        if self.null_columns:
+            result["null_rows"] = self.null_rows
+        candidate_fps = np.fromiter(self.candidates.keys(), dtype="uint64", count=len(self.candidates))
+        if self.method == "exact":
+            duplicate_rows, groups = 0, 0
+            confirmed = np.zeros(len(candidate_fps), dtype=bool)
+            for fingerprints in self._partitions():
+                unique, counts = np.unique(fingerprints, return_counts=True)
+                duplicate_rows += len(fingerprints) - len(unique)
+                groups += int((counts > 1).sum())
+                confirmed |= np.isin(candidate_fps, unique[counts > 1])
+            result.update({
+                "duplicate_rows": int(duplicate_rows),
+                "duplicate_groups": groups,
+                "spilled_to_disk": self.spill_dir is not None
+            })
+            examples = [self.candidates[int(fp)] for fp in candidate_fps[confirmed]]
+            if self.spill_dir is not None:
+                shutil.rmtree(self.spill_dir, ignore_errors=True)
+                self.spill_dir = None
+        else:
+            result.update({
+                "duplicate_rows": self.bloom_hits,
+                "false_positive_rate": round(self.bloom.false_positive_rate(), 6)
+            })
+            examples = list(self.candidates.values())
+        result["duplicate_percentage"] = round(result["duplicate_rows"] / self.rows * 100, 4) if self.rows else 0.0
+        result["examples"] = examples[:self.MAX_EXAMPLES]
+        return result
+
+
+class DuplicateScanner:
+    """Дубликаты строк целиком и по ключевым столбцам (например, ticket_id)"""
+
+    MAX_AUTO_KEYS = 3
+
+    def __init__(self, columns: List[str], method: str = "exact", memory_mb: float = 256,
+                 key_columns: Optional[List[str]] = None):
+        columns = [str(c) for c in columns]
+        if key_columns:
+            keys = [k for k in key_columns if k in columns]
+        else:
+            keys = [c for c in columns if c.lower() == "id" or c.lower().endswith("_id")][:self.MAX_AUTO_KEYS]
+        share = memory_mb / (len(keys) + 1)
+        self.rows = DuplicateDetector(method, share)
+        self.keys = {k: DuplicateDetector(method, share, key=[k]) for k in keys}
+
+    def update(self, chunk: pd.DataFrame):
+        chunk.columns = [str(c) for c in chunk.columns]
+        self.rows.update(chunk)
+        for detector in self.keys.values():
+            detector.update(chunk)
+
+    def result(self) -> Dict[str, Any]:
+        result = self.rows.result()
+        if self.keys:
+            result["key_columns"] = {}
+            for name, detector in self.keys.items():
+                key_result = detector.result()
+                key_result.pop("method", None)
+                key_result.pop("rows", None)
+                result["key_columns"][name] = key_result
+        return result
+
+
+class KeyDiscovery:
+    """Потенциальные ключи и приближенные функциональные зависимости.
+
+    Кандидаты ищутся по 64-битным хешам столбцов на выборке (без попарного
+    nunique по всей таблице), затем проверяются точным проходом по всем
+    данным через DuplicateDetector. Дробные числа и даты в ключи не
+    предлагаются (уникальны случайно), если не заданы явно в include.
+    Зависимость X -> Y оценивается по строкам с заполненным X; столбцы,
+    где пропусков больше MAX_DETERMINANT_NULLS, детерминантами не бывают.
+    """
+
+    SAMPLE_SIZE = 20000
+    MAX_PAIR_COLUMNS = 15
+    MAX_FD_COLUMNS = 30
+    MIN_FD_STRENGTH = 0.95
+    MIN_KEY_UNIQUENESS = 0.99  # Почти уникальные столбцы тоже кандидаты: проверка покажет дубликаты
+    MAX_DETERMINANT_NULLS = 0.5
+    MAX_KEYS = 5
+    MAX_DEPENDENCIES = 20
+    MAX_VERIFIED = 5
+
+    def __init__(self, memory_mb: float = 64, include: Optional[List[str]] = None):
+        self.memory_mb = memory_mb
+        self.include = set(include or [])
+        self.sample_rows = 0
+        self.keys: List[Tuple[str, ...]] = []
+        self.uniqueness: Dict[Tuple[str, ...], float] = {}
+        self.dependencies: List[Dict[str, Any]] = []
+        self.detectors: Dict[Tuple[str, ...], DuplicateDetector] = {}
+
+    def discover(self, df: pd.DataFrame):
+        """Поиск кандидатов на выборке"""
+        if len(df) > self.SAMPLE_SIZE:
+            df = df.sample(self.SAMPLE_SIZE, random_state=0)
+        n = len(df)
+        self.sample_rows = n
+        if n < 2:
+            return
+        hashes, distinct, present, keyable = {}, {}, {}, {}
+        for i, col in enumerate(df.columns):
+            series = df.iloc[:, i]
+            name = str(col)
+            hashes[name] = column_hashes(series)
+            present[name] = series.notna().to_numpy()
+            # Уникальные значения среди заполненных
+            distinct[name] = len(np.unique(hashes[name][present[name]]))
+            keyable[name] = name in self.include or not self._continuous(series)
+        has_nulls = {c: not present[c].all() for c in hashes}
+
+        # Одностолбцовые ключи; составные из пар ищутся, только если их нет
+        min_distinct = self.MIN_KEY_UNIQUENESS * n
+        keys = {(c,): distinct[c] for c in hashes if distinct[c] >= min_distinct and not has_nulls[c] and keyable[c]}
+        if not keys:
+            pool = sorted((c for c in hashes if not has_nulls[c] and keyable[c] and distinct[c] > 1),
+                          key=lambda c: -distinct[c])[:self.MAX_PAIR_COLUMNS]
+            for a_pos, a in enumerate(pool):
+                for b in pool[a_pos + 1:]:
+                    if distinct[a] * distinct[b] < min_distinct:
+                        continue
+                    pairs = len(np.unique(combine_hashes(hashes[a], hashes[b])))
+                    if pairs >= min_distinct:
+                        keys[(a, b)] = pairs
+        # Точные ключи и столбцы с "id" в имени предпочтительнее
+        ranked = sorted(keys, key=lambda k: (-keys[k], not any("id" in c.lower() for c in k)))
+        self.keys = ranked[:self.MAX_KEYS]
+        self.uniqueness = {k: round(keys[k] / n, 4) for k in self.keys}
+
+        # FD X -> Y: число пар (X, Y) совпадает с числом значений X (по строкам с заполненным X)
+        filled = {c: int(present[c].sum()) for c in hashes}
+        lhs_pool = sorted((c for c in hashes if 1 < distinct[c] <= filled[c] / 2),
+                          key=lambda c: -distinct[c])[:self.MAX_FD_COLUMNS]
+        determinants = {c for c in lhs_pool if 1 - filled[c] / n <= self.MAX_DETERMINANT_NULLS}
+        dependencies = []
+        for a_pos, a in enumerate(lhs_pool):
+            for b in lhs_pool[a_pos + 1:]:
+                combined = combine_hashes(hashes[a], hashes[b])
+                pairs = {}
+                for lhs, rhs in ((a, b), (b, a)):
+                    if lhs not in determinants:
+                        continue
+                    # Без пропусков в X пары считаются по всем строкам - одинаково в обе стороны
+                    scope = lhs if has_nulls[lhs] else None
+                    if scope not in pairs:
+                        pairs[scope] = len(np.unique(combined[present[lhs]] if scope else combined))
+                    strength = distinct[lhs] / pairs[scope]
+                    if strength >= self.MIN_FD_STRENGTH:
+                        entry = {"determinant": lhs, "dependent": rhs, "strength": round(strength, 4)}
+                        if has_nulls[lhs]:
+                            entry["determinant_null_rate"] = round(1 - filled[lhs] / n, 4)
+                        dependencies.append(entry)
+        dependencies.sort(key=lambda d: (-d["strength"], d["determinant"], d["dependent"]))
+        self.dependencies = dependencies[:self.MAX_DEPENDENCIES]
+
+    @staticmethod
+    def _continuous(series: pd.Series) -> bool:
+        """Даты и дробные числа: их уникальность - свойство измерения, а не ключа"""
+        if pd.api.types.is_datetime64_any_dtype(series.dtype):
+            return True
+        if pd.api.types.is_float_dtype(series.dtype):
+            values = series.to_numpy(dtype="float64", na_value=np.nan)
+            values = values[np.isfinite(values)]
+            return bool(len(values)) and not bool(np.all(values == np.floor(values)))
+        return False
+
+    def start_verification(self):
+        """Подготовить точную проверку лучших кандидатов на полных данных"""
+        keys = list(self.keys[:self.MAX_VERIFIED])
+        targets = list(keys)
+        for dep in self.dependencies[:self.MAX_VERIFIED]:
+            targets += [(dep["determinant"],), (dep["determinant"], dep["dependent"])]
+        targets = list(dict.fromkeys(targets))
+        share = self.memory_mb / max(len(targets), 1)
+        # Пустые значения ключа считаются отдельно; зависимость проверяется по строкам с заполненным X
+        self.detectors = {t: DuplicateDetector("exact", share, key=list(t), null_columns=None if t in keys else [t[0]])
+                          for t in targets}
+
+    def update(self, chunk: pd.DataFrame):
+        chunk.columns = [str(c) for c in chunk.columns]
+        for target, detector in self.detectors.items():
+            detector.update(chunk)
+
+    def result(self) -> Dict[str, Any]:
+        """Ключи и зависимости; verified - проверено на всех строках"""
+        counts = {t: d.result() for t, d in self.detectors.items()}
+        keys = []
+        for key in self.keys:
+            entry = {"columns": list(key), "uniqueness": self.uniqueness[key], "verified": False}
+            if key in counts:
+                entry["duplicate_rows"] = counts[key]["duplicate_rows"]
+                entry["null_rows"] = counts[key].get("null_rows", 0)
+                entry["verified"] = entry["duplicate_rows"] == 0 and entry["null_rows"] == 0
+            keys.append(entry)
+        dependencies = []
+        for dep in self.dependencies:
+            entry = dict(dep, verified=False)
+            lhs, pair = (dep["determinant"],), (dep["determinant"], dep["dependent"])
+            if lhs in counts and pair in counts:
+                # Нарушения: лишние пары (X, Y) сверх числа значений X
+                entry["violations"] = counts[pair]["rows"] - counts[pair]["duplicate_rows"] - \
+                    (counts[lhs]["rows"] - counts[lhs]["duplicate_rows"])
+                entry["verified"] = entry["violations"] == 0
+            dependencies.append(entry)
+        return {
+            "sample_rows": self.sample_rows,
+            "candidate_keys": keys,
+            "functional_dependencies": dependencies
+        }
+
+
+def digit_matrix(values: pd.Series, length: int) -> np.ndarray:
+    """Строки из цифр одной длины -> матрица цифр (n x length)"""
+    data = np.frombuffer("".join(values).encode("ascii"), dtype=np.uint8)
+    return data.reshape(-1, length).astype("int64") - 48
+
+
+def inn_valid(digits: pd.Series) -> np.ndarray:
+    """Контрольные цифры ИНН (10 цифр - организации, 12 - физлица)"""
+    valid = np.zeros(len(digits), dtype=bool)
+    lengths = digits.str.len().to_numpy()
+    w10 = np.array([2, 4, 10, 3, 5, 9, 4, 6, 8])
+    w11 = np.array([7, 2, 4, 10, 3, 5, 9, 4, 6, 8])
+    w12 = np.array([3, 7, 2, 4, 10, 3, 5, 9, 4, 6, 8])
+    mask = lengths == 10
+    if mask.any():
+        d = digit_matrix(digits[mask], 10)
+        valid[mask] = (d[:, :9] @ w10) % 11 % 10 == d[:, 9]
+    mask = lengths == 12
+    if mask.any():
+        d = digit_matrix(digits[mask], 12)
+        valid[mask] = ((d[:, :10] @ w11) % 11 % 10 == d[:, 10]) & ((d[:, :11] @ w12) % 11 % 10 == d[:, 11])
+    return valid
+
+
+def snils_valid(digits: pd.Series) -> np.ndarray:
+    """Контрольное число СНИЛС"""
+    d = digit_matrix(digits, 11)
+    total = d[:, :9] @ np.arange(9, 0, -1)
+    control = np.where(total < 100, total, total % 101)
+    control = np.where(control >= 100, 0, control)
+    return control == d[:, 9] * 10 + d[:, 10]
+
+
+def luhn_valid(digits: pd.Series) -> np.ndarray:
+    """Алгоритм Луна для номеров карт (13-19 цифр)"""
+    valid = np.zeros(len(digits), dtype=bool)
+    lengths = digits.str.len().to_numpy()
+    for length in np.unique(lengths):
+        mask = lengths == length
+        d = digit_matrix(digits[mask], int(length))[:, ::-1]
+        doubled = d[:, 1::2] * 2
+        total = d[:, ::2].sum(axis=1) + (doubled - 9 * (doubled > 9)).sum(axis=1)
+        valid[mask] = total % 10 == 0
+    return valid
+
+
+class PIIScanner:
+    """Поиск персональных данных: векторные регулярные выражения и контрольные суммы по чанкам.
+
+    Столбцы отбираются по первому чанку: по подсказкам в имени и по пробной
+    выборке значений; столбцы без совпадений дальше не сканируются. Дробные
+    столбцы проверяются, только если имя подсказывает ПДн, а значения целые
+    (телефон с пропусками читается как float64): числа сравниваются без ".0".
+    """
+
+    # Вид -> (шаблон значения целиком, проверка контрольной суммы по цифрам)
+    DETECTORS = {
+        "email": (r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+", None),
+        "phone": (r"(?:\+7|8|7)[ (-]*\d{3}[ )-]*\d{3}[ -]*\d{2}[ -]*\d{2}|\+\d{1,3}[ (-]*\d{2,4}[ )-]*\d{3,4}[ -]*\d{2,4}", None),
+        "inn": (r"\d{10}|\d{12}", inn_valid),
+        "snils": (r"\d{3}-?\d{3}-?\d{3}[ -]?\d{2}", snils_valid),
+        "card": (r"(?:\d[ -]?){12,18}\d", luhn_valid),
+        "passport": (r"\d{2} ?\d{2} ?\d{6}", None),
+        "birth_date": (r"\d{1,2}[./-]\d{1,2}[./-](?:19|20)\d{2}|(?:19|20)\d{2}-\d{2}-\d{2}", None),
+    }
+    NAME_HINTS = {
+        "email": ("mail", "почт"),
+        "phone": ("phone", "тел", "mobile", "моб"),
+        "inn": ("inn", "инн"),
+        "snils": ("snils", "снилс"),
+        "card": ("card", "карт", "pan"),
+        "passport": ("passport", "паспорт"),
+        "birth_date": ("birth", "dob", "рожд", "bday"),
+    }
+    # Без контрольной суммы эти виды неотличимы от обычных чисел и дат
+    HINT_ONLY = ("passport", "birth_date")
+    PROBE_SIZE = 500
+    MIN_HIT_RATE = 0.05
+    MIN_CHECKSUM_RATE = 0.5  # Случайные числа проходят контрольную сумму примерно в 10% случаев
+
+    def __init__(self):
+        self.plan: Optional[Dict[str, List[str]]] = None
+        self.skipped = 0
+        self.non_null: Dict[str, int] = {}
+        self.shaped: Dict[Tuple[str, str], int] = {}
+        self.hits: Dict[Tuple[str, str], int] = {}
+
+    def _hinted(self, name: str) -> List[str]:
+        name = name.lower()
+        return [kind for kind, hints in self.NAME_HINTS.items() if any(h in name for h in hints)]
+
+    def _prepare(self, chunk: pd.DataFrame):
+        """Отбор столбцов и видов ПДн по именам и пробной выборке"""
+        self.plan = {}
+        for i, col in enumerate(chunk.columns):
+            name, series = str(col), chunk.iloc[:, i]
+            hinted = self._hinted(name)
+            dtype = series.dtype
+            if pd.api.types.is_datetime64_any_dtype(dtype):
+                kinds = [k for k in hinted if k == "birth_date"]
+            elif pd.api.types.is_bool_dtype(dtype) or (
+                    pd.api.types.is_float_dtype(dtype) and not (hinted and self._integral(series))):
+                kinds = []
+            else:
+                probe = self._strings(series.dropna().head(self.PROBE_SIZE))
+                kinds = [kind for kind in self.DETECTORS
+                         if kind in hinted or (kind not in self.HINT_ONLY and self._match(kind, probe)[1].any())]
+            if kinds:
+                self.plan[name] = kinds
+            else:
+                self.skipped += 1
+
+    def _integral(self, series: pd.Series) -> bool:
+        values = series.head(self.PROBE_SIZE * 10).to_numpy(dtype="float64", na_value=np.nan)
+        values = values[np.isfinite(values)]
+        return bool(len(values)) and bool(np.all(values == np.floor(values)))
+
+    @staticmethod
+    def _strings(series: pd.Series) -> pd.Series:
+        if pd.api.types.is_float_dtype(series.dtype):
+            # Целые значения - без ".0", иначе 79161234567.0 не похоже на телефон
+            values = series.to_numpy(dtype="float64", na_value=np.nan)
+            integral = np.isfinite(values) & (values == np.floor(values)) & (np.abs(values) < 2 ** 63)
+            text = series.astype(str).to_numpy(dtype=object)
+            text[integral] = values[integral].astype("int64").astype(str)
+            return pd.Series(text, index=series.index, dtype=object).str.strip()
+        return series.astype(str).str.strip()
+
+    def _match(self, kind: str, values: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+        """Маски совпадения по форме и с учетом контрольной суммы"""
+        pattern, checksum = self.DETECTORS[kind]
+        shaped = values.str.fullmatch(pattern).fillna(False).to_numpy(dtype=bool)
+        valid = shaped.copy()
+        if checksum is not None and shaped.any():
+            digits = values[shaped].str.replace(r"\D", "", regex=True)
+            valid[shaped] = checksum(digits)
+        return shaped, valid
+
+    def update(self, chunk: pd.DataFrame):
+        if self.plan is None:
+            self._prepare(chunk)
+        for i, col in enumerate(chunk.columns):
+            name = str(col)
+            if name not in self.plan:
+                continue
+            series = chunk.iloc[:, i].dropna()
+            self.non_null[name] = self.non_null.get(name, 0) + len(series)
+            if len(series) == 0:
+                continue
+            if pd.api.types.is_datetime64_any_dtype(series.dtype):
+                # Дата рождения: без времени и в правдоподобном диапазоне
+                years = series.dt.year
+                plausible = (series.dt.normalize() == series) & (years >= 1900) & (years <= datetime.now().year)
+                count = int(plausible.sum())
+                self.shaped[(name, "birth_date")] = self.shaped.get((name, "birth_date"), 0) + count
+                self.hits[(name, "birth_date")] = self.hits.get((name, "birth_date"), 0) + count
+                continue
+            values = self._strings(series)
+            for kind in self.plan[name]:
+                shaped, valid = self._match(kind, values)
+                self.shaped[(name, kind)] = self.shaped.get((name, kind), 0) + int(shaped.sum())
+                self.hits[(name, kind)] = self.hits.get((name, kind), 0) + int(valid.sum())
+
+    def result(self) -> Dict[str, Any]:
+        """Доли совпадений по столбцам; учитываются виды с заметной долей"""
+        columns: Dict[str, Dict[str, Any]] = {}
+        for (name, kind), hits in self.hits.items():
+            non_null = self.non_null.get(name, 0)
+            if not non_null or not hits:
+                continue
+            rate = hits / non_null
+            entry = {"hits": hits, "rate": round(rate, 4)}
+            if self.DETECTORS[kind][1] is not None:
+                entry["checksum_rate"] = round(hits / self.shaped[(name, kind)], 4)
+                if entry["checksum_rate"] < self.MIN_CHECKSUM_RATE:
+                    continue
+            if rate >= self.MIN_HIT_RATE or kind in self._hinted(name):
+                entry["name_hint"] = kind in self._hinted(name)
+                columns.setdefault(name, {})[kind] = entry
+        return {
+            "columns": columns,
+            "scanned_columns": len(self.plan or {}),
+            "skipped_columns": self.skipped
+        }
+
+
+def mask_pii_value(value: Any, kinds: List[str]) -> Any:
+    """Маскирование значения: email - кроме первого символа и домена, дата рождения - кроме года, иначе все цифры кроме двух последних"""
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    # Целое из дробного столбца: "79161234567.0" маскируется как "79161234567"
+    text = re.sub(r"^(-?\d+)\.0+$", r"\1", str(value))
+    if "email" in kinds and "@" in text:
+        local, _, domain = text.partition("@")
+        return f"{local[:1]}***@{domain}"
+    if "birth_date" in kinds:
+        year = re.search(r"(?:19|20)\d{2}", text)
+        return f"{year.group(0)}-**-**" if year else "***"
+    digits = sum(ch.isdigit() for ch in text)
+    masked, seen = [], 0
+    for ch in text:
+        if ch.isdigit():
+            seen += 1
+            masked.append(ch if seen > digits - 2 else "*")
+        else:
+            masked.append(ch)
+    return "".join(masked)
+
+
+class MinHashSignatures:
+    """MinHash-сигнатуры множеств значений столбцов.
+
+    Сигнатура - минимумы NUM_PERM хеш-функций по хешам значений; сливается
+    поэлементным минимумом, поэтому считается по чанкам. Доля совпавших
+    позиций двух сигнатур оценивает коэффициент Жаккара множеств значений.
+    Параметры хеш-функций фиксированы, чтобы сигнатуры разных файлов и
+    запусков были сравнимы.
+    """
+
+    NUM_PERM = 64
+    SEED = 20240601
+    BLOCK_ROWS = 65536
+
+    def __init__(self):
+        rng = np.random.default_rng(self.SEED)
+        self.a = rng.integers(1, 2 ** 63, self.NUM_PERM, dtype="uint64") | np.uint64(1)
+        self.b = rng.integers(0, 2 ** 63, self.NUM_PERM, dtype="uint64")
+        self.signatures: Dict[str, np.ndarray] = {}
+
+    def update(self, chunk: pd.DataFrame):
+        for i, col in enumerate(chunk.columns):
+            values = chunk.iloc[:, i].dropna()
+            if len(values) == 0:
+                continue
+            hashes = np.unique(column_hashes(values))
+            signature = self.signatures.get(str(col))
+            if signature is None:
+                signature = np.full(self.NUM_PERM, np.iinfo("uint64").max, dtype="uint64")
+            for start in range(0, len(hashes), self.BLOCK_ROWS):
+                block = hashes[start:start + self.BLOCK_ROWS, None] * self.a + self.b
+                block ^= block >> np.uint64(29)
+                signature = np.minimum(signature, block.min(axis=0))
+            self.signatures[str(col)] = signature
+
+    def result(self) -> Dict[str, Any]:
+        """Сигнатуры в hex (NUM_PERM 64-битных значений подряд)"""
+        return {
+            "num_perm": self.NUM_PERM,
+            "seed": self.SEED,
+            "columns": {name: sig.astype(">u8").tobytes().hex() for name, sig in self.signatures.items()}
+        }
+
+    @staticmethod
+    def decode(signature: str) -> np.ndarray:
+        return np.frombuffer(bytes.fromhex(signature), dtype=">u8").astype("uint64")
+
+
+class JoinKeyIndex:
+    """LSH-индекс MinHash-сигнатур столбцов для поиска ключей соединения между наборами.
+
+    Сигнатура делится на BANDS полос; столбцы, совпавшие хотя бы в одной
+    полосе, становятся кандидатами, и для них по сигнатурам оцениваются
+    сходство Жаккара и вложенность. Попарного сравнения значений нет, время
+    почти линейно по числу столбцов.
+    """
+
+    BANDS = 16
+    MIN_DISTINCT = 10  # Малые множества (флаги, статусы) совпадают почти везде
+    MIN_JACCARD = 0.5
+    MIN_CONTAINMENT = 0.8
+    MIN_KEY_UNIQUENESS = 0.95
+
+    def __init__(self):
+        self.columns: List[Dict[str, Any]] = []
+        self.buckets: Dict[Tuple[int, bytes], List[int]] = {}
+
+    def add(self, dataset: str, analysis_data: Dict[str, Any]):
+        """Добавить столбцы набора по сигнатурам из statistics.minhash"""
+        minhash = analysis_data.get("statistics", {}).get("minhash")
+        if not minhash:
+            return
+        overview = {c.get("name"): c for c in analysis_data.get("overview", {}).get("columns", [])}
+        for name, encoded in minhash["columns"].items():
+            info = overview.get(name, {})
+            distinct = info.get("unique_count", 0)
+            if distinct < self.MIN_DISTINCT:
+                continue
+            signature = MinHashSignatures.decode(encoded)
+            position = len(self.columns)
+            self.columns.append({
+                "dataset": dataset,
+                "column": name,
+                "signature": signature,
+                "distinct": distinct,
+                "uniqueness": distinct / max(info.get("non_null_count", 0), 1)
+            })
+            for band, part in enumerate(np.array_split(signature, self.BANDS)):
+                self.buckets.setdefault((band, part.tobytes()), []).append(position)
+
+    def candidates(self) -> List[Dict[str, Any]]:
+        """Пары столбцов из разных наборов с заметным пересечением значений"""
+        pairs = set()
+        for members in self.buckets.values():
+            for i_pos, i in enumerate(members):
+                for j in members[i_pos + 1:]:
+                    if self.columns[i]["dataset"] != self.columns[j]["dataset"]:
+                        pairs.add((min(i, j), max(i, j)))
+        
+        results = []
+        for i, j in sorted(pairs):
+            left, right = self.columns[i], self.columns[j]
+            jaccard = float(np.mean(left["signature"] == right["signature"]))
+            # |A ∩ B| = J / (1 + J) * (|A| + |B|); вложенность - доля меньшего множества в пересечении
+            intersection = jaccard / (1 + jaccard) * (left["distinct"] + right["distinct"])
+            containment = min(intersection / min(left["distinct"], right["distinct"]), 1.0)
+            if jaccard < self.MIN_JACCARD and containment < self.MIN_CONTAINMENT:
+                continue
+            key_side = max(left["uniqueness"], right["uniqueness"]) >= self.MIN_KEY_UNIQUENESS
+            results.append({
+                "left": {"dataset": left["dataset"], "column": left["column"], "distinct": left["distinct"]},
+                "right": {"dataset": right["dataset"], "column": right["column"], "distinct": right["distinct"]},
+                "jaccard": round(jaccard, 3),
+                "containment": round(containment, 3),
+                "relation": "join_key" if key_side and containment >= self.MIN_CONTAINMENT else "overlap"
+            })
+        results.sort(key=lambda r: (r["relation"] != "join_key", -r["containment"], -r["jaccard"]))
+        return results
+
+
+class ArrowProfiler:
+    """Профиль таблицы Arrow ядрами pyarrow.compute без преобразования в pandas.
+
+    Строки остаются в буферах Arrow; в Python переводятся только примеры
+    значений, частые значения и строки sample.
+    """
+
+    def __init__(self, histogram_bins: int = 20):
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        self.pa, self.pc = pa, pc
+        self.histogram_bins = histogram_bins
+
+    def _is_numeric(self, column) -> bool:
+        types = self.pa.types
+        return types.is_integer(column.type) or types.is_floating(column.type) or types.is_decimal(column.type)
+
+    def _finite(self, column):
+        """Непустые значения как float64; NaN и бесконечности отбрасываются"""
+        values = self.pc.drop_null(self.pc.cast(column, self.pa.float64(), safe=False))
+        return self.pc.filter(values, self.pc.is_finite(values))
+
+    @staticmethod
+    def _python(value: Any) -> Any:
+        if isinstance(value, (datetime, pd.Timestamp)):
+            return value.isoformat()
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+        return value
+
+    def overview(self, table, file_info: FileInfo) -> DataOverview:
+        pc = self.pc
+        rows = table.num_rows
+        columns = []
+        for name, column in zip(table.column_names, table.columns):
+            nulls = column.null_count
+            examples = pc.drop_null(column.slice(0, 10000))[:5].to_pylist()
+            if len(examples) < 5 and rows - nulls > len(examples):
+                examples = pc.drop_null(column)[:5].to_pylist()
+            counts = pc.value_counts(column)
+            counts = counts.filter(pc.is_valid(counts.field("values")))
+            order = pc.array_sort_indices(counts.field("counts"), order="descending")[:TOP_VALUES]
+            top_values = [{
+                "value": str(self._python(item["values"])),
+                "count": item["counts"],
+                "error": 0,
+                "percentage": round(item["counts"] / rows * 100, 2) if rows else 0.0
+            } for item in counts.take(order).to_pylist()]
+            columns.append(ColumnInfo(
+                name=str(name),
+                dtype=str(column.type),
+                non_null_count=rows - nulls,
+                null_count=nulls,
+                null_percentage=float(nulls / rows * 100) if rows else 0.0,
+                unique_count=pc.count_distinct(column, mode="only_valid").as_py(),
+                example_values=[self._python(v) for v in examples],
+                top_values=top_values
+            ))
+        return DataOverview(
+            file_info=file_info,
+            data_type="tabular",
+            rows=rows,
+            cols=table.num_columns,
+            columns=columns,
+            memory_usage_mb=float(table.nbytes / 1024 / 1024)
+        )
+
+    def statistics(self, table) -> Dict[str, Any]:
+        """Статистика в формате _get_dataframe_statistics"""
+        pc = self.pc
+        dtypes_distribution: Dict[str, int] = {}
+        for field in table.schema:
+            dtypes_distribution[str(field.type)] = dtypes_distribution.get(str(field.type), 0) + 1
+        missing_rows = None
+        for column in table.columns:
+            if column.null_count:
+                is_null = pc.is_null(column)
+                missing_rows = is_null if missing_rows is None else pc.or_(missing_rows, is_null)
+        nulls = [column.null_count for column in table.columns]
+        stats: Dict[str, Any] = {
+            "memory_usage_mb": float(table.nbytes / 1024 / 1024),
+            "dtypes_distribution": dtypes_distribution,
+            "missing_data_summary": {
+                "total_missing": int(sum(nulls)),
+                "columns_with_missing": sum(1 for n in nulls if n),
+                "rows_with_missing": int(pc.sum(missing_rows).as_py() or 0) if missing_rows is not None else 0
+            }
+        }
+
+        numeric, outliers, histograms = {}, {}, {}
+        for name, column in zip(table.column_names, table.columns):
+            temporal = self.pa.types.is_timestamp(column.type) or self.pa.types.is_date(column.type)
+            if self._is_numeric(column):
+                values = self._finite(column)
+                if len(values) == 0:
+                    continue
+                numeric[str(name)] = self._describe(values)
+                outliers[str(name)] = self._outliers(values)
+            elif temporal:
+                values = pc.drop_null(pc.cast(pc.cast(column, self.pa.timestamp("ns")), self.pa.int64()))
+                values = pc.cast(values, self.pa.float64(), safe=False)
+            else:
+                continue
+            if self.histogram_bins and len(values):
+                histograms[str(name)] = self._histogram(values, temporal)
+        if numeric:
+            stats["numeric_summary"] = numeric
+            stats["outliers"] = outliers
+        if self.histogram_bins:
+            stats["histograms"] = histograms
+        return stats
+
+    def _describe(self, values) -> Dict[str, float]:
+        pc = self.pc
+        min_max = pc.min_max(values).as_py()
+        q1, median, q3 = pc.quantile(values, q=[0.25, 0.5, 0.75]).to_pylist()
+        std = pc.stddev(values, ddof=1).as_py()
+        return {
+            "count": float(len(values)),
+            "mean": pc.mean(values).as_py(),
+            "std": float("nan") if std is None else std,
+            "min": min_max["min"],
+            "25%": q1,
+            "50%": median,
+            "75%": q3,
+            "max": min_max["max"]
+        }
+
+    def _outliers(self, values) -> Dict[str, Any]:
+        """Выбросы по IQR и MAD теми же правилами, что и _outlier_statistics"""
+        pc = self.pc
+        q1, median, q3 = pc.quantile(values, q=[0.25, 0.5, 0.75]).to_pylist()
+        deviations = pc.abs(pc.subtract(values, median))
+        mad = pc.quantile(deviations, q=0.5).to_pylist()[0]
+        fences = robust_fences(q1, median, q3, mad, pc.mean(deviations).as_py())
+        iqr_mask = pc.or_(pc.less(values, fences["lower_fence"]), pc.greater(values, fences["upper_fence"]))
+        z_rate, mask = None, iqr_mask
+        if fences["robust_z_lower"] is not None:
+            z_mask = pc.or_(pc.less(values, fences["robust_z_lower"]), pc.greater(values, fences["robust_z_upper"]))
+            z_rate = pc.mean(pc.cast(z_mask, self.pa.float64())).as_py()
+            mask = pc.or_(iqr_mask, z_mask)
+        # В numpy переводятся только выбросы, а не весь столбец
+        candidates = pc.filter(values, mask).to_numpy()
+        if len(candidates) > TOP_OUTLIERS:
+            far = np.argpartition(-np.abs(candidates - median), TOP_OUTLIERS - 1)[:TOP_OUTLIERS]
+            candidates = candidates[far]
+        min_max = pc.min_max(values).as_py()
+        return outlier_summary(fences, len(values), pc.mean(pc.cast(iqr_mask, self.pa.float64())).as_py(), z_rate,
+                               np.unique(candidates), min_max["min"], min_max["max"])
+
+    def _histogram(self, values, temporal: bool) -> Dict[str, Any]:
+        bins = self.histogram_bins
+        counts, edges = np.histogram(values.to_numpy(), bins=bins)
+        depth_edges = self.pc.quantile(values, q=np.linspace(0, 1, bins + 1).tolist()).to_pylist()
+        return histogram_summary(edges, counts, depth_edges, len(values) / bins, temporal)
+
+    def sample(self, table, rows: int) -> List[Dict[str, Any]]:
+        """Первые строки в виде строк, как _sample_records"""
+        return [{str(k): None if v is None else str(self._python(v)) for k, v in record.items()}
+                for record in table.slice(0, rows).to_pylist()]
+
+
+class SampledProfiler:
+    """Выборочное профилирование случайными блоками с ранней остановкой"""
+
+    MIN_BLOCKS = 5
+    PILOT_ROWS = 1000
+    MAX_FRACTION = 0.5  # Дальше случайные блоки дороже последовательного полного прохода
+    IDENTIFIER_UNIQUENESS = 0.9
+
+    def __init__(self, config: AnalysisConfig, logger: Logger):
+        self.config = config
+        self.logger = logger
+        self.z = confidence_z(config.sample_confidence)
+
+    def read_pilot(self, path: str, sep: str, encoding: str) -> pd.DataFrame:
+        """Первые строки файла: схема, типы и примеры"""
+        return pd.read_csv(path, sep=sep, encoding=encoding, nrows=self.PILOT_ROWS,
+                           on_bad_lines="skip", low_memory=False)
+
+    @staticmethod
+    def multiline_columns(pilot: pd.DataFrame) -> List[str]:
+        """Столбцы с переводами строк внутри значений: случайный блок может начаться посреди такого значения"""
+        columns = []
+        for i, col in enumerate(pilot.columns):
+            series = pilot.iloc[:, i]
+            if pd.api.types.is_object_dtype(series.dtype) or pd.api.types.is_string_dtype(series.dtype):
+                if series.dropna().astype(str).str.contains("[\r\n]").any():
+                    columns.append(str(col))
+        return columns
+
+    def profile_csv(self, path: str, sep: str, encoding: str, types: Optional[TypeInferencer] = None,
+                    pilot: Optional[pd.DataFrame] = None) -> Tuple[StreamingProfile, pd.DataFrame, Dict[str, Any]]:
+        """Профиль CSV по случайным блокам байтов, выровненным по строкам"""
+        if pilot is None:
+            pilot = self.read_pilot(path, sep, encoding)
+        if types:
+            pilot = types.fit_transform(pilot)
+        names = [str(c) for c in pilot.columns]
+        file_size = os.path.getsize(path)
+        with open(path, "rb") as f:
+            f.readline()
+            data_start = f.tell()
+        block_bytes = max(int(self.config.sample_block_mb * 1024 * 1024), 64 * 1024)
+        total_blocks = max(1, math.ceil((file_size - data_start) / block_bytes))
+        rng = np.random.default_rng(self.config.sample_seed)
+        order = rng.permutation(total_blocks)
+        skipped_lines = 0
+
+        def blocks():
+            nonlocal skipped_lines
+            with open(path, "rb") as f:
+                for slot in order:
+                    start = data_start + int(slot) * block_bytes
+                    end = min(start + block_bytes, file_size)
+                    # Строка принадлежит блоку, в котором она начинается
+                    f.seek(start - 1)
+                    f.readline()
+                    if f.tell() >= end:
+                        yield pd.DataFrame(columns=names), 0
+                        continue
+                    data = f.read(end - f.tell())
+                    if not data.endswith(b"\n"):
+                        data += f.readline()
+                    try:
+                        chunk = pd.read_csv(io.BytesIO(data), sep=sep, encoding=encoding, header=None,
+                                            names=names, index_col=False, on_bad_lines="skip", low_memory=False)
+                    except pd.errors.EmptyDataError:
+                        chunk = pd.DataFrame(columns=names)
+                    except pd.errors.ParserError:
+                        # Блок начался внутри значения в кавычках: кавычки не сбалансированы
+                        skipped_lines += data.count(b"\n")
+                        continue
+                    # Строки с другим числом полей пропускаются: поврежденные или разрезанные границей блока
+                    skipped_lines += max(data.count(b"\n") - len(chunk), 0)
+                    yield (types.transform(chunk) if types else chunk), end - start
+
+        profile = StreamingProfile(pilot, seed=self.config.sample_seed, histogram_bins=self.config.histogram_bins,
+                                   correlations=self.config.correlations)
+        info = self._run(profile, blocks(), total_blocks, data_bytes=file_size - data_start)
+        info["skipped_lines"] = skipped_lines
+        if skipped_lines:
+            self.logger.warning(f"Выборка: пропущено {skipped_lines:,} строк с неверным числом полей "
+                                f"(поврежденные строки или многострочные значения) - оценки могут быть смещены")
+        return profile, pilot, info
+
+    def profile_parquet(self, path: str,
+                        types: Optional[TypeInferencer] = None) -> Tuple[StreamingProfile, pd.DataFrame, Dict[str, Any]]:
+        """Профиль Parquet по случайным row group"""
+        import pyarrow.parquet as pq
+        parquet_file = pq.ParquetFile(path)
+        total_blocks = parquet_file.num_row_groups
+        pilot = parquet_file.read_row_group(0).to_pandas() if total_blocks else pd.DataFrame()
+        if types:
+            pilot = types.fit_transform(pilot)
+        order = np.random.default_rng(self.config.sample_seed).permutation(total_blocks)
+
+        def blocks():
+            for slot in order:
+                meta = parquet_file.metadata.row_group(int(slot))
+                chunk = parquet_file.read_row_group(int(slot)).to_pandas()
+                yield (types.transform(chunk) if types else chunk), meta.total_byte_size
+
+        profile = StreamingProfile(pilot, seed=self.config.sample_seed, histogram_bins=self.config.histogram_bins,
+                                   correlations=self.config.correlations)
+        info = self._run(profile, blocks(), total_blocks, exact_rows=parquet_file.metadata.num_rows)
+        pilot = pilot.head(self.PILOT_ROWS)
+        return profile, pilot, info
+
+    def _run(self, profile: StreamingProfile, blocks, total_blocks: int,
+             data_bytes: int = 0, exact_rows: Optional[int] = None) -> Dict[str, Any]:
+        stop_reason = "exhausted"
+        max_blocks = min(total_blocks, self.config.sample_max_blocks)
+        for i, (chunk, nbytes) in enumerate(blocks):
+            profile.update(chunk, nbytes)
+            if i + 1 >= max_blocks:
+                stop_reason = "exhausted" if i + 1 >= total_blocks else "max_blocks"
+                break
+            if i + 1 < self.MIN_BLOCKS:
+                continue
+            if self._estimates(profile, total_blocks, data_bytes, exact_rows)["converged"]:
+                stop_reason = "converged"
+                break
+            if i + 1 >= self.MAX_FRACTION * total_blocks:
+                stop_reason = "max_fraction"
+                break
+
+        info = self._estimates(profile, total_blocks, data_bytes, exact_rows)
+        info.update({
+            "mode": "random_blocks",
+            "confidence": self.config.sample_confidence,
+            "tolerance": self.config.sample_tolerance,
+            "blocks_read": len(profile.blocks),
+            "blocks_total": total_blocks,
+            "fraction_read": round(len(profile.blocks) / total_blocks, 4) if total_blocks else 1.0,
+            "rows_sampled": profile.rows,
+            "stop_reason": stop_reason
+        })
+        self.logger.info(f"Выборка: {info['blocks_read']}/{total_blocks} блоков, "
+                         f"{profile.rows:,} строк, остановка: {stop_reason}")
+        return info
+
+    def _estimates(self, profile: StreamingProfile, total_blocks: int,
+                   data_bytes: int, exact_rows: Optional[int]) -> Dict[str, Any]:
+        """Оценки с доверительными интервалами и признак сходимости"""
+        tol = self.config.sample_tolerance
+        fpc = 1 - len(profile.blocks) / total_blocks if total_blocks else 0.0
+        converged = True
+
+        if exact_rows is not None:
+            rows_est, rows_hw = float(exact_rows), 0.0
+        else:
+            per_byte, per_byte_hw = ratio_estimate([b[0] for b in profile.blocks],
+                                                   [b[1] for b in profile.blocks], self.z, fpc)
+            rows_est, rows_hw = per_byte * data_bytes, per_byte_hw * data_bytes
+            converged &= rows_hw <= tol * max(rows_est, 1.0)
+
+        columns = {}
+        for name, acc in profile.columns.items():
+            null_rate, null_hw = ratio_estimate([b[1] for b in acc.blocks], [b[0] for b in acc.blocks], self.z, fpc)
+            col = {"null_rate": self._interval(null_rate, null_hw)}
+            converged &= null_hw <= tol
+            if acc.numeric and acc.n:
+                mean, mean_hw = ratio_estimate([b[3] for b in acc.blocks], [b[2] for b in acc.blocks], self.z, fpc)
+                col["mean"] = self._interval(mean, mean_hw)
+                if self._identifier(name, acc):
+                    # Среднее идентификатора бессмысленно, а для упорядоченных по файлу id почти не сходится
+                    col["identifier"] = True
+                else:
+                    scale = max(abs(mean), acc.std if acc.n > 1 else 0.0, 1e-12)
+                    converged &= mean_hw <= tol * scale
+                # Граница DKW для ошибки рангов квантилей (в предположении независимых строк)
+                col["quantile_rank_error"] = round(math.sqrt(math.log(2 / (1 - self.config.sample_confidence)) / (2 * acc.n)), 5)
+            columns[name] = col
+
+        return {
+            "estimated_rows": self._interval(rows_est, rows_hw),
+            "columns": columns,
+            "converged": bool(converged)
+        }
+
+    def _identifier(self, name: str, acc: ColumnAccumulator) -> bool:
+        """id по имени или целочисленный столбец с почти уникальными значениями"""
+        lowered = name.lower()
+        if lowered == "id" or lowered.endswith("_id"):
+            return True
+        return acc.n > 0 and acc.integral and acc.distinct.estimate() >= self.IDENTIFIER_UNIQUENESS * acc.n
+
+    @staticmethod
+    def _interval(value: float, half_width: float) -> Dict[str, Optional[float]]:
+        if math.isnan(value):
+            return {"value": None, "ci_low": None, "ci_high": None}
+        if math.isinf(half_width):
+            return {"value": round(value, 6), "ci_low": None, "ci_high": None}
+        return {"value": round(value, 6), "ci_low": round(value - half_width, 6), "ci_high": round(value + half_width, 6)}
+
+
+class DataAnalyzer:
+    """Основной класс анализа данных"""
+    
+    def __init__(self, config: AnalysisConfig):
+        self.config = config
+        self.logger = Logger(config.verbose)
+        self.file_handler = FileHandler(self.logger)
+        self.csv_reader = CSVReader(self.logger)
+        self.sampled_profiler = SampledProfiler(config, self.logger)
+        self.meter = ThroughputMeter()
+        self.timer = StageTimer()
+        self.run_stages: List[Dict[str, Any]] = []  # Общие для запуска этапы (поиск файлов) - в начало timings
+    
+    def analyze_file(self, file_info: FileInfo) -> Dict[str, Any]:
+        """Анализ одного файла"""
+        self.logger.info(f"Анализ файла: {file_info.path} ({file_info.format})")
+        self.meter = self.csv_reader.meter = ThroughputMeter()
+        self.timer = self.csv_reader.timer = StageTimer({"stages": [dict(s) for s in self.run_stages],
+                                                         "peak_rss_mb": None})
+        started = time.perf_counter()
+        
+        try:
+            if self.config.sampled and file_info.compression and file_info.format in ["csv", "tsv", "parquet"]:
+                # В сжатом потоке нет случайного доступа к блокам
+                self.logger.info(f"Файл сжат ({file_info.compression}): вместо выборки - потоковый проход")
+                result = self._analyze_chunked(file_info)
+            elif self.config.sampled and file_info.format in ["csv", "tsv", "parquet"]:
+                result = self._analyze_sampled(file_info)
+            elif self.config.chunk_size and file_info.format in ["csv", "tsv", "parquet"]:
+                result = self._analyze_chunked(file_info)
+            elif self.config.arrow and file_info.format in ["csv", "tsv", "parquet"]:
+                result = self._analyze_arrow(file_info)
+            elif file_info.format in ["csv", "tsv"]:
+                result = self._analyze_csv(file_info)
+            elif file_info.format == "json":
+                result = self._analyze_json(file_info)
+            elif file_info.format == "xml":
+                result = self._analyze_xml(file_info)
+            elif file_info.format == "excel":
+                result = self._analyze_excel(file_info)
+            elif file_info.format == "parquet":
+                result = self._analyze_parquet(file_info)
+            else:
+                raise ValueError(f"Неподдерживаемый формат: {file_info.format}")
+            
+            if self.config.mask_pii:
+                self._mask_pii(result)
+            if file_info.compression:
+                report = self.meter.report(file_info.compression)
+                result.setdefault("statistics", {})["input"] = report
+                self.logger.info(f"Распаковка {file_info.compression}: {report['compressed_mb']} MB -> "
+                                 f"{report['uncompressed_mb']} MB за {report['decompress_seconds']} с "
+                                 f"({report['compressed_mb_per_s']} / {report['uncompressed_mb_per_s']} MB/s)")
+            self.timer.timings["analysis_seconds"] = round(time.perf_counter() - started, 3)
+            result["timings"] = self.timer.timings
+            return result
+                
+        except Exception as e:
+            self.logger.error(f"Ошибка анализа файла {file_info.path}: {e}")
+            raise
+    
+    def _analyze_csv(self, file_info: FileInfo) -> Dict[str, Any]:
+        """Анализ CSV файла"""
+        
+        # Добавляем диагностику в verbose режиме
+        if self.config.verbose:
+            with self.timer.span("diagnose"):
+                self.csv_reader.diagnose_csv_structure(file_info.path, compression=file_info.compression)
+        
+        df = None
+        attempts = []
+        separator_info = {}
+        
+        # Сначала пробуем стандартный способ (быстро)
+        try:
+            df = self.csv_reader.read_csv(file_info.path, file_info.compression)
+            attempts = [({"method": "standard_pandas"}, f"OK: {df.shape[0]} строк, {df.shape[1]} столбцов")]
+            
+            # Проверяем результат - если только 1 столбец, скорее всего проблема с разделителем
+            if df.shape[1] == 1:
+                first_value = str(df.iloc[0, 0]) if len(df) > 0 else ""
+                if ';' in first_value or '\t' in first_value:
+                    self.logger.warning("Стандартное чтение дало 1 столбец, но в данных есть другие разделители. Пробуем устойчивое чтение.")
+                    df = None  # Сбросим результат для перехода к устойчивому чтению
+                
+        except Exception as e:
+            attempts = [({"method": "standard_pandas"}, f"FAILED: {str(e)[:100]}")]
+            self.logger.debug(f"Стандартное чтение не сработало: {e}")
+        
+        # Если стандартное чтение не сработало ИЛИ дало подозрительный результат
+        if df is None or df.shape[1] <= 1:
+            self.logger.info("Переходим к устойчивому чтению с автоопределением разделителя...")
+            
+            # Определяем предпочтительные разделители
+            prefer_seps = None
+            if file_info.format == "tsv":
+                prefer_seps = ("\t", ";", ",", "|")
+            
+            # Устойчивое чтение
+            df, robust_attempts, separator_info = self.csv_reader.robust_read_csv(
+                file_info.path, 
+                expected_cols=self.config.expected_cols,
+                prefer_seps=prefer_seps,
+                force_separator=self.config.force_separator,
+                compression=file_info.compression
+            )
+            attempts.extend(robust_attempts)
+        
+        types = self._type_inferencer()
+        if types:
+            with self.timer.span("type_inference", rows=len(df)):
+                df = types.fit_transform(df)
+        
+        # Создаем обзор
+        overview = self._create_dataframe_overview(df, file_info)
+        overview.separator_info = separator_info
+        overview.read_attempts = attempts
+        
+        stats = self._get_dataframe_statistics(df)
+        if types and types.specs:
+            stats["type_inference"] = types.report()
+        return {
+            "overview": overview.to_dict(),
+            "sample": self._sample_records(df),
+            "statistics": stats
+        }
+    
+    def _open_input(self, file_info: FileInfo):
+        """Бинарный поток файла с учетом сжатия"""
+        return open_input(file_info.path, file_info.compression, self.meter)
+    
+    def _seekable_input(self, file_info: FileInfo):
+        """Путь или распакованная копия в памяти для форматов со случайным доступом (Parquet, Excel)"""
+        if not file_info.compression:
+            return file_info.path
+        with self._open_input(file_info) as source:
+            return io.BytesIO(source.read())
+    
+    def _duplicate_method(self) -> str:
+        """Метод поиска дубликатов; auto в выборочном режиме (и при его переходе на полный проход) - off"""
+        if self.config.duplicates == "auto":
+            return "off" if self.config.sampled else "exact"
+        return self.config.duplicates
+    
+    def _type_inferencer(self) -> Optional[TypeInferencer]:
+        """Новый TypeInferencer на файл (None, если определение типов отключено)"""
+        return TypeInferencer(self.logger) if self.config.infer_types else None
+    
+    def _sample_records(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
+        """Безопасное получение sample для больших датафреймов"""
+        sample_df = df.head(self.config.sample_rows)
+        sample = []
+        
+        for _, row in sample_df.iterrows():
+            row_dict = {}
+            for col, val in row.items():
+                # Конвертируем все значения в строки для безопасной сериализации
+                if pd.isna(val):
+                    row_dict[str(col)] = None
+                elif isinstance(val, (pd.Timestamp, datetime)):
+                    row_dict[str(col)] = val.isoformat() if hasattr(val, 'isoformat') else str(val)
+                else:
+                    row_dict[str(col)] = str(val)
+            sample.append(row_dict)
+        return sample
+    
+    def _analyze_sampled(self, file_info: FileInfo) -> Dict[str, Any]:
+        """Выборочный анализ: случайные блоки файла до достижения заданной точности"""
+        separator_info = {}
+        types = self._type_inferencer()
+        if file_info.format == "parquet":
+            if not optional_packages.get('pyarrow'):
+                raise RuntimeError("Для работы с Parquet нужен pyarrow: pip install pyarrow")
+            with self.timer.span("sample_blocks") as stage:
+                profile, pilot, sampling = self.sampled_profiler.profile_parquet(file_info.path, types)
+                stage["rows"] = profile.rows
+        else:
+            sep, encoding, separator_info = self._resolve_csv_dialect(file_info)
+            pilot = self.sampled_profiler.read_pilot(file_info.path, sep, encoding)
+            multiline = self.sampled_profiler.multiline_columns(pilot)
+            if multiline:
+                self.logger.warning(f"Многострочные значения в столбцах {', '.join(multiline)}: случайные блоки "
+                                    f"могут разрезать их, вместо выборки - потоковый проход")
+                return self._analyze_chunked(file_info)
+            with self.timer.span("sample_blocks") as stage:
+                profile, pilot, sampling = self.sampled_profiler.profile_csv(file_info.path, sep, encoding, types,
+                                                                             pilot=pilot)
+                stage["rows"] = profile.rows
+        
+        estimated_rows = sampling["estimated_rows"]["value"]
+        overview = self._overview_from_profile(profile, file_info, estimated_rows)
+        overview.separator_info = separator_info
+        stats = self._statistics_from_profile(profile, estimated_rows)
+        if types and types.specs:
+            stats["type_inference"] = types.report()
+        if self.config.discover_keys:
+            # Без полного прохода кандидаты остаются непроверенными
+            with self.timer.span("statistics.keys", rows=len(pilot)):
+                keys = KeyDiscovery(include=self.config.key_columns)
+                keys.discover(pilot)
+                stats["keys"] = keys.result()
+        if self.config.pii_scan:
+            with self.timer.span("statistics.pii", rows=len(pilot)):
+                pii = PIIScanner()
+                pii.update(pilot)
+                stats["pii"] = pii.result()
+        if self.config.minhash:
+            with self.timer.span("statistics.minhash", rows=len(pilot)):
+                minhash = MinHashSignatures()
+                minhash.update(pilot)
+                stats["minhash"] = minhash.result()
+        stats["sampling"] = sampling
+        return {
+            "overview": overview.to_dict(),
+            "sample": self._sample_records(pilot),
+            "statistics": stats
+        }
+    
+    def _resolve_csv_dialect(self, file_info: FileInfo) -> Tuple[str, str, Dict[str, Any]]:
+        """Разделитель и кодировка для потокового чтения CSV"""
+        if self.config.force_separator:
+            return self.config.force_separator, "utf-8", {"forced_separator": self.config.force_separator}
+        if file_info.format == "tsv":
+            return "\t", "utf-8", {}
+        with self.timer.span("sniff"):
+            sep, separator_info = self.csv_reader.detect_separator(file_info.path, compression=file_info.compression)
+        return sep, separator_info.get("encoding", "utf-8"), separator_info
+    
+    def _analyze_chunked(self, file_info: FileInfo) -> Dict[str, Any]:
+        """Полный потоковый анализ по чанкам с ограниченной памятью"""
+        separator_info = {}
+        chunk_size = self.config.chunk_size or 1_000_000
+        if file_info.format == "parquet":
+            if not optional_packages.get('pyarrow'):
+                raise RuntimeError("Для работы с Parquet нужен pyarrow: pip install pyarrow")
+            import pyarrow.parquet as pq
+            batches = pq.ParquetFile(self._seekable_input(file_info)).iter_batches(batch_size=chunk_size)
+            chunks = (batch.to_pandas() for batch in batches)
+        else:
+            sep, encoding, separator_info = self._resolve_csv_dialect(file_info)
+            
+            def csv_chunks():
+                # Поток держится открытым, пока идут чанки
+                with self._open_input(file_info) as source:
+                    yield from pd.read_csv(source, sep=sep, encoding=encoding, chunksize=chunk_size,
+                                           on_bad_lines="skip", low_memory=False)
+            chunks = csv_chunks()
+        
+        types = self._type_inferencer()
+        profile, scanners, head = None, {}, None
+        for i in itertools.count():
+            # Чтение чанка, профиль и проверки замеряются раздельно и суммируются по чанкам
+            with self.timer.span("read", accumulate=True) as stage:
+                chunk = next(chunks, None)
+                stage["rows"] = len(chunk) if chunk is not None else 0
+            if chunk is None:
+                break
+            if types:
+                with self.timer.span("type_inference", accumulate=True, rows=len(chunk)):
+                    chunk = types.transform(chunk) if profile is not None else types.fit_transform(chunk)
+            if profile is None:
+                profile = StreamingProfile(chunk, seed=self.config.sample_seed,
+                                           histogram_bins=self.config.histogram_bins,
+                                           correlations=self.config.correlations)
+                head = chunk.head(self.config.sample_rows)
+                scanners = self._chunk_scanners(chunk)
+            with self.timer.span("statistics.profile", accumulate=True, rows=len(chunk)):
+                profile.update(chunk)
+            self._update_scanners(scanners, chunk)
+            self.logger.debug(f"Чанк {i + 1}: всего {profile.rows:,} строк")
+        
+        if profile is None:
+            raise RuntimeError(f"Файл {file_info.path} не содержит данных")
+        self.logger.success(f"Потоковое чтение: {profile.rows:,} строк, {len(profile.blocks)} чанков")
+        
+        with self.timer.span("statistics.finalize"):
+            overview = self._overview_from_profile(profile, file_info)
+            overview.separator_info = separator_info
+            stats = self._statistics_from_profile(profile)
+            if types and types.specs:
+                stats["type_inference"] = types.report()
+            stats.update({name: scanner.result() for name, scanner in scanners.items()})
+        return {
+            "overview": overview.to_dict(),
+            "sample": self._sample_records(head),
+            "statistics": stats
+        }
+    
+    def _update_scanners(self, scanners: Dict[str, Any], chunk: pd.DataFrame):
+        """Проверки по очередному чанку, время каждой - в свой этап statistics.<раздел>"""
+        for name, scanner in scanners.items():
+            with self.timer.span(f"statistics.{name}", accumulate=True, rows=len(chunk)):
+                scanner.update(chunk)
+    
+    def _chunk_scanners(self, first_chunk: pd.DataFrame, correlations: bool = False) -> Dict[str, Any]:
+        """Потоковые проверки по чанкам: раздел statistics -> объект с update(chunk) и result()"""
+        scanners: Dict[str, Any] = {}
+        if self._duplicate_method() != "off":
+            scanners["duplicates"] = DuplicateScanner(list(first_chunk.columns), self._duplicate_method(),
+                                                      self.config.duplicates_memory_mb, self.config.key_columns)
+        if self.config.discover_keys:
+            # Кандидаты по первому чанку, проверка - на всех
+            keys = KeyDiscovery(self.config.duplicates_memory_mb, self.config.key_columns)
+            keys.discover(first_chunk)
+            keys.start_verification()
+            scanners["keys"] = keys
+        if self.config.pii_scan:
+            scanners["pii"] = PIIScanner()
+        if self.config.minhash:
+            scanners["minhash"] = MinHashSignatures()
+        if correlations and self.config.correlations:
+            scanners["correlations"] = CorrelationAccumulator(first_chunk.rename(columns=str))
+        return scanners
+    
+    def _analyze_arrow(self, file_info: FileInfo) -> Dict[str, Any]:
+        """Анализ на таблице Arrow: обзор и статистика ядрами pyarrow.compute.
+        
+        Строковые столбцы приводятся к числам, датам и булевым по правилам TypeInferencer
+        ядрами pyarrow.compute. Проверки по чанкам (дубликаты, ключи, ПДн, корреляции)
+        написаны для pandas: они идут по срезам таблицы через представления pandas с типами
+        Arrow и внутри среза переводят значения в объекты Python, поэтому память этого шага
+        пропорциональна срезу (chunk_size строк), а не файлу.
+        """
+        if not optional_packages.get('pyarrow'):
+            raise RuntimeError("Для режима Arrow нужен pyarrow: pip install pyarrow")
+        separator_info = {}
+        if file_info.format == "parquet":
+            import pyarrow.parquet as pq
+            with self.timer.span("read") as stage:
+                table = pq.read_table(self._seekable_input(file_info))
+                stage["rows"] = table.num_rows
+        else:
+            import pyarrow.csv as pacsv
+            sep, encoding, separator_info = self._resolve_csv_dialect(file_info)
+            with self.timer.span("read") as stage, self._open_input(file_info) as source:
+                table = pacsv.read_csv(
+                    source,
+                    read_options=pacsv.ReadOptions(encoding=encoding),
+                    parse_options=pacsv.ParseOptions(delimiter=sep, invalid_row_handler=lambda row: "skip"),
+                    # Пустые строки - пропуски, как в pandas
+                    convert_options=pacsv.ConvertOptions(strings_can_be_null=True)
+                )
+                stage["rows"] = table.num_rows
+        self.logger.success(f"Arrow: {table.num_rows:,} строк, {table.num_columns} столбцов, "
+                            f"{table.nbytes / 1024 / 1024:.1f} MB")
+        types = self._type_inferencer()
+        if types:
+            with self.timer.span("type_inference", rows=table.num_rows):
+                table = types.fit_transform_arrow(table)
+        
+        profiler = ArrowProfiler(self.config.histogram_bins)
+        with self.timer.span("overview", rows=table.num_rows):
+            overview = profiler.overview(table, file_info)
+        overview.separator_info = separator_info
+        with self.timer.span("statistics.arrow", rows=table.num_rows):
+            stats = profiler.statistics(table)
+        if types and types.specs:
+            stats["type_inference"] = types.report()
+        
+        # Срезы таблицы не копируют данные; порции одного размера, как в других режимах
+        step = self.config.chunk_size or 1_000_000
+        batches = (table.slice(start, step).to_pandas(types_mapper=pd.ArrowDtype)
+                   for start in range(0, table.num_rows, step))
+        scanners = None
+        for chunk in batches:
+            if scanners is None:
+                scanners = self._chunk_scanners(chunk, correlations=True)
+            self._update_scanners(scanners, chunk)
+        stats.update({name: scanner.result() for name, scanner in (scanners or {}).items()})
+        return {
+            "overview": overview.to_dict(),
+            "sample": profiler.sample(table, self.config.sample_rows),
+            "statistics": stats
+        }
+    
+    def _overview_from_profile(self, profile: StreamingProfile, file_info: FileInfo,
+                               estimated_rows: Optional[float] = None) -> DataOverview:
+        """Обзор по потоковому профилю (выборочные оценки масштабируются на весь файл)"""
+        rows = int(round(estimated_rows or profile.rows))
+        scale = rows / profile.rows if profile.rows else 0.0
+        columns = []
+        for name, acc in profile.columns.items():
+            null_rate = acc.nulls / acc.rows if acc.rows else 0.0
+            non_null_count = int(round((acc.rows - acc.nulls) * scale))
+            columns.append(ColumnInfo(
+                name=name,
+                dtype=profile.dtypes.get(name, "object"),
+                non_null_count=non_null_count,
+                null_count=int(round(acc.nulls * scale)),
+                null_percentage=float(null_rate * 100),
+                unique_count=min(acc.distinct.estimate(), non_null_count),
+                # По выборке или по заполненному скетчу число уникальных - оценка
+                unique_count_approx=not acc.distinct.exact or rows != profile.rows,
+                example_values=[v.isoformat() if isinstance(v, (pd.Timestamp, datetime)) else v
+                                for v in acc.examples],
+                top_values=acc.top_values.top(scale=scale, rows=acc.rows)
+            ))
+        
+        return DataOverview(
+            file_info=file_info,
+            data_type="tabular",
+            rows=rows,
+            cols=len(profile.columns),
+            columns=columns,
+            memory_usage_mb=float(profile.memory_bytes * scale / 1024 / 1024)
+        )
+    
+    def _statistics_from_profile(self, profile: StreamingProfile,
+                                 estimated_rows: Optional[float] = None) -> Dict[str, Any]:
+        """Статистика по потоковому профилю в формате _get_dataframe_statistics"""
+        rows = estimated_rows or profile.rows
+        scale = rows / profile.rows if profile.rows else 0.0
+        dtypes_distribution: Dict[str, int] = {}
+        for dtype in profile.dtypes.values():
+            dtypes_distribution[dtype] = dtypes_distribution.get(dtype, 0) + 1
+        stats = {
+            "memory_usage_mb": float(profile.memory_bytes * scale / 1024 / 1024),
+            "dtypes_distribution": dtypes_distribution,
+            "missing_data_summary": {
+                "total_missing": int(round(sum(acc.nulls for acc in profile.columns.values()) * scale)),
+                "columns_with_missing": sum(1 for acc in profile.columns.values() if acc.nulls > 0),
+                "rows_with_missing": int(round(profile.rows_with_missing * scale))
+            }
+        }
+        
+        numeric = {name: acc.describe() for name, acc in profile.columns.items() if acc.numeric and acc.n}
+        if numeric:
+            stats["numeric_summary"] = numeric
+            stats["outliers"] = {name: profile.columns[name].outliers(scale) for name in numeric}
+        
+        if self.config.histogram_bins:
+            histograms = {name: acc.histograms(self.config.histogram_bins, scale)
+                          for name, acc in profile.columns.items()}
+            stats["histograms"] = {name: h for name, h in histograms.items() if h}
+        
+        if profile.correlations:
+            stats["correlations"] = profile.correlations.result()
+        
+        return stats
+    
+    def _analyze_json(self, file_info: FileInfo) -> Dict[str, Any]:
+        """Анализ JSON файла"""
+        with self.timer.span("read"), open_text(file_info.path, file_info.compression, meter=self.meter) as f:
+            data = json.load(f)
+        
+        def summarize_structure(obj, depth=0, max_depth=3):
+            if depth > max_depth:
+                return "...depth limit..."
+            if isinstance(obj, dict):
+                return {k: summarize_structure(v, depth+1, max_depth) 
+                       for k, v in list(obj.items())[:20]}
+            elif isinstance(obj, list):
+                return [summarize_structure(v, depth+1, max_depth) 
+                       for v in obj[:10]]
+            return type(obj).__name__
+        
+        # Попытка табличного представления
         table_overview = None
         if isinstance(data, list) and all(isinstance(x, dict) for x in data[:100] if x):
             df = pd.DataFrame(data)
@@ -674,7 +3372,8 @@ class DataAnalyzer:
     
     def _analyze_xml(self, file_info: FileInfo) -> Dict[str, Any]:
         """Анализ XML файла"""
-        tree = etree.parse(file_info.path)
+        with self.timer.span("read"), self._open_input(file_info) as source:
+            tree = etree.parse(source)
         root = tree.getroot()
         
         def element_signature(elem):
@@ -718,11 +3417,13 @@ class DataAnalyzer:
             raise RuntimeError("Для работы с Excel нужен openpyxl: pip install openpyxl")
         
         # Читаем все листы
-        xl_file = pd.ExcelFile(file_info.path)
+        xl_file = pd.ExcelFile(self._seekable_input(file_info))
         sheets_info = {}
         
         for sheet_name in xl_file.sheet_names:
-            df = pd.read_excel(file_info.path, sheet_name=sheet_name)
+            with self.timer.span("read", accumulate=True) as stage:
+                df = pd.read_excel(xl_file, sheet_name=sheet_name)
+                stage["rows"] = len(df)
             sheets_info[sheet_name] = {
                 "overview": self._create_dataframe_overview(df, file_info).to_dict(),
                 "sample": df.head(self.config.sample_rows).to_dict(orient="records")
@@ -743,41 +3444,40 @@ class DataAnalyzer:
         if not optional_packages.get('pyarrow'):
             raise RuntimeError("Для работы с Parquet нужен pyarrow: pip install pyarrow")
         
-        df = pd.read_parquet(file_info.path)
+        with self.timer.span("read") as stage:
+            df = pd.read_parquet(self._seekable_input(file_info))
+            stage["rows"] = len(df)
+        types = self._type_inferencer()
+        if types:
+            with self.timer.span("type_inference", rows=len(df)):
+                df = types.fit_transform(df)
         overview = self._create_dataframe_overview(df, file_info)
         sample = df.head(self.config.sample_rows).to_dict(orient="records")
         
+        stats = self._get_dataframe_statistics(df)
+        if types and types.specs:
+            stats["type_inference"] = types.report()
         return {
             "overview": overview.to_dict(),
             "sample": sample,
-            "statistics": self._get_dataframe_statistics(df)
+            "statistics": stats
         }
     
+    def _map_columns(self, func, items: List[Any]) -> List[Any]:
+        """Применить func к столбцам в пуле потоков (редукции pandas/numpy отпускают GIL).
+        
+        Результаты возвращаются в порядке столбцов независимо от планирования потоков.
+        """
+        workers = min(self.config.workers or os.cpu_count() or 1, len(items))
+        if workers <= 1:
+            return [func(item) for item in items]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(func, items))
+    
     def _create_dataframe_overview(self, df: pd.DataFrame, file_info: FileInfo) -> DataOverview:
         """Создание обзора для DataFrame"""
-        columns = []
-        for col in df.columns:
-            series = df[col]
-            null_count = series.isnull().sum()
-            
-            # Безопасное получение примеров значений
-            example_values = []
-            non_null_series = series.dropna()
-            for val in non_null_series.head(5):
-                if isinstance(val, (pd.Timestamp, datetime)):
-                    example_values.append(val.isoformat() if hasattr(val, 'isoformat') else str(val))
-                else:
-                    example_values.append(val)
-            
-            columns.append(ColumnInfo(
-                name=str(col),
-                dtype=str(series.dtype),
-                non_null_count=int(series.count()),
-                null_count=int(null_count),
-                null_percentage=float(null_count / len(df) * 100),
-                unique_count=int(series.nunique()),
-                example_values=example_values
-            ))
+        with self.timer.span("overview", accumulate=True, rows=len(df)):
+            columns = self._map_columns(lambda i: self._column_info(df.iloc[:, i]), list(range(df.shape[1])))
         
         return DataOverview(
             file_info=file_info,
@@ -788,128 +3488,1127 @@ class DataAnalyzer:
             memory_usage_mb=float(df.memory_usage(deep=True).sum() / 1024 / 1024)
         )
     
-    def _get_dataframe_statistics(self, df: pd.DataFrame) -> Dict[str, Any]:
-        """Получение статистики DataFrame"""
-        stats = {
-            "memory_usage_mb": float(df.memory_usage(deep=True).sum() / 1024 / 1024),
-            "dtypes_distribution": {str(k): int(v) for k, v in df.dtypes.value_counts().to_dict().items()},
-            "missing_data_summary": {
-                "total_missing": int(df.isnull().sum().sum()),
-                "columns_with_missing": int((df.isnull().sum() > 0).sum()),
-                "rows_with_missing": int(df.isnull().any(axis=1).sum())
-            }
-        }
-        
-        # Числовая статистика
-        numeric_cols = df.select_dtypes(include=['number']).columns
-        if len(numeric_cols) > 0:
-            numeric_desc = df[numeric_cols].describe()
-            stats["numeric_summary"] = {
-                str(col): {str(stat): float(val) for stat, val in numeric_desc[col].items()}
-                for col in numeric_desc.columns
+    def _column_info(self, series: pd.Series) -> ColumnInfo:
+        """Обзор одного столбца"""
+        null_count = series.isnull().sum()
+        
+        # Безопасное получение примеров значений
+        example_values = []
+        non_null_series = series.dropna()
+        for val in non_null_series.head(5):
+            if isinstance(val, (pd.Timestamp, datetime)):
+                example_values.append(val.isoformat() if hasattr(val, 'isoformat') else str(val))
+            else:
+                example_values.append(val)
+        
+        # Частые значения: скетч по порциям вместо value_counts по всему столбцу
+        top_values = TopKSketch()
+        step = self.config.chunk_size or 1_000_000
+        for start in range(0, len(non_null_series), step):
+            top_values.update(non_null_series.iloc[start:start + step])
+        
+        return ColumnInfo(
+            name=str(series.name),
+            dtype=str(series.dtype),
+            non_null_count=int(series.count()),
+            null_count=int(null_count),
+            null_percentage=float(null_count / len(series) * 100) if len(series) else 0.0,
+            unique_count=int(non_null_series.nunique()),
+            example_values=example_values,
+            top_values=top_values.top(rows=len(series))
+        )
+    
+    def _get_dataframe_statistics(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """Получение статистики DataFrame"""
+        def step(name):
+            return self.timer.span(f"statistics.{name}", rows=len(df))
+        
+        with step("missing"):
+            stats = {
+                "memory_usage_mb": float(df.memory_usage(deep=True).sum() / 1024 / 1024),
+                "dtypes_distribution": {str(k): int(v) for k, v in df.dtypes.value_counts().to_dict().items()},
+                "missing_data_summary": {
+                    "total_missing": int(df.isnull().sum().sum()),
+                    "columns_with_missing": int((df.isnull().sum() > 0).sum()),
+                    "rows_with_missing": int(df.isnull().any(axis=1).sum())
+                }
+            }
+        
+        # Числовая статистика
+        numeric_cols = df.select_dtypes(include=['number']).columns
+        if len(numeric_cols) > 0:
+            with step("numeric_summary"):
+                numeric_desc = df[numeric_cols].describe()
+                stats["numeric_summary"] = {
+                    str(col): {str(stat): float(val) for stat, val in numeric_desc[col].items()}
+                    for col in numeric_desc.columns
+                }
+            with step("outliers"):
+                stats["outliers"] = self._outlier_statistics(df[numeric_cols])
+        
+        if self.config.histogram_bins:
+            with step("histograms"):
+                stats["histograms"] = self._histogram_statistics(df)
+        
+        if self.config.correlations:
+            with step("correlations"):
+                stats["correlations"] = self._correlation_statistics(df)
+        
+        if self._duplicate_method() != "off":
+            with step("duplicates"):
+                stats["duplicates"] = self._duplicate_statistics(df)
+        
+        if self.config.discover_keys:
+            with step("keys"):
+                stats["keys"] = self._key_statistics(df)
+        
+        if self.config.pii_scan:
+            with step("pii"):
+                stats["pii"] = self._pii_statistics(df)
+        
+        if self.config.minhash:
+            with step("minhash"):
+                minhash = MinHashSignatures()
+                minhash.update(df)
+                stats["minhash"] = minhash.result()
+        
+        return stats
+    
+    def _outlier_statistics(self, numeric_df: pd.DataFrame) -> Dict[str, Any]:
+        """Выбросы по IQR и MAD, векторно по каждому числовому столбцу"""
+        def column_outliers(i):
+            values = numeric_df.iloc[:, i].to_numpy(dtype="float64", na_value=np.nan)
+            values = values[np.isfinite(values)]
+            if len(values) == 0:
+                return None
+            q1, median, q3 = np.quantile(values, [0.25, 0.5, 0.75])
+            deviations = np.abs(values - median)
+            fences = robust_fences(q1, median, q3, float(np.median(deviations)), float(deviations.mean()))
+            iqr_mask = (values < fences["lower_fence"]) | (values > fences["upper_fence"])
+            z_rate, mask = None, iqr_mask
+            if fences["robust_z_lower"] is not None:
+                z_mask = (values < fences["robust_z_lower"]) | (values > fences["robust_z_upper"])
+                z_rate = float(z_mask.mean())
+                mask = iqr_mask | z_mask
+            # Кандидаты в примеры - самые удаленные от медианы выбросы
+            candidates = values[mask]
+            if len(candidates) > TOP_OUTLIERS:
+                far = np.argpartition(-np.abs(candidates - median), TOP_OUTLIERS - 1)[:TOP_OUTLIERS]
+                candidates = candidates[far]
+            return outlier_summary(fences, len(values), float(iqr_mask.mean()), z_rate,
+                                   np.unique(candidates), float(values.min()), float(values.max()))
+        
+        results = self._map_columns(column_outliers, list(range(numeric_df.shape[1])))
+        return {str(col): r for col, r in zip(numeric_df.columns, results) if r is not None}
+    
+    def _histogram_statistics(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """Равноширинные и равночастотные гистограммы числовых столбцов и дат"""
+        bins = self.config.histogram_bins
+        
+        def column_histogram(i):
+            series = df.iloc[:, i]
+            dtype = series.dtype
+            temporal = pd.api.types.is_datetime64_any_dtype(dtype)
+            if temporal:
+                values = datetime_to_ns(series)
+            elif pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype):
+                values = series.to_numpy(dtype="float64", na_value=np.nan)
+                values = values[np.isfinite(values)]
+            else:
+                return None
+            if len(values) == 0:
+                return None
+            counts, edges = np.histogram(values, bins=bins)
+            depth_edges = np.quantile(values, np.linspace(0, 1, bins + 1))
+            return histogram_summary(edges, counts, depth_edges, len(values) / bins, temporal)
+        
+        results = self._map_columns(column_histogram, list(range(df.shape[1])))
+        return {str(col): r for col, r in zip(df.columns, results) if r is not None}
+    
+    def _duplicate_statistics(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """Дубликаты по отпечаткам строк, порциями для ограничения памяти"""
+        scanner = DuplicateScanner(list(df.columns), self._duplicate_method(),
+                                   self.config.duplicates_memory_mb, self.config.key_columns)
+        step = self.config.chunk_size or 1_000_000
+        for start in range(0, len(df), step):
+            scanner.update(df.iloc[start:start + step].copy(deep=False))
+        return scanner.result()
+    
+    def _key_statistics(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """Потенциальные ключи и FD: поиск на выборке, проверка на всей таблице"""
+        keys = KeyDiscovery(self.config.duplicates_memory_mb, self.config.key_columns)
+        keys.discover(df)
+        keys.start_verification()
+        step = self.config.chunk_size or 1_000_000
+        for start in range(0, len(df), step):
+            keys.update(df.iloc[start:start + step].copy(deep=False))
+        return keys.result()
+    
+    def _correlation_statistics(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """Корреляции по совместным моментам, порциями для ограничения памяти"""
+        df = df.rename(columns=str)
+        correlations = CorrelationAccumulator(df)
+        step = self.config.chunk_size or 1_000_000
+        for start in range(0, len(df), step):
+            correlations.update(df.iloc[start:start + step])
+        return correlations.result()
+    
+    def _pii_statistics(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """Персональные данные по столбцам, порциями для ограничения памяти"""
+        pii = PIIScanner()
+        step = self.config.chunk_size or 1_000_000
+        for start in range(0, len(df), step):
+            pii.update(df.iloc[start:start + step])
+        return pii.result()
+    
+    def _mask_pii(self, result: Dict[str, Any]):
+        """Маскирование найденных ПДн в примерах строк, обзоре столбцов и примерах дубликатов"""
+        stats = result.get("statistics", {})
+        flagged = {name: list(kinds) for name, kinds in stats.get("pii", {}).get("columns", {}).items()}
+        if not flagged:
+            return
+        
+        def mask_row(row):
+            if isinstance(row, dict):
+                for name, kinds in flagged.items():
+                    if name in row:
+                        row[name] = mask_pii_value(row[name], kinds)
+        
+        for row in result.get("sample", []):
+            mask_row(row)
+        for column in result.get("overview", {}).get("columns", []):
+            kinds = flagged.get(column.get("name"))
+            if kinds:
+                column["example_values"] = [mask_pii_value(v, kinds) for v in column.get("example_values", [])]
+                for item in column.get("top_values") or []:
+                    item["value"] = mask_pii_value(item["value"], kinds)
+        duplicates = stats.get("duplicates", {})
+        for row in duplicates.get("examples", []):
+            mask_row(row)
+        for name, key_result in duplicates.get("key_columns", {}).items():
+            if name in flagged:
+                key_result["examples"] = [mask_pii_value(v, flagged[name]) for v in key_result.get("examples", [])]
+        stats["pii"]["masked"] = True
+
+@dataclass
+class GenerationOptions:
+    """Параметры генерации Ollama"""
+    think: bool = False  # Рассуждения моделей вроде qwen3 (блоки <think>)
+    num_predict: Optional[int] = 4096  # Лимит токенов ответа
+    num_ctx: Optional[int] = None  # Окно контекста; по умолчанию - по бюджету промпта и num_predict
+    temperature: Optional[float] = None  # None - значение по умолчанию модели
+    keep_alive: Optional[str] = None  # Сколько модель остается в памяти Ollama после запроса ("30m", "-1")
+    
+    def to_options(self, prompt_tokens: int) -> Dict[str, Any]:
+        """options для ollama.chat.
+        
+        Окно по умолчанию считается от бюджета промпта, а не от конкретного промпта:
+        смена num_ctx между запросами перезагружает модель в Ollama.
+        """
+        options: Dict[str, Any] = {}
+        if self.num_predict:
+            options["num_predict"] = self.num_predict
+        if self.temperature is not None:
+            options["temperature"] = self.temperature
+        # Запас 1.5 на неточность оценки токенов; иначе Ollama молча обрежет начало промпта
+        needed = prompt_tokens * 1.5 + (self.num_predict or 4096)
+        options["num_ctx"] = self.num_ctx or int(math.ceil(needed / 1024) * 1024)
+        return options
+
+
+def strip_reasoning(text: str) -> str:
+    """Убрать блоки <think>...</think>; незакрытый блок (ответ обрезан лимитом) убирается до конца"""
+    text = re.sub(r"<think>.*?</think>\s*", "", text, flags=re.S)
+    return text.split("<think>", 1)[0]
+
+
+def estimate_tokens(text: str) -> int:
+    """Оценка числа токенов без токенизатора модели"""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def compact_number(value: Any) -> str:
+    """Число без лишних знаков для таблиц промпта: 199982.5, 0.0997, 1.2e+07"""
+    if value is None or isinstance(value, bool):
+        return "" if value is None else str(value)
+    if isinstance(value, (int, np.integer)):
+        return str(value)
+    if isinstance(value, (float, np.floating)):
+        return "" if math.isnan(value) else f"{value:.6g}"
+    return str(value)
+
+
+def clip_text(value: Any, width: int) -> str:
+    """Значение одной строкой не длиннее width символов (| заменяется, чтобы не ломать таблицу)"""
+    text = str(value).replace("\n", " ").replace("|", "/")
+    return text if len(text) <= width else text[:width - 1] + "…"
+
+
+@dataclass
+class PromptSection:
+    """Раздел промпта: варианты от подробного к краткому, пустой вариант - раздел выброшен"""
+    title: str
+    variants: List[List[str]]
+    # Важность деталей, теряемых при переходе к следующему варианту: при нехватке
+    # бюджета первыми отбрасываются наименее важные детали всех разделов
+    weights: List[int]
+    level: int = 0
+    
+    def text(self) -> str:
+        lines = self.variants[self.level]
+        return f"{self.title}:\n" + "\n".join(lines) if lines else ""
+
+
+def fit_sections(sections: List[PromptSection], budget: int) -> int:
+    """Сократить разделы до бюджета токенов, начиная с наименее важных деталей; возвращает оценку токенов"""
+    def used():
+        return sum(estimate_tokens(section.text()) for section in sections)
+    
+    while used() > budget:
+        shrinkable = [s for s in sections if s.level < len(s.variants) - 1]
+        if not shrinkable:
+            break
+        min(shrinkable, key=lambda s: s.weights[s.level]).level += 1
+    
+    # Даже краткие варианты не влезли (сотни столбцов): обрезаем строки с последних разделов
+    for section in reversed(sections):
+        total = used()
+        if total <= budget:
+            break
+        lines = section.variants[section.level]
+        available = budget - (total - estimate_tokens(section.text())) - estimate_tokens(section.title) - 10
+        kept, size = [], 0
+        for line in lines:
+            size += estimate_tokens(line + "\n")
+            if size > available:
+                break
+            kept.append(line)
+        if len(kept) < len(lines):
+            section.variants[section.level] = kept and kept + [f"... еще {len(lines) - len(kept)} строк"]
+    return used()
+
+
+@dataclass
+class LLMJob:
+    """Анализ одного файла в очереди LLM: приоритет (меньше - раньше), метрики запросов и замеры этапов"""
+    filename: str = ""
+    priority: int = 0
+    calls: List[Dict[str, Any]] = field(default_factory=list)
+    timer: StageTimer = field(default_factory=StageTimer)
+    deadline: Optional[float] = None  # Момент time.monotonic(), после которого запросы файла не ждут ответа
+
+
+# Текущий анализ; наследуется потоками map-reduce через copy_context
+LLM_JOB: contextvars.ContextVar = contextvars.ContextVar("llm_job", default=None)
+
+
+class RequestQueue:
+    """Очередь запросов к Ollama: не больше slots одновременно, первым - меньший приоритет.
+    
+    Локальный Ollama обрабатывает запросы по одному на модель (OLLAMA_NUM_PARALLEL), лишние
+    ждут в его очереди и упираются в таймауты; здесь ожидание видно и управляемо.
+    """
+    
+    def __init__(self, slots: int):
+        self.slots = max(1, slots)
+        self._condition = threading.Condition()
+        self._waiting: List[Tuple[int, int]] = []  # Куча (приоритет, порядковый номер)
+        self._order = itertools.count()
+        self.in_flight = 0
+        self.max_depth = 0
+        self.waits: List[float] = []
+        self.retries = 0
+    
+    @contextmanager
+    def slot(self, priority: int = 0, deadline: Optional[float] = None):
+        """Занять слот; отдает (секунды ожидания, длину очереди при постановке). TimeoutError - дедлайн истек в очереди"""
+        ticket = (priority, next(self._order))
+        start = time.monotonic()
+        with self._condition:
+            heapq.heappush(self._waiting, ticket)
+            depth = len(self._waiting) + self.in_flight - 1
+            self.max_depth = max(self.max_depth, len(self._waiting))
+            while self.in_flight >= self.slots or self._waiting[0] != ticket:
+                remaining = deadline - time.monotonic() if deadline is not None else None
+                if remaining is not None and remaining <= 0:
+                    self._waiting.remove(ticket)
+                    heapq.heapify(self._waiting)
+                    self._condition.notify_all()
+                    raise TimeoutError("Дедлайн истек в очереди запросов")
+                self._condition.wait(remaining)
+            heapq.heappop(self._waiting)
+            self.in_flight += 1
+            waited = time.monotonic() - start
+            self.waits.append(waited)
+            self._condition.notify_all()
+        try:
+            yield waited, depth
+        finally:
+            with self._condition:
+                self.in_flight -= 1
+                self._condition.notify_all()
+    
+    def note_retry(self):
+        with self._condition:
+            self.retries += 1
+    
+    def report(self) -> Dict[str, Any]:
+        """Сводка: запросы, максимальная длина очереди, ожидание слота, повторы"""
+        with self._condition:
+            waits = sorted(self.waits)
+            return {
+                "requests": len(waits),
+                "slots": self.slots,
+                "max_queue_depth": self.max_depth,
+                "mean_wait_seconds": round(sum(waits) / len(waits), 2) if waits else 0.0,
+                "p95_wait_seconds": round(waits[min(len(waits) - 1, int(len(waits) * 0.95))], 2) if waits else 0.0,
+                "max_wait_seconds": round(waits[-1], 2) if waits else 0.0,
+                "retries": self.retries
             }
-        
-        return stats
+
 
 class LLMClient:
     """Клиент для работы с LLM через Ollama"""
     
-    def __init__(self, model_name: str, logger: Logger):
+    TASKS = textwrap.dedent("""
+        Предоставь:
+        - Краткое резюме данных (что это за данные, откуда могут быть)
+        - Анализ структуры и схемы данных
+        - Оценка качества данных (пропуски, выбросы, дубликаты)
+        - Интересные паттерны или аномалии в данных
+        - Рекомендации по предобработке
+        - Предложения по анализу и визуализации
+        - Потенциальные проблемы и риски
+        - Бизнес-выводы и рекомендации по использованию данных
+        - предлагать рекомендации оптимального места хранения
+        (например: агрегированные аналитические данные – в ClickHouse, сырые – в HDFS,
+        оперативные – в PostgreSQL)
+        
+        Отвечай на русском языке, структурированно, с маркерами и подзаголовками.
+    """).strip()
+    
+    COMPLEX_COLUMNS = 30  # Шире - в каскаде сразу большая модель
+    MIN_ANSWER_CHARS = 400
+    
+    GROUP_TASKS = textwrap.dedent("""
+        Это часть столбцов широкой таблицы; общий отчет будет собран из выводов по всем группам.
+        Кратко (до 10 пунктов) и только по этим столбцам опиши:
+        - смысл столбцов и их типы
+        - проблемы качества (пропуски, выбросы, ошибки типов, ПДн)
+        - аномалии, связи и зависимости между столбцами
+        - рекомендации по предобработке
+        
+        Отвечай на русском языке, без вступления и общего резюме.
+    """).strip()
+    
+    def __init__(self, model_name: str, logger: Logger,
+                 prompt_tokens: int = math.ceil(DEFAULT_PROMPT_CHARS / CHARS_PER_TOKEN),
+                 group_columns: int = 60, concurrency: int = 2,
+                 generation: Optional[GenerationOptions] = None,
+                 fast_model: Optional[str] = None, escalate: str = "auto", deadline: Optional[float] = None,
+                 timeout: Optional[float] = None, retries: int = 2, backoff: float = 2.0):
         self.model_name = model_name
+        self.fast_model = fast_model
+        self.escalate = escalate
+        self.deadline = deadline
         self.logger = logger
+        self.prompt_tokens = prompt_tokens
+        self.group_columns = group_columns  # Больше столбцов - map-reduce по группам (0 - всегда один запрос)
+        self.concurrency = max(1, concurrency)
+        self.generation = generation or GenerationOptions()
+        self.timeout = timeout
+        self.retries = max(0, retries)
+        self.backoff = backoff
+        # Общая для всех файлов и групп столбцов: concurrency ограничивает запросы к Ollama в целом
+        self.queue = RequestQueue(self.concurrency)
+        self._shared_client = None
+        self._client_lock = threading.Lock()
     
-    def analyze_data(self, filename: str, analysis_data: Dict[str, Any]) -> str:
-        """Отправка данных на анализ в LLM"""
-        prompt = self._build_prompt(filename, analysis_data)
-        
-        self.logger.info(f"Отправка запроса в {self.model_name}...")
-        start_time = time.time()
-        
+    def analyze_data(self, filename: str, analysis_data: Dict[str, Any], job: Optional[LLMJob] = None) -> str:
+        """Отправка данных на анализ в LLM; метрики запросов - в job.calls"""
+        token = LLM_JOB.set(job or LLMJob(filename))
         try:
-            response = self._call_ollama(prompt)
-            elapsed = time.time() - start_time
-            self.logger.success(f"Ответ получен за {elapsed:.1f}с")
-            return response
+            if self.fast_model:
+                return self._cascade(filename, analysis_data)
+            return self._analyze(filename, analysis_data, self.model_name)
         except Exception as e:
             self.logger.error(f"Ошибка LLM: {e}")
             raise
+        finally:
+            LLM_JOB.reset(token)
+    
+    def _analyze(self, filename: str, analysis_data: Dict[str, Any], model: str,
+                 deadline: Optional[float] = None) -> str:
+        """Анализ одной моделью: одним запросом или map-reduce для широких таблиц"""
+        columns = self._table(analysis_data.get("overview", {})).get("columns") or []
+        if self.group_columns and len(columns) > self.group_columns:
+            return self._analyze_wide(filename, analysis_data, [c["name"] for c in columns], model, deadline)
+        with self._span("prompt") as stage:
+            prompt = self._build_prompt(filename, analysis_data)
+            stage["tokens"] = estimate_tokens(prompt)
+        return self._timed_call(prompt, model, deadline=deadline)
+    
+    def _cascade(self, filename: str, analysis_data: Dict[str, Any]) -> str:
+        """Быстрая модель по умолчанию; большая - по запросу, для сложных данных или если ответ не прошел проверку.
+        
+        Большая модель ограничена deadline: не успела - используется ответ быстрой.
+        """
+        reason = self._escalation_reason(analysis_data)
+        quick = None
+        if not reason:
+            quick = self._analyze(filename, analysis_data, self.fast_model)
+            calls = LLM_JOB.get().calls
+            last_call = calls[-1] if calls else {}
+            problems = self._structure_problems(quick, truncated=last_call.get("done_reason") == "length")
+            if not problems:
+                return quick
+            if self.escalate == "never":
+                self.logger.warning(f"Ответ {self.fast_model} не прошел проверку ({', '.join(problems)}), "
+                                    f"эскалация отключена")
+                return quick
+            reason = f"ответ {self.fast_model} не прошел проверку: {', '.join(problems)}"
+        
+        self.logger.info(f"Эскалация на {self.model_name}: {reason}")
+        deadline = time.monotonic() + self.deadline if self.deadline else None
+        try:
+            return self._analyze(filename, analysis_data, self.model_name, deadline)
+        except TimeoutError:
+            self.logger.warning(f"{self.model_name} не ответила за {self.deadline}с, используется {self.fast_model}")
+            return quick if quick is not None else self._analyze(filename, analysis_data, self.fast_model)
+    
+    def _escalation_reason(self, analysis_data: Dict[str, Any]) -> Optional[str]:
+        """Причина сразу звать большую модель (None - начинаем с быстрой)"""
+        if self.escalate == "always":
+            return "по запросу"
+        if self.escalate == "never":
+            return None
+        table = self._table(analysis_data.get("overview", {}))
+        columns = table.get("columns") or []
+        if not columns:
+            return f"вложенная структура ({analysis_data.get('overview', {}).get('data_type', 'unknown')})"
+        if len(columns) > self.COMPLEX_COLUMNS:
+            return f"широкая таблица: {len(columns)} столбцов"
+        return None
+    
+    def _structure_problems(self, text: str, truncated: bool = False) -> List[str]:
+        """Структурные проверки ответа: длина, разметка, язык, ключевые разделы"""
+        problems = []
+        if truncated:
+            problems.append("обрезан лимитом длины")
+        if len(text) < self.MIN_ANSWER_CHARS:
+            problems.append("слишком короткий")
+        lines = [line.strip() for line in text.splitlines()]
+        if sum(1 for line in lines if re.match(r"(#|[-*•]|\d+[.)])\s", line)) < 5:
+            problems.append("нет заголовков и списков")
+        letters = re.findall(r"[A-Za-zА-Яа-яЁё]", text)
+        if letters and sum(1 for c in letters if c.isascii()) > len(letters) / 2:
+            problems.append("не на русском")
+        lowered = text.lower()
+        missing = [topic for topic in ("качеств", "рекомендац") if topic not in lowered]
+        if missing:
+            problems.append("нет разделов: " + ", ".join(missing))
+        return problems
+    
+    def _timed_call(self, prompt: str, model: str, label: str = "", deadline: Optional[float] = None) -> str:
+        """Вызов модели через очередь: ожидание слота, таймаут запроса, повторы с удвоением паузы.
+        
+        Таймаут и паузы не выходят за deadline; истекший deadline не повторяется.
+        """
+        job = LLM_JOB.get() or LLMJob()
+        if job.deadline is not None:
+            deadline = min(deadline, job.deadline) if deadline is not None else job.deadline
+        for attempt in range(1, self.retries + 2):
+            with self.queue.slot(job.priority, deadline) as (waited, depth):
+                queued = f", в очереди {waited:.1f}с" if waited >= 0.1 else ""
+                self.logger.info(f"Отправка запроса в {model}{label}{queued}...")
+                start_time = time.time()
+                request_deadline = time.monotonic() + self.timeout if self.timeout else None
+                if deadline is not None:
+                    request_deadline = min(request_deadline or deadline, deadline)
+                try:
+                    with self._span("llm", model=model, request=label.strip(" ()") or None, attempt=attempt,
+                                    queue_wait_seconds=round(waited, 2)):
+                        response = self._call_ollama(prompt, model, request_deadline,
+                                                     {"queue_wait_seconds": round(waited, 2), "queue_depth": depth,
+                                                      "attempt": attempt})
+                    self.logger.success(f"Ответ получен за {time.time() - start_time:.1f}с{label}")
+                    return response
+                except Exception as e:
+                    error = e
+            if attempt > self.retries or (deadline is not None and time.monotonic() >= deadline):
+                raise error
+            pause = self.backoff * 2 ** (attempt - 1)
+            if deadline is not None:
+                pause = min(pause, max(0.0, deadline - time.monotonic()))
+            self.queue.note_retry()
+            self.logger.warning(f"Запрос к {model}{label} не удался ({error}), "
+                                f"повтор {attempt + 1}/{self.retries + 1} через {pause:.1f}с")
+            time.sleep(pause)
+    
+    def _analyze_wide(self, filename: str, analysis_data: Dict[str, Any], names: List[str], model: str,
+                      deadline: Optional[float] = None) -> str:
+        """Map-reduce для широких таблиц: параллельный анализ групп столбцов и общий отчет по их выводам.
+        
+        Задержка ограничена самой медленной группой (если групп не больше concurrency) плюс reduce.
+        """
+        groups = self._column_groups(names)
+        self.logger.info(f"Широкая таблица: {len(names)} столбцов, {len(groups)} групп, "
+                         f"до {self.concurrency} запросов одновременно")
+        start_time = time.time()
+        
+        def analyze_group(i):
+            group = groups[i]
+            scope = f"Группа столбцов {i + 1} из {len(groups)}: {group[0]} … {group[-1]} ({len(group)} шт.)"
+            with self._span("prompt", request=f"группа {i + 1}") as stage:
+                prompt = self._build_prompt(filename, self._column_subset(analysis_data, group),
+                                            tasks=self.GROUP_TASKS, scope=scope)
+                stage["tokens"] = estimate_tokens(prompt)
+            return self._timed_call(prompt, model, f" (группа {i + 1}/{len(groups)})", deadline)
+        
+        findings: List[Optional[str]] = []
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            # Группы наследуют текущий LLMJob: приоритет в очереди и сбор метрик
+            futures = [pool.submit(contextvars.copy_context().run, analyze_group, i) for i in range(len(groups))]
+            for i, future in enumerate(futures):
+                try:
+                    findings.append(future.result())
+                except Exception as e:
+                    self.logger.warning(f"Группа {i + 1} не проанализирована: {e}")
+                    findings.append(None)
+        if not any(findings):
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError("Группы столбцов не проанализированы до дедлайна")
+            raise RuntimeError("Ни одна группа столбцов не проанализирована")
+        self.logger.info(f"Группы проанализированы за {time.time() - start_time:.1f}с, объединяем выводы")
+        with self._span("prompt", request="reduce") as stage:
+            prompt = self._build_reduce_prompt(filename, analysis_data, groups, findings)
+            stage["tokens"] = estimate_tokens(prompt)
+        return self._timed_call(prompt, model, " (reduce)", deadline)
+    
+    def _column_groups(self, names: List[str]) -> List[List[str]]:
+        """Соседние столбцы группами примерно одного размера, не больше group_columns"""
+        count = math.ceil(len(names) / self.group_columns)
+        size = math.ceil(len(names) / count)
+        return [names[i:i + size] for i in range(0, len(names), size)]
     
-    def _build_prompt(self, filename: str, analysis_data: Dict[str, Any]) -> str:
-        """Построение промпта для LLM"""
-        def safe_truncate(obj, max_chars=4000):
-            s = safe_json_dumps(obj, ensure_ascii=False, indent=2)
-            if len(s) > max_chars:
-                return s[:max_chars] + "... [truncated]"
-            return s
+    @staticmethod
+    def _table(overview: Dict[str, Any]) -> Dict[str, Any]:
+        """Табличная часть обзора (JSON со списком объектов анализируется как таблица)"""
+        return overview.get("table_like", overview)
+    
+    def _column_subset(self, analysis_data: Dict[str, Any], names: List[str]) -> Dict[str, Any]:
+        """Данные анализа, ограниченные группой столбцов; общие для таблицы разделы уходят в reduce"""
+        selected = set(names)
+        overview = dict(analysis_data.get("overview", {}))
+        table = dict(self._table(overview))
+        table["columns"] = [c for c in table.get("columns", []) if c["name"] in selected]
+        if "table_like" in overview:
+            overview["table_like"] = table
+        else:
+            overview = table
+        
+        stats = analysis_data.get("statistics", {})
+        subset = {key: {k: v for k, v in stats[key].items() if k in selected}
+                  for key in ("numeric_summary", "outliers", "type_inference") if key in stats}
+        if "pii" in stats:
+            subset["pii"] = {**stats["pii"], "columns": {k: v for k, v in stats["pii"].get("columns", {}).items()
+                                                         if k in selected}}
+        if "keys" in stats:
+            keys = stats["keys"]
+            subset["keys"] = {**keys,
+                              "candidate_keys": [k for k in keys.get("candidate_keys", []) if set(k["columns"]) <= selected],
+                              "functional_dependencies": [d for d in keys.get("functional_dependencies", [])
+                                                          if {d["determinant"], d["dependent"]} <= selected]}
+        if "correlations" in stats:
+            subset["correlations"] = {"top_pairs": [p for p in stats["correlations"].get("top_pairs", [])
+                                                    if set(p["columns"]) <= selected]}
+        if "sampling" in stats:
+            subset["sampling"] = stats["sampling"]
         
+        sample = analysis_data.get("sample")
+        if isinstance(sample, list) and all(isinstance(record, dict) for record in sample):
+            sample = [{k: v for k, v in record.items() if k in selected} for record in sample]
+        return {"overview": overview, "sample": sample, "statistics": subset}
+    
+    def _build_prompt(self, filename: str, analysis_data: Dict[str, Any],
+                      tasks: Optional[str] = None, scope: str = "") -> str:
+        """Промпт в пределах бюджета токенов: плотные таблицы вместо JSON, разделы сокращаются по приоритету"""
+        overview = analysis_data.get("overview", {})
+        stats = analysis_data.get("statistics", {})
+        header = (f"Ты - эксперт по анализу данных. Проанализируй предоставленный набор данных.\n\n"
+                  f"{self._dataset_line(filename, overview, stats)}" + (f"\n{scope}" if scope else ""))
+        table = self._table(overview)
+        if table.get("columns"):
+            sections = self._table_sections(table, stats, analysis_data.get("sample"))
+        else:
+            sections = self._structure_sections(overview, analysis_data.get("sample"))
+        return self._assemble(header, sections, tasks or self.TASKS)
+
+    def describe(self, filename: str, analysis_data: Dict[str, Any]) -> str:
+        """Профиль файла текстом в пределах бюджета промпта, без задания модели (для агентов, MCP)"""
+        overview = analysis_data.get("overview", {})
+        stats = analysis_data.get("statistics", {})
+        header = self._dataset_line(filename, overview, stats)
+        table = self._table(overview)
+        if table.get("columns"):
+            sections = self._table_sections(table, stats, analysis_data.get("sample"))
+        else:
+            sections = self._structure_sections(overview, analysis_data.get("sample"))
+        fit_sections(sections, self.prompt_tokens - estimate_tokens(header))
+        return "\n\n".join([header] + [text for text in (section.text() for section in sections) if text])
+
+    def _build_reduce_prompt(self, filename: str, analysis_data: Dict[str, Any],
+                             groups: List[List[str]], findings: List[Optional[str]]) -> str:
+        """Промпт reduce-шага: выводы по группам и общие для всей таблицы разделы"""
         overview = analysis_data.get("overview", {})
-        sample = analysis_data.get("sample", {})
         stats = analysis_data.get("statistics", {})
+        header = (f"Ты - эксперт по анализу данных. Широкая таблица проанализирована по группам столбцов; "
+                  f"объедини выводы групп в единый отчет.\n\n{self._dataset_line(filename, overview, stats)}")
+        
+        def findings_lines(width):
+            lines = []
+            for i, (group, text) in enumerate(zip(groups, findings)):
+                text = (text or "анализ не получен").strip()
+                if width and len(text) > width:
+                    text = text[:width] + "…"
+                lines += [f"### Группа {i + 1}: {group[0]} … {group[-1]}", text]
+            return lines
         
-        # Добавляем информацию о разделителе, если есть
+        # Выбросы и типы столбцов уже разобраны в группах
+        table_stats = {k: stats[k] for k in ("missing_data_summary", "duplicates", "pii") if k in stats}
+        keys = self._keys_lines(stats.get("keys"))
+        correlations = self._correlation_lines(stats.get("correlations"))
+        sections = [
+            PromptSection("ВЫВОДЫ ПО ГРУППАМ СТОЛБЦОВ",
+                          [findings_lines(None), findings_lines(1500), findings_lines(600)], weights=[6, 8]),
+            PromptSection("КАЧЕСТВО ДАННЫХ (вся таблица)",
+                          [self._quality_lines(table_stats, details=False)], weights=[]),
+            PromptSection("КЛЮЧИ И ЗАВИСИМОСТИ", [keys or ["- не найдены"], keys[:3], []], weights=[3, 7]),
+            PromptSection("СИЛЬНЕЙШИЕ СВЯЗИ МЕЖДУ СТОЛБЦАМИ",
+                          [correlations or ["- сильных связей нет"], correlations[:3], []], weights=[3, 6])
+        ]
+        return self._assemble(header, sections, self.TASKS)
+    
+    def _assemble(self, header: str, sections: List[PromptSection], tasks: str) -> str:
+        """Уложить разделы в бюджет и собрать промпт"""
+        fit_sections(sections, self.prompt_tokens - estimate_tokens(header) - estimate_tokens(tasks))
+        body = "\n\n".join(text for text in (section.text() for section in sections) if text)
+        prompt = f"{header}\n\n{body}\n\n{tasks}"
+        reduced = [section.title for section in sections if section.level]
+        self.logger.info(f"Промпт: ~{estimate_tokens(prompt)} токенов из {self.prompt_tokens}"
+                         + (f", сокращено: {', '.join(reduced)}" if reduced else ""))
+        return prompt
+    
+    def _dataset_line(self, filename: str, overview: Dict[str, Any], stats: Dict[str, Any]) -> str:
+        """Файл, формат, размер и способ чтения одной строкой"""
+        file_info = overview.get("file_info", {})
+        parts = [f"Файл: {filename}", f"формат: {file_info.get('format') or overview.get('data_type', 'unknown')}"]
         separator_info = overview.get("separator_info", {})
-        separator_text = ""
-        if separator_info:
-            sep_name = separator_info.get("separator_name", "неизвестно")
-            expected_cols = separator_info.get("expected_columns", "неизвестно")
-            separator_text = f"\nИнформация о разделителе: {sep_name}, ожидается столбцов: {expected_cols}"
-        
-        prompt = f"""
-Ты - эксперт по анализу данных. Проанализируй предоставленный набор данных.
-
-Файл: {filename}{separator_text}
-
-СТРУКТУРА ДАННЫХ:
-{safe_truncate(overview)}
-
-ПРИМЕРЫ ДАННЫХ:
-{safe_truncate(sample)}
-
-СТАТИСТИКА:
-{safe_truncate(stats)}
-
-Предоставь:
-- Краткое резюме данных (что это за данные, откуда могут быть)
-- Анализ структуры и схемы данных  
-- Оценка качества данных (пропуски, выбросы, дубликаты)
-- Интересные паттерны или аномалии в данных
-- Рекомендации по предобработке
-- Предложения по анализу и визуализации
-- Потенциальные проблемы и риски
-- Бизнес-выводы и рекомендации по использованию данных
-- предлагать рекомендации оптимального места хранения 
-(например: агрегированные аналитические данные – в ClickHouse, сырые – в HDFS, 
-оперативные – в PostgreSQL)
-
-Отвечай на русском языке, структурированно, с маркерами и подзаголовками.
-"""
-        return textwrap.dedent(prompt).strip()
+        if separator_info.get("separator_name"):
+            parts.append(f"разделитель: {separator_info['separator_name']}")
+        if "rows" in overview:
+            parts.append(f"{overview['rows']} строк x {overview.get('cols')} столбцов")
+        sampling = stats.get("sampling")
+        if sampling:
+            parts.append(f"оценки по выборке {sampling['fraction_read']:.0%} файла")
+        return "; ".join(parts)
+    
+    def _table_sections(self, overview: Dict[str, Any], stats: Dict[str, Any], sample: Any) -> List[PromptSection]:
+        """Разделы промпта для табличных данных"""
+        columns = overview["columns"]
+        numeric = stats.get("numeric_summary", {})
+        types = stats.get("type_inference", {})
+        
+        def row(column, ranges, examples):
+            spec = types.get(column["name"])
+            cells = [column["name"], column["dtype"] + (f" ({spec['kind']})" if spec else ""),
+                     compact_number(round(column["null_percentage"], 1)),
+                     ("~" if column.get("unique_count_approx") else "") + str(column["unique_count"])]
+            if ranges:
+                summary = numeric.get(column["name"], {})
+                cells += [compact_number(summary.get(k)) for k in ("min", "50%", "max")]
+            if examples:
+                cells.append(", ".join(clip_text(v, 30) for v in column.get("example_values", [])[:3]))
+            return " | ".join(cells)
+        
+        def table(ranges, examples):
+            head = ["столбец", "тип", "пусто %", "уникальных"] + (["мин", "медиана", "макс"] if ranges else []) + \
+                   (["примеры"] if examples else [])
+            return [" | ".join(head)] + [row(c, ranges, examples) for c in columns]
+        
+        keys = self._keys_lines(stats.get("keys"))
+        correlations = self._correlation_lines(stats.get("correlations"))
+        quality = self._quality_lines(stats)
+        # Порядок разделов - по важности; веса задают, какие детали отбрасываются раньше
+        sections = [
+            PromptSection("СТОЛБЦЫ", [table(bool(numeric), True), table(bool(numeric), False), table(False, False)],
+                          weights=[5, 8]),
+            PromptSection("КАЧЕСТВО ДАННЫХ", [quality, self._quality_lines(stats, details=False)], weights=[6]),
+            PromptSection("КЛЮЧИ И ЗАВИСИМОСТИ", [keys or ["- не найдены"], keys[:3], []], weights=[4, 7]),
+            PromptSection("СИЛЬНЕЙШИЕ СВЯЗИ МЕЖДУ СТОЛБЦАМИ",
+                          [correlations or ["- сильных связей нет"], correlations[:3], []], weights=[4, 6]),
+            PromptSection("ЧАСТЫЕ ЗНАЧЕНИЯ (доля строк)",
+                          [self._top_values_lines(columns, 5) or ["- нет повторяющихся значений"],
+                           self._top_values_lines(columns, 3, width=25), []], weights=[2, 5]),
+            PromptSection("ПРИМЕРЫ ДАННЫХ", [self._sample_lines(sample, n) for n in (None, 5, 2, 0)],
+                          weights=[1, 3, 4])
+        ]
+        # Для JSON статистика не считается: не утверждаем, что проблем и связей нет
+        skipped = set() if stats else {"КАЧЕСТВО ДАННЫХ", "КЛЮЧИ И ЗАВИСИМОСТИ", "СИЛЬНЕЙШИЕ СВЯЗИ МЕЖДУ СТОЛБЦАМИ"}
+        return [section for section in sections if section.title not in skipped]
+    
+    def _structure_sections(self, overview: Dict[str, Any], sample: Any) -> List[PromptSection]:
+        """Разделы промпта для JSON, XML и Excel: компактный JSON с обрезкой по бюджету"""
+        structure = safe_json_dumps({k: v for k, v in overview.items() if k != "file_info"},
+                                    ensure_ascii=False, separators=(",", ":"))
+        sample_text = safe_json_dumps(sample, ensure_ascii=False, separators=(",", ":"))
+        return [
+            PromptSection("СТРУКТУРА ДАННЫХ", [[clip_text(structure, n)] for n in (12000, 6000, 3000, 1500)],
+                          weights=[3, 5, 7]),
+            PromptSection("ПРИМЕРЫ ДАННЫХ", [[clip_text(sample_text, 4000)], [clip_text(sample_text, 1500)], []],
+                          weights=[2, 6])
+        ]
+    
+    def _quality_lines(self, stats: Dict[str, Any], details: bool = True) -> List[str]:
+        """Пропуски, дубликаты, выбросы, ПДн и ошибки приведения типов"""
+        lines = []
+        missing = stats.get("missing_data_summary")
+        if missing:
+            lines.append(f"- пропуски: {missing['total_missing']} значений в {missing['columns_with_missing']} "
+                         f"столбцах, строк с пропусками: {missing['rows_with_missing']}")
+        duplicates = stats.get("duplicates")
+        if duplicates:
+            lines.append(f"- дубликаты строк: {duplicates['duplicate_rows']} ({duplicates['duplicate_percentage']}%)")
+            for name, key in duplicates.get("key_columns", {}).items():
+                line = f"- повторы {name}: {key['duplicate_rows']} ({key['duplicate_percentage']}%)"
+                if key.get("null_rows"):
+                    line += f", пустых значений: {key['null_rows']}"
+                lines.append(line)
+        outliers = {name: o for name, o in stats.get("outliers", {}).items()
+                    if o.get("iqr_outliers") or o.get("mad_outliers")}
+        if details:
+            for name, o in outliers.items():
+                extremes = ", ".join(compact_number(v) for v in o.get("top_outliers", [])[:3])
+                lines.append(f"- выбросы {name}: IQR {o['iqr_outlier_percentage']}% вне "
+                             f"[{compact_number(o['lower_fence'])}, {compact_number(o['upper_fence'])}], "
+                             f"MAD {o['mad_outlier_percentage']}%" + (f", крайние: {extremes}" if extremes else ""))
+        elif outliers:
+            lines.append("- выбросы: " + ", ".join(f"{name} {o['iqr_outlier_percentage']}%"
+                                                   for name, o in outliers.items()))
+        pii = stats.get("pii", {})
+        for name, kinds in pii.get("columns", {}).items():
+            found = ", ".join(f"{kind} {hit['rate']:.0%}" for kind, hit in kinds.items())
+            lines.append(f"- персональные данные {name}: {found}" + (" (в примерах замаскированы)" if pii.get("masked") else ""))
+        if details:
+            for name, spec in stats.get("type_inference", {}).items():
+                # failed_values - число значений, не разобранных при приведении (стали пропусками)
+                if spec.get("failed_values"):
+                    lines.append(f"- {name}: {spec['match_rate']:.1%} значений приведены к {spec['target']}, "
+                                 f"не разобраны: {spec['failed_values']:,}")
+        return lines or ["- проблем не найдено"]
+    
+    def _top_values_lines(self, columns: List[Dict[str, Any]], per_column: int, width: int = 40) -> List[str]:
+        """Частые значения столбцов с заметными повторами, не похожих на идентификаторы"""
+        lines = []
+        for column in columns:
+            top = column.get("top_values")
+            if top and top[0]["percentage"] >= 1 and column.get("unique_count", 0) <= 0.5 * column.get("non_null_count", 0):
+                values = ", ".join(f"{clip_text(item['value'], width)} {item['percentage']}%" for item in top[:per_column])
+                lines.append(f"- {column['name']}: {values}")
+        return lines
+    
+    def _sample_lines(self, sample: Any, rows: Optional[int]) -> List[str]:
+        """Примеры строк таблицей: заголовок один раз, длинные значения обрезаны"""
+        if not isinstance(sample, list) or not sample or not isinstance(sample[0], dict) or rows == 0:
+            return []
+        sample = sample[:rows]
+        names = list(sample[0].keys())
+        lines = [" | ".join(clip_text(name, 40) for name in names)]
+        lines += [" | ".join("" if record.get(name) is None else clip_text(record.get(name), 40) for name in names)
+                  for record in sample]
+        return lines
     
-    def _call_ollama(self, prompt: str) -> str:
-        """Вызов Ollama API"""
+    def _keys_lines(self, keys: Optional[Dict[str, Any]], limit: int = 8) -> List[str]:
+        """Потенциальные ключи и функциональные зависимости одной строкой каждый"""
+        if not keys:
+            return []
+        
+        def status(item):
+            if "violations" in item:
+                return "проверено" if item["verified"] else f"нарушений: {item['violations']}"
+            if "duplicate_rows" in item:
+                return "проверено" if item["verified"] else \
+                    f"дубликатов: {item['duplicate_rows']}, пустых: {item['null_rows']}"
+            return f"по выборке {keys.get('sample_rows', 0)} строк"
+        
+        lines = [f"- ключ ({', '.join(k['columns'])}): {status(k)}" for k in keys.get("candidate_keys", [])]
+        lines += [f"- {d['determinant']} -> {d['dependent']} (сила {d['strength']}): {status(d)}"
+                  for d in keys.get("functional_dependencies", [])[:limit]]
+        return lines
+    
+    def _correlation_lines(self, correlations: Optional[Dict[str, Any]], min_value: float = 0.3) -> List[str]:
+        """Сильнейшие пары вместо полной матрицы корреляций"""
+        if not correlations:
+            return []
+        names = {"pearson": "Пирсон", "cramers_v": "V Крамера"}
+        return [f"- {a} ~ {b}: {names[p['method']]} {p['value']}"
+                for p in correlations.get("top_pairs", []) if abs(p["value"]) >= min_value
+                for a, b in [p["columns"]]]
+    
+    def _call_ollama(self, prompt: str, model: Optional[str] = None, deadline: Optional[float] = None,
+                     queue_info: Optional[Dict[str, Any]] = None) -> str:
+        """Вызов Ollama API; deadline - момент time.monotonic(), после которого ждать ответа нельзя"""
+        model = model or self.model_name
         # Пробуем Python клиент
-        if OLLAMA_CLIENT_OK:
+        if optional_packages.get('ollama'):
+            from httpx import TimeoutException as OllamaTimeout  # httpx - зависимость клиента ollama
             try:
-                response = ollama.chat(
-                    model=self.model_name,
-                    messages=[{"role": "user", "content": prompt}]
-                )
-                return response.get("message", {}).get("content", "").strip()
+                response = self._chat(prompt, model, self._remaining(deadline))
+                self._record_call(response, model, queue_info or {})
+                return strip_reasoning(response.get("message", {}).get("content", "")).strip()
+            except OllamaTimeout:
+                raise TimeoutError(f"{model}: истекло время ожидания ответа")
+            except TimeoutError:
+                raise
             except Exception as e:
                 self.logger.warning(f"Python клиент Ollama не сработал: {e}, пробуем CLI...")
         
-        # Фолбэк на CLI
+        # Фолбэк на CLI (параметры генерации и метрики недоступны)
         try:
             result = subprocess.run(
-                ["ollama", "run", self.model_name],
+                ["ollama", "run", model],
                 input=prompt.encode("utf-8"),
                 capture_output=True,
-                check=True
+                check=True,
+                timeout=self._remaining(deadline)
             )
-            return result.stdout.decode("utf-8").strip()
+            return strip_reasoning(result.stdout.decode("utf-8")).strip()
+        except subprocess.TimeoutExpired:
+            raise TimeoutError(f"{model}: истекло время ожидания ответа")
         except subprocess.CalledProcessError as e:
             error_msg = e.stderr.decode("utf-8", errors="ignore")
             raise RuntimeError(f"Ошибка Ollama CLI: {error_msg}")
+    
+    @staticmethod
+    def _span(name: str, **fields):
+        """Замер этапа в timings текущего анализа (вне анализа - в никуда)"""
+        job = LLM_JOB.get()
+        return (job.timer if job is not None else StageTimer()).span(name, **fields)
+    
+    @staticmethod
+    def _remaining(deadline: Optional[float]) -> Optional[float]:
+        """Секунды до дедлайна (None - без ограничения)"""
+        if deadline is None:
+            return None
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError("Дедлайн истек до отправки запроса")
+        return remaining
+
+    def _client(self, timeout: Optional[float] = None):
+        """Клиент Ollama: без таймаута - общий модуля, с обычным таймаутом - один на LLMClient.
+        
+        Так соединение к Ollama не пересоздается на каждый запрос; отдельный клиент нужен, только
+        если до дедлайна осталось меньше llm_timeout.
+        """
+        if not timeout:
+            return ollama
+        if self.timeout and timeout >= self.timeout - 1:
+            with self._client_lock:
+                if self._shared_client is None:
+                    self._shared_client = ollama.Client(timeout=self.timeout)
+            return self._shared_client
+        return ollama.Client(timeout=timeout)
+    
+    def warm_up(self):
+        """Загрузка моделей в память Ollama до первого запроса (запрос без промпта только загружает модель)"""
+        for model in dict.fromkeys(filter(None, [self.fast_model, self.model_name])):
+            kwargs = {"model": model}
+            if self.generation.keep_alive:
+                kwargs["keep_alive"] = self.generation.keep_alive
+            start_time = time.time()
+            try:
+                ollama.generate(**kwargs)
+                self.logger.success(f"Модель {model} загружена за {time.time() - start_time:.1f}с")
+            except Exception as e:
+                self.logger.warning(f"Не удалось загрузить модель {model}: {e}")
+    
+    def _chat(self, prompt: str, model: str, timeout: Optional[float] = None):
+        """ollama.chat с параметрами генерации; при timeout - отдельный клиент с ограничением ожидания"""
+        client = self._client(timeout)
+        kwargs = {
+            "model": model,
+            "messages": [{"role": "user", "content": prompt}],
+            "options": self.generation.to_options(self.prompt_tokens),
+            "think": self.generation.think
+        }
+        if self.generation.keep_alive:
+            kwargs["keep_alive"] = self.generation.keep_alive
+        try:
+            return client.chat(**kwargs)
+        except ollama.ResponseError as e:
+            # Модели без режима рассуждений отвергают параметр think
+            if "think" not in str(e):
+                raise
+            self.logger.debug(f"Модель {model} не поддерживает think: {e}")
+            kwargs.pop("think")
+            return client.chat(**kwargs)
+    
+    def _record_call(self, response, model: str, queue_info: Dict[str, Any]):
+        """Токены и длительности из ответа Ollama (в наносекундах) в лог и метрики текущего LLMJob"""
+        def seconds(key):
+            return round((response.get(key) or 0) / 1e9, 2)
+        
+        call = {
+            "model": model,
+            "prompt_tokens": response.get("prompt_eval_count") or 0,
+            "prompt_seconds": seconds("prompt_eval_duration"),
+            "output_tokens": response.get("eval_count") or 0,
+            "output_seconds": seconds("eval_duration"),
+            "load_seconds": seconds("load_duration"),
+            "total_seconds": seconds("total_duration"),
+            "done_reason": response.get("done_reason"),
+            **queue_info
+        }
+        call["output_tokens_per_s"] = round(call["output_tokens"] / call["output_seconds"], 1) \
+            if call["output_seconds"] else None
+        thinking = response.get("message", {}).get("thinking")
+        if thinking:
+            call["thinking_chars"] = len(thinking)
+        job = LLM_JOB.get()
+        if job is not None:
+            job.calls.append(call)
+        self.logger.info(f"Ollama: промпт {call['prompt_tokens']} ток. за {call['prompt_seconds']}с, "
+                         f"ответ {call['output_tokens']} ток. за {call['output_seconds']}с "
+                         f"({call['output_tokens_per_s']} ток/с), загрузка {call['load_seconds']}с")
+        if call["done_reason"] == "length":
+            self.logger.warning(f"Ответ обрезан лимитом num_predict={self.generation.num_predict}")
+
+
+class AnalysisIndex:
+    """Индекс прошлых анализов: отпечаток схемы и статистики -> ответ LLM.
+    
+    Ежедневные выгрузки одной таблицы дают ту же схему и близкую статистику;
+    для них ответ LLM берется из прошлого запуска с описанием изменений.
+    Хранится в JSONL рядом с отчетами.
+    """
+    
+    FILE_NAME = "analysis_index.jsonl"
+    TOP_VALUES = 3
+    MIN_TOP_PERCENTAGE = 5    # Более редкие значения меняются от выгрузки к выгрузке
+    ID_UNIQUE_RATIO = 0.95    # Среднее идентификаторов растет вместе с выгрузкой
+    MAX_CHANGES = 20
+    
+    def __init__(self, output_dir: str, logger: Logger):
+        self.path = Path(output_dir) / self.FILE_NAME
+        self.logger = logger
+        self._lock = threading.Lock()  # Пакетный режим дописывает индекс из нескольких потоков
+    
+    @classmethod
+    def fingerprint(cls, analysis_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Схема (имена и типы столбцов) и компактная статистика по столбцам; None для нетабличных данных"""
+        overview = analysis_data.get("overview", {})
+        table = overview.get("table_like", overview)
+        if not table.get("columns"):
+            return None
+        numeric = analysis_data.get("statistics", {}).get("numeric_summary", {})
+        schema = [[c["name"], c["dtype"]] for c in table["columns"]]
+        columns = {}
+        for c in table["columns"]:
+            unique_ratio = c["unique_count"] / c["non_null_count"] if c["non_null_count"] else 0.0
+            summary = numeric.get(c["name"], {}) if unique_ratio < cls.ID_UNIQUE_RATIO else {}
+            columns[c["name"]] = {
+                "null_percentage": round(c["null_percentage"], 3),
+                "unique_ratio": round(unique_ratio, 4),
+                "top": [str(item["value"]) for item in (c.get("top_values") or [])[:cls.TOP_VALUES]
+                        if item["percentage"] >= cls.MIN_TOP_PERCENTAGE],
+                **{k: summary[k] for k in ("mean", "std", "min", "max") if summary.get(k) is not None}
+            }
+        return {
+            "schema_hash": hashlib.sha1(json.dumps(schema, ensure_ascii=False).encode("utf-8")).hexdigest()[:16],
+            "rows": table.get("rows"),
+            "columns": columns
+        }
+    
+    @staticmethod
+    def similarity(old: Dict[str, Any], new: Dict[str, Any]) -> float:
+        """Близость отпечатков в [0, 1]; разные схемы - 0.
+        
+        По каждому столбцу усредняются: разница доли пропусков (10 п.п. - полностью разные),
+        доли уникальных (0.2), сдвиг среднего в стандартных отклонениях и пересечение частых значений.
+        Число строк не учитывается: выгрузки растут, изменение попадает в отчет об изменениях.
+        """
+        if old["schema_hash"] != new["schema_hash"]:
+            return 0.0
+        scores = []
+        for name, b in new["columns"].items():
+            a = old["columns"].get(name, {})
+            parts = [1 - min(1.0, abs(a.get("null_percentage", 0) - b["null_percentage"]) / 10),
+                     1 - min(1.0, abs(a.get("unique_ratio", 0) - b["unique_ratio"]) / 0.2)]
+            if "mean" in a and "mean" in b:
+                scale = max(a.get("std") or 0, b.get("std") or 0) or abs(a["mean"]) or 1.0
+                parts.append(1 - min(1.0, abs(a["mean"] - b["mean"]) / scale))
+            if a.get("top") or b["top"]:
+                union = set(a.get("top", [])) | set(b["top"])
+                parts.append(len(set(a.get("top", [])) & set(b["top"])) / len(union))
+            scores.append(sum(parts) / len(parts))
+        return sum(scores) / len(scores) if scores else 0.0
+    
+    def _entries(self) -> List[Dict[str, Any]]:
+        if not self.path.exists():
+            return []
+        entries = []
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+        return entries
+    
+    def find(self, fingerprint: Dict[str, Any], threshold: float) -> Optional[Tuple[Dict[str, Any], float]]:
+        """Самый похожий прошлый анализ не ниже порога"""
+        best, best_score = None, threshold
+        for entry in self._entries():
+            score = self.similarity(entry["fingerprint"], fingerprint)
+            # При равенстве берется более поздний запуск
+            if score >= best_score:
+                best, best_score = entry, score
+        return (best, best_score) if best else None
+    
+    def add(self, filename: str, fingerprint: Dict[str, Any], llm_response: str, report_path: Optional[str]):
+        entry = {
+            "run_id": datetime.now().strftime("%Y%m%d_%H%M%S"),
+            "file": filename,
+            "report": report_path,
+            "fingerprint": fingerprint,
+            "llm_response": llm_response
+        }
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(safe_json_dumps(entry, ensure_ascii=False) + "\n")
+    
+    def changes(self, old: Dict[str, Any], new: Dict[str, Any]) -> List[str]:
+        """Заметные отличия новой статистики от прошлой"""
+        lines = []
+        if old.get("rows") and new.get("rows") and old["rows"] != new["rows"]:
+            lines.append(f"- строк: {old['rows']:,} -> {new['rows']:,} ({(new['rows'] / old['rows'] - 1) * 100:+.1f}%)")
+        for name, b in new["columns"].items():
+            a = old["columns"].get(name, {})
+            if abs(a.get("null_percentage", 0) - b["null_percentage"]) >= 1:
+                lines.append(f"- {name}: пропуски {a.get('null_percentage', 0):.1f}% -> {b['null_percentage']:.1f}%")
+            if "mean" in a and "mean" in b and a.get("std") and abs(a["mean"] - b["mean"]) >= 0.1 * a["std"]:
+                lines.append(f"- {name}: среднее {compact_number(a['mean'])} -> {compact_number(b['mean'])}")
+            for edge, label in (("min", "минимум"), ("max", "максимум")):
+                if edge in a and edge in b and a[edge] != b[edge] and \
+                        (b[edge] < a[edge] if edge == "min" else b[edge] > a[edge]):
+                    lines.append(f"- {name}: {label} {compact_number(a[edge])} -> {compact_number(b[edge])}")
+            appeared = [v for v in b["top"] if v not in a.get("top", [])]
+            if appeared and a.get("top"):
+                lines.append(f"- {name}: новые частые значения: {', '.join(clip_text(v, 30) for v in appeared)}")
+        if len(lines) > self.MAX_CHANGES:
+            lines = lines[:self.MAX_CHANGES] + [f"- ... еще {len(lines) - self.MAX_CHANGES}"]
+        return lines
+
 
 class ResultSaver:
     """Сохранение результатов анализа"""
@@ -919,11 +4618,17 @@ class ResultSaver:
         self.logger = logger
         self.output_dir.mkdir(exist_ok=True)
     
-    def save_analysis(self, filename: str, analysis_data: Dict[str, Any], llm_response: str) -> str:
+    def save_analysis(self, filename: str, analysis_data: Dict[str, Any], llm_response: str,
+                      timer: Optional[StageTimer] = None) -> str:
         """Сохранение результатов анализа"""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         base_name = Path(filename).stem
         
+        # Markdown отчет; пишется первым, чтобы время записи попало в timings JSON
+        md_path = self.output_dir / f"{base_name}_report_{timestamp}.md"
+        with (timer or StageTimer()).span("save"), open(md_path, "w", encoding="utf-8") as f:
+            f.write(self._create_markdown_report(filename, analysis_data, llm_response))
+        
         # JSON с полными данными
         json_path = self.output_dir / f"{base_name}_analysis_{timestamp}.json"
         with open(json_path, "w", encoding="utf-8") as f:
@@ -934,11 +4639,6 @@ class ResultSaver:
                 "timestamp": timestamp
             }, ensure_ascii=False, indent=2))
         
-        # Markdown отчет
-        md_path = self.output_dir / f"{base_name}_report_{timestamp}.md"
-        with open(md_path, "w", encoding="utf-8") as f:
-            f.write(self._create_markdown_report(filename, analysis_data, llm_response))
-        
         self.logger.success(f"Результаты сохранены: {json_path}, {md_path}")
         return str(md_path)
     
@@ -989,10 +4689,23 @@ class ResultSaver:
 ## Статистика
 
 ```json
-{safe_json_dumps(analysis_data.get('statistics', {}), ensure_ascii=False, indent=2)}
+{safe_json_dumps({k: v for k, v in analysis_data.get('statistics', {}).items() if k != "minhash"}, ensure_ascii=False, indent=2)}
 ```
 """
         return report
+    
+    def save_join_keys(self, candidates: List[Dict[str, Any]], datasets: List[str]) -> str:
+        """Сохранение найденных связей между наборами"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        json_path = self.output_dir / f"join_keys_{timestamp}.json"
+        with open(json_path, "w", encoding="utf-8") as f:
+            f.write(safe_json_dumps({
+                "datasets": datasets,
+                "candidates": candidates,
+                "timestamp": timestamp
+            }, ensure_ascii=False, indent=2))
+        self.logger.success(f"Связи между наборами сохранены: {json_path}")
+        return str(json_path)
 
 def create_argument_parser() -> argparse.ArgumentParser:
     """Создание парсера аргументов командной строки"""
@@ -1007,6 +4720,10 @@ def create_argument_parser() -> argparse.ArgumentParser:
           %(prog)s -m llama2 -s 20              # другая модель и больше примеров
           %(prog)s --force-separator ";"        # принудительный разделитель
           %(prog)s -c 27 -v                     # ожидается 27 столбцов, подробный режим
+          %(prog)s --sampled --sample-tolerance 0.02  # выборочный режим с точностью 2%%
+          %(prog)s --chunk-size 500000 --key-columns ticket_id  # потоковый режим
+          %(prog)s --all-files                  # все файлы и ключи соединения между ними
+          %(prog)s --watch                      # анализировать файлы по мере появления в ./input/
         """)
     )
     
@@ -1024,22 +4741,573 @@ def create_argument_parser() -> argparse.ArgumentParser:
                        help="Ожидаемое количество столбцов (для CSV)")
     parser.add_argument("--force-separator", 
                        help="Принудительный разделитель (например: ';' или '\\t')")
-    parser.add_argument("--max-chars", type=int, default=4000,
-                       help="Максимум символов для промпта (по умолчанию: 4000)")
+    parser.add_argument("--max-chars", type=int, default=DEFAULT_PROMPT_CHARS,
+                       help=f"Максимум символов для промпта (по умолчанию: {DEFAULT_PROMPT_CHARS})")
+    parser.add_argument("--prompt-tokens", type=int,
+                       help="Бюджет промпта в токенах (по умолчанию: --max-chars / 3)")
+    parser.add_argument("--group-columns", type=int, default=60,
+                       help="Таблицы шире этого числа столбцов анализируются группами (map-reduce); 0 - одним запросом (по умолчанию: 60)")
+    parser.add_argument("--think", action="store_true",
+                       help="Разрешить модели рассуждать перед ответом (qwen3 и др.; по умолчанию выключено)")
+    parser.add_argument("--num-predict", type=int, default=4096,
+                       help="Максимум токенов ответа, 0 - без лимита (по умолчанию: 4096)")
+    parser.add_argument("--num-ctx", type=int,
+                       help="Окно контекста модели (по умолчанию: по бюджету промпта и --num-predict)")
+    parser.add_argument("--temperature", type=float,
+                       help="Температура генерации (по умолчанию: значение модели)")
+    parser.add_argument("--fast-model",
+                       help="Быстрая модель каскада (например qwen3:1.7b); -m используется при эскалации")
+    parser.add_argument("--escalate", choices=["never", "auto", "always"], default="auto",
+                       help="Эскалация на модель -m: never, auto - для сложных данных и ответов, "
+                            "не прошедших проверку, always (по умолчанию: auto)")
+    parser.add_argument("--keep-alive",
+                       help="Сколько модель остается в памяти Ollama после запроса: 30m, 1h, -1 - всегда (по умолчанию - настройка Ollama)")
+    parser.add_argument("--deadline", type=float,
+                       help="Секунды на ответ модели -m при эскалации; затем используется быстрая модель")
+    parser.add_argument("--no-reuse", action="store_true",
+                       help="Не использовать прошлые анализы похожих файлов, всегда вызывать LLM")
+    parser.add_argument("--reuse-threshold", type=float, default=0.95,
+                       help="Минимальное сходство статистики для повторного использования анализа (по умолчанию: 0.95)")
+    parser.add_argument("--llm-concurrency", type=int, default=2,
+                       help="Одновременных запросов к Ollama: группы столбцов и файлы пакетного режима (по умолчанию: 2)")
+    parser.add_argument("--llm-timeout", type=float,
+                       help="Таймаут одного запроса к Ollama в секундах (по умолчанию без ограничения)")
+    parser.add_argument("--llm-retries", type=int, default=2,
+                       help="Повторов запроса к Ollama при ошибке или таймауте (по умолчанию: 2)")
+    parser.add_argument("--llm-backoff", type=float, default=2.0,
+                       help="Пауза перед первым повтором в секундах, дальше удваивается (по умолчанию: 2)")
     parser.add_argument("--no-save", action="store_true",
                        help="Не сохранять результаты в файлы")
     parser.add_argument("-v", "--verbose", action="store_true",
                        help="Подробный вывод с диагностикой")
+    parser.add_argument("--sampled", action="store_true",
+                       help="Выборочный режим: случайные блоки файла с доверительными интервалами (CSV/TSV/Parquet)")
+    parser.add_argument("--sample-tolerance", type=float, default=0.02,
+                       help="Допустимая относительная полуширина интервала для ранней остановки (по умолчанию: 0.02)")
+    parser.add_argument("--sample-confidence", type=float, default=0.95,
+                       help="Уровень доверия интервалов (по умолчанию: 0.95)")
+    parser.add_argument("--sample-block-mb", type=float, default=4.0,
+                       help="Размер случайного блока в МБ (по умолчанию: 4.0)")
+    parser.add_argument("--sample-max-blocks", type=int, default=500,
+                       help="Максимум блоков в выборочном режиме (по умолчанию: 500)")
+    parser.add_argument("--chunk-size", type=int,
+                       help="Потоковый режим: полный проход по чанкам указанного числа строк (CSV/TSV/Parquet)")
+    parser.add_argument("--duplicates", choices=DUPLICATE_METHODS, default="auto",
+                       help="Поиск дубликатов: exact - точно со сбросом на диск, bloom - приближенно, "
+                            "auto - exact, но off в режиме --sampled (по умолчанию: auto)")
+    parser.add_argument("--duplicates-memory-mb", type=float, default=256,
+                       help="Лимит памяти на отпечатки дубликатов в МБ (по умолчанию: 256)")
+    parser.add_argument("--key-columns",
+                       help="Ключевые столбцы для проверки дубликатов через запятую (по умолчанию: *_id)")
+    parser.add_argument("--no-type-inference", action="store_true",
+                       help="Не приводить строковые столбцы к числам, датам и булевым")
+    parser.add_argument("--no-keys", action="store_true",
+                       help="Не искать потенциальные ключи и функциональные зависимости")
+    parser.add_argument("--no-pii", action="store_true",
+                       help="Не искать персональные данные")
+    parser.add_argument("--mask-pii", action="store_true",
+                       help="Маскировать найденные персональные данные в примерах перед отправкой в LLM")
+    parser.add_argument("--arrow", action="store_true",
+                       help="Профилирование CSV/TSV/Parquet ядрами pyarrow.compute без преобразования в pandas")
+    parser.add_argument("-j", "--workers", type=int,
+                       help="Число потоков для статистики по столбцам (по умолчанию: число ядер)")
+    parser.add_argument("--no-correlations", action="store_true",
+                       help="Не считать корреляции между столбцами")
+    parser.add_argument("--all-files", action="store_true",
+                       help="Анализировать все найденные файлы и искать ключи соединения между ними")
+    parser.add_argument("--watch", action="store_true",
+                       help="Наблюдать за директорией и анализировать новые и измененные файлы (с --all-files - и уже лежащие)")
+    parser.add_argument("--watch-debounce", type=float, default=2.0,
+                       help="Секунд без изменения размера, после которых файл считается записанным (по умолчанию: 2)")
+    parser.add_argument("--watch-poll", type=float, default=5.0,
+                       help="Интервал опроса директории без inotify, секунд (по умолчанию: 5)")
+    parser.add_argument("--watch-polling", action="store_true",
+                       help="Опрос вместо inotify (сетевые диски, где inotify не видит чужих записей)")
+    parser.add_argument("--profile", nargs="?", const="",
+                       help="Профиль cProfile всего запуска в файл pstats (по умолчанию: <output-dir>/profile_<время>.pstats)")
+    parser.add_argument("--histogram-bins", type=int, default=20,
+                       help="Число корзин гистограмм числовых столбцов и дат, 0 - отключить (по умолчанию: 20)")
     
     return parser
 
+def process_file(file_to_analyze: FileInfo, analyzer: DataAnalyzer, llm_client: LLMClient,
+                 result_saver: Optional[ResultSaver], config: AnalysisConfig,
+                 analysis_index: Optional[AnalysisIndex] = None) -> Dict[str, Any]:
+    """Анализ одного файла: статистика, ответ LLM, вывод сводки и сохранение отчета"""
+    analyzer.logger.info(f"Анализируем: {file_to_analyze.path}")
+    
+    # Анализ данных
+    analysis_data = analyzer.analyze_file(file_to_analyze)
+    return finish_file(file_to_analyze, analysis_data, analyzer.logger, llm_client, result_saver, config,
+                       analysis_index)
+
+
+# Сводки файлов, завершающихся в потоках пакетного режима, не перемешиваются
+OUTPUT_LOCK = threading.Lock()
+
+
+def finish_file(file_to_analyze: FileInfo, analysis_data: Dict[str, Any], logger: Logger, llm_client: LLMClient,
+                result_saver: Optional[ResultSaver], config: AnalysisConfig,
+                analysis_index: Optional[AnalysisIndex] = None) -> Dict[str, Any]:
+    """Ответ LLM по готовой статистике, вывод сводки и сохранение отчета"""
+    llm_response = answer_file(file_to_analyze, analysis_data, logger, llm_client, config, analysis_index)
+    
+    with OUTPUT_LOCK:
+        print_summary(file_to_analyze, analysis_data, llm_response, config)
+    
+    # Сохранение результатов
+    report_path = save_result(file_to_analyze, analysis_data, llm_response, result_saver, analysis_index)
+    if report_path:
+        print(f"\n📄 Полный отчет сохранен: {report_path}")
+    
+    return analysis_data
+
+
+def answer_file(file_to_analyze: FileInfo, analysis_data: Dict[str, Any], logger: Logger, llm_client: LLMClient,
+                config: AnalysisConfig, analysis_index: Optional[AnalysisIndex] = None,
+                deadline: Optional[float] = None) -> str:
+    """Ответ LLM по готовой статистике или похожий прошлый анализ из индекса.
+    
+    deadline (момент time.monotonic()) ограничивает ожидание в очереди и запросы к Ollama.
+    """
+    started = time.perf_counter()
+    timer = StageTimer(analysis_data.setdefault("timings", {"stages": [], "peak_rss_mb": None}))
+    # Похожий прошлый анализ вместо нового запроса к LLM
+    with timer.span("reuse_lookup"):
+        fingerprint = AnalysisIndex.fingerprint(analysis_data) if analysis_index else None
+        match = analysis_index.find(fingerprint, config.reuse_threshold) if fingerprint else None
+    if match:
+        entry, score = match
+        changes = analysis_index.changes(entry["fingerprint"], fingerprint)
+        analysis_data["reused_analysis"] = {"run_id": entry["run_id"], "file": entry["file"],
+                                            "report": entry.get("report"), "similarity": round(score, 4)}
+        logger.success(f"Использован анализ {entry['run_id']} ({entry['file']}), сходство {score:.3f}")
+        llm_response = (f"{entry['llm_response']}\n\n---\n\n## Изменения относительно прошлого анализа\n\n"
+                        f"Анализ LLM взят из запуска {entry['run_id']} ({os.path.basename(entry['file'])}, "
+                        f"сходство {score:.3f}); модель не вызывалась.\n\n"
+                        + ("\n".join(changes) if changes else "Заметных изменений статистики нет."))
+    else:
+        # LLM анализ; меньшие файлы получают слоты очереди раньше
+        job = LLMJob(file_to_analyze.path, priority=file_to_analyze.size_bytes, timer=timer, deadline=deadline)
+        llm_response = llm_client.analyze_data(
+            os.path.basename(file_to_analyze.path), 
+            analysis_data,
+            job
+        )
+        if job.calls:
+            analysis_data["llm_calls"] = job.calls
+    
+    # Время файла без сохранения: статистика, ожидание в очереди и ответ LLM
+    timings = analysis_data["timings"]
+    timings["total_seconds"] = round(timings.get("analysis_seconds", 0) + time.perf_counter() - started, 3)
+    return llm_response
+
+
+def save_result(file_to_analyze: FileInfo, analysis_data: Dict[str, Any], llm_response: str,
+                result_saver: Optional[ResultSaver], analysis_index: Optional[AnalysisIndex] = None) -> Optional[str]:
+    """Отчеты Markdown и JSON; новый ответ LLM записывается в индекс для повторного использования"""
+    report_path = None
+    if result_saver:
+        report_path = result_saver.save_analysis(file_to_analyze.path, analysis_data, llm_response,
+                                                 StageTimer(analysis_data["timings"]))
+    if analysis_index and not analysis_data.get("reused_analysis"):
+        analysis_index.add(file_to_analyze.path, AnalysisIndex.fingerprint(analysis_data), llm_response, report_path)
+    return report_path
+
+
+def print_summary(file_to_analyze: FileInfo, analysis_data: Dict[str, Any], llm_response: str,
+                  config: AnalysisConfig):
+    """Краткая сводка, структура данных и ответ LLM в консоль"""
+    llm_calls = analysis_data.get("llm_calls")
+    reused = analysis_data.get("reused_analysis")
+    print("\n" + "="*80)
+    print("КРАТКАЯ СВОДКА")
+    print("="*80)
+    overview = analysis_data.get("overview", {})
+    print(f"📊 Файл: {file_to_analyze.path}")
+    print(f"📋 Формат: {overview.get('data_type', 'unknown')}")
+    print(f"📏 Размер: {overview.get('rows', 0):,} строк × {overview.get('cols', 0)} столбцов")
+    print(f"💾 Память: {overview.get('memory_usage_mb', 0):.2f} MB")
+    
+    timings = analysis_data.get("timings")
+    if timings:
+        slowest = sorted((s for s in timings["stages"] if s["stage"] != "discovery"),
+                         key=lambda s: -s["wall_seconds"])[:3]
+        print(f"⏱️  Время: {timings.get('total_seconds', 0):.1f}с, пик памяти "
+              f"{timings['peak_rss_mb'] or '?'} MB; дольше всего: "
+              + ", ".join(f"{s['stage']} {s['wall_seconds']:.1f}с" for s in slowest))
+    
+    # Информация о разделителе
+    separator_info = overview.get("separator_info", {})
+    if separator_info:
+        sep_name = separator_info.get("separator_name", "неизвестно")
+        print(f"🔍 Разделитель: {sep_name}")
+    
+    if reused:
+        print(f"♻️  Анализ LLM взят из запуска {reused['run_id']} (сходство {reused['similarity']:.3f})")
+    if llm_calls:
+        print(f"🤖 LLM: {len(llm_calls)} запр., промпт {sum(c['prompt_tokens'] for c in llm_calls):,} ток., "
+              f"ответ {sum(c['output_tokens'] for c in llm_calls):,} ток., "
+              f"генерация {sum(c['total_seconds'] for c in llm_calls):.1f}с, "
+              f"в очереди {sum(c.get('queue_wait_seconds', 0) for c in llm_calls):.1f}с")
+    
+    input_info = analysis_data.get("statistics", {}).get("input")
+    if input_info:
+        print(f"🗜️  Сжатие: {input_info['compression']}, {input_info['compressed_mb']} MB -> "
+              f"{input_info['uncompressed_mb']} MB, распаковка {input_info['uncompressed_mb_per_s']} MB/s")
+    
+    sampling = analysis_data.get("statistics", {}).get("sampling")
+    if sampling:
+        print(f"🎯 Выборка: {sampling['blocks_read']}/{sampling['blocks_total']} блоков "
+              f"({sampling['fraction_read']:.1%}), сходимость: {'да' if sampling['converged'] else 'нет'}")
+    
+    print("\n" + "="*80)
+    print("СТРУКТУРА ДАННЫХ")
+    print("="*80)
+    print(safe_json_dumps(overview, ensure_ascii=False, indent=2))
+    
+    print("\n" + "="*80)
+    print("АНАЛИЗ LLM")
+    print("="*80)
+    print(llm_response)
+    
+    if config.verbose:
+        print("\n" + "="*80)
+        print("ПОПЫТКИ ЧТЕНИЯ (первые 5)")
+        print("="*80)
+        attempts = overview.get("read_attempts", [])
+        for i, (cfg, status) in enumerate(attempts[:5], 1):
+            print(f"{i:02d}. {cfg} -> {status}")
+        
+        print("\n" + "="*80) 
+        print("ПРИМЕРЫ ДАННЫХ (первые 3 записи)")
+        print("="*80)
+        sample = analysis_data.get("sample", [])
+        print(safe_json_dumps(sample[:3], ensure_ascii=False, indent=2))
+
+
+class FilePipeline:
+    """Статистика файлов - в вызывающем потоке, ответы LLM, сводки и сохранение - в пуле.
+    
+    Если ответа LLM ждут 2*llm_concurrency файлов, анализ следующего откладывается:
+    готовая статистика не копится в памяти.
+    """
+    def __init__(self, analyzer: DataAnalyzer, llm_client: LLMClient, result_saver: Optional[ResultSaver],
+                 config: AnalysisConfig, analysis_index: Optional[AnalysisIndex] = None):
+        self.analyzer = analyzer
+        self.llm_client = llm_client
+        self.result_saver = result_saver
+        self.config = config
+        self.analysis_index = analysis_index
+        self.max_pending = 2 * max(1, config.llm_concurrency)
+        # Потоков больше, чем слотов: ожидающие файлы стоят в очереди запросов с приоритетом и учетом ожидания
+        self.pool = ThreadPoolExecutor(max_workers=self.max_pending)
+        self.pending = {}
+    
+    def submit(self, file_to_analyze: FileInfo) -> Dict[str, Dict[str, Any]]:
+        """Статистика файла и постановка в очередь LLM; возвращает файлы, завершенные за время ожидания"""
+        finished = self.collect()
+        if len(self.pending) >= self.max_pending:
+            self.analyzer.logger.debug(f"Ждем LLM: {len(self.pending)} файлов в очереди")
+            finished.update(self.collect(FIRST_COMPLETED))
+        self.analyzer.logger.info(f"Анализируем: {file_to_analyze.path}")
+        try:
+            analysis_data = self.analyzer.analyze_file(file_to_analyze)
+        except Exception as e:
+            self.analyzer.logger.error(f"Файл {file_to_analyze.path} пропущен: {e}")
+            return finished
+        self.pending[self.pool.submit(finish_file, file_to_analyze, analysis_data, self.analyzer.logger,
+                                      self.llm_client, self.result_saver, self.config,
+                                      self.analysis_index)] = file_to_analyze.path
+        return finished
+    
+    def collect(self, return_when: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """Завершенные файлы: без return_when - только уже готовые, иначе с ожиданием (wait)"""
+        if return_when is None:
+            done = [future for future in self.pending if future.done()]
+        else:
+            done = wait(self.pending, return_when=return_when).done if self.pending else []
+        results = {}
+        for future in done:
+            path = self.pending.pop(future)
+            try:
+                results[path] = future.result()
+            except Exception as e:
+                self.analyzer.logger.error(f"Файл {path} пропущен: {e}")
+        return results
+    
+    def close(self) -> Dict[str, Dict[str, Any]]:
+        """Дождаться всех файлов в очереди"""
+        results = self.collect(ALL_COMPLETED)
+        self.pool.shutdown()
+        return results
+
+
+def run_batch(files: List[FileInfo], analyzer: DataAnalyzer, llm_client: LLMClient,
+              result_saver: Optional[ResultSaver], config: AnalysisConfig,
+              analysis_index: Optional[AnalysisIndex] = None) -> Dict[str, Dict[str, Any]]:
+    """Пакетный режим: статистика по файлам последовательно, запросы к LLM - параллельно с ней.
+    Файлы идут от меньших к большим.
+    """
+    results = {}
+    pipeline = FilePipeline(analyzer, llm_client, result_saver, config, analysis_index)
+    for file_to_analyze in sorted(files, key=lambda f: f.size_bytes):
+        results.update(pipeline.submit(file_to_analyze))
+    results.update(pipeline.close())
+    # Порядок файлов как при поиске
+    return {f.path: results[f.path] for f in files if f.path in results}
+
+
+def file_signature(path: str) -> Optional[Tuple[int, int]]:
+    """Размер и время изменения (нс); None, если файла уже нет"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def walk_files(root: str) -> List[str]:
+    return [os.path.join(directory, name) for directory, _, names in os.walk(root) for name in names]
+
+
+class InotifyWatcher:
+    """Изменения в дереве каталогов через inotify (Linux) без внешних пакетов.
+    
+    Каталог сканируется один раз при старте (установка наблюдения на подкаталоги);
+    дальше ядро само сообщает о закрытых после записи и перемещенных файлах.
+    """
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ISDIR = 0x40000000
+    MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+    EVENT = struct.Struct("iIII")  # wd, mask, cookie, len; затем имя длиной len
+    
+    def __init__(self, root: str):
+        import ctypes
+        import ctypes.util
+        self.root = root
+        self._ctypes = ctypes
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        if not hasattr(self._libc, "inotify_init1"):
+            raise OSError(errno.ENOSYS, "inotify недоступен")
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+        self.dirs: Dict[int, str] = {}
+        self._add_tree(root)
+    
+    def _add_tree(self, root: str) -> List[str]:
+        """Наблюдение за root и подкаталогами; файлы, уже лежащие в них"""
+        files = []
+        for directory, _, names in os.walk(root):
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), self.MASK)
+            if wd < 0:
+                error = self._ctypes.get_errno()
+                if error == errno.ENOENT:
+                    continue
+                raise OSError(error, f"inotify_add_watch {directory} (лимит: fs.inotify.max_user_watches)")
+            self.dirs[wd] = directory
+            files.extend(os.path.join(directory, name) for name in names)
+        return files
+    
+    def changes(self, timeout: float) -> List[str]:
+        """Пути файлов, записанных или перемещенных за время ожидания (не дольше timeout секунд)"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        paths = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = self.EVENT.unpack_from(data, offset)
+            offset += self.EVENT.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            if mask & self.IN_Q_OVERFLOW:
+                # События потеряны: один раз проходим дерево, неизмененные файлы отсеет подпись
+                paths.extend(walk_files(self.root))
+                continue
+            if mask & self.IN_IGNORED:
+                self.dirs.pop(wd, None)
+                continue
+            directory = self.dirs.get(wd)
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, name)
+            if mask & self.IN_ISDIR:
+                # Новый или перемещенный каталог мог появиться уже с файлами
+                paths.extend(self._add_tree(path))
+            else:
+                paths.append(path)
+        return paths
+    
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Запасной вариант без inotify: обход дерева раз в interval секунд и сравнение подписей файлов"""
+    def __init__(self, root: str, interval: float):
+        self.root = root
+        self.interval = interval
+        self.snapshot = self._scan()
+        self.next_scan = time.monotonic() + interval
+    
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        snapshot = {}
+        for path in walk_files(self.root):
+            signature = file_signature(path)
+            if signature:
+                snapshot[path] = signature
+        return snapshot
+    
+    def changes(self, timeout: float) -> List[str]:
+        delay = self.next_scan - time.monotonic()
+        if delay > timeout:
+            time.sleep(timeout)
+            return []
+        time.sleep(max(0.0, delay))
+        snapshot = self._scan()
+        self.next_scan = time.monotonic() + self.interval
+        changed = [path for path, signature in snapshot.items() if self.snapshot.get(path) != signature]
+        self.snapshot = snapshot
+        return changed
+    
+    def close(self):
+        pass
+
+
+class Debouncer:
+    """Файлы, размер и время изменения которых не менялись seconds секунд: запись закончена"""
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.pending: Dict[str, Tuple[Tuple[int, int], float]] = {}
+    
+    def touch(self, path: str):
+        signature = file_signature(path)
+        if signature is None:
+            self.pending.pop(path, None)
+        else:
+            self.pending[path] = (signature, time.monotonic())
+    
+    def ready(self) -> List[Tuple[str, Tuple[int, int]]]:
+        """Устоявшиеся файлы с подписями; у остальных подпись перепроверяется"""
+        now = time.monotonic()
+        ready = []
+        for path, (signature, since) in list(self.pending.items()):
+            current = file_signature(path)
+            if current is None:
+                del self.pending[path]
+            elif current != signature:
+                self.pending[path] = (current, now)
+            elif now - since >= self.seconds:
+                del self.pending[path]
+                ready.append((path, signature))
+        return ready
+
+
+def create_watcher(config: AnalysisConfig, logger: Logger):
+    """inotify, если доступен и не выключен --watch-polling, иначе опрос"""
+    if not config.watch_polling and sys.platform.startswith("linux"):
+        try:
+            watcher = InotifyWatcher(config.input_dir)
+            logger.info(f"Наблюдение за {config.input_dir} (inotify, каталогов: {len(watcher.dirs)})")
+            return watcher
+        except OSError as e:
+            logger.warning(f"inotify недоступен: {e}, переходим на опрос")
+    logger.info(f"Наблюдение за {config.input_dir} (опрос раз в {config.watch_poll:g}с)")
+    return PollingWatcher(config.input_dir, config.watch_poll)
+
+
+def run_watch(analyzer: DataAnalyzer, llm_client: LLMClient, result_saver: Optional[ResultSaver],
+              config: AnalysisConfig, analysis_index: Optional[AnalysisIndex] = None):
+    """Режим наблюдения: новые и измененные файлы анализируются, как только их запись закончена.
+    
+    Работает до Ctrl+C или SIGTERM; файлы, уже отправленные в LLM, при остановке дообрабатываются.
+    """
+    if not os.path.isdir(config.input_dir):
+        raise FileNotFoundError(f"Директория {config.input_dir} не найдена")
+    handler = analyzer.file_handler
+    # Отчеты в output внутри input не должны попадать в анализ
+    output_dir = os.path.abspath(config.output_dir) + os.sep if config.output_dir else None
+    stop = threading.Event()
+    
+    def on_signal(signum, frame):
+        # Первый сигнал - мягкая остановка, второй прерывает сразу
+        if stop.is_set():
+            raise KeyboardInterrupt
+        stop.set()
+    
+    # Обработчики сигналов ставятся только из основного потока
+    previous = {sig: signal.signal(sig, on_signal) for sig in (signal.SIGINT, signal.SIGTERM)} \
+        if threading.current_thread() is threading.main_thread() else {}
+    watcher = create_watcher(config, analyzer.logger)
+    pipeline = FilePipeline(analyzer, llm_client, result_saver, config, analysis_index)
+    debouncer = Debouncer(config.watch_debounce)
+    processed: Dict[str, Tuple[int, int]] = {}
+    analyzed = 0
+    try:
+        if config.all_files:
+            # Наблюдение уже запущено: файлы, появившиеся во время обхода, не потеряются
+            for file_to_analyze in sorted(handler.find_files(config.input_dir, config.file_pattern),
+                                          key=lambda f: f.size_bytes):
+                if stop.is_set():
+                    break
+                processed[file_to_analyze.path] = file_signature(file_to_analyze.path)
+                analyzed += len(pipeline.submit(file_to_analyze))
+        
+        while not stop.is_set():
+            # Пока есть недописанные файлы, их подписи проверяются чаще
+            timeout = min(1.0, max(0.1, config.watch_debounce / 4)) if debouncer.pending else 1.0
+            for path in watcher.changes(timeout):
+                if handler.matches(path, config.file_pattern) and \
+                        not (output_dir and os.path.abspath(path).startswith(output_dir)):
+                    debouncer.touch(path)
+            for path, signature in debouncer.ready():
+                if processed.get(path) == signature:
+                    continue
+                processed[path] = signature
+                try:
+                    file_to_analyze = handler.file_info(path)
+                except OSError as e:
+                    analyzer.logger.warning(f"Файл {path} недоступен: {e}")
+                    continue
+                analyzed += len(pipeline.submit(file_to_analyze))
+            analyzed += len(pipeline.collect())
+    finally:
+        for sig, handler_func in previous.items():
+            signal.signal(sig, handler_func)
+        watcher.close()
+        if pipeline.pending:
+            analyzer.logger.info(f"Остановка: дожидаемся {len(pipeline.pending)} файлов в очереди LLM")
+        analyzed += len(pipeline.close())
+    analyzer.logger.success(f"Наблюдение остановлено, проанализировано файлов: {analyzed}")
+
 def main():
     """Основная функция"""
     parser = create_argument_parser()
     args = parser.parse_args()
+    check_required_packages()
+    config = config_from_args(args)
     
-    # Конфигурация
-    config = AnalysisConfig(
+    if args.profile is None:
+        run_analysis(config)
+        return
+    profile_path = args.profile or os.path.join(config.output_dir or ".",
+                                                f"profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pstats")
+    profile_run(lambda: run_analysis(config), profile_path)
+
+
+def config_from_args(args: argparse.Namespace) -> AnalysisConfig:
+    """Конфигурация из аргументов create_argument_parser"""
+    return AnalysisConfig(
         input_dir=args.input_dir,
         output_dir=args.output_dir or (DEFAULT_OUTPUT_DIR if not args.no_save else None),
         model_name=args.model,
@@ -1049,84 +5317,139 @@ def main():
         file_pattern=args.file_pattern,
         save_results=not args.no_save,
         verbose=args.verbose,
-        force_separator=args.force_separator
+        force_separator=args.force_separator,
+        sampled=args.sampled,
+        sample_tolerance=args.sample_tolerance,
+        sample_confidence=args.sample_confidence,
+        sample_block_mb=args.sample_block_mb,
+        sample_max_blocks=args.sample_max_blocks,
+        chunk_size=args.chunk_size,
+        duplicates=args.duplicates,
+        duplicates_memory_mb=args.duplicates_memory_mb,
+        key_columns=[c.strip() for c in args.key_columns.split(",")] if args.key_columns else None,
+        histogram_bins=args.histogram_bins,
+        infer_types=not args.no_type_inference,
+        discover_keys=not args.no_keys,
+        pii_scan=not args.no_pii,
+        mask_pii=args.mask_pii,
+        all_files=args.all_files,
+        minhash=args.all_files,
+        correlations=not args.no_correlations,
+        workers=args.workers,
+        arrow=args.arrow,
+        prompt_tokens=args.prompt_tokens,
+        llm_group_columns=args.group_columns,
+        llm_concurrency=args.llm_concurrency,
+        llm_timeout=args.llm_timeout,
+        llm_retries=args.llm_retries,
+        llm_backoff=args.llm_backoff,
+        llm_think=args.think,
+        llm_num_predict=args.num_predict or None,
+        llm_num_ctx=args.num_ctx,
+        llm_temperature=args.temperature,
+        llm_keep_alive=args.keep_alive,
+        llm_fast_model=args.fast_model,
+        llm_escalate=args.escalate,
+        llm_deadline=args.deadline,
+        reuse_analyses=not args.no_reuse,
+        reuse_threshold=args.reuse_threshold,
+        watch=args.watch,
+        watch_debounce=args.watch_debounce,
+        watch_poll=args.watch_poll,
+        watch_polling=args.watch_polling
     )
+
+
+def profile_run(func, path: str):
+    """Запуск func под cProfile: статистика в path (pstats) и 25 функций с наибольшим суммарным временем.
     
+    cProfile видит только основной поток: чтение, разбор и порядок шагов статистики; работа
+    пулов потоков и запросы пакетного режима видны как ожидание.
+    """
+    import cProfile
+    import pstats
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(func)
+    finally:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(path)
+        print("\n" + "="*80)
+        print("ПРОФИЛЬ (cProfile, основной поток)")
+        print("="*80)
+        pstats.Stats(profiler, stream=sys.stdout).sort_stats("cumulative").print_stats(25)
+        print(f"📈 Профиль сохранен: {path} (просмотр: python -m pstats {path})")
+
+
+def create_llm_client(config: AnalysisConfig, logger: Logger) -> LLMClient:
+    return LLMClient(config.model_name, logger, prompt_tokens=config.prompt_budget(),
+                     group_columns=config.llm_group_columns, concurrency=config.llm_concurrency,
+                     generation=GenerationOptions(think=config.llm_think, num_predict=config.llm_num_predict,
+                                                  num_ctx=config.llm_num_ctx, temperature=config.llm_temperature,
+                                                  keep_alive=config.llm_keep_alive),
+                     fast_model=config.llm_fast_model, escalate=config.llm_escalate,
+                     deadline=config.llm_deadline, timeout=config.llm_timeout,
+                     retries=config.llm_retries, backoff=config.llm_backoff)
+
+
+def run_analysis(config: AnalysisConfig):
+    """Поиск файлов, анализ и сохранение по готовой конфигурации"""
     # Инициализация компонентов
     analyzer = DataAnalyzer(config)
-    llm_client = LLMClient(config.model_name, analyzer.logger)
+    llm_client = create_llm_client(config, analyzer.logger)
     result_saver = ResultSaver(config.output_dir, analyzer.logger) if config.save_results else None
+    # Индекс хранится рядом с отчетами, поэтому без сохранения результатов не используется
+    analysis_index = AnalysisIndex(config.output_dir, analyzer.logger) \
+        if config.save_results and config.reuse_analyses else None
     
     try:
+        if config.watch:
+            run_watch(analyzer, llm_client, result_saver, config, analysis_index)
+            return
+        
         # Поиск файлов
-        files = analyzer.file_handler.find_files(config.input_dir, config.file_pattern)
+        discovery = StageTimer()
+        with discovery.span("discovery") as stage:
+            files = analyzer.file_handler.find_files(config.input_dir, config.file_pattern)
+            stage["files"] = len(files)
+        analyzer.run_stages = discovery.timings["stages"]
         if not files:
             analyzer.logger.error(f"Файлы не найдены в {config.input_dir}")
             sys.exit(1)
         
         analyzer.logger.info(f"Найдено файлов: {len(files)}")
         
-        # Берем первый файл для анализа
-        file_to_analyze = files[0]
-        analyzer.logger.info(f"Анализируем: {file_to_analyze.path}")
-        
-        # Анализ данных
-        analysis_data = analyzer.analyze_file(file_to_analyze)
-        
-        # LLM анализ
-        llm_response = llm_client.analyze_data(
-            os.path.basename(file_to_analyze.path), 
-            analysis_data
-        )
-        
-        # Вывод результатов
-        print("\n" + "="*80)
-        print("КРАТКАЯ СВОДКА")
-        print("="*80)
-        overview = analysis_data.get("overview", {})
-        print(f"📊 Файл: {file_to_analyze.path}")
-        print(f"📋 Формат: {overview.get('data_type', 'unknown')}")
-        print(f"📏 Размер: {overview.get('rows', 0):,} строк × {overview.get('cols', 0)} столбцов")
-        print(f"💾 Память: {overview.get('memory_usage_mb', 0):.2f} MB")
-        
-        # Информация о разделителе
-        separator_info = overview.get("separator_info", {})
-        if separator_info:
-            sep_name = separator_info.get("separator_name", "неизвестно")
-            print(f"🔍 Разделитель: {sep_name}")
-        
-        print("\n" + "="*80)
-        print("СТРУКТУРА ДАННЫХ")
-        print("="*80)
-        print(safe_json_dumps(overview, ensure_ascii=False, indent=2))
-        
-        print("\n" + "="*80)
-        print("АНАЛИЗ LLM")
-        print("="*80)
-        print(llm_response)
+        # По умолчанию анализируется первый файл, в пакетном режиме - все
+        if config.all_files:
+            results = run_batch(files, analyzer, llm_client, result_saver, config, analysis_index)
+            queue_report = llm_client.queue.report()
+            if queue_report["requests"]:
+                print(f"\n🚦 Очередь LLM: {queue_report['requests']} запр. по {queue_report['slots']} одновременно, "
+                      f"макс. очередь {queue_report['max_queue_depth']}, ожидание среднее "
+                      f"{queue_report['mean_wait_seconds']}с / p95 {queue_report['p95_wait_seconds']}с / "
+                      f"макс. {queue_report['max_wait_seconds']}с, повторов {queue_report['retries']}")
+        else:
+            results = {files[0].path: process_file(files[0], analyzer, llm_client, result_saver, config,
+                                                   analysis_index)}
         
-        if config.verbose:
-            print("\n" + "="*80)
-            print("ПОПЫТКИ ЧТЕНИЯ (первые 5)")
-            print("="*80)
-            attempts = overview.get("read_attempts", [])
-            for i, (cfg, status) in enumerate(attempts[:5], 1):
-                print(f"{i:02d}. {cfg} -> {status}")
+        if config.all_files and len(results) > 1:
+            index = JoinKeyIndex()
+            for path, analysis_data in results.items():
+                index.add(os.path.relpath(path, config.input_dir), analysis_data)
+            candidates = index.candidates()
             
-            print("\n" + "="*80) 
-            print("ПРИМЕРЫ ДАННЫХ (первые 3 записи)")
+            print("\n" + "="*80)
+            print("СВЯЗИ МЕЖДУ НАБОРАМИ")
             print("="*80)
-            sample = analysis_data.get("sample", [])
-            print(safe_json_dumps(sample[:3], ensure_ascii=False, indent=2))
-        
-        # Сохранение результатов
-        if result_saver:
-            report_path = result_saver.save_analysis(
-                file_to_analyze.path,
-                analysis_data, 
-                llm_response
-            )
-            print(f"\n📄 Полный отчет сохранен: {report_path}")
+            for item in candidates[:20]:
+                left, right = item["left"], item["right"]
+                print(f"{'🔑' if item['relation'] == 'join_key' else '🔗'} {left['dataset']}.{left['column']} ↔ "
+                      f"{right['dataset']}.{right['column']}: Жаккар {item['jaccard']}, "
+                      f"вложенность {item['containment']}")
+            if not candidates:
+                print("Общих столбцов не найдено")
+            if result_saver:
+                result_saver.save_join_keys(candidates, [os.path.relpath(p, config.input_dir) for p in results])
         
         analyzer.logger.success("Анализ завершен успешно!")
         
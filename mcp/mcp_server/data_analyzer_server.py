@@ -0,0 +1,418 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from mcp.server import InitializationOptions
+from mcp.server.lowlevel import Server, NotificationOptions
+from mcp.server.stdio import stdio_server
+import mcp.types as types
+
+# Настройка кодировки для Windows
+if sys.platform == "win32" and os.environ.get('PYTHONIOENCODING') is None:
+    sys.stdin.reconfigure(encoding="utf-8")
+    sys.stdout.reconfigure(encoding="utf-8")
+    sys.stderr.reconfigure(encoding="utf-8")
+
+# Анализатор лежит в каталоге LDT репозитория
+LDT_DIR = os.environ.get("ANALYZER_LDT_DIR") or os.path.join(os.path.dirname(__file__), "..", "..", "LDT")
+sys.path.insert(0, os.path.abspath(LDT_DIR))
+import universal_data_analyzer as uda  # noqa: E402
+
+logging.basicConfig(level=logging.INFO, stream=sys.stderr, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('mcp_data_analyzer')
+logger.info("Starting MCP Data Analyzer Server")
+
+# Данные по умолчанию - та же папка, что у файлового сервера (server_3.py): агент создает файлы и профилирует их
+BASE_DIR = os.environ.get("ANALYZER_INPUT_DIR") or os.path.join(os.path.dirname(__file__), "files")
+# Отчеты, индекс прошлых анализов и кэш профилей
+OUTPUT_DIR = os.environ.get("ANALYZER_OUTPUT_DIR") or os.path.join(os.path.dirname(__file__), "analyzer_output")
+MODEL = os.environ.get("ANALYZER_MODEL") or uda.DEFAULT_MODEL
+PROMPT_TOKENS = int(os.environ.get("ANALYZER_PROMPT_TOKENS") or 3000)
+
+MODES = ["auto", "full", "sampled"]
+SAMPLED_FROM_MB = 500  # В режиме auto файлы больше этого профилируются выборочно
+PROGRESS_INTERVAL = 2.0  # Секунд между уведомлениями о прогрессе
+MEMORY_CACHE_SIZE = 32
+
+os.makedirs(BASE_DIR, exist_ok=True)
+os.makedirs(OUTPUT_DIR, exist_ok=True)
+
+
+class ProfileCache:
+    """Профили и рекомендации по файлам: в памяти и на диске (сервер может перезапускаться на каждую сессию).
+
+    Запись действительна, пока у файла те же размер и время изменения; полный профиль
+    подходит и для запроса выборочного.
+    """
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        self.memory: OrderedDict = OrderedDict()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, file_path: str) -> str:
+        return os.path.join(self.cache_dir, hashlib.sha1(file_path.encode("utf-8")).hexdigest() + ".json")
+
+    def load(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """Последняя запись для файла (возможно, устаревшая)"""
+        if file_path in self.memory:
+            self.memory.move_to_end(file_path)
+            return self.memory[file_path]
+        try:
+            with open(self._path(file_path), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        self._remember(file_path, entry)
+        return entry
+
+    def save(self, file_path: str, entry: Dict[str, Any]):
+        with open(self._path(file_path), "w", encoding="utf-8") as f:
+            f.write(uda.safe_json_dumps(entry, ensure_ascii=False))
+        self._remember(file_path, entry)
+
+    def _remember(self, file_path: str, entry: Dict[str, Any]):
+        self.memory[file_path] = entry
+        self.memory.move_to_end(file_path)
+        while len(self.memory) > MEMORY_CACHE_SIZE:
+            self.memory.popitem(last=False)
+
+    @staticmethod
+    def fresh(entry: Optional[Dict[str, Any]], signature, mode: str) -> bool:
+        return bool(entry) and tuple(entry["signature"]) == tuple(signature) and entry["mode"] in (mode, "full")
+
+
+class Progress:
+    """Уведомления notifications/progress, если клиент передал progressToken"""
+    def __init__(self, server: Server):
+        ctx = server.request_context
+        self.session = ctx.session
+        self.request_id = ctx.request_id
+        self.token = ctx.meta.progressToken if ctx.meta else None
+        self.step = 0
+
+    async def __call__(self, message: str, total: Optional[float] = None):
+        if self.token is None:
+            return
+        self.step += 1
+        try:
+            await self.session.send_progress_notification(self.token, self.step, total, message,
+                                                          related_request_id=str(self.request_id))
+        except Exception as e:
+            logger.debug(f"Уведомление о прогрессе не отправлено: {e}")
+
+
+class AnalyzerTools:
+    def __init__(self, base_dir: str, output_dir: str):
+        self.base_dir = base_dir
+        self.config = uda.AnalysisConfig(
+            input_dir=base_dir, output_dir=output_dir, model_name=MODEL, sample_rows=5,
+            max_chars=uda.DEFAULT_PROMPT_CHARS, expected_cols=None, file_pattern=None,
+            verbose=False, save_results=True, prompt_tokens=PROMPT_TOKENS
+        )
+        self.logger = uda.Logger(False)
+        self.file_handler = uda.FileHandler(self.logger)
+        self.llm_client = uda.create_llm_client(self.config, self.logger)
+        self.result_saver = uda.ResultSaver(output_dir, self.logger)
+        self.analysis_index = uda.AnalysisIndex(output_dir, self.logger)
+        self.cache = ProfileCache(os.path.join(output_dir, "profile_cache"))
+        # Статистика - по одному файлу (нагрузка на CPU), запросы к LLM - через очередь LLMClient
+        self.analysis_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="analysis")
+        self.llm_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="llm")
+        # Одновременные вызовы для одного файла ждут одного и того же расчета
+        self.running: Dict[tuple, asyncio.Future] = {}
+        # и все получают уведомления о его прогрессе
+        self.listeners: Dict[tuple, List[Progress]] = {}
+
+    def resolve(self, file_name: str) -> str:
+        """Путь файла в базовой директории; файлы вне нее недоступны"""
+        root = os.path.realpath(self.base_dir)
+        path = os.path.realpath(os.path.join(root, file_name))
+        if os.path.commonpath([root, path]) != root:
+            raise ValueError(f"Файл '{file_name}' вне базовой директории")
+        if not os.path.isfile(path):
+            raise ValueError(f"Файл '{file_name}' не найден")
+        if not self.file_handler.matches(path):
+            raise ValueError(f"Формат файла '{file_name}' не поддерживается: CSV, TSV, JSON, XML, Excel, Parquet")
+        return path
+
+    def list_data_files(self) -> str:
+        """Поддерживаемые файлы данных в базовой директории с отметкой о профиле в кэше."""
+        files = self.file_handler.find_files(self.base_dir)
+        if not files:
+            return f"В директории {self.base_dir} нет файлов данных"
+        lines = [f"Файлы данных в {self.base_dir}:"]
+        for f in sorted(files, key=lambda f: f.path):
+            entry = self.cache.load(f.path)
+            cached = " ✓ профиль в кэше" if self.cache.fresh(entry, uda.file_signature(f.path), "sampled") else ""
+            lines.append(f"📄 {os.path.relpath(f.path, self.base_dir)} ({f.format}, "
+                         f"{f.size_bytes / 1024 / 1024:.1f} MB){cached}")
+        return "\n".join(lines)
+
+    async def profile_file(self, file_name: str, mode: str, refresh: bool, progress: Progress) -> str:
+        """Профиль файла: из кэша или новый расчет в пуле потоков с уведомлениями о прогрессе."""
+        path = self.resolve(file_name)
+        entry, cached = await self._profile(path, mode, refresh, progress)
+        footer = (f"\n\n(профиль из кэша от {entry['created']})" if cached
+                  else f"\n\n(профилирование: {entry['analysis_data']['timings'].get('analysis_seconds', 0):.1f}с)")
+        return self.llm_client.describe(file_name, entry["analysis_data"]) + footer
+
+    async def get_cached_profile(self, file_name: str) -> str:
+        """Готовый профиль без расчета; если файл изменился, профиль помечается как устаревший."""
+        path = self.resolve(file_name)
+        entry = await asyncio.to_thread(self.cache.load, path)
+        if not entry:
+            return f"Профиля для '{file_name}' нет в кэше, вызовите profile_file"
+        note = "" if tuple(entry["signature"]) == tuple(uda.file_signature(path) or ()) else \
+            " ⚠ файл изменился после профилирования, обновите профиль: profile_file с refresh=true"
+        return (self.llm_client.describe(file_name, entry["analysis_data"])
+                + f"\n\n(профиль из кэша от {entry['created']}, режим {entry['mode']}){note}")
+
+    async def get_recommendations(self, file_name: str, mode: str, refresh: bool, progress: Progress) -> str:
+        """Рекомендации LLM по профилю файла; ответ кэшируется вместе с профилем."""
+        path = self.resolve(file_name)
+        entry, _ = await self._profile(path, mode, refresh, progress)
+        recommendations = entry.setdefault("recommendations", {})
+        if MODEL in recommendations and not refresh:
+            await progress("Рекомендации из кэша", total=1)
+            return recommendations[MODEL]
+        future = self._shared(("llm", path, MODEL), lambda: self._answer(path, entry))
+        response = await self._wait(future, progress, f"Ожидание ответа {MODEL}")
+        recommendations[MODEL] = response
+        await asyncio.to_thread(self.cache.save, path, entry)
+        return response
+
+    async def _profile(self, path: str, mode: str, refresh: bool, progress: Progress):
+        """(запись кэша, взята ли из кэша)"""
+        signature = uda.file_signature(path)
+        if signature is None:  # Файл удален после проверки пути
+            raise ValueError(f"Файл '{os.path.basename(path)}' не найден")
+        if mode == "auto":
+            mode = "sampled" if signature[0] > SAMPLED_FROM_MB * 1024 * 1024 else "full"
+        entry = await asyncio.to_thread(self.cache.load, path)
+        if not refresh and self.cache.fresh(entry, signature, mode):
+            return entry, True
+        key = ("profile", path, mode)
+        listeners = self.listeners.setdefault(key, [])
+        listeners.append(progress)
+        try:
+            future = self._shared(key, lambda: self._analyze(path, mode, signature, self._broadcast(key)))
+            # Отмена одного вызова не прерывает расчет, который ждут другие
+            return await asyncio.shield(future), False
+        finally:
+            listeners.remove(progress)
+            if not listeners:
+                self.listeners.pop(key, None)
+
+    def _shared(self, key: tuple, start: Callable[[], Awaitable[Any]]) -> asyncio.Future:
+        """Расчет для ключа: запускается первым вызовом, остальные ждут его же до завершения"""
+        future = self.running.get(key)
+        if future is None:
+            future = self.running[key] = asyncio.ensure_future(start())
+            future.add_done_callback(lambda _: self.running.pop(key, None))
+        return future
+
+    def _broadcast(self, key: tuple) -> Callable[..., Awaitable[None]]:
+        """Прогресс расчета всем вызовам, которые его ждут, включая присоединившихся позже"""
+        async def notify(message: str, total: Optional[float] = None):
+            for progress in list(self.listeners.get(key, ())):
+                await progress(message, total)
+        return notify
+
+    async def _analyze(self, path: str, mode: str, signature,
+                       progress: Callable[..., Awaitable[None]]) -> Dict[str, Any]:
+        analyzer = uda.DataAnalyzer(replace(self.config, sampled=mode == "sampled"))
+        file_info = self.file_handler.file_info(path)
+        name = os.path.basename(path)
+        await progress(f"Профилирование {name} ({mode})")
+        future = asyncio.get_running_loop().run_in_executor(self.analysis_pool, analyzer.analyze_file, file_info)
+        reported = 0
+        started = time.monotonic()
+        while True:
+            done, _ = await asyncio.wait({future}, timeout=PROGRESS_INTERVAL)
+            # Этапы, завершенные анализатором (раздел timings), - как сообщения о прогрессе
+            stages = analyzer.timer.timings["stages"]
+            if len(stages) > reported:
+                reported = len(stages)
+                await progress(f"{name}: {stages[-1]['stage']} готов, {time.monotonic() - started:.0f}с")
+            elif not done:
+                await progress(f"{name}: профилирование, {time.monotonic() - started:.0f}с")
+            if done:
+                break
+        analysis_data = future.result()
+        entry = {"signature": list(signature), "mode": mode, "created": uda.datetime.now().isoformat(timespec="seconds"),
+                 "analysis_data": analysis_data}
+        await asyncio.to_thread(self.cache.save, path, entry)
+        return entry
+
+    async def _answer(self, path: str, entry: Dict[str, Any]) -> str:
+        file_info = self.file_handler.file_info(path)
+        # Копия: timings ответа не должны попасть в кэш профиля при ошибке LLM
+        analysis_data = json.loads(uda.safe_json_dumps(entry["analysis_data"]))
+
+        def answer():
+            response = uda.answer_file(file_info, analysis_data, self.logger, self.llm_client, self.config,
+                                       self.analysis_index)
+            uda.save_result(file_info, analysis_data, response, self.result_saver, self.analysis_index)
+            return response
+        return await asyncio.get_running_loop().run_in_executor(self.llm_pool, answer)
+
+    @staticmethod
+    async def _wait(future: asyncio.Future, progress: Progress, message: str):
+        """Ожидание общего расчета со своими уведомлениями; отмена ожидания расчет не прерывает"""
+        started = time.monotonic()
+        while True:
+            done, _ = await asyncio.wait({future}, timeout=PROGRESS_INTERVAL)
+            if done:
+                return future.result()
+            await progress(f"{message}, {time.monotonic() - started:.0f}с")
+
+
+def tool_mode(arguments: Dict[str, Any]) -> str:
+    """Режим профилирования из аргументов инструмента (по умолчанию auto)"""
+    mode = arguments.get("mode", "auto")
+    if mode not in MODES:
+        raise ValueError(f"Неизвестный режим '{mode}': допустимы {', '.join(MODES)}")
+    return mode
+
+
+async def main(base_dir: str, output_dir: str):
+    logger.info(f"Starting Data Analyzer MCP Server with base dir: {base_dir}")
+
+    analyzer_tools = AnalyzerTools(base_dir, output_dir)
+    server = Server("data-analyzer")
+
+    mode_schema = {"type": "string", "enum": MODES,
+                   "description": "full - весь файл, sampled - случайные блоки (быстро для больших файлов), "
+                                  f"auto - sampled для файлов больше {SAMPLED_FROM_MB} MB"}
+
+    # Регистрируем обработчики
+    logger.debug("Регистрация обработчиков")
+
+    @server.list_tools()
+    async def handle_list_tools() -> list[types.Tool]:
+        """Список доступных инструментов"""
+        return [
+            types.Tool(
+                name="list_data_files",
+                description="Показывает файлы данных (CSV, TSV, JSON, XML, Excel, Parquet) в базовой директории",
+                inputSchema={
+                    "type": "object",
+                    "properties": {},
+                },
+            ),
+            types.Tool(
+                name="profile_file",
+                description="Профилирует файл данных: столбцы и типы, пропуски, дубликаты, выбросы, ключи, "
+                            "персональные данные, связи столбцов. Повторный вызов для неизмененного файла - из кэша",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "file_name": {"type": "string", "description": "Имя файла в базовой директории"},
+                        "mode": mode_schema,
+                        "refresh": {"type": "boolean", "description": "Пересчитать, даже если профиль есть в кэше"},
+                    },
+                    "required": ["file_name"],
+                },
+            ),
+            types.Tool(
+                name="get_cached_profile",
+                description="Возвращает уже рассчитанный профиль файла без нового расчета",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "file_name": {"type": "string", "description": "Имя файла в базовой директории"},
+                    },
+                    "required": ["file_name"],
+                },
+            ),
+            types.Tool(
+                name="get_recommendations",
+                description="Рекомендации LLM по файлу данных: качество, предобработка, анализ, место хранения. "
+                            "Профилирует файл, если профиля еще нет",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "file_name": {"type": "string", "description": "Имя файла в базовой директории"},
+                        "mode": mode_schema,
+                        "refresh": {"type": "boolean", "description": "Пересчитать профиль и запросить LLM заново"},
+                    },
+                    "required": ["file_name"],
+                },
+            ),
+        ]
+
+    @server.call_tool()
+    async def handle_call_tool(
+        name: str, arguments: dict[str, Any] | None
+    ) -> list[types.TextContent]:
+        """Обработка запросов на выполнение инструментов"""
+        try:
+            if not arguments:
+                arguments = {}
+
+            if name == "list_data_files":
+                result = await asyncio.to_thread(analyzer_tools.list_data_files)
+                return [types.TextContent(type="text", text=result)]
+
+            elif name == "profile_file":
+                if "file_name" not in arguments:
+                    raise ValueError("Отсутствует аргумент file_name")
+                result = await analyzer_tools.profile_file(arguments["file_name"], tool_mode(arguments),
+                                                           bool(arguments.get("refresh")), Progress(server))
+                return [types.TextContent(type="text", text=result)]
+
+            elif name == "get_cached_profile":
+                if "file_name" not in arguments:
+                    raise ValueError("Отсутствует аргумент file_name")
+                result = await analyzer_tools.get_cached_profile(arguments["file_name"])
+                return [types.TextContent(type="text", text=result)]
+
+            elif name == "get_recommendations":
+                if "file_name" not in arguments:
+                    raise ValueError("Отсутствует аргумент file_name")
+                result = await analyzer_tools.get_recommendations(arguments["file_name"],
+                                                                  tool_mode(arguments),
+                                                                  bool(arguments.get("refresh")), Progress(server))
+                return [types.TextContent(type="text", text=result)]
+
+            else:
+                raise ValueError(f"Неизвестный инструмент: {name}")
+
+        except Exception as e:
+            return [types.TextContent(type="text", text=f"Ошибка: {str(e)}")]
+
+    async with stdio_server() as (read_stream, write_stream):
+        # stdout занят протоколом MCP: вывод анализатора (print, rich) - в stderr
+        sys.stdout = sys.stderr
+        logger.info("Сервер запущен с транспортом stdio")
+        await server.run(
+            read_stream,
+            write_stream,
+            InitializationOptions(
+                server_name="data-analyzer",
+                server_version="0.1.0",
+                capabilities=server.get_capabilities(
+                    notification_options=NotificationOptions(),
+                    experimental_capabilities={},
+                ),
+            ),
+        )
+
+class ServerWrapper():
+    """Обертка для совместимости с mcp[cli]"""
+    def run(self):
+        asyncio.run(main(BASE_DIR, OUTPUT_DIR))
+
+wrapper = ServerWrapper()
+
+if __name__ == "__main__":
+    print(f"Запуск сервера анализа данных. Базовая директория: {BASE_DIR}", file=sys.stderr)
+    wrapper.run()